@@ -1,37 +1,311 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import math
+import cmath
 import json
 import os
-from datetime import datetime
 import threading
 import time
 import re
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Dict, Any
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.collections import LineCollection
+from mpl_toolkits.mplot3d import Axes3D  # noqa: F401 (registers the 3d projection)
 import numpy as np
+from instrumentation import Instrumentation, profiled
+import linalg_engine
+import expression_engine
+import plotting
+import data_io
+import streaming
+import stats_engine
+import sketches
+import distributions
+import monte_carlo
+import sweeps
+import bigint
+import function_library
+import scripting
+import solver
+import timeseries
+import history_store
+import live_preview
+import batch_plot
 
-class AdvancedCalculator:
+class VirtualGrid(tk.Frame):
+    """Scrollable table that only draws the cells currently in view"""
+    
+    def __init__(self, parent, cell_width=110, cell_height=22, formatter=None, **kwargs):
+        super().__init__(parent, bg='#0a0a0a', **kwargs)
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.formatter = formatter or (lambda value: f"{value:.6g}")
+        self.data = None
+        self.column_names = None
+        self.first_row = 0
+        self.first_col = 0
+        
+        self.canvas = tk.Canvas(self, bg='#1e1e1e', highlightthickness=0)
+        self.vbar = ttk.Scrollbar(self, orient='vertical', command=self.on_vscroll)
+        self.hbar = ttk.Scrollbar(self, orient='horizontal', command=self.on_hscroll)
+        self.vbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.hbar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        self.canvas.bind('<Configure>', lambda e: self.redraw())
+        self.canvas.bind('<MouseWheel>', lambda e: self.scroll_rows(-1 if e.delta > 0 else 1))
+        self.canvas.bind('<Button-4>', lambda e: self.scroll_rows(-1))
+        self.canvas.bind('<Button-5>', lambda e: self.scroll_rows(1))
+    
+    def set_data(self, data, column_names=None):
+        """Show a 1D or 2D array (may be memory-mapped or any object with shape and 2D slicing)"""
+        if data is not None and np.ndim(data) == 1:
+            data = np.asarray(data).reshape(-1, 1)
+        self.data = data
+        self.column_names = column_names
+        self.first_row = 0
+        self.first_col = 0
+        self.redraw()
+    
+    def shape(self):
+        return (0, 0) if self.data is None else self.data.shape
+    
+    def visible_counts(self):
+        rows = max(1, self.canvas.winfo_height() // self.cell_height - 1)
+        cols = max(1, (self.canvas.winfo_width() - 60) // self.cell_width)
+        return rows, cols
+    
+    def scroll_rows(self, amount):
+        n_rows, _ = self.shape()
+        rows, _ = self.visible_counts()
+        self.first_row = max(0, min(self.first_row + amount, max(0, n_rows - rows)))
+        self.redraw()
+    
+    def _scroll(self, args, first, total, visible, unit):
+        if args[0] == 'moveto':
+            first = int(float(args[1]) * total)
+        elif args[0] == 'scroll':
+            step = int(args[1]) * (visible if args[2] == 'pages' else unit)
+            first += step
+        return max(0, min(first, max(0, total - visible)))
+    
+    def on_vscroll(self, *args):
+        n_rows, _ = self.shape()
+        rows, _ = self.visible_counts()
+        self.first_row = self._scroll(args, self.first_row, n_rows, rows, 1)
+        self.redraw()
+    
+    def on_hscroll(self, *args):
+        _, n_cols = self.shape()
+        _, cols = self.visible_counts()
+        self.first_col = self._scroll(args, self.first_col, n_cols, cols, 1)
+        self.redraw()
+    
+    def redraw(self):
+        """Draw the visible window of cells"""
+        self.canvas.delete('all')
+        n_rows, n_cols = self.shape()
+        if not n_rows or not n_cols:
+            self.vbar.set(0, 1)
+            self.hbar.set(0, 1)
+            return
+        
+        rows, cols = self.visible_counts()
+        last_row = min(n_rows, self.first_row + rows)
+        last_col = min(n_cols, self.first_col + cols)
+        window = np.asarray(self.data[self.first_row:last_row, self.first_col:last_col])
+        
+        header_fg, cell_fg = '#7f8c8d', '#00ff88'
+        font = ('JetBrains Mono', 10)
+        for j in range(last_col - self.first_col):
+            x = 60 + j * self.cell_width + self.cell_width - 5
+            column = self.first_col + j
+            label = self.column_names[column] if self.column_names else str(column)
+            self.canvas.create_text(x, self.cell_height // 2, text=label,
+                                    fill=header_fg, font=font, anchor='e')
+        for i in range(last_row - self.first_row):
+            y = (i + 1) * self.cell_height + self.cell_height // 2
+            self.canvas.create_text(55, y, text=str(self.first_row + i), fill=header_fg,
+                                    font=font, anchor='e')
+            for j in range(last_col - self.first_col):
+                x = 60 + j * self.cell_width + self.cell_width - 5
+                self.canvas.create_text(x, y, text=self.formatter(window[i, j]),
+                                        fill=cell_fg, font=font, anchor='e')
+        
+        self.vbar.set(self.first_row / n_rows, last_row / n_rows)
+        self.hbar.set(self.first_col / n_cols, last_col / n_cols)
+
+
+class SessionManager:
+    """Calculator sessions hosted by one process, sharing engines and worker pools
+
+    Each session (the Tk root window, then a Toplevel per File > New
+    Session) has its own display, expression, history, memory and
+    variables. The compiled-expression cache is process-wide in
+    expression_engine; the function library, the process pool used by
+    statistics, Monte Carlo and big-integer expansion, and the matrix
+    worker are created once here and used by every session.
+    """
+    
     def __init__(self, root):
         self.root = root
+        self.sessions = []
+        self.opened = 0
+        self.function_library = function_library.FunctionLibrary()
+        self.library_loaded = False
+        self.workers = os.cpu_count() or 1
+        self.executor = None
+        self.matrix_worker = None
+        # The engine's counter hook is process-wide: register it once and fan out
+        expression_engine.set_counter(self.count)
+    
+    def count(self, name):
+        """Report an engine counter (cache hits, misses, evaluations) to every session's profiler"""
+        for calculator in list(self.sessions):
+            calculator.profiler.count(name)
+    
+    def open_session(self, window=None):
+        """Start a session in window (default: a new Toplevel)"""
+        if window is None:
+            window = tk.Toplevel(self.root)
+        calculator = AdvancedCalculator(window, self)
+        self.sessions.append(calculator)
+        self.opened += 1
+        if self.opened > 1:
+            window.title(f"{window.title()} [{self.opened}]")
+        window.protocol("WM_DELETE_WINDOW", lambda: self.close_session(calculator))
+        return calculator
+    
+    def close_session(self, calculator):
+        """Stop a session; the last one closing shuts the shared pools down"""
+        calculator.shutdown()
+        self.sessions.remove(calculator)
+        if not self.sessions:
+            self.shutdown()
+            self.root.destroy()
+        elif calculator.root is self.root:
+            # The root window hosts the other sessions' Toplevels: empty and hide it
+            others = {session.root for session in self.sessions}
+            for child in self.root.winfo_children():
+                if child not in others:
+                    child.destroy()
+            self.root.config(menu='')
+            self.root.withdraw()
+        else:
+            calculator.root.destroy()
+    
+    def close_all(self):
+        for calculator in list(self.sessions):
+            self.close_session(calculator)
+    
+    def get_executor(self):
+        """Process pool for statistics map-reduce and Monte Carlo, created on first use"""
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+        return self.executor
+    
+    def get_matrix_worker(self):
+        if self.matrix_worker is None:
+            self.matrix_worker = linalg_engine.MatrixWorker()
+        return self.matrix_worker
+    
+    def shutdown(self):
+        if self.matrix_worker is not None:
+            self.matrix_worker.shutdown()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class AdvancedCalculator:
+    # Graphing modes: combobox label -> (plot method, function entry label)
+    PLOT_MODES = {
+        'y = f(x)': ('plot_explicit', "Function f(x) ="),
+        'Parametric x(t), y(t)': ('plot_parametric', "x(t); y(t) ="),
+        'Polar r(θ)': ('plot_polar', "r(θ) ="),
+        'Implicit F(x, y) = 0': ('plot_implicit', "F(x, y) ="),
+        'Domain coloring f(z)': ('plot_domain_coloring', "Function f(z) ="),
+        'Surface z = f(x, y)': ('plot_surface', "z = f(x, y) ="),
+        'Data points': ('plot_points', "Title:"),
+        'Live stream': ('plot_stream', "File or pipe:"),
+    }
+    
+    SURFACE_RESOLUTION = 1000  # Samples per axis evaluated for 3D surfaces
+    SURFACE_STILL_PIXELS = 4   # Canvas pixels per drawn sample at rest
+    SURFACE_DRAG_PIXELS = 16   # Canvas pixels per drawn sample while rotating
+    DENSITY_THRESHOLD = 100000  # Above this many points, plot a binned density image
+    STREAM_CAPACITY = 10000     # Samples kept by the live stream ring buffer
+    STREAM_INTERVAL_MS = 50     # Live stream redraw cadence
+    LARGE_IMPORT_BYTES = 1 << 20  # Imports above this stay as arrays, not text
+    TABLE_IN_MEMORY_BYTES = 256 << 20  # Larger tables are streamed from disk in chunks
+    PARALLEL_STATS_BYTES = 256 << 20  # Larger Statistics imports are reduced on all cores
+    TABLE_CHUNK_ROWS = 1 << 20
+    REGRESSION_PLOT_POINTS = 1000000  # Points sampled for the regression scatter
+    SWEEP_DATASET_ROWS = 50_000_000  # Largest sweep loaded into Statistics as an array
+    FACTORIAL_LIMIT = 250_000  # ~1.2 million digits, computed in well under a second
+    
+    # Scientific buttons available on the complex principal branch (radians)
+    COMPLEX_FUNCTIONS = {
+        'sin': cmath.sin, 'cos': cmath.cos, 'tan': cmath.tan,
+        'asin': cmath.asin, 'acos': cmath.acos, 'atan': cmath.atan,
+        'log': cmath.log10, 'ln': cmath.log, 'exp': cmath.exp,
+        '√': cmath.sqrt, '∛': expression_engine.COMPLEX_NAMESPACE['cbrt'],
+        'x²': lambda z: z * z, '1/x': lambda z: 1 / z, '|x|': abs,
+        'π': lambda z: math.pi, 'e': lambda z: math.e
+    }
+    
+    def __init__(self, root, shared=None):
+        self.root = root
+        self.shared = shared or SessionManager(root)  # Engines and pools common to all sessions
         self.root.title("Advanced Scientific Calculator Pro")
         self.root.geometry("800x900")
         self.root.minsize(600, 700)
         self.root.configure(bg='#0a0a0a')
         
+        # Opt-in profiling (CALC_PROFILE=1 or Tools > Profiling)
+        self.profiler = Instrumentation(enabled=os.environ.get('CALC_PROFILE') == '1')
+        
         # Variables
         self.display_var = tk.StringVar()
         self.display_var.set("0")
         self.current_expression = ""
-        self.history = []
+        self.history = history_store.History()
         self.memory_value = 0
         self.variables = {}  # For storing variables (x, y, etc.)
+        self.last_answer = 0  # Exact last result, reachable as 'ans' in expressions
+        self._expansion = (None, None)  # (big int, full decimal text) from the last copy
+        self.live_preview = live_preview.LivePreview()
+        self._preview_poll = None  # after() id while a preview is outstanding
         self.theme = "dark"  # Default theme
         self.precision = 10  # Decimal precision
+        self.complex_mode = tk.BooleanVar(value=False)
+        self.complex_display = "rect"  # 'rect' (a + bi) or 'polar' (r ∠ θ°)
         
         # Data for graphing
-        self.plot_data = {'x': [], 'y': []}
+        self.plot_data = {'x': np.empty(0), 'y': np.empty(0)}
+        self.density_image = None
+        self._rebin_pending = None
+        self.stream_reader = None
+        self.stream_buffer = None
+        
+        # Statistics dataset: imported array (bypasses the text box) and parse/sort caches
+        self.stats_array = None
+        self._data_cache = (None, None)    # (text, parsed array)
+        self._sorted_cache = (None, None)  # (source array, sorted copy)
+        self.stats_table = None  # {'path', 'array', 'columns'} for multi-column data
+        self.stats_source_path = None  # Dataset too large to load; reduced in parallel
+        self._moments_cache = (None, None)  # ((path, mtime), MomentState)
+        self._sketch_cache = (None, None)   # ((path, mtime) or source array, DatasetSketch)
+        self.stats_workers = self.shared.workers
+        self.monte_carlo_run = None
+        self.function_library = self.shared.function_library
+        self._render_generation = 0  # Cancels stale progressive renders
+        self.surface_data = None  # Full-resolution (x, y, z) of the current 3D plot
+        self.surface_artist = None
+        self._rotating = False
         
         # Load settings
         self.load_settings()
@@ -44,6 +318,7 @@ class AdvancedCalculator:
         self.create_notebook()  # Tabbed interface
         self.create_menu()
         self.create_status_bar()
+        self.load_function_library()
         
         # Bind keyboard events
         self.bind_keyboard_events()
@@ -51,6 +326,11 @@ class AdvancedCalculator:
         # Auto-save timer
         self.start_auto_save()
         
+        # Profiling heartbeat and overlay
+        if self.profiler.enabled:
+            self.set_profiling(True)
+        
+    @profiled
     def setup_styles(self):
         """Configure modern styles with theme support"""
         self.style = ttk.Style()
@@ -136,6 +416,16 @@ class AdvancedCalculator:
                                    wraplength=700)
         self.expr_display.pack(fill=tk.X, pady=(0, 5))
         
+        # Live preview of the expression's value while typing
+        self.preview_var = tk.StringVar()
+        self.preview_display = tk.Label(display_frame,
+                                      textvariable=self.preview_var,
+                                      font=('JetBrains Mono', 12),
+                                      bg='#0a0a0a',
+                                      fg='#4a90e2',
+                                      anchor='e')
+        self.preview_display.pack(fill=tk.X)
+        
         # Main display with gradient effect
         display_container = tk.Frame(display_frame, bg='#1e1e1e', relief='flat', bd=2)
         display_container.pack(fill=tk.X, ipady=5, ipadx=10)
@@ -182,6 +472,11 @@ class AdvancedCalculator:
         self.notebook.add(self.graph_frame, text="Graphing")
         self.create_graphing_interface()
         
+        # Matrix Tab
+        self.matrix_frame = tk.Frame(self.notebook, bg='#0a0a0a')
+        self.notebook.add(self.matrix_frame, text="Matrix")
+        self.create_matrix_interface()
+        
     def create_basic_buttons(self):
         """Create basic calculator buttons with modern layout"""
         button_frame = tk.Frame(self.basic_frame, bg='#0a0a0a')
@@ -232,6 +527,25 @@ class AdvancedCalculator:
     
     def create_scientific_buttons(self):
         """Create scientific calculator interface"""
+        # Complex mode bar
+        mode_frame = tk.Frame(self.scientific_frame, bg='#0a0a0a')
+        mode_frame.pack(fill=tk.X, padx=10, pady=(5, 0))
+        
+        tk.Checkbutton(mode_frame, text="Complex", variable=self.complex_mode,
+                      command=self.on_complex_mode_changed, bg='#0a0a0a', fg='#ffffff',
+                      selectcolor='#4a90e2', font=('JetBrains Mono', 11)).pack(side=tk.LEFT)
+        
+        self.complex_display_var = tk.StringVar(value=self.complex_display)
+        for text, value in (("a+bi", "rect"), ("r∠θ", "polar")):
+            tk.Radiobutton(mode_frame, text=text, variable=self.complex_display_var, value=value,
+                          command=self.on_complex_mode_changed, bg='#0a0a0a', fg='#ffffff',
+                          selectcolor='#4a90e2', font=('JetBrains Mono', 11)).pack(side=tk.LEFT, padx=5)
+        
+        ttk.Button(mode_frame, text="i", style='Function.TButton',
+                  command=self.add_imaginary_unit).pack(side=tk.RIGHT)
+        ttk.Button(mode_frame, text="Solve...", style='Function.TButton',
+                  command=self.open_solver).pack(side=tk.RIGHT, padx=5)
+        
         button_frame = tk.Frame(self.scientific_frame, bg='#0a0a0a')
         button_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
@@ -333,6 +647,38 @@ class AdvancedCalculator:
         self.data_entry = tk.Text(input_frame, height=3, font=('JetBrains Mono', 11),
                                 bg='#1e1e1e', fg='#ffffff', insertbackground='#ffffff')
         self.data_entry.pack(fill=tk.X, pady=5)
+        self.data_entry.bind('<Key>', self.on_data_entry_key)
+        
+        # Multi-column table controls
+        table_frame = tk.Frame(self.stats_frame, bg='#0a0a0a')
+        table_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        ttk.Button(table_frame, text="Import Table", style='Function.TButton',
+                  command=self.import_table).grid(row=0, column=0, padx=(0, 5), sticky='w')
+        self.table_info = tk.Label(table_frame, text="No table", bg='#0a0a0a', fg='#7f8c8d',
+                                 font=('JetBrains Mono', 10))
+        self.table_info.grid(row=0, column=1, columnspan=5, sticky='w')
+        
+        tk.Label(table_frame, text="X:", bg='#0a0a0a', fg='#ffffff').grid(row=1, column=0, sticky='e')
+        self.table_x = ttk.Combobox(table_frame, state='readonly', width=12)
+        self.table_x.grid(row=1, column=1, padx=2)
+        tk.Label(table_frame, text="Y:", bg='#0a0a0a', fg='#ffffff').grid(row=1, column=2, sticky='e')
+        self.table_y = ttk.Combobox(table_frame, state='readonly', width=12)
+        self.table_y.grid(row=1, column=3, padx=2)
+        tk.Label(table_frame, text="Degree:", bg='#0a0a0a', fg='#ffffff').grid(row=1, column=4, sticky='e')
+        self.regression_degree = tk.Spinbox(table_frame, from_=1, to=8, width=3,
+                                          bg='#1e1e1e', fg='#ffffff')
+        self.regression_degree.grid(row=1, column=5, padx=2, sticky='w')
+        
+        table_buttons = [
+            ("Summary", self.table_summary),
+            ("Correlation", lambda: self.table_matrix("Correlation")),
+            ("Covariance", lambda: self.table_matrix("Covariance")),
+            ("Regression", self.table_regression)
+        ]
+        for i, (text, command) in enumerate(table_buttons):
+            ttk.Button(table_frame, text=text, style='Function.TButton',
+                      command=command).grid(row=2, column=i, padx=2, pady=5, sticky='ew')
         
         # Statistics buttons
         stats_btn_frame = tk.Frame(self.stats_frame, bg='#0a0a0a')
@@ -344,7 +690,9 @@ class AdvancedCalculator:
             ("Mode", self.calc_mode),
             ("Std Dev", self.calc_std_dev),
             ("Variance", self.calc_variance),
-            ("Range", self.calc_range)
+            ("Range", self.calc_range),
+            ("Percentiles", self.calc_percentiles),
+            ("Distinct", self.calc_distinct)
         ]
         
         for i, (text, command) in enumerate(stats_buttons):
@@ -352,10 +700,76 @@ class AdvancedCalculator:
                            command=command)
             btn.grid(row=i//3, column=i%3, padx=5, pady=5, sticky='ew')
         
+        # Approximate mode: mergeable sketches instead of sorting or counting every value
+        sketch_frame = tk.Frame(self.stats_frame, bg='#0a0a0a')
+        sketch_frame.pack(fill=tk.X, padx=10)
+        
+        self.stats_approximate = tk.BooleanVar(value=False)
+        tk.Checkbutton(sketch_frame, text="Approximate (sketches)", variable=self.stats_approximate,
+                      bg='#0a0a0a', fg='#ffffff', selectcolor='#1e1e1e',
+                      activebackground='#0a0a0a').pack(side=tk.LEFT)
+        ttk.Button(sketch_frame, text="Merge Sketches", style='Function.TButton',
+                  command=self.merge_sketches).pack(side=tk.RIGHT, padx=2)
+        ttk.Button(sketch_frame, text="Save Sketch", style='Function.TButton',
+                  command=self.save_sketch).pack(side=tk.RIGHT, padx=2)
+        
+        # Probability distributions (the same functions are available in expressions)
+        dist_frame = tk.Frame(self.stats_frame, bg='#0a0a0a')
+        dist_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        self.distribution_name = tk.StringVar(value="Normal")
+        dist_combo = ttk.Combobox(dist_frame, textvariable=self.distribution_name, state='readonly',
+                                  width=11, values=list(distributions.DISTRIBUTIONS))
+        dist_combo.grid(row=0, column=0, padx=(0, 5))
+        dist_combo.bind('<<ComboboxSelected>>', lambda e: self.on_distribution_changed())
+        self.distribution_params_label = tk.Label(dist_frame, bg='#0a0a0a', fg='#ffffff')
+        self.distribution_params_label.grid(row=0, column=1, sticky='e')
+        self.distribution_params = tk.Entry(dist_frame, width=12, bg='#1e1e1e', fg='#ffffff')
+        self.distribution_params.grid(row=0, column=2, padx=2)
+        tk.Label(dist_frame, text="x / p / n:", bg='#0a0a0a', fg='#ffffff').grid(row=0, column=3, sticky='e')
+        self.distribution_input = tk.Entry(dist_frame, width=14, bg='#1e1e1e', fg='#ffffff')
+        self.distribution_input.grid(row=0, column=4, padx=2)
+        self.on_distribution_changed()
+        
+        dist_buttons = [
+            ("PDF", lambda: self.apply_distribution("pdf")),
+            ("CDF", lambda: self.apply_distribution("cdf")),
+            ("Inverse", lambda: self.apply_distribution("inv")),
+            ("Sample", self.sample_distribution),
+            ("Plot", self.plot_distribution)
+        ]
+        for i, (text, command) in enumerate(dist_buttons):
+            ttk.Button(dist_frame, text=text, style='Function.TButton',
+                      command=command).grid(row=1, column=i, padx=2, pady=5, sticky='ew')
+        
         # Results display
-        self.stats_result = tk.Text(self.stats_frame, height=8, font=('JetBrains Mono', 11),
+        self.stats_result = tk.Text(self.stats_frame, height=5, font=('JetBrains Mono', 11),
                                   bg='#1e1e1e', fg='#00ff88', state='disabled')
-        self.stats_result.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        self.stats_result.pack(fill=tk.X, padx=10, pady=5)
+        
+        # Distribution chart
+        chart_bar = tk.Frame(self.stats_frame, bg='#0a0a0a')
+        chart_bar.pack(fill=tk.X, padx=10)
+        
+        self.stats_chart_kind = tk.StringVar(value="Histogram")
+        ttk.Combobox(chart_bar, textvariable=self.stats_chart_kind, state='readonly', width=12,
+                    values=["Histogram", "Box Plot", "ECDF", "KDE"]).pack(side=tk.LEFT)
+        tk.Label(chart_bar, text="Bins:", bg='#0a0a0a', fg='#ffffff').pack(side=tk.LEFT, padx=(10, 2))
+        self.stats_bins = tk.Entry(chart_bar, width=6, bg='#1e1e1e', fg='#ffffff')
+        self.stats_bins.insert(0, "auto")
+        self.stats_bins.pack(side=tk.LEFT)
+        ttk.Button(chart_bar, text="Draw", style='Function.TButton',
+                  command=self.draw_distribution).pack(side=tk.RIGHT)
+        ttk.Button(chart_bar, text="Time Series...", style='Function.TButton',
+                  command=self.open_time_series).pack(side=tk.RIGHT, padx=5)
+        
+        # Figure rather than pyplot: no global registry, so a closed session's figures are freed
+        self.stats_fig = Figure(figsize=(6, 3), facecolor='#0a0a0a')
+        self.stats_ax = self.stats_fig.add_subplot(111)
+        self.stats_ax.set_facecolor('#1e1e1e')
+        self.stats_ax.tick_params(colors='#ffffff')
+        self.stats_canvas = FigureCanvasTkAgg(self.stats_fig, self.stats_frame)
+        self.stats_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
     def create_graphing_interface(self):
         """Create graphing calculator interface"""
@@ -363,8 +777,15 @@ class AdvancedCalculator:
         func_frame = tk.Frame(self.graph_frame, bg='#0a0a0a')
         func_frame.pack(fill=tk.X, padx=10, pady=5)
         
-        tk.Label(func_frame, text="Function f(x) =",
-                font=('JetBrains Mono', 12), bg='#0a0a0a', fg='#ffffff').pack(side=tk.LEFT)
+        self.plot_mode = tk.StringVar(value=next(iter(self.PLOT_MODES)))
+        mode_menu = ttk.Combobox(func_frame, textvariable=self.plot_mode, state='readonly',
+                                 values=list(self.PLOT_MODES), width=22)
+        mode_menu.pack(side=tk.LEFT, padx=(0, 5))
+        mode_menu.bind('<<ComboboxSelected>>', lambda e: self.on_plot_mode_changed())
+        
+        self.function_label = tk.Label(func_frame, text="Function f(x) =",
+                                     font=('JetBrains Mono', 12), bg='#0a0a0a', fg='#ffffff')
+        self.function_label.pack(side=tk.LEFT)
         
         self.function_entry = tk.Entry(func_frame, font=('JetBrains Mono', 12),
                                      bg='#1e1e1e', fg='#ffffff', insertbackground='#ffffff')
@@ -387,12 +808,104 @@ class AdvancedCalculator:
         self.x_max.insert(0, "10")
         self.x_max.pack(side=tk.LEFT, padx=2)
         
+        tk.Label(range_frame, text="Y Range:", bg='#0a0a0a', fg='#ffffff').pack(side=tk.LEFT, padx=(10, 0))
+        self.y_min = tk.Entry(range_frame, width=10, bg='#1e1e1e', fg='#ffffff')
+        self.y_min.insert(0, "-10")
+        self.y_min.pack(side=tk.LEFT, padx=2)
+        
+        tk.Label(range_frame, text="to", bg='#0a0a0a', fg='#ffffff').pack(side=tk.LEFT)
+        self.y_max = tk.Entry(range_frame, width=10, bg='#1e1e1e', fg='#ffffff')
+        self.y_max.insert(0, "10")
+        self.y_max.pack(side=tk.LEFT, padx=2)
+        
+        tk.Label(range_frame, text="t/θ:", bg='#0a0a0a', fg='#ffffff').pack(side=tk.LEFT, padx=(10, 0))
+        self.t_min = tk.Entry(range_frame, width=8, bg='#1e1e1e', fg='#ffffff')
+        self.t_min.insert(0, "0")
+        self.t_min.pack(side=tk.LEFT, padx=2)
+        
+        tk.Label(range_frame, text="to", bg='#0a0a0a', fg='#ffffff').pack(side=tk.LEFT)
+        self.t_max = tk.Entry(range_frame, width=8, bg='#1e1e1e', fg='#ffffff')
+        self.t_max.insert(0, "2*pi")
+        self.t_max.pack(side=tk.LEFT, padx=2)
+        
+        # Point data source
+        data_frame = tk.Frame(self.graph_frame, bg='#0a0a0a')
+        data_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        ttk.Button(data_frame, text="Import Points", style='Function.TButton',
+                  command=self.import_plot_points).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(data_frame, text="From Statistics", style='Function.TButton',
+                  command=self.use_statistics_points).pack(side=tk.LEFT)
+        ttk.Button(data_frame, text="Stream File", style='Function.TButton',
+                  command=self.choose_stream_source).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Button(data_frame, text="Stop", style='Clear.TButton',
+                  command=self.stop_stream).pack(side=tk.LEFT, padx=(5, 0))
+        self.points_info = tk.Label(data_frame, text="No point data", bg='#0a0a0a', fg='#7f8c8d',
+                                  font=('JetBrains Mono', 10))
+        self.points_info.pack(side=tk.LEFT, padx=10)
+        
         # Graph canvas
         self.create_graph_canvas()
     
+    def create_matrix_interface(self):
+        """Create matrix entry, linear algebra operations and result grid"""
+        self.matrix_operands = {'A': None, 'B': None}  # Imported arrays (bypass the text boxes)
+        self.matrix_results = {}
+        
+        entry_frame = tk.Frame(self.matrix_frame, bg='#0a0a0a')
+        entry_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        self.matrix_entries = {}
+        for col, name in enumerate(('A', 'B')):
+            header = tk.Frame(entry_frame, bg='#0a0a0a')
+            header.grid(row=0, column=col, sticky='ew', padx=5)
+            tk.Label(header, text=f"Matrix {name} (rows on lines, values comma-separated):",
+                    font=('JetBrains Mono', 10), bg='#0a0a0a', fg='#ffffff').pack(side=tk.LEFT)
+            ttk.Button(header, text="Import", style='Function.TButton',
+                      command=lambda n=name: self.import_matrix(n)).pack(side=tk.RIGHT)
+            
+            text = tk.Text(entry_frame, height=5, width=30, font=('JetBrains Mono', 11),
+                          bg='#1e1e1e', fg='#ffffff', insertbackground='#ffffff')
+            text.grid(row=1, column=col, sticky='nsew', padx=5, pady=5)
+            text.bind('<KeyRelease>', lambda e, n=name: self.matrix_operands.update({n: None}))
+            self.matrix_entries[name] = text
+            entry_frame.grid_columnconfigure(col, weight=1)
+        
+        # Operation buttons
+        ops_frame = tk.Frame(self.matrix_frame, bg='#0a0a0a')
+        ops_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        for i, (operation, (label, _)) in enumerate(linalg_engine.OPERATIONS.items()):
+            btn = ttk.Button(ops_frame, text=label, style='Function.TButton',
+                           command=lambda op=operation: self.run_matrix_operation(op))
+            btn.grid(row=i // 4, column=i % 4, padx=3, pady=3, sticky='ew')
+        for j in range(4):
+            ops_frame.grid_columnconfigure(j, weight=1)
+        
+        # Result selector and export
+        result_bar = tk.Frame(self.matrix_frame, bg='#0a0a0a')
+        result_bar.pack(fill=tk.X, padx=10, pady=5)
+        
+        self.matrix_result_choice = tk.StringVar()
+        self.matrix_result_menu = ttk.Combobox(result_bar, textvariable=self.matrix_result_choice,
+                                               state='readonly', width=20)
+        self.matrix_result_menu.pack(side=tk.LEFT)
+        self.matrix_result_menu.bind('<<ComboboxSelected>>', lambda e: self.show_matrix_result())
+        
+        self.matrix_info = tk.Label(result_bar, text="", font=('JetBrains Mono', 10),
+                                  bg='#0a0a0a', fg='#7f8c8d', anchor='w')
+        self.matrix_info.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=10)
+        
+        ttk.Button(result_bar, text="Export", style='Function.TButton',
+                  command=self.export_matrix_result).pack(side=tk.RIGHT)
+        
+        self.matrix_grid = VirtualGrid(self.matrix_frame, formatter=self.format_matrix_cell)
+        self.matrix_grid.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+    
     def create_graph_canvas(self):
         """Create matplotlib canvas for graphing"""
-        self.fig, self.ax = plt.subplots(figsize=(8, 6), facecolor='#0a0a0a')
+        self.fig = Figure(figsize=(8, 6), facecolor='#0a0a0a')
+        self.ax = self.fig.add_subplot(111)
         self.ax.set_facecolor('#1e1e1e')
         self.ax.grid(True, alpha=0.3)
         self.ax.set_xlabel('X', color='#ffffff')
@@ -401,6 +914,16 @@ class AdvancedCalculator:
         
         self.canvas = FigureCanvasTkAgg(self.fig, self.graph_frame)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        
+        # Decimate 3D surfaces while they are being rotated
+        self.canvas.mpl_connect('button_press_event', self.on_surface_press)
+        self.canvas.mpl_connect('button_release_event', self.on_surface_release)
+        
+        # Scroll to zoom point data; the density image re-bins to the new window
+        self.canvas.mpl_connect('scroll_event', self.on_points_scroll)
+        
+        # Keep the live stream's blit background in sync with full redraws
+        self.canvas.mpl_connect('draw_event', self.on_canvas_draw)
     
     def create_menu(self):
         """Create comprehensive menu system"""
@@ -414,8 +937,10 @@ class AdvancedCalculator:
         file_menu.add_command(label="Export History", command=self.export_history)
         file_menu.add_command(label="Save Session", command=self.save_session)
         file_menu.add_command(label="Load Session", command=self.load_session)
+        file_menu.add_command(label="New Session", command=self.shared.open_session)
+        file_menu.add_command(label="Batch Plot Export...", command=self.batch_plot_export)
         file_menu.add_separator()
-        file_menu.add_command(label="Exit", command=self.root.quit)
+        file_menu.add_command(label="Exit", command=self.shared.close_all)
         
         # Edit menu
         edit_menu = tk.Menu(menubar, tearoff=0, bg='#2d2d2d', fg='#ffffff')
@@ -436,7 +961,16 @@ class AdvancedCalculator:
         menubar.add_cascade(label="Tools", menu=tools_menu)
         tools_menu.add_command(label="Unit Converter", command=self.open_unit_converter)
         tools_menu.add_command(label="Currency Converter", command=self.open_currency_converter)
+        tools_menu.add_command(label="Monte Carlo...", command=self.open_monte_carlo)
+        tools_menu.add_command(label="Parameter Sweep...", command=self.open_sweep)
+        tools_menu.add_command(label="Function Library...", command=self.open_function_library)
+        tools_menu.add_command(label="Script...", command=self.open_script)
         tools_menu.add_command(label="Settings", command=self.open_settings)
+        tools_menu.add_separator()
+        self.profiling_var = tk.BooleanVar(value=self.profiler.enabled)
+        tools_menu.add_checkbutton(label="Profiling", variable=self.profiling_var,
+                                   command=lambda: self.set_profiling(self.profiling_var.get()))
+        tools_menu.add_command(label="Export Trace...", command=self.export_trace)
         
         # Help menu
         help_menu = tk.Menu(menubar, tearoff=0, bg='#2d2d2d', fg='#ffffff')
@@ -457,6 +991,11 @@ class AdvancedCalculator:
         self.status_right = tk.Label(self.status_bar, text=f"Precision: {self.precision}",
                                    bg='#1e1e1e', fg='#7f8c8d', anchor='e')
         self.status_right.pack(side=tk.RIGHT, padx=5)
+        
+        # Profiling overlay, only shown while instrumentation is enabled
+        self.status_profile = tk.Label(self.status_bar, text="",
+                                     bg='#1e1e1e', fg='#ff6b35', anchor='e',
+                                     font=('JetBrains Mono', 9))
     
     def get_button_style_command(self, text):
         """Enhanced button style and command mapping"""
@@ -497,10 +1036,17 @@ class AdvancedCalculator:
         return commands.get(text, lambda: None)
     
     # Enhanced calculation methods
+    @profiled
     def apply_function(self, function):
         """Enhanced function application with more operations"""
+        if self.complex_mode.get() and function in self.COMPLEX_FUNCTIONS:
+            self.apply_complex_function(function)
+            return
+        
         try:
-            current_value = float(self.display_var.get().replace(',', ''))
+            current_value = self.displayed_integer()
+            if current_value is None:
+                current_value = float(self.display_var.get().replace(',', ''))
             
             # Trigonometric functions
             if function == 'sin':
@@ -556,10 +1102,10 @@ class AdvancedCalculator:
             
             # Factorial
             elif function in ['n!', 'x!']:
-                if current_value >= 0 and current_value == int(current_value) and current_value <= 170:
+                if 0 <= current_value <= self.FACTORIAL_LIMIT and current_value == int(current_value):
                     result = math.factorial(int(current_value))
                 else:
-                    raise ValueError("Factorial only for non-negative integers ≤ 170")
+                    raise ValueError(f"Factorial only for non-negative integers ≤ {self.FACTORIAL_LIMIT:,}")
             
             # Constants
             elif function == 'π':
@@ -574,16 +1120,55 @@ class AdvancedCalculator:
             else:
                 return
             
+            self.show_result(result)
+            self.update_status(self.describe_result(result) or "Function applied")
+            
+        except Exception as e:
+            self.display_var.set("Error")
+            self.current_expression = ""
+            self.update_status(f"Error: {str(e)}")
+    
+    def apply_complex_function(self, function):
+        """Apply a scientific function on the complex principal branch"""
+        try:
+            result = self.COMPLEX_FUNCTIONS[function](self.get_display_value())
             self.display_var.set(self.format_number(result))
-            self.current_expression = str(result)
+            self.current_expression = repr(result)
             self.update_displays()
             self.update_status("Function applied")
-            
         except Exception as e:
             self.display_var.set("Error")
             self.current_expression = ""
             self.update_status(f"Error: {str(e)}")
     
+    def get_display_value(self):
+        """Parse the display, including complex values in a+bi or r∠θ° form"""
+        text = self.display_var.get().replace(',', '')
+        if not self.complex_mode.get():
+            return float(text)
+        if '∠' in text:
+            modulus, angle = text.replace('°', '').split('∠')
+            return cmath.rect(float(modulus), math.radians(float(angle)))
+        return complex(expression_engine.evaluate(text.replace(' ', ''), 'complex'))
+    
+    def add_imaginary_unit(self):
+        """Enter i, switching on complex mode if needed"""
+        if not self.complex_mode.get():
+            self.complex_mode.set(True)
+            self.on_complex_mode_changed()
+        self.add_number('i')
+    
+    def on_complex_mode_changed(self):
+        """Apply complex mode and display form changes"""
+        self.complex_display = self.complex_display_var.get()
+        try:
+            value = self.get_display_value()
+            self.display_var.set(self.format_number(value))
+        except Exception:
+            pass
+        mode = "complex" if self.complex_mode.get() else "real"
+        self.update_status(f"{mode.capitalize()} mode ({self.complex_display})")
+    
     def apply_bitwise_operation(self, operation, value):
         """Apply bitwise operations for programming mode"""
         if operation == 'NOT':
@@ -592,18 +1177,21 @@ class AdvancedCalculator:
         return value
     
     # Memory operations
+    @profiled
     def memory_clear(self):
         """Clear memory"""
         self.memory_value = 0
         self.update_memory_indicator()
         self.update_status("Memory cleared")
     
+    @profiled
     def memory_recall(self):
         """Recall value from memory"""
         self.display_var.set(self.format_number(self.memory_value))
         self.current_expression = str(self.memory_value)
         self.update_status("Memory recalled")
     
+    @profiled
     def memory_store(self):
         """Store current value in memory"""
         try:
@@ -613,6 +1201,7 @@ class AdvancedCalculator:
         except:
             self.update_status("Error storing in memory")
     
+    @profiled
     def memory_add(self):
         """Add current value to memory"""
         try:
@@ -623,6 +1212,7 @@ class AdvancedCalculator:
         except:
             self.update_status("Error adding to memory")
     
+    @profiled
     def memory_subtract(self):
         """Subtract current value from memory"""
         try:
@@ -640,70 +1230,715 @@ class AdvancedCalculator:
     # Statistics functions
     def get_data_points(self):
         """Parse data points from text input"""
+        return self.get_data_array().tolist()
+    
+    def get_data_array(self):
+        """Dataset as a float array: the imported array, or the parsed (cached) text"""
+        if self.stats_array is not None:
+            return self.stats_array
+        if self.stats_source_path is not None:
+            messagebox.showerror("Error", "This dataset is too large to load; use the statistics "
+                                          "buttons (median, mode and percentiles are estimated from sketches)")
+            return np.empty(0)
         data_text = self.data_entry.get("1.0", tk.END).strip()
-        if not data_text:
-            return []
+        cached_text, cached_array = self._data_cache
+        if data_text == cached_text:
+            return cached_array
         
         try:
             # Split by comma and convert to float
-            data = [float(x.strip()) for x in data_text.split(',') if x.strip()]
-            return data
+            data = np.array([float(x.strip()) for x in data_text.split(',') if x.strip()])
         except ValueError:
             messagebox.showerror("Error", "Please enter valid numbers separated by commas")
-            return []
+            return np.empty(0)
+        self._data_cache = (data_text, data)
+        return data
+    
+    def on_data_entry_key(self, event):
+        """Typing over an imported dataset replaces it"""
+        imported = self.stats_array is not None or self.stats_source_path is not None
+        if imported and (event.char or event.keysym in ('BackSpace', 'Delete')):
+            self.stats_array = None
+            self.stats_source_path = None
+            self.data_entry.delete("1.0", tk.END)
+    
+    def get_sorted_data(self):
+        """Sorted copy of the dataset, sorted once and reused by ECDF, box plot and KDE"""
+        data = self.get_data_array()
+        cached_source, cached_sorted = self._sorted_cache
+        if cached_source is not data:
+            cached_sorted = np.sort(data[np.isfinite(data)])
+            self._sorted_cache = (data, cached_sorted)
+        return cached_sorted
     
+    @profiled
     def calc_mean(self):
         """Calculate mean"""
-        data = self.get_data_points()
-        if data:
-            mean = sum(data) / len(data)
-            self.display_stats_result(f"Mean: {mean:.6f}")
+        self.with_moments(lambda state: self.display_stats_result(f"Mean: {state.mean:.6f}"))
     
+    @profiled
     def calc_median(self):
         """Calculate median"""
-        data = self.get_data_points()
-        if data:
-            sorted_data = sorted(data)
-            n = len(sorted_data)
-            if n % 2 == 0:
-                median = (sorted_data[n//2 - 1] + sorted_data[n//2]) / 2
-            else:
-                median = sorted_data[n//2]
+        if self.use_sketches():
+            self.with_sketch(lambda sketch: self.display_stats_result(
+                f"Median ≈ {sketch.quantiles.quantiles(0.5):.6f} "
+                f"(rank error ±{sketch.quantiles.rank_error():.2%}, 99% conf.)"))
+            return
+        data = self.get_data_array()
+        if data.size:
+            median = np.median(data)
             self.display_stats_result(f"Median: {median:.6f}")
     
+    @profiled
     def calc_mode(self):
         """Calculate mode"""
-        data = self.get_data_points()
-        if data:
-            from collections import Counter
-            counter = Counter(data)
-            max_count = max(counter.values())
-            modes = [k for k, v in counter.items() if v == max_count]
+        if self.use_sketches():
+            def report(sketch):
+                hitters = sketch.heavy_hitters
+                if not hitters.counters:
+                    self.display_stats_result("Mode: no value stands out from the rest")
+                    return
+                value, count = hitters.top(1)[0]
+                self.display_stats_result(
+                    f"Mode ≈ {value:g} (count {count}–{count + hitters.error} of {hitters.count})")
+            self.with_sketch(report)
+            return
+        data = self.get_data_array()
+        if data.size:
+            values, counts = np.unique(data, return_counts=True)
+            modes = values[counts == counts.max()].tolist()
             self.display_stats_result(f"Mode: {modes}")
     
+    @profiled
+    def calc_percentiles(self):
+        """Calculate the 1st, 5th, 25th, 50th, 75th, 95th and 99th percentiles"""
+        levels = np.array([1, 5, 25, 50, 75, 95, 99])
+        if self.use_sketches():
+            self.with_sketch(lambda sketch: self.display_stats_result(
+                self.format_percentiles(levels, sketch.quantiles.quantiles(levels / 100))
+                + f" (rank error ±{sketch.quantiles.rank_error():.2%})"))
+            return
+        data = self.get_sorted_data()
+        if data.size:
+            values = stats_engine.quantile_sorted(data, levels / 100)
+            self.display_stats_result(self.format_percentiles(levels, values))
+    
+    def format_percentiles(self, levels, values):
+        """One-line 'P1=… P5=…' listing"""
+        return "  ".join(f"P{level}={value:.6g}" for level, value in zip(levels, values))
+    
+    @profiled
+    def calc_distinct(self):
+        """Count distinct values"""
+        if self.use_sketches():
+            self.with_sketch(lambda sketch: self.display_stats_result(
+                f"Distinct ≈ {sketch.distinct.estimate():,.0f} "
+                f"(±{sketch.distinct.relative_error():.2%} std. error)"))
+            return
+        data = self.get_sorted_data()
+        if data.size:
+            distinct = 1 + int(np.count_nonzero(data[1:] != data[:-1]))
+            self.display_stats_result(f"Distinct: {distinct:,}")
+    
+    @profiled
     def calc_std_dev(self):
         """Calculate standard deviation"""
-        data = self.get_data_points()
-        if data and len(data) > 1:
-            mean = sum(data) / len(data)
-            variance = sum((x - mean) ** 2 for x in data) / (len(data) - 1)
-            std_dev = math.sqrt(variance)
-            self.display_stats_result(f"Standard Deviation: {std_dev:.6f}")
+        def report(state):
+            if state.count > 1:
+                self.display_stats_result(f"Standard Deviation: {state.std_dev():.6f}")
+        self.with_moments(report)
     
+    @profiled
     def calc_variance(self):
         """Calculate variance"""
-        data = self.get_data_points()
-        if data and len(data) > 1:
-            mean = sum(data) / len(data)
-            variance = sum((x - mean) ** 2 for x in data) / (len(data) - 1)
-            self.display_stats_result(f"Variance: {variance:.6f}")
+        def report(state):
+            if state.count > 1:
+                self.display_stats_result(f"Variance: {state.variance():.6f}")
+        self.with_moments(report)
     
+    @profiled
     def calc_range(self):
         """Calculate range"""
-        data = self.get_data_points()
-        if data:
-            range_val = max(data) - min(data)
-            self.display_stats_result(f"Range: {range_val:.6f}")
+        self.with_moments(lambda state: self.display_stats_result(
+            f"Range: {state.maximum - state.minimum:.6f}"))
+    
+    def with_moments(self, report):
+        """Call report(state) with the dataset's moments; large files are reduced on all cores"""
+        path = self.stats_source_path
+        if path is None:
+            data = self.get_data_array()
+            if data.size:
+                report(stats_engine.MomentState.from_array(data))
+            return
+        
+        cached_key, cached_state = self._moments_cache
+        key = (path, os.path.getmtime(path))
+        if cached_key == key:
+            report(cached_state)
+            return
+        
+        def done(state):
+            self._moments_cache = (key, state)
+            report(state)
+        
+        self.reduce_file(stats_engine.parallel_file_stats, path, done)
+    
+    def use_sketches(self):
+        """Sketches answer order statistics when asked to, or when the data cannot be loaded"""
+        return self.stats_approximate.get() or self.stats_source_path is not None
+    
+    def with_sketch(self, report):
+        """Call report(sketch) with the dataset's DatasetSketch, built once per dataset"""
+        path = self.stats_source_path
+        cached_key, cached_sketch = self._sketch_cache
+        if path is None:
+            data = self.get_data_array()
+            if data.size == 0:
+                return
+            if cached_key is not data:
+                cached_sketch = sketches.DatasetSketch.from_array(data)
+                self._sketch_cache = (data, cached_sketch)
+            report(cached_sketch)
+            return
+        
+        key = (path, os.path.getmtime(path))
+        if isinstance(cached_key, tuple) and cached_key == key:
+            report(cached_sketch)
+            return
+        
+        def done(sketch):
+            self._sketch_cache = (key, sketch)
+            report(sketch)
+        
+        self.reduce_file(sketches.parallel_file_sketch, path, done)
+    
+    def reduce_file(self, reduce, path, done):
+        """Run reduce(path, executor, workers) on a helper thread and hand its result to done"""
+        executor = self.get_stats_executor()
+        result = {}
+        
+        def run():
+            try:
+                result['value'] = reduce(path, executor, self.stats_workers)
+            except Exception as e:
+                result['error'] = e
+        
+        threading.Thread(target=run, daemon=True).start()
+        self.update_status(f"Reducing {os.path.basename(path)} on {self.stats_workers} cores...")
+        self.poll_reduction(result, done)
+    
+    def poll_reduction(self, result, done):
+        """Wait for a background file reduction without blocking the event loop"""
+        if not result:
+            self.root.after(100, lambda: self.poll_reduction(result, done))
+            return
+        if 'error' in result:
+            messagebox.showerror("Statistics Error", f"Error: {str(result['error'])}")
+            return
+        self.update_status("Statistics computed")
+        done(result['value'])
+    
+    def save_sketch(self):
+        """Save the dataset's sketch so it can be merged with others later"""
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".json", filetypes=[("Sketch files", "*.json"), ("All files", "*.*")])
+        if not file_path:
+            return
+        
+        def write(sketch):
+            try:
+                sketches.save_sketch(sketch, file_path)
+                self.update_status(f"Sketch saved to {os.path.basename(file_path)}")
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to save sketch: {str(e)}")
+        
+        self.with_sketch(write)
+    
+    def merge_sketches(self):
+        """Merge saved sketches (e.g. one per file) and report the combined statistics"""
+        file_paths = filedialog.askopenfilenames(
+            filetypes=[("Sketch files", "*.json"), ("All files", "*.*")])
+        if not file_paths:
+            return
+        try:
+            merged = sketches.DatasetSketch()
+            for file_path in file_paths:
+                merged.merge(sketches.load_sketch(file_path))
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to merge sketches: {str(e)}")
+            return
+        
+        moments = merged.moments
+        levels = np.array([1, 5, 25, 50, 75, 95, 99])
+        self.display_stats_result(f"Merged {len(file_paths)} sketches: count {moments.count:,}, "
+                                  f"mean {moments.mean:.6f}, std dev {moments.std_dev():.6f}")
+        self.display_stats_result(self.format_percentiles(levels, merged.quantiles.quantiles(levels / 100))
+                                  + f" (rank error ±{merged.quantiles.rank_error():.2%})")
+        self.display_stats_result(f"Distinct ≈ {merged.distinct.estimate():,.0f}")
+    
+    def get_stats_executor(self):
+        """Process pool for statistics map-reduce, shared by all sessions"""
+        return self.shared.get_executor()
+    
+    @profiled
+    def draw_distribution(self):
+        """Draw a histogram, box plot, ECDF or KDE of the dataset"""
+        try:
+            data = self.get_sorted_data()
+            if data.size == 0:
+                raise ValueError("Enter or import data points first")
+            kind = self.stats_chart_kind.get()
+            bins_text = self.stats_bins.get().strip().lower()
+            bins = stats_engine.auto_bins(data) if bins_text in ('', 'auto') else int(bins_text)
+            
+            ax = self.stats_ax
+            ax.clear()
+            if kind == "Histogram":
+                counts, edges = stats_engine.histogram(data, bins)
+                ax.stairs(counts, edges, fill=True, color='#4a90e2')
+            elif kind == "Box Plot":
+                ax.bxp([stats_engine.box_stats(data)], showmeans=True,
+                       flierprops={'markersize': 2, 'markeredgecolor': '#ff6b35'})
+            elif kind == "ECDF":
+                x, y = stats_engine.ecdf(data)
+                ax.step(x, y, where='post', color='#00ff88')
+            else:
+                x, density = stats_engine.kde_fft(data)
+                ax.plot(x, density, color='#00ff88')
+                ax.fill_between(x, density, color='#00ff88', alpha=0.2)
+            
+            ax.set_facecolor('#1e1e1e')
+            ax.grid(True, alpha=0.3, color='#7f8c8d')
+            ax.tick_params(colors='#ffffff')
+            ax.set_title(f"{kind} (n={data.size:,})", color='#ffffff')
+            self.stats_canvas.draw()
+            self.update_status(f"{kind} drawn")
+        except Exception as e:
+            messagebox.showerror("Chart Error", f"Error drawing chart: {str(e)}")
+    
+    # Probability distributions
+    def on_distribution_changed(self):
+        """Show the selected distribution's parameter names and defaults"""
+        _, names, defaults, _ = distributions.DISTRIBUTIONS[self.distribution_name.get()]
+        self.distribution_params_label.config(text=", ".join(names) + ":")
+        self.distribution_params.delete(0, tk.END)
+        self.distribution_params.insert(0, ", ".join(f"{value:g}" for value in defaults))
+    
+    def get_distribution(self):
+        """(calculator prefix, parameter list, discrete) for the selected distribution"""
+        prefix, names, _, discrete = distributions.DISTRIBUTIONS[self.distribution_name.get()]
+        params = [float(value) for value in self.distribution_params.get().split(',') if value.strip()]
+        if len(params) != len(names):
+            raise ValueError(f"Enter parameters as: {', '.join(names)}")
+        return prefix, params, discrete
+    
+    @profiled
+    def apply_distribution(self, kind):
+        """Evaluate the PDF, CDF or inverse CDF at the entered values, or over the whole dataset"""
+        try:
+            prefix, params, _ = self.get_distribution()
+            text = self.distribution_input.get().strip()
+            if text:
+                values = np.array([float(value) for value in text.split(',') if value.strip()])
+            else:
+                values = self.get_data_array()  # e.g. p-values for every test statistic
+                if values.size == 0:
+                    return
+            name = prefix + kind
+            results = distributions.FUNCTIONS[name](values, *params)
+            
+            args = ", ".join(f"{value:g}" for value in params)
+            if values.size <= 5:
+                for value, result in zip(values, results):
+                    self.display_stats_result(f"{name}({value:g}, {args}) = {result:.10g}")
+            else:
+                finite = results[np.isfinite(results)]
+                self.display_stats_result(
+                    f"{name}(data, {args}) over {values.size:,} values: "
+                    f"min {finite.min():.6g}, mean {finite.mean():.6g}, max {finite.max():.6g}"
+                    if finite.size else f"{name}(data, {args}): no finite results")
+        except Exception as e:
+            messagebox.showerror("Distribution Error", f"Error: {str(e)}")
+    
+    @profiled
+    def sample_distribution(self):
+        """Draw n samples into the Statistics dataset"""
+        try:
+            prefix, params, _ = self.get_distribution()
+            text = self.distribution_input.get().strip()
+            count = int(float(text)) if text else 1000
+            if count <= 0:
+                raise ValueError("Sample size must be positive")
+            samples = distributions.FUNCTIONS[prefix + "rnd"](*params, count)
+            self.stats_array = np.asarray(samples, dtype=float)
+            self.stats_source_path = None
+            self.data_entry.delete("1.0", tk.END)
+            self.data_entry.insert("1.0", f"[{count:,} samples from {self.distribution_name.get()}"
+                                          f"({', '.join(f'{value:g}' for value in params)})]")
+            self.update_status(f"Sampled {count:,} values")
+        except Exception as e:
+            messagebox.showerror("Distribution Error", f"Error: {str(e)}")
+    
+    @profiled
+    def plot_distribution(self):
+        """Draw the selected distribution's PDF (or PMF) on the statistics chart"""
+        try:
+            prefix, params, discrete = self.get_distribution()
+            lo = distributions.FUNCTIONS[prefix + "inv"](0.001, *params)
+            hi = distributions.FUNCTIONS[prefix + "inv"](0.999, *params)
+            if not (np.isfinite(lo) and np.isfinite(hi)):
+                raise ValueError("Invalid parameters")
+            
+            ax = self.stats_ax
+            ax.clear()
+            if discrete:
+                k = np.arange(max(0, int(lo)), int(hi) + 1, dtype=float)
+                ax.vlines(k, 0, distributions.FUNCTIONS[prefix + "pdf"](k, *params), color='#4a90e2', lw=3)
+            else:
+                x = np.linspace(lo, hi, 1000)
+                density = distributions.FUNCTIONS[prefix + "pdf"](x, *params)
+                ax.plot(x, density, color='#00ff88')
+                ax.fill_between(x, density, color='#00ff88', alpha=0.2)
+            
+            ax.set_facecolor('#1e1e1e')
+            ax.grid(True, alpha=0.3, color='#7f8c8d')
+            ax.tick_params(colors='#ffffff')
+            ax.set_title(f"{self.distribution_name.get()}({', '.join(f'{value:g}' for value in params)})",
+                         color='#ffffff')
+            self.stats_canvas.draw()
+        except Exception as e:
+            messagebox.showerror("Distribution Error", f"Error: {str(e)}")
+    
+    # Time series
+    def open_time_series(self):
+        """Ordered analysis of the Statistics dataset, streamed in chunks and drawn on the graph canvas"""
+        window = tk.Toplevel(self.root)
+        window.title("Time Series")
+        window.geometry("520x220")
+        window.configure(bg='#0a0a0a')
+        labels = {label: name for name, (label, _) in timeseries.OPERATIONS.items()}
+        defaults = {'moving_average': "100", 'ewma': "0.05", 'rolling_std': "100", 'resample': "10000",
+                    'autocorrelation': "500", 'spectrum': "4096", 'spectrogram': "1024"}
+        state = {'cancel': None, 'result': None}
+        
+        form = tk.Frame(window, bg='#0a0a0a')
+        form.pack(fill=tk.X, padx=10, pady=10)
+        operation = tk.StringVar(value=timeseries.OPERATIONS['moving_average'][0])
+        operation_menu = ttk.Combobox(form, textvariable=operation, state='readonly',
+                                      values=list(labels), width=20)
+        operation_menu.grid(row=0, column=0, columnspan=2, sticky='w', pady=2)
+        parameter_label = tk.Label(form, bg='#0a0a0a', fg='#ffffff')
+        parameter_label.grid(row=1, column=0, sticky='e')
+        parameter = tk.Entry(form, width=12, bg='#1e1e1e', fg='#ffffff', insertbackground='#ffffff')
+        parameter.grid(row=1, column=1, sticky='w', padx=5, pady=2)
+        tk.Label(form, text="Sample rate:", bg='#0a0a0a', fg='#ffffff').grid(row=2, column=0, sticky='e')
+        rate_entry = tk.Entry(form, width=12, bg='#1e1e1e', fg='#ffffff', insertbackground='#ffffff')
+        rate_entry.insert(0, "1")
+        rate_entry.grid(row=2, column=1, sticky='w', padx=5, pady=2)
+        info = tk.Label(window, text="", bg='#0a0a0a', fg='#7f8c8d', anchor='w')
+        info.pack(fill=tk.X, padx=10)
+        
+        def on_operation_changed(event=None):
+            name = labels[operation.get()]
+            text = timeseries.OPERATIONS[name][1]
+            parameter_label.config(text=f"{text}:" if text else "")
+            parameter.delete(0, tk.END)
+            if text:
+                parameter.insert(0, defaults[name])
+            parameter.config(state=tk.NORMAL if text else tk.DISABLED)
+        operation_menu.bind('<<ComboboxSelected>>', on_operation_changed)
+        on_operation_changed()
+        
+        def run():
+            if state['cancel'] is not None:
+                return
+            name = labels[operation.get()]
+            try:
+                value = float(expression_engine.evaluate(parameter.get())) if timeseries.OPERATIONS[name][1] else None
+                rate = float(expression_engine.evaluate(rate_entry.get()))
+                if rate <= 0:
+                    raise ValueError("Sample rate must be positive")
+                source_path = self.stats_source_path
+                data = None if source_path is not None else self.get_data_array()
+                if data is not None and len(data) < 2:
+                    raise ValueError("Enter or import at least two data points")
+            except Exception as e:
+                messagebox.showerror("Time Series Error", f"Error: {str(e)}", parent=window)
+                return
+            columns = max(self.canvas.get_tk_widget().winfo_width(), 800)
+            cancelled = threading.Event()
+            progress = {'fraction': 0.0}
+            outcome = {}
+            state['cancel'] = cancelled
+            
+            def compute():
+                try:
+                    series = (timeseries.spill_text(source_path, cancelled=cancelled.is_set)
+                              if source_path is not None else timeseries.as_series(data))
+                    outcome['value'] = self.analyse_series(series, name, value, rate, columns,
+                                                           lambda fraction: progress.update(fraction=fraction),
+                                                           cancelled.is_set)
+                except Exception as e:
+                    outcome['error'] = e
+            
+            def poll():
+                if not window.winfo_exists():
+                    cancelled.set()
+                    state['cancel'] = None
+                    return
+                if not outcome:
+                    info.config(text=f"{operation.get()}... {progress['fraction']:.0%}")
+                    self.root.after(100, poll)
+                    return
+                state['cancel'] = None
+                if 'error' in outcome:
+                    cancelled_run = isinstance(outcome['error'], timeseries.Cancelled)
+                    info.config(text="Cancelled" if cancelled_run else "")
+                    if not cancelled_run:
+                        messagebox.showerror("Time Series Error", f"Error: {str(outcome['error'])}",
+                                             parent=window)
+                    return
+                state['result'] = outcome['value'].get('series')
+                self.draw_time_series(outcome['value'])
+                info.config(text=outcome['value']['summary'])
+            
+            threading.Thread(target=compute, daemon=True).start()
+            poll()
+        
+        def cancel():
+            if state['cancel'] is not None:
+                state['cancel'].set()
+        
+        def use_as_dataset():
+            if state['result'] is None:
+                messagebox.showinfo("Time Series", "Run a moving average, EWMA, rolling std, "
+                                                   "detrend or resample first", parent=window)
+                return
+            self.stats_array = state['result']
+            self.stats_source_path = None
+            self.data_entry.delete("1.0", tk.END)
+            self.data_entry.insert("1.0", f"[{len(self.stats_array):,} values from {operation.get()}]")
+            self.update_status("Time series result is now the Statistics dataset")
+        
+        buttons = tk.Frame(window, bg='#0a0a0a')
+        buttons.pack(pady=10)
+        for text, command in [("Run", run), ("Cancel", cancel), ("Use as Dataset", use_as_dataset)]:
+            ttk.Button(buttons, text=text, style='Function.TButton',
+                      command=command).pack(side=tk.LEFT, padx=5)
+        window.protocol("WM_DELETE_WINDOW", lambda: (cancel(), window.destroy()))
+    
+    @staticmethod
+    def analyse_series(series, name, value, rate, columns, progress, cancelled):
+        """Run one time-series operation (helper thread); returns what draw_time_series needs"""
+        n = len(series)
+        label = timeseries.OPERATIONS[name][0]
+        options = {'progress': progress, 'cancelled': cancelled}
+        if name in timeseries.SERIES_OPERATIONS:
+            if name == 'moving_average':
+                result = timeseries.moving_average(series, int(value), **options)
+            elif name == 'ewma':
+                result = timeseries.ewma(series, value, **options)
+            elif name == 'rolling_std':
+                result = timeseries.rolling_std(series, int(value), **options)
+            elif name == 'resample':
+                result = timeseries.resample(series, int(value), **options)
+            else:
+                result = timeseries.detrend(series, 'linear' if name == 'detrend_linear' else 'constant', **options)
+            scale = (n - 1) / max(len(result) - 1, 1) / rate  # Result positions in source time
+            source = timeseries.envelope(series, columns, cancelled=cancelled)
+            output = timeseries.envelope(result, columns, cancelled=cancelled)
+            return {'kind': 'series', 'title': f"{label} of {n:,} samples", 'series': result,
+                    'source': (source[0] / rate,) + source[1:], 'output': (output[0] * scale,) + output[1:],
+                    'summary': f"{len(result):,} values; Use as Dataset to analyse them further"}
+        if name == 'autocorrelation':
+            lags, acf = timeseries.autocorrelation(series, int(value), **options)
+            return {'kind': 'acf', 'title': f"Autocorrelation ({n:,} samples)", 'lags': lags / rate,
+                    'acf': acf, 'band': 1.96 / np.sqrt(n),
+                    'summary': f"Lag 1: {acf[1]:.4f}; 95% band ±{1.96 / np.sqrt(n):.2g}"}
+        if name == 'spectrum':
+            frequencies, psd = timeseries.power_spectrum(series, int(value), rate, **options)
+            peak = frequencies[1:][np.argmax(psd[1:])] if psd.size > 1 else 0.0
+            return {'kind': 'spectrum', 'title': f"Power spectrum ({n:,} samples, segment {int(value)})",
+                    'frequencies': frequencies, 'psd': psd, 'summary': f"Peak frequency {peak:.6g}"}
+        times, frequencies, power = timeseries.spectrogram(series, int(value), rate, columns, **options)
+        return {'kind': 'spectrogram', 'title': f"Spectrogram ({n:,} samples, segment {int(value)})",
+                'times': times, 'frequencies': frequencies, 'power': power,
+                'summary': f"{power.shape[1]:,} time bins × {power.shape[0]:,} frequencies"}
+    
+    def draw_time_series(self, result):
+        """Draw an analyse_series result on the graph canvas"""
+        self._render_generation += 1
+        self.stop_stream()
+        self.notebook.select(self.graph_frame)
+        self.ensure_axes('rectilinear')
+        ax = self.ax
+        ax.clear()
+        x_label, y_label = 'Time', 'Value'
+        if result['kind'] == 'series':
+            for (positions, lows, highs, means), color, alpha in ((result['source'], '#7f8c8d', 0.4),
+                                                                   (result['output'], '#00ff88', 0.3)):
+                if np.any(highs > lows):
+                    ax.fill_between(positions, lows, highs, color=color, alpha=alpha, linewidth=0)
+                ax.plot(positions, means, color=color, linewidth=1)
+        elif result['kind'] == 'acf':
+            lags, acf = result['lags'], result['acf']
+            if lags.size <= 200:
+                ax.vlines(lags, 0, acf, color='#00ff88')
+            else:
+                ax.plot(lags, acf, color='#00ff88', linewidth=1)
+            for level in (result['band'], -result['band']):
+                ax.axhline(level, color='#ff6b35', linestyle='--', linewidth=1)
+            x_label, y_label = 'Lag', 'Autocorrelation'
+        elif result['kind'] == 'spectrum':
+            ax.semilogy(result['frequencies'][1:], result['psd'][1:], color='#00ff88', linewidth=1)
+            x_label, y_label = 'Frequency', 'Power / frequency'
+        else:
+            times, frequencies, power = result['times'], result['frequencies'], result['power']
+            decibels = 10 * np.log10(np.maximum(power, np.finfo(float).tiny))
+            ax.imshow(decibels, origin='lower', aspect='auto', cmap='viridis',
+                      extent=(times[0], times[-1], frequencies[0], frequencies[-1]),
+                      vmin=np.percentile(decibels, 5), vmax=decibels.max())
+            x_label, y_label = 'Time', 'Frequency'
+        self.style_axes(result['title'])
+        ax.set_xlabel(x_label, color='#ffffff')
+        ax.set_ylabel(y_label, color='#ffffff')
+        self.canvas.draw()
+        self.update_status(result['summary'])
+    
+    # Multi-column tables
+    def import_table(self):
+        """Import a CSV table with optional header; large files stay on disk"""
+        file_path = filedialog.askopenfilename(
+            title="Import Table",
+            filetypes=[("CSV files", "*.csv"), ("NumPy arrays", "*.npy"),
+                      ("Text files", "*.txt"), ("All files", "*.*")]
+        )
+        if not file_path:
+            return
+        try:
+            if file_path.lower().endswith('.npy'):
+                array = data_io.load_array(file_path)
+                columns = [f"col{i + 1}" for i in range(array.shape[1])]
+                path = None
+            else:
+                header, count = data_io.read_header(file_path)
+                columns = header or [f"col{i + 1}" for i in range(count)]
+                if os.path.getsize(file_path) > self.TABLE_IN_MEMORY_BYTES:
+                    array, path = None, file_path
+                else:
+                    array, path = data_io.load_array(file_path), None
+            
+            self.stats_table = {'path': path, 'array': array, 'columns': columns}
+            self.table_x['values'] = columns
+            self.table_y['values'] = columns
+            self.table_x.current(0)
+            self.table_y.current(min(1, len(columns) - 1))
+            rows = f"{array.shape[0]:,} rows" if array is not None else "streamed from disk"
+            self.table_info.config(text=f"{os.path.basename(file_path)}: {len(columns)} columns, {rows}")
+            self.update_status("Table imported successfully")
+        except Exception as e:
+            messagebox.showerror("Import Error", f"Error importing table: {str(e)}")
+    
+    def iter_table(self):
+        """Yield the table in row chunks, from memory or from disk"""
+        if self.stats_table is None:
+            raise ValueError("Import a table first")
+        array = self.stats_table['array']
+        if array is None:
+            yield from data_io.iter_table_chunks(self.stats_table['path'])
+        else:
+            for start in range(0, array.shape[0], self.TABLE_CHUNK_ROWS):
+                yield array[start:start + self.TABLE_CHUNK_ROWS]
+    
+    def accumulate_table(self, transform=None):
+        """One pass over the table into a cross-product accumulator"""
+        accumulator = None
+        for chunk in self.iter_table():
+            if transform is not None:
+                chunk = transform(chunk)
+            if accumulator is None:
+                accumulator = stats_engine.CrossProductAccumulator(chunk.shape[1])
+            accumulator.update(chunk)
+        if accumulator is None or accumulator.count == 0:
+            raise ValueError("Table has no complete numeric rows")
+        return accumulator
+    
+    @profiled
+    def table_summary(self):
+        """Per-column summary statistics"""
+        try:
+            summary = self.accumulate_table().summary()
+            lines = [f"{'column':>12} {'mean':>12} {'std dev':>12} {'min':>12} {'max':>12}"]
+            for i, name in enumerate(self.stats_table['columns']):
+                lines.append(f"{name[:12]:>12} {summary['mean'][i]:>12.6g} {summary['std_dev'][i]:>12.6g} "
+                             f"{summary['min'][i]:>12.6g} {summary['max'][i]:>12.6g}")
+            lines.append(f"rows: {summary['count']:,}")
+            self.display_stats_result("\n".join(lines))
+        except Exception as e:
+            messagebox.showerror("Statistics Error", f"Error: {str(e)}")
+    
+    @profiled
+    def table_matrix(self, kind):
+        """Pairwise correlation or covariance matrix, as text and a heatmap"""
+        try:
+            accumulator = self.accumulate_table()
+            matrix = accumulator.correlation() if kind == "Correlation" else accumulator.covariance()
+            names = [name[:10] for name in self.stats_table['columns']]
+            lines = [f"{kind}:", " " * 11 + "".join(f"{name:>11}" for name in names)]
+            for name, row in zip(names, matrix):
+                lines.append(f"{name:>10} " + "".join(f"{value:>11.4g}" for value in row))
+            self.display_stats_result("\n".join(lines))
+            
+            ax = self.stats_ax
+            ax.clear()
+            limit = 1 if kind == "Correlation" else np.nanmax(np.abs(matrix)) or 1
+            ax.imshow(matrix, cmap='coolwarm', vmin=-limit, vmax=limit)
+            ax.set_xticks(range(len(names)), names, rotation=45, ha='right')
+            ax.set_yticks(range(len(names)), names)
+            ax.tick_params(colors='#ffffff')
+            ax.set_title(f"{kind} matrix", color='#ffffff')
+            self.stats_canvas.draw()
+        except Exception as e:
+            messagebox.showerror("Statistics Error", f"Error: {str(e)}")
+    
+    @profiled
+    def table_regression(self):
+        """Polynomial least-squares fit of Y on X, overlaid on the graph"""
+        try:
+            x_col, y_col = self.table_x.current(), self.table_y.current()
+            degree = int(self.regression_degree.get())
+            if self.stats_table is None:
+                raise ValueError("Import a table first")
+            array = self.stats_table['array']
+            rows = array.shape[0] if array is not None else \
+                os.path.getsize(self.stats_table['path']) // 16
+            stride = max(1, rows // self.REGRESSION_PLOT_POINTS)
+            samples = []
+            
+            def features(chunk):
+                samples.append(chunk[::stride, [x_col, y_col]])
+                return stats_engine.polynomial_features(chunk[:, x_col], chunk[:, y_col], degree)
+            
+            coefficients, r_squared = stats_engine.regression_from_accumulator(
+                self.accumulate_table(features))
+            
+            terms = " + ".join(f"{c:.6g}·x^{p}" if p > 1 else (f"{c:.6g}·x" if p else f"{c:.6g}")
+                               for p, c in enumerate(coefficients))
+            names = self.stats_table['columns']
+            self.display_stats_result(f"Regression {names[y_col]} ~ {names[x_col]} (degree {degree}): "
+                                      f"y = {terms}, R² = {r_squared:.6f}")
+            
+            # Scatter (or density) of the data with the fitted curve on top
+            sample = np.concatenate(samples)
+            self.set_plot_points(sample[:, 0], sample[:, 1], f"{names[x_col]} vs {names[y_col]}")
+            self.plot_function()
+            x_fit = np.linspace(*self.ax.get_xlim(), 500)
+            self.ax.plot(x_fit, np.polynomial.polynomial.polyval(x_fit, coefficients),
+                         color='#ff6b35', linewidth=2)
+            self.canvas.draw()
+            self.notebook.select(self.graph_frame)
+        except Exception as e:
+            messagebox.showerror("Regression Error", f"Error: {str(e)}")
     
     def display_stats_result(self, result):
         """Display statistics result"""
@@ -713,83 +1948,694 @@ class AdvancedCalculator:
         self.stats_result.see(tk.END)
     
     # Graphing functions
+    @profiled
     def plot_function(self):
-        """Plot mathematical function"""
+        """Plot the function entry using the selected plot mode"""
+        self._render_generation += 1
+        self.stop_stream()
         try:
-            func_str = self.function_entry.get()
-            x_min = float(self.x_min.get())
-            x_max = float(self.x_max.get())
-            
-            # Create x values
-            x = np.linspace(x_min, x_max, 1000)
-            
-            # Replace common math functions
-            func_str = func_str.replace('^', '**')
-            func_str = func_str.replace('sin', 'np.sin')
-            func_str = func_str.replace('cos', 'np.cos')
-            func_str = func_str.replace('tan', 'np.tan')
-            func_str = func_str.replace('log', 'np.log10')
-            func_str = func_str.replace('ln', 'np.log')
-            func_str = func_str.replace('sqrt', 'np.sqrt')
-            func_str = func_str.replace('exp', 'np.exp')
-            func_str = func_str.replace('pi', 'np.pi')
-            func_str = func_str.replace('e', 'np.e')
+            method_name, _ = self.PLOT_MODES[self.plot_mode.get()]
+            self.ensure_axes('3d' if method_name == 'plot_surface' else 'rectilinear')
+            getattr(self, method_name)()
+        except Exception as e:
+            messagebox.showerror("Plot Error", f"Error plotting function: {str(e)}")
+            self.update_status("Plot error")
+    
+    def on_plot_mode_changed(self):
+        """Update the function label for the selected plot mode"""
+        _, label = self.PLOT_MODES[self.plot_mode.get()]
+        self.function_label.config(text=label)
+    
+    def parse_range(self, entry):
+        """Read a range entry, which may hold an expression such as 2*pi"""
+        return float(expression_engine.evaluate(entry.get()))
+    
+    def get_plot_ranges(self):
+        """Read the X and Y range entries"""
+        return (self.parse_range(self.x_min), self.parse_range(self.x_max),
+                self.parse_range(self.y_min), self.parse_range(self.y_max))
+    
+    def ensure_axes(self, projection):
+        """Swap the figure between 2D and 3D axes on the same canvas"""
+        self.density_image = None
+        if projection != '3d':
+            self.surface_data = None
+            self.surface_artist = None
+        if self.ax.name == projection:
+            return
+        self.fig.clf()
+        if projection == '3d':
+            self.ax = self.fig.add_subplot(111, projection='3d')
+        else:
+            self.ax = self.fig.add_subplot(111)
+    
+    def style_axes(self, title):
+        """Apply the calculator's axes styling after clearing"""
+        self.ax.grid(True, alpha=0.3, color='#7f8c8d')
+        self.ax.set_facecolor('#1e1e1e')
+        self.ax.set_xlabel('X', color='#ffffff')
+        self.ax.set_ylabel('Y', color='#ffffff')
+        self.ax.tick_params(colors='#ffffff')
+        self.ax.set_title(title, color='#ffffff')
+    
+    def plot_explicit(self):
+        """Plot y = f(x)"""
+        func_str = self.function_entry.get()
+        x_min = self.parse_range(self.x_min)
+        x_max = self.parse_range(self.x_max)
+        
+        # Create x values
+        x = np.linspace(x_min, x_max, 1000)
+        
+        # Evaluate function
+        y = expression_engine.compile_expression(func_str).vectorized(shape=x.shape, x=x)
+        
+        # Plot
+        self.ax.clear()
+        self.ax.plot(x, y, color='#00ff88', linewidth=2)
+        self.style_axes(f'f(x) = {func_str}')
+        
+        self.canvas.draw()
+        self.update_status("Function plotted successfully")
+    
+    def plot_parametric(self):
+        """Plot the curve (x(t), y(t)) over the t range"""
+        func_str = self.function_entry.get()
+        x_src, y_src = plotting.parametric_sources(func_str)
+        t = np.linspace(self.parse_range(self.t_min), self.parse_range(self.t_max), 2000)
+        
+        x = expression_engine.compile_expression(x_src).vectorized(shape=t.shape, t=t)
+        y = expression_engine.compile_expression(y_src).vectorized(shape=t.shape, t=t)
+        
+        self.ax.clear()
+        self.ax.plot(x, y, color='#00ff88', linewidth=2)
+        self.style_axes(f'(x, y) = ({x_src}, {y_src})')
+        self.canvas.draw()
+        self.update_status("Parametric curve plotted")
+    
+    def plot_polar(self):
+        """Plot r(θ) over the θ range"""
+        func_str = self.function_entry.get()
+        theta = np.linspace(self.parse_range(self.t_min), self.parse_range(self.t_max), 2000)
+        
+        r = expression_engine.compile_expression(func_str).vectorized(
+            shape=theta.shape, theta=theta, θ=theta, t=theta)
+        
+        self.ax.clear()
+        self.ax.plot(r * np.cos(theta), r * np.sin(theta), color='#00ff88', linewidth=2)
+        self.ax.set_aspect('equal', adjustable='datalim')
+        self.style_axes(f'r(θ) = {func_str}')
+        self.canvas.draw()
+        self.update_status("Polar curve plotted")
+    
+    def plot_implicit(self):
+        """Plot F(x, y) = 0 by marching squares with adaptive refinement"""
+        func_str = self.function_entry.get()
+        expression = expression_engine.compile_expression(plotting.implicit_source(func_str))
+        extent = self.get_plot_ranges()
+        
+        segments = plotting.implicit_segments(expression, extent)
+        
+        self.ax.clear()
+        self.ax.add_collection(LineCollection(segments, colors='#00ff88', linewidths=2))
+        self.ax.set_xlim(extent[0], extent[1])
+        self.ax.set_ylim(extent[2], extent[3])
+        self.style_axes(f'{func_str}' if '=' in func_str else f'{func_str} = 0')
+        self.canvas.draw()
+        self.update_status("Implicit curve plotted" if len(segments) else "No curve in range")
+    
+    def plot_surface(self):
+        """Plot z = f(x, y) as a 3D surface"""
+        func_str = self.function_entry.get()
+        expression = expression_engine.compile_expression(func_str)
+        extent = self.get_plot_ranges()
+        
+        self.surface_data = plotting.surface_grid(expression, extent, self.SURFACE_RESOLUTION)
+        
+        self.ax.clear()
+        self.surface_artist = None
+        self.draw_surface(self.surface_sample_count(self.SURFACE_STILL_PIXELS))
+        self.style_axes(f'z = {func_str}')
+        self.ax.set_zlabel('Z', color='#ffffff')
+        self.ax.xaxis.set_pane_color((0.12, 0.12, 0.12, 1.0))
+        self.ax.yaxis.set_pane_color((0.12, 0.12, 0.12, 1.0))
+        self.ax.zaxis.set_pane_color((0.12, 0.12, 0.12, 1.0))
+        self.canvas.draw()
+        self.update_status("Surface plotted")
+    
+    def surface_sample_count(self, pixels_per_sample):
+        """Samples per axis for the current canvas size"""
+        widget = self.canvas.get_tk_widget()
+        return max(16, max(widget.winfo_width(), widget.winfo_height()) // pixels_per_sample)
+    
+    def draw_surface(self, max_count):
+        """Replace the surface artist with one decimated to max_count samples per axis"""
+        if self.surface_artist is not None:
+            self.surface_artist.remove()
+        x, y, z = plotting.decimate_grid(*self.surface_data, max_count)
+        self.surface_artist = self.ax.plot_surface(x, y, z, cmap='viridis', linewidth=0,
+                                                   antialiased=False, rcount=max_count,
+                                                   ccount=max_count)
+    
+    def on_surface_press(self, event):
+        """Drop to a coarse surface while the user rotates the view"""
+        if self.surface_data is None or event.inaxes is not self.ax:
+            return
+        self._rotating = True
+        self.draw_surface(self.surface_sample_count(self.SURFACE_DRAG_PIXELS))
+        self.canvas.draw_idle()
+    
+    def on_surface_release(self, event):
+        """Restore the full-resolution surface once rotation stops"""
+        if not self._rotating or self.surface_data is None:
+            return
+        self._rotating = False
+        self.draw_surface(self.surface_sample_count(self.SURFACE_STILL_PIXELS))
+        self.canvas.draw_idle()
+    
+    def set_plot_points(self, x, y, source):
+        """Store point data as contiguous float arrays"""
+        self.plot_data = {'x': np.ascontiguousarray(x, dtype=float),
+                          'y': np.ascontiguousarray(y, dtype=float)}
+        self.points_info.config(text=f"{self.plot_data['x'].size:,} points from {source}")
+        self.plot_mode.set('Data points')
+        self.on_plot_mode_changed()
+    
+    def import_plot_points(self):
+        """Import x, y columns (or a single y column) from CSV or .npy"""
+        file_path = filedialog.askopenfilename(
+            title="Import Points",
+            filetypes=[("CSV files", "*.csv"), ("NumPy arrays", "*.npy"),
+                      ("Text files", "*.txt"), ("All files", "*.*")]
+        )
+        if file_path:
+            try:
+                x, y = data_io.split_points(data_io.load_array(file_path))
+                self.set_plot_points(x, y, os.path.basename(file_path))
+                self.plot_function()
+            except Exception as e:
+                messagebox.showerror("Import Error", f"Error importing points: {str(e)}")
+    
+    def use_statistics_points(self):
+        """Plot the Statistics dataset against its index"""
+        data = self.get_data_points()
+        if data:
+            y = np.asarray(data, dtype=float)
+            self.set_plot_points(np.arange(y.size, dtype=float), y, "Statistics")
+            self.plot_function()
+    
+    def plot_points(self):
+        """Scatter plot, or a density image when there are too many points to draw"""
+        x, y = self.plot_data['x'], self.plot_data['y']
+        if x.size == 0:
+            raise ValueError("Import points or use the Statistics data first")
+        extent = plotting.data_extent(x, y)
+        title = self.function_entry.get() or f"{x.size:,} points"
+        
+        self.ax.clear()
+        if x.size <= self.DENSITY_THRESHOLD:
+            self.ax.plot(x, y, '.', color='#00ff88', markersize=3)
+        else:
+            self.density_image = self.ax.imshow(np.zeros((1, 1)), extent=extent, origin='lower',
+                                                aspect='auto', cmap='viridis',
+                                                interpolation='nearest')
+        self.ax.set_xlim(extent[0], extent[1])
+        self.ax.set_ylim(extent[2], extent[3])
+        if self.density_image is not None:
+            self.rebin_points()
+        self.style_axes(title)
+        self.ax.callbacks.connect('xlim_changed', lambda ax: self.schedule_rebin())
+        self.ax.callbacks.connect('ylim_changed', lambda ax: self.schedule_rebin())
+        self.canvas.draw()
+        self.update_status(f"Plotted {x.size:,} points")
+    
+    def schedule_rebin(self):
+        """Coalesce limit changes into one re-bin"""
+        if self.density_image is None or self._rebin_pending is not None:
+            return
+        self._rebin_pending = self.root.after(30, self.rebin_points)
+    
+    def rebin_points(self):
+        """Bin only the visible window at canvas resolution"""
+        self._rebin_pending = None
+        if self.density_image is None:
+            return
+        x_min, x_max = self.ax.get_xlim()
+        y_min, y_max = self.ax.get_ylim()
+        widget = self.canvas.get_tk_widget()
+        width = max(widget.winfo_width(), 200)
+        height = max(widget.winfo_height(), 200)
+        
+        extent = (x_min, x_max, y_min, y_max)
+        counts = plotting.density_grid(self.plot_data['x'], self.plot_data['y'], extent, width, height)
+        shaded = np.log1p(counts)
+        self.density_image.set_data(shaded)
+        self.density_image.set_extent(extent)
+        self.density_image.set_clim(0, max(shaded.max(), 1))
+        self.canvas.draw_idle()
+    
+    def on_points_scroll(self, event):
+        """Zoom point plots around the cursor"""
+        method_name, _ = self.PLOT_MODES[self.plot_mode.get()]
+        if method_name != 'plot_points' or event.inaxes is not self.ax or event.xdata is None:
+            return
+        factor = 0.8 if event.button == 'up' else 1.25
+        x_min, x_max = self.ax.get_xlim()
+        y_min, y_max = self.ax.get_ylim()
+        self.ax.set_xlim(event.xdata + (x_min - event.xdata) * factor,
+                         event.xdata + (x_max - event.xdata) * factor)
+        self.ax.set_ylim(event.ydata + (y_min - event.ydata) * factor,
+                         event.ydata + (y_max - event.ydata) * factor)
+        self.canvas.draw_idle()
+    
+    def choose_stream_source(self):
+        """Pick a growing file or named pipe and start streaming it"""
+        file_path = filedialog.askopenfilename(
+            title="Stream File or Pipe",
+            filetypes=[("Log files", "*.log *.csv *.txt"), ("All files", "*")]
+        )
+        if file_path:
+            self.function_entry.delete(0, tk.END)
+            self.function_entry.insert(0, file_path)
+            self.plot_mode.set('Live stream')
+            self.on_plot_mode_changed()
+            self.plot_function()
+    
+    def plot_stream(self):
+        """Start a live plot of the file or pipe named in the function entry"""
+        path = self.function_entry.get().strip()
+        if not os.path.exists(path):
+            raise ValueError(f"No such file or pipe: {path}")
+        
+        self.stream_buffer = streaming.RingBuffer(self.STREAM_CAPACITY)
+        self.stream_reader = streaming.StreamReader(path, self.stream_buffer)
+        self.stream_reader.start()
+        
+        self.ax.clear()
+        self.stream_line, = self.ax.plot([], [], color='#00ff88', linewidth=1.5, animated=True)
+        self.ax.set_xlim(0, self.STREAM_CAPACITY)
+        self.ax.set_ylim(-1, 1)
+        self.style_axes(f'Live: {os.path.basename(path)}')
+        self.canvas.draw()
+        self.update_status("Streaming started")
+        generation = self._render_generation
+        self.root.after(self.STREAM_INTERVAL_MS, lambda: self.update_stream(generation))
+    
+    def on_canvas_draw(self, event):
+        """Cache everything but the animated stream line after each full draw"""
+        if self.stream_reader is not None:
+            self.stream_background = self.canvas.copy_from_bbox(self.ax.bbox)
+    
+    def update_stream(self, generation):
+        """Blit the newest ring buffer contents and refresh rolling statistics"""
+        if self.stream_reader is None or generation != self._render_generation:
+            return
+        if self.stream_reader.error is not None:
+            error = self.stream_reader.error
+            self.stop_stream()
+            messagebox.showerror("Stream Error", f"Error reading stream: {str(error)}")
+            return
+        
+        y = self.stream_buffer.view()
+        stats = self.stream_buffer.rolling_stats()
+        if stats is not None:
+            # Rescale (full redraw) only when the data leaves the current limits
+            y_min, y_max = self.ax.get_ylim()
+            if stats['min'] < y_min or stats['max'] > y_max:
+                pad = (stats['max'] - stats['min']) * 0.1 or 1.0
+                self.ax.set_ylim(stats['min'] - pad, stats['max'] + pad)
+                self.canvas.draw()
             
-            # Evaluate function
-            y = eval(func_str)
+            self.canvas.restore_region(self.stream_background)
+            self.stream_line.set_data(np.arange(y.size), y)
+            self.ax.draw_artist(self.stream_line)
+            self.canvas.blit(self.ax.bbox)
             
-            # Plot
-            self.ax.clear()
-            self.ax.plot(x, y, color='#00ff88', linewidth=2)
-            self.ax.grid(True, alpha=0.3, color='#7f8c8d')
-            self.ax.set_facecolor('#1e1e1e')
-            self.ax.set_xlabel('X', color='#ffffff')
-            self.ax.set_ylabel('Y', color='#ffffff')
-            self.ax.tick_params(colors='#ffffff')
-            self.ax.set_title(f'f(x) = {self.function_entry.get()}', color='#ffffff')
+            self.points_info.config(
+                text=f"n={stats['count']:,} last={stats['latest']:.6g} mean={stats['mean']:.6g} "
+                     f"σ={stats['std_dev']:.6g} min={stats['min']:.6g} max={stats['max']:.6g}")
+        
+        self.root.after(self.STREAM_INTERVAL_MS, lambda: self.update_stream(generation))
+    
+    def stop_stream(self):
+        """Stop the background reader; the ring buffer is released with it"""
+        if self.stream_reader is None:
+            return
+        self.stream_reader.stop()
+        self.stream_reader = None
+        self.update_status("Streaming stopped")
+    
+    def plot_domain_coloring(self):
+        """Domain-colored plot of f(z), rendered coarse first and then refined"""
+        func_str = self.function_entry.get()
+        expression = expression_engine.compile_expression(func_str)
+        extent = self.get_plot_ranges()
+        
+        self.ax.clear()
+        image = plotting.render_domain_coloring(expression, extent, 64, 64)
+        self.domain_image = self.ax.imshow(image, extent=extent, origin='upper',
+                                           aspect='auto', interpolation='bilinear')
+        self.style_axes(f'f(z) = {func_str}')
+        self.ax.grid(False)
+        self.canvas.draw()
+        
+        generation = self._render_generation
+        self.root.after(1, lambda: self.refine_domain_coloring(expression, extent, generation, 4))
+    
+    def refine_domain_coloring(self, expression, extent, generation, divisor):
+        """Re-render the domain coloring at higher resolution unless superseded"""
+        if generation != self._render_generation:
+            return
+        widget = self.canvas.get_tk_widget()
+        width = max(widget.winfo_width(), 256) // divisor
+        height = max(widget.winfo_height(), 256) // divisor
+        
+        self.domain_image.set_data(plotting.render_domain_coloring(expression, extent, width, height))
+        self.domain_image.set_interpolation('nearest' if divisor == 1 else 'bilinear')
+        self.canvas.draw_idle()
+        
+        if divisor > 1:
+            self.root.after(1, lambda: self.refine_domain_coloring(expression, extent, generation, 1))
+        else:
+            self.update_status("Domain coloring rendered")
+    
+    # Matrix functions
+    def get_matrix(self, name):
+        """Return the imported array for A/B, or parse the text box"""
+        if self.matrix_operands[name] is not None:
+            return self.matrix_operands[name]
+        text = self.matrix_entries[name].get("1.0", tk.END).strip()
+        if not text:
+            return None
+        return linalg_engine.parse_matrix(text)
+    
+    def import_matrix(self, name):
+        """Import matrix A or B from CSV or .npy without pasting it into Tk"""
+        file_path = filedialog.askopenfilename(
+            title=f"Import Matrix {name}",
+            filetypes=[("NumPy arrays", "*.npy"), ("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        if file_path:
+            try:
+                matrix = linalg_engine.load_matrix(file_path)
+                self.matrix_operands[name] = matrix
+                entry = self.matrix_entries[name]
+                entry.delete("1.0", tk.END)
+                entry.insert("1.0", f"[{matrix.shape[0]}×{matrix.shape[1]} from {os.path.basename(file_path)}]")
+                self.update_status(f"Matrix {name} imported")
+            except Exception as e:
+                messagebox.showerror("Import Error", f"Error importing matrix: {str(e)}")
+    
+    @profiled
+    def run_matrix_operation(self, operation):
+        """Run a linear algebra operation, in a worker process for large operands"""
+        try:
+            a = self.get_matrix('A')
+            if a is None:
+                raise ValueError("Enter or import matrix A")
+            b = self.get_matrix('B') if linalg_engine.OPERATIONS[operation][1] == 2 else None
             
-            self.canvas.draw()
-            self.update_status("Function plotted successfully")
+            if linalg_engine.needs_background(a, b):
+                future = self.shared.get_matrix_worker().submit(operation, a, b)
+                self.matrix_info.config(text=f"Computing {linalg_engine.OPERATIONS[operation][0]}...")
+                self.update_status("Matrix job running in background")
+                self.poll_matrix_job(future)
+                return
             
+            self.set_matrix_results(linalg_engine.run_operation(operation, a, b))
+            self.update_status("Matrix operation completed")
         except Exception as e:
-            messagebox.showerror("Plot Error", f"Error plotting function: {str(e)}")
-            self.update_status("Plot error")
+            messagebox.showerror("Matrix Error", f"Error: {str(e)}")
+            self.update_status("Matrix error")
+    
+    def poll_matrix_job(self, future):
+        """Check a background matrix job without blocking the event loop"""
+        if not future.done():
+            self.root.after(100, lambda: self.poll_matrix_job(future))
+            return
+        try:
+            self.set_matrix_results(linalg_engine.MatrixWorker.load_results(future.result()))
+            self.update_status("Matrix operation completed")
+        except Exception as e:
+            self.matrix_info.config(text="")
+            messagebox.showerror("Matrix Error", f"Error: {str(e)}")
+            self.update_status("Matrix error")
+    
+    def set_matrix_results(self, results):
+        """Store named results and show the first one"""
+        self.matrix_results = results
+        self.matrix_result_menu['values'] = list(results)
+        self.matrix_result_choice.set(next(iter(results)))
+        self.show_matrix_result()
+    
+    def show_matrix_result(self):
+        """Show the selected result in the grid (scalars in the info label)"""
+        name = self.matrix_result_choice.get()
+        value = self.matrix_results.get(name)
+        if isinstance(value, np.ndarray):
+            self.matrix_grid.set_data(value)
+            self.matrix_info.config(text=f"{name}: {value.shape[0]}×{value.shape[1]}")
+        else:
+            self.matrix_grid.set_data(None)
+            scalars = [f"{k} = {self.format_number(v)}" for k, v in self.matrix_results.items()
+                       if not isinstance(v, np.ndarray)]
+            self.matrix_info.config(text=", ".join(scalars))
+            if value is not None:
+                self.display_var.set(self.format_number(value))
+                self.current_expression = str(value)
+                self.update_displays()
+    
+    def format_matrix_cell(self, value):
+        """Format a grid cell, including complex eigenvalues"""
+        if np.iscomplexobj(value) and value.imag != 0:
+            return f"{value.real:.4g}{value.imag:+.4g}i"
+        return f"{np.real(value):.{min(self.precision, 8)}g}"
+    
+    def export_matrix_result(self):
+        """Export the selected matrix result to .npy or CSV"""
+        value = self.matrix_results.get(self.matrix_result_choice.get())
+        if not isinstance(value, np.ndarray):
+            messagebox.showinfo("Export", "No matrix result to export")
+            return
+        
+        file_path = filedialog.asksaveasfilename(
+            title="Export Matrix",
+            defaultextension=".npy",
+            filetypes=[("NumPy arrays", "*.npy"), ("CSV files", "*.csv")]
+        )
+        
+        if file_path:
+            try:
+                if file_path.lower().endswith('.csv'):
+                    np.savetxt(file_path, value, delimiter=',')
+                else:
+                    np.save(file_path, value)
+                self.update_status("Matrix exported successfully")
+            except Exception as e:
+                messagebox.showerror("Export Error", f"Error exporting matrix: {str(e)}")
     
     # Enhanced calculation and display methods
+    # Equation solver
+    SOLVER_HINTS = {
+        'roots': ("x^3 - 6*x^2 + 11*x - 6   or coefficients 1, -6, 11, -6", "x^3 - 6*x^2 + 11*x - 6"),
+        'dense': ("Augmented matrix [A | b], one row per line (or Open File...)", "2, 1, -1, 8\n-3, -1, 2, -11\n-2, 1, 2, -3"),
+        'sparse': ("Open a Matrix Market .mtx or row,col,value CSV; b below (blank = ones)", ""),
+        'batch': ("Open a CSV with n² + n values per row (A row-major, then b) or a (k, n, n+1) .npy", ""),
+    }
+    
+    def open_solver(self):
+        """Polynomial roots, dense and sparse linear systems and batches of small systems"""
+        window = tk.Toplevel(self.root)
+        window.title("Equation Solver")
+        window.geometry("720x620")
+        window.configure(bg='#0a0a0a')
+        labels = {label: mode for mode, label in solver.MODES.items()}
+        state = {'file': None, 'result': None, 'cancel': None}
+        
+        top = tk.Frame(window, bg='#0a0a0a')
+        top.pack(fill=tk.X, padx=10, pady=(10, 0))
+        mode_var = tk.StringVar(value=solver.MODES['roots'])
+        mode_menu = ttk.Combobox(top, textvariable=mode_var, state='readonly',
+                                 values=list(labels), width=28)
+        mode_menu.pack(side=tk.LEFT)
+        file_label = tk.Label(top, text="", bg='#0a0a0a', fg='#7f8c8d')
+        file_label.pack(side=tk.LEFT, padx=10)
+        
+        hint = tk.Label(window, text="", bg='#0a0a0a', fg='#ffffff', font=('JetBrains Mono', 10))
+        hint.pack(anchor='w', padx=10, pady=(5, 0))
+        input_text = tk.Text(window, height=6, font=('JetBrains Mono', 11),
+                             bg='#1e1e1e', fg='#ffffff', insertbackground='#ffffff')
+        input_text.pack(fill=tk.X, padx=10, pady=5)
+        
+        rhs_frame = tk.Frame(window, bg='#0a0a0a')
+        rhs_frame.pack(fill=tk.X, padx=10)
+        tk.Label(rhs_frame, text="b:", bg='#0a0a0a', fg='#ffffff').pack(side=tk.LEFT)
+        rhs_entry = tk.Entry(rhs_frame, bg='#1e1e1e', fg='#ffffff', insertbackground='#ffffff')
+        rhs_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        
+        info = tk.Label(window, text="", bg='#0a0a0a', fg='#7f8c8d', anchor='w', justify=tk.LEFT)
+        info.pack(fill=tk.X, padx=10, pady=(5, 0))
+        grid = VirtualGrid(window, formatter=self.format_matrix_cell)
+        grid.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        
+        def on_mode_changed(event=None):
+            mode = labels[mode_var.get()]
+            text, example = self.SOLVER_HINTS[mode]
+            hint.config(text=text)
+            input_text.delete("1.0", tk.END)
+            input_text.insert("1.0", example)
+            rhs_entry.config(state=tk.NORMAL if mode == 'sparse' else tk.DISABLED)
+            state['file'] = None
+            file_label.config(text="")
+        mode_menu.bind('<<ComboboxSelected>>', on_mode_changed)
+        on_mode_changed()
+        
+        def open_file():
+            file_path = filedialog.askopenfilename(
+                title="Open System", parent=window,
+                filetypes=[("Matrix files", "*.mtx *.csv *.txt *.npy"), ("All files", "*.*")])
+            if file_path:
+                state['file'] = file_path
+                file_label.config(text=os.path.basename(file_path))
+        
+        def right_hand_side():
+            text = rhs_entry.get().strip()
+            if not text:
+                return None
+            if os.path.exists(text):
+                return np.asarray(data_io.load_array(text), dtype=float).ravel()
+            return data_io.parse_numbers(text)
+        
+        def compute(mode, text, rhs, cancelled, progress):
+            """Runs on a helper thread; returns (result, summary)"""
+            if mode == 'roots':
+                roots, residuals = solver.polynomial_roots(solver.polynomial_coefficients(text))
+                return (roots, residuals), (f"{roots.size} roots; largest |p(root)| = "
+                                            f"{residuals.max() if roots.size else 0:.3g}")
+            if mode == 'dense':
+                matrix = (linalg_engine.load_matrix(state['file']) if state['file']
+                          else linalg_engine.parse_matrix(text))
+                x, residuals = solver.solve_dense(*solver.split_augmented(np.asarray(matrix, dtype=float)))
+                return (x, residuals), f"{x.shape[0]} unknowns; relative residual {residuals.max():.3g}"
+            if state['file'] is None:
+                raise ValueError("Open a file first")
+            if mode == 'sparse':
+                matrix = solver.load_sparse(state['file'])
+                result = solver.solve_sparse(matrix, rhs, progress=progress, cancelled=cancelled.is_set)
+                outcome = "converged" if result['converged'] else "stopped"
+                return result, (f"{matrix.size:,} unknowns, {matrix.nnz:,} nonzeros; {result['method'].upper()} "
+                                f"{outcome} after {result['iterations']:,} iterations, relative residual "
+                                f"{result['relative_residual']:.3g}")
+            a, b = solver.load_batch(state['file'])
+            x, residuals = solver.solve_batch(a, b)
+            singular = int(np.isnan(residuals).sum())
+            return (x, residuals), (f"{x.shape[0]:,} systems of size {x.shape[1]}; "
+                                    f"{singular:,} singular; largest residual {np.nanmax(residuals, initial=0):.3g}")
+        
+        def solve():
+            if state['cancel'] is not None:
+                return
+            mode = labels[mode_var.get()]
+            try:
+                rhs = right_hand_side() if mode == 'sparse' else None
+            except (OSError, ValueError) as e:
+                messagebox.showerror("Solver Error", f"Error reading b: {str(e)}", parent=window)
+                return
+            text = input_text.get("1.0", tk.END)
+            cancelled = threading.Event()
+            progress = {}
+            outcome = {}
+            state['cancel'] = cancelled
+            
+            def run():
+                try:
+                    outcome['value'] = compute(mode, text, rhs, cancelled,
+                                               lambda iteration, residual: progress.update(
+                                                   iteration=iteration, residual=residual))
+                except Exception as e:
+                    outcome['error'] = e
+            
+            def poll():
+                if not window.winfo_exists():
+                    cancelled.set()
+                    return
+                if not outcome:
+                    if progress:
+                        info.config(text=f"Iteration {progress['iteration']:,}, "
+                                         f"relative residual {progress['residual']:.3g}")
+                    self.root.after(100, poll)
+                    return
+                state['cancel'] = None
+                if 'error' in outcome:
+                    info.config(text="")
+                    messagebox.showerror("Solver Error", f"Error: {str(outcome['error'])}", parent=window)
+                    return
+                result, summary = outcome['value']
+                names, table = solver.result_table(mode, result)
+                state['result'] = (names, table)
+                grid.set_data(table, names)
+                info.config(text=summary)
+                self.update_status("Solved")
+            
+            info.config(text="Solving...")
+            threading.Thread(target=run, daemon=True).start()
+            poll()
+        
+        def cancel():
+            if state['cancel'] is not None:
+                state['cancel'].set()
+        
+        def export():
+            if state['result'] is None:
+                messagebox.showinfo("Export", "Nothing solved yet", parent=window)
+                return
+            file_path = filedialog.asksaveasfilename(
+                title="Export Solution", parent=window, defaultextension=".csv",
+                filetypes=[("CSV files", "*.csv"), ("NumPy arrays", "*.npy")])
+            if file_path:
+                try:
+                    solver.export_table(file_path, *state['result'])
+                    self.update_status("Solution exported successfully")
+                except Exception as e:
+                    messagebox.showerror("Export Error", f"Error: {str(e)}", parent=window)
+        
+        buttons = tk.Frame(window, bg='#0a0a0a')
+        buttons.pack(pady=5)
+        for text, command in [("Open File...", open_file), ("Solve", solve),
+                              ("Cancel", cancel), ("Export...", export)]:
+            ttk.Button(buttons, text=text, style='Function.TButton',
+                      command=command).pack(side=tk.LEFT, padx=5)
+        window.protocol("WM_DELETE_WINDOW", lambda: (cancel(), window.destroy()))
+    
+    @profiled
     def calculate(self):
         """Enhanced calculation with error handling and history"""
         try:
             if self.current_expression:
                 # Add current display value if expression doesn't end with operator
                 if self.current_expression[-1] in '+-*/':
-                    self.current_expression += self.display_var.get().replace(',', '')
+                    if self.complex_mode.get():
+                        self.current_expression += f"({self.get_display_value()!r})"
+                    else:
+                        self.current_expression += self.display_var.get().replace(',', '')
                 
                 # Replace display operators with calculation operators
                 calc_expr = self.current_expression
                 calc_expr = calc_expr.replace('÷', '/').replace('×', '*')
                 
                 # Evaluate expression with enhanced precision
-                result = eval(calc_expr)
+                mode = 'complex' if self.complex_mode.get() else 'real'
+                result = expression_engine.evaluate(calc_expr, mode, ans=self.last_answer)
                 
                 # Format result based on precision setting
                 formatted_result = self.format_number(result)
                 
-                # Add to history with timestamp
-                timestamp = datetime.now().strftime("%H:%M:%S")
-                history_entry = {
-                    'expression': self.current_expression,
-                    'result': result,
-                    'timestamp': timestamp
-                }
-                self.history.append(history_entry)
-                if len(self.history) > 100:  # Keep only last 100 calculations
-                    self.history.pop(0)
+                # Add to history (columnar; timestamped now)
+                self.history.append(self.current_expression, result)
                 
                 # Update display
-                self.display_var.set(formatted_result)
-                self.current_expression = str(result)
-                self.update_displays()
-                self.update_status("Calculation completed")
+                self.show_result(result, formatted_result)
+                self.update_status(self.describe_result(result) or "Calculation completed")
                 
         except Exception as e:
             self.display_var.set("Error")
@@ -802,8 +2648,16 @@ class AdvancedCalculator:
         if isinstance(number, complex):
             if number.imag == 0:
                 number = number.real
+            elif self.complex_display == "polar":
+                angle = math.degrees(cmath.phase(number))
+                return f"{abs(number):.{self.precision}g} ∠ {angle:.{self.precision}g}°"
             else:
-                return f"{number.real:.{self.precision}g} + {number.imag:.{self.precision}g}i"
+                sign = '-' if number.imag < 0 else '+'
+                return f"{number.real:.{self.precision}g} {sign} {abs(number.imag):.{self.precision}g}i"
+        
+        if isinstance(number, int) and abs(number) >= 1e15:
+            # Leading digits from the top bits only: instant even for million-digit integers
+            return bigint.format_scientific(number, self.precision)
         
         if abs(number) < 1e-10:
             number = 0
@@ -813,6 +2667,65 @@ class AdvancedCalculator:
         else:
             return f"{number:.{self.precision}g}"
     
+    def show_result(self, result, formatted=None):
+        """Display a result and make it the start of the next expression
+        
+        Integers too long to spell out (or past str()'s digit limit) continue
+        as 'ans', which evaluates to the exact value.
+        """
+        self.last_answer = result
+        self.display_var.set(formatted or self.format_number(result))
+        if isinstance(result, int) and result.bit_length() > bigint.INLINE_DIGITS * 3:
+            self.current_expression = "ans"
+        else:
+            self.current_expression = str(result)
+        self.update_displays()
+    
+    def describe_result(self, result):
+        """Digit count and trailing digits for integers shown in scientific notation"""
+        if isinstance(result, int) and abs(result) >= 1e15:
+            return bigint.describe(result)
+        return None
+    
+    def displayed_integer(self):
+        """The exact integer behind the display, if it shows the last (large integer) answer"""
+        value = self.last_answer
+        if (isinstance(value, int) and not isinstance(value, bool) and abs(value) >= 1e15
+                and self.display_var.get() == self.format_number(value)):
+            return value
+        return None
+    
+    def expand_integer(self, value, done):
+        """Full decimal text of a large integer, converted in a worker process
+        
+        The conversion is only done on demand (copy/export) and the last one
+        is cached; done(text) runs on the Tk thread.
+        """
+        cached_value, text = self._expansion
+        if cached_value is value:
+            done(text)
+            return
+        if value.bit_length() <= bigint.INLINE_DIGITS * 3:
+            done(str(value))
+            return
+        future = self.get_stats_executor().submit(bigint.to_decimal_string, value)
+        self.update_status(f"Expanding {bigint.digit_count(value):,} digits...")
+        
+        def poll():
+            if not future.done():
+                self.root.after(50, poll)
+                return
+            try:
+                text = future.result()
+            except Exception as e:
+                self.update_status(f"Error: {str(e)}")
+                return
+            self._expansion = (value, text)
+            done(text)
+        
+        poll()
+    
+    @profiled
     def add_number(self, number):
         """Enhanced number input with validation"""
         current = self.display_var.get()
@@ -824,6 +2737,7 @@ class AdvancedCalculator:
         self.current_expression += number
         self.update_displays()
     
+    @profiled
     def add_operator(self, operator):
         """Enhanced operator handling"""
         # Convert symbols for calculation
@@ -835,6 +2749,7 @@ class AdvancedCalculator:
             self.display_var.set("0")
             self.update_displays()
     
+    @profiled
     def clear(self):
         """Clear all"""
         self.display_var.set("0")
@@ -842,11 +2757,13 @@ class AdvancedCalculator:
         self.update_displays()
         self.update_status("Cleared")
     
+    @profiled
     def clear_entry(self):
         """Clear current entry only"""
         self.display_var.set("0")
         self.update_status("Entry cleared")
     
+    @profiled
     def backspace(self):
         """Enhanced backspace"""
         current = self.display_var.get()
@@ -859,6 +2776,7 @@ class AdvancedCalculator:
             self.current_expression = self.current_expression[:-1]
             self.update_displays()
     
+    @profiled
     def toggle_sign(self):
         """Toggle positive/negative sign"""
         current = self.display_var.get()
@@ -868,12 +2786,14 @@ class AdvancedCalculator:
             else:
                 self.display_var.set('-' + current)
     
+    @profiled
     def update_displays(self):
         """Update all display elements"""
         # Update expression display
         display_expr = self.current_expression
         display_expr = display_expr.replace('/', '÷').replace('*', '×')
         self.expr_var.set(display_expr)
+        self.request_preview()
         
         # Update variable display
         self.var_display.config(text=self.format_variables())
@@ -887,6 +2807,30 @@ class AdvancedCalculator:
             except:
                 self.binary_display.config(text="Binary: 0")
     
+    def request_preview(self):
+        """Ask for a live preview of current_expression (debounced, computed off the Tk thread)"""
+        mode = 'complex' if self.complex_mode.get() else 'real'
+        self.live_preview.request(self.current_expression, mode, {'ans': self.last_answer})
+        if self._preview_poll is None:
+            self._preview_poll = self.root.after(30, self.poll_preview)
+    
+    def poll_preview(self):
+        """Show the preview once the newest request has been evaluated"""
+        generation, value = self.live_preview.result
+        if generation != self.live_preview.generation:
+            self._preview_poll = self.root.after(30, self.poll_preview)
+            return
+        self._preview_poll = None
+        if value is live_preview.DEFERRED:
+            self.preview_var.set("= … (press = to compute)")
+        elif value is None:
+            self.preview_var.set("")
+        else:
+            try:
+                self.preview_var.set(f"= {self.format_number(value)}")
+            except Exception:
+                self.preview_var.set("")
+    
     def format_variables(self):
         """Format variables for display"""
         if self.variables:
@@ -909,14 +2853,135 @@ class AdvancedCalculator:
         )
         if file_path:
             try:
-                with open(file_path, 'r') as file:
-                    data = file.read()
-                    self.data_entry.delete("1.0", tk.END)
-                    self.data_entry.insert("1.0", data)
+                self.data_entry.delete("1.0", tk.END)
+                self.stats_source_path = None
+                size = os.path.getsize(file_path)
+                if size > self.PARALLEL_STATS_BYTES and not file_path.lower().endswith('.npy'):
+                    # Too large to load: statistics are map-reduced over byte ranges
+                    self.stats_array = None
+                    self.stats_source_path = file_path
+                    self.data_entry.insert("1.0", f"[{size / (1 << 30):.2f} GB in {os.path.basename(file_path)}]")
+                elif file_path.lower().endswith('.npy') or size > self.LARGE_IMPORT_BYTES:
+                    # Keep large datasets as an array instead of pasting them into Tk
+                    array = data_io.load_array(file_path)
+                    column = array[:, -1]
+                    if isinstance(column, np.memmap) and column.dtype == float:
+                        self.stats_array = column  # Stays memory-mapped; time series read it in chunks
+                    else:
+                        self.stats_array = np.ascontiguousarray(column, dtype=float)
+                    self.data_entry.insert("1.0", f"[{self.stats_array.size:,} values from {os.path.basename(file_path)}]")
+                else:
+                    with open(file_path, 'r') as file:
+                        data = file.read()
+                        self.stats_array = None
+                        self.data_entry.insert("1.0", data)
                 self.update_status("Data imported successfully")
             except Exception as e:
                 messagebox.showerror("Import Error", f"Error importing data: {str(e)}")
     
+    def batch_plot_export(self):
+        """Render a CSV/JSON list of plots to image files off-screen, in a process pool"""
+        window = tk.Toplevel(self.root)
+        window.title("Batch Plot Export")
+        window.geometry("560x200")
+        window.configure(bg='#0a0a0a')
+        state = {'cancel': None}
+        
+        form = tk.Frame(window, bg='#0a0a0a')
+        form.pack(fill=tk.X, padx=10, pady=10)
+        entries = {}
+        for row, (label, default) in enumerate([("Jobs file:", ""), ("Output folder:", os.path.abspath("plots")),
+                                                 ("DPI:", "300")]):
+            tk.Label(form, text=label, bg='#0a0a0a', fg='#ffffff').grid(row=row, column=0, sticky='e')
+            entry = tk.Entry(form, width=44 if row < 2 else 8, bg='#1e1e1e', fg='#ffffff',
+                             insertbackground='#ffffff')
+            entry.insert(0, default)
+            entry.grid(row=row, column=1, sticky='w', padx=5, pady=2)
+            entries[label] = entry
+        file_format = tk.StringVar(value='png')
+        ttk.Combobox(form, textvariable=file_format, state='readonly', values=batch_plot.FORMATS,
+                     width=6).grid(row=2, column=2, sticky='w')
+        
+        def browse(label, path):
+            if path:
+                entries[label].delete(0, tk.END)
+                entries[label].insert(0, path)
+        
+        def browse_jobs():
+            browse("Jobs file:", filedialog.askopenfilename(
+                parent=window, title="Batch Plot Jobs",
+                filetypes=[("CSV files", "*.csv"), ("JSON files", "*.json"), ("All files", "*.*")]))
+        
+        def browse_folder():
+            browse("Output folder:", filedialog.askdirectory(parent=window, title="Output Folder"))
+        
+        ttk.Button(form, text="...", width=3, command=browse_jobs).grid(row=0, column=2, sticky='w')
+        ttk.Button(form, text="...", width=3, command=browse_folder).grid(row=1, column=2, sticky='w')
+        info = tk.Label(window, text="", bg='#0a0a0a', fg='#7f8c8d', anchor='w')
+        info.pack(fill=tk.X, padx=10)
+        
+        def run():
+            if state['cancel'] is not None:
+                return
+            try:
+                jobs = batch_plot.load_jobs(entries["Jobs file:"].get())
+                dpi = int(entries["DPI:"].get())
+                if dpi <= 0:
+                    raise ValueError("DPI must be positive")
+            except Exception as e:
+                messagebox.showerror("Batch Plot Error", f"Error: {str(e)}", parent=window)
+                return
+            out_dir = entries["Output folder:"].get()
+            cancelled = threading.Event()
+            progress = {'done': 0}
+            outcome = {}
+            state['cancel'] = cancelled
+            
+            def work():
+                try:
+                    outcome['results'] = batch_plot.export(
+                        jobs, out_dir, file_format.get(), dpi, workers=self.stats_workers,
+                        progress=lambda done, total: progress.update(done=done), cancelled=cancelled.is_set)
+                except Exception as e:
+                    outcome['error'] = e
+            
+            def poll():
+                if not window.winfo_exists():
+                    cancelled.set()
+                    return
+                if thread.is_alive():
+                    info.config(text=f"Rendering... {progress['done']:,}/{len(jobs):,}")
+                    window.after(200, poll)
+                    return
+                state['cancel'] = None
+                if 'error' in outcome:
+                    info.config(text="")
+                    messagebox.showerror("Batch Plot Error", f"Error: {str(outcome['error'])}", parent=window)
+                    return
+                failures = [f"{name}: {error}" for name, _, error in outcome['results'] if error]
+                written = len(outcome['results']) - len(failures)
+                info.config(text=f"{written:,} plots written to {out_dir}"
+                                 + (" (cancelled)" if cancelled.is_set() else ""))
+                self.update_status(f"{written:,} plots exported")
+                if failures:
+                    messagebox.showwarning("Batch Plot", "Some plots failed:\n" + "\n".join(failures[:20]),
+                                           parent=window)
+            
+            thread = threading.Thread(target=work, daemon=True)
+            thread.start()
+            poll()
+        
+        def cancel():
+            if state['cancel'] is not None:
+                state['cancel'].set()
+        
+        buttons = tk.Frame(window, bg='#0a0a0a')
+        buttons.pack(pady=10)
+        for text, command in [("Export", run), ("Cancel", cancel), ("Close", window.destroy)]:
+            ttk.Button(buttons, text=text, style='Function.TButton',
+                      command=command).pack(side=tk.LEFT, padx=5)
+        window.protocol("WM_DELETE_WINDOW", lambda: (cancel(), window.destroy()))
+    
     def export_history(self):
         """Export calculation history"""
         if not self.history:
@@ -932,7 +2997,7 @@ class AdvancedCalculator:
         if file_path:
             try:
                 with open(file_path, 'w') as file:
-                    json.dump(self.history, file, indent=2)
+                    json.dump(self.history.entries(), file, indent=2)
                 self.update_status("History exported successfully")
             except Exception as e:
                 messagebox.showerror("Export Error", f"Error exporting history: {str(e)}")
@@ -940,7 +3005,7 @@ class AdvancedCalculator:
     def save_session(self):
         """Save current session"""
         session_data = {
-            'history': self.history,
+            'history': self.history.to_json(),
             'memory': self.memory_value,
             'variables': self.variables,
             'theme': self.theme,
@@ -973,7 +3038,7 @@ class AdvancedCalculator:
                 with open(file_path, 'r') as file:
                     session_data = json.load(file)
                 
-                self.history = session_data.get('history', [])
+                self.history = history_store.History.from_json(session_data.get('history', []))
                 self.memory_value = session_data.get('memory', 0)
                 self.variables = session_data.get('variables', {})
                 self.theme = session_data.get('theme', 'dark')
@@ -998,6 +3063,7 @@ class AdvancedCalculator:
                     self.theme = settings.get('theme', 'dark')
                     self.precision = settings.get('precision', 10)
                     self.memory_value = settings.get('memory', 0)
+                    self.complex_display = settings.get('complex_display', 'rect')
             except:
                 pass  # Use defaults if loading fails
     
@@ -1006,7 +3072,8 @@ class AdvancedCalculator:
         settings = {
             'theme': self.theme,
             'precision': self.precision,
-            'memory': self.memory_value
+            'memory': self.memory_value,
+            'complex_display': self.complex_display
         }
         
         try:
@@ -1020,12 +3087,60 @@ class AdvancedCalculator:
         def auto_save():
             self.save_settings()
             # Schedule next auto-save in 5 minutes
-            self.root.after(300000, auto_save)
+            self._auto_save = self.root.after(300000, auto_save)
         
         # Start auto-save after 5 minutes
-        self.root.after(300000, auto_save)
+        self._auto_save = self.root.after(300000, auto_save)
+    
+    def shutdown(self):
+        """Stop this session's background work; the shared pools stay up for other sessions"""
+        self.save_settings()
+        self.live_preview.close()
+        self.stop_stream()
+        self.stop_monte_carlo()
+        self.profiler.stop_heartbeat()
+        self.root.after_cancel(self._auto_save)
+    
+    # Profiling
+    def set_profiling(self, enabled):
+        """Enable or disable instrumentation and its status bar overlay"""
+        self.profiler.set_enabled(enabled, self.root)
+        if enabled:
+            self.status_profile.pack(side=tk.RIGHT, padx=5)
+            self.update_profile_overlay()
+            self.update_status("Profiling enabled")
+        else:
+            self.status_profile.pack_forget()
+            self.update_status("Profiling disabled")
+    
+    def update_profile_overlay(self):
+        """Refresh the live profiling overlay twice a second"""
+        if not self.profiler.enabled:
+            return
+        self.status_profile.config(text=self.profiler.overlay_text())
+        self.root.after(500, self.update_profile_overlay)
+    
+    def export_trace(self):
+        """Export recorded spans as Chrome trace-event JSON"""
+        if not self.profiler.events:
+            messagebox.showinfo("Export Trace", "No profiling data recorded. Enable Tools > Profiling first.")
+            return
+        
+        file_path = filedialog.asksaveasfilename(
+            title="Export Trace",
+            defaultextension=".json",
+            filetypes=[("Chrome trace", "*.json")]
+        )
+        
+        if file_path:
+            try:
+                self.profiler.export_chrome_trace(file_path)
+                self.update_status("Trace exported successfully")
+            except Exception as e:
+                messagebox.showerror("Export Error", f"Error exporting trace: {str(e)}")
     
     # UI enhancements
+    @profiled
     def toggle_theme(self):
         """Toggle between light and dark themes"""
         self.theme = "light" if self.theme == "dark" else "dark"
@@ -1033,10 +3148,17 @@ class AdvancedCalculator:
         self.update_status(f"Switched to {self.theme} theme")
     
     def copy_result(self):
-        """Copy current result to clipboard"""
-        self.root.clipboard_clear()
-        self.root.clipboard_append(self.display_var.get())
-        self.update_status("Result copied to clipboard")
+        """Copy current result to clipboard (large integers in full)"""
+        def copy(text):
+            self.root.clipboard_clear()
+            self.root.clipboard_append(text)
+            self.update_status("Result copied to clipboard")
+        
+        value = self.displayed_integer()
+        if value is None:
+            copy(self.display_var.get())
+        else:
+            self.expand_integer(value, copy)
     
     def paste_value(self):
         """Paste value from clipboard"""
@@ -1062,6 +3184,7 @@ class AdvancedCalculator:
         self.update_status("Everything cleared")
     
     # Enhanced dialogs
+    @profiled
     def show_history(self):
         """Show enhanced calculation history"""
         history_window = tk.Toplevel(self.root)
@@ -1069,47 +3192,64 @@ class AdvancedCalculator:
         history_window.geometry("600x400")
         history_window.configure(bg='#0a0a0a')
         
-        # Create treeview for better history display
-        columns = ("Time", "Expression", "Result")
-        tree = ttk.Treeview(history_window, columns=columns, show="headings", height=15)
-        
-        # Configure columns
-        tree.heading("Time", text="Time")
-        tree.heading("Expression", text="Expression")
-        tree.heading("Result", text="Result")
-        
-        tree.column("Time", width=100)
-        tree.column("Expression", width=300)
-        tree.column("Result", width=150)
+        summary = tk.Label(history_window, bg='#0a0a0a', fg='#7f8c8d', anchor='w',
+                           font=('JetBrains Mono', 10))
+        summary.pack(fill=tk.X, padx=10, pady=(10, 0))
         
-        # Add scrollbar
-        scrollbar = ttk.Scrollbar(history_window, orient="vertical", command=tree.yview)
-        tree.configure(yscrollcommand=scrollbar.set)
+        # Virtual table, newest first: only the visible rows are formatted
+        grid = VirtualGrid(history_window, cell_width=180, formatter=str)
+        grid.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        # Pack widgets
-        tree.pack(side="left", fill="both", expand=True, padx=10, pady=10)
-        scrollbar.pack(side="right", fill="y", pady=10)
+        grid.set_data(history_store.HistoryTable(self.history, self.format_number),
+                      ["Time", "Expression", "Result"])
+        stats = self.history.summary()
+        text = f"{stats['count']:,} calculations, {self.history.unique_expressions:,} distinct expressions"
+        if stats.get('finite'):
+            text += (f"  |  mean {stats['mean']:.6g}  std {stats['std']:.6g}"
+                     f"  min {stats['min']:.6g}  max {stats['max']:.6g}")
+        summary.config(text=text)
         
-        # Populate history
-        for entry in self.history:
-            if isinstance(entry, dict):
-                tree.insert("", "end", values=(
-                    entry.get('timestamp', ''),
-                    entry.get('expression', ''),
-                    self.format_number(entry.get('result', 0))
-                ))
+        def clear_history():
+            self.history.clear()
+            history_window.destroy()
         
         # Buttons frame
         btn_frame = tk.Frame(history_window, bg='#0a0a0a')
         btn_frame.pack(fill=tk.X, padx=10, pady=5)
         
+        ttk.Button(btn_frame, text="Plot Results",
+                  command=self.plot_history).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="To Statistics",
+                  command=self.history_to_statistics).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="Clear History",
-                  command=lambda: [self.history.clear(), history_window.destroy()]).pack(side=tk.LEFT, padx=5)
+                  command=clear_history).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="Export History",
                   command=self.export_history).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="Close",
                   command=history_window.destroy).pack(side=tk.RIGHT, padx=5)
     
+    def plot_history(self):
+        """Plot past results against seconds since the first calculation"""
+        if not self.history:
+            messagebox.showinfo("History", "No calculations yet")
+            return
+        times = self.history.timestamps_view()
+        seconds = (times - times[0]) / 1000.0
+        self.set_plot_points(seconds, self.history.results_view(), "history")
+        self.notebook.select(self.graph_frame)
+        self.plot_function()
+    
+    def history_to_statistics(self):
+        """Make the result column the Statistics dataset (a view, not a copy)"""
+        if not self.history:
+            messagebox.showinfo("History", "No calculations yet")
+            return
+        self.stats_array = self.history.results_view()
+        self.stats_source_path = None
+        self.data_entry.delete("1.0", tk.END)
+        self.data_entry.insert("1.0", f"[{len(self.stats_array):,} past results]")
+        self.update_status("History results are now the Statistics dataset")
+    
     def show_variables(self):
         """Show variables dialog"""
         var_window = tk.Toplevel(self.root)
@@ -1139,6 +3279,407 @@ class AdvancedCalculator:
         """Open currency converter dialog"""
         messagebox.showinfo("Currency Converter", "Currency converter feature coming soon!")
     
+    def open_monte_carlo(self):
+        """Monte Carlo workbench: estimates stream into the Statistics tab"""
+        window = tk.Toplevel(self.root)
+        window.title("Monte Carlo")
+        window.geometry("560x360")
+        window.configure(bg='#0a0a0a')
+        
+        tk.Label(window, text="Model (X = expr; ...; result):", bg='#0a0a0a', fg='#ffffff',
+                font=('JetBrains Mono', 11)).pack(anchor='w', padx=10, pady=(10, 0))
+        model_text = tk.Text(window, height=4, font=('JetBrains Mono', 11),
+                             bg='#1e1e1e', fg='#ffffff', insertbackground='#ffffff')
+        model_text.insert("1.0", "Z = normrnd(0, 1); S = 100*exp((0.05 - 0.2^2/2) + 0.2*Z); "
+                                 "exp(-0.05)*max(S - 100, 0)")
+        model_text.pack(fill=tk.X, padx=10, pady=5)
+        
+        options = tk.Frame(window, bg='#0a0a0a')
+        options.pack(fill=tk.X, padx=10)
+        fields = {}
+        for i, (label, default) in enumerate([("Seed:", "12345"), ("Target ±:", "0.01"),
+                                              ("Max samples:", "100000000"), ("Chunk:", "1048576")]):
+            tk.Label(options, text=label, bg='#0a0a0a', fg='#ffffff').grid(row=i // 2, column=(i % 2) * 2, sticky='e')
+            entry = tk.Entry(options, width=14, bg='#1e1e1e', fg='#ffffff')
+            entry.insert(0, default)
+            entry.grid(row=i // 2, column=(i % 2) * 2 + 1, padx=5, pady=2, sticky='w')
+            fields[label] = entry
+        tk.Label(options, text="Confidence:", bg='#0a0a0a', fg='#ffffff').grid(row=2, column=0, sticky='e')
+        confidence = ttk.Combobox(options, state='readonly', width=6, values=["90%", "95%", "99%"])
+        confidence.set("95%")
+        confidence.grid(row=2, column=1, padx=5, sticky='w')
+        
+        progress = tk.Label(window, text="Random functions: normrnd, unifrnd, exprnd, poissrnd, ... "
+                                         "(end Target with % for relative precision)",
+                            bg='#0a0a0a', fg='#7f8c8d', wraplength=520, justify='left')
+        progress.pack(fill=tk.X, padx=10, pady=5)
+        
+        def start():
+            try:
+                target_text = fields["Target ±:"].get().strip()
+                relative = target_text.endswith('%')
+                target = float(target_text.rstrip('%')) / (100 if relative else 1) if target_text else None
+                seed_text = fields["Seed:"].get().strip()
+                self.start_monte_carlo(
+                    model_text.get("1.0", tk.END).strip(), progress,
+                    seed=int(seed_text) if seed_text else None, target=target, relative=relative,
+                    max_samples=int(float(fields["Max samples:"].get())),
+                    chunk_size=int(float(fields["Chunk:"].get())),
+                    confidence=float(confidence.get().rstrip('%')) / 100)
+            except Exception as e:
+                messagebox.showerror("Monte Carlo Error", f"Error: {str(e)}", parent=window)
+        
+        buttons = tk.Frame(window, bg='#0a0a0a')
+        buttons.pack(pady=10)
+        ttk.Button(buttons, text="Run", style='Function.TButton', command=start).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Stop", style='Function.TButton',
+                  command=self.stop_monte_carlo).pack(side=tk.LEFT, padx=5)
+    
+    def start_monte_carlo(self, source, progress, **options):
+        """Launch a run on the statistics process pool and start polling it"""
+        self.stop_monte_carlo()
+        run = monte_carlo.MonteCarloRun(source, self.get_stats_executor(), self.stats_workers, **options)
+        self.monte_carlo_run = run
+        self.notebook.select(self.stats_frame)
+        self.display_stats_result(f"Monte Carlo: {source}")
+        self.poll_monte_carlo(run, progress)
+    
+    def poll_monte_carlo(self, run, progress):
+        """Merge finished chunks, stream the running estimate and redraw its convergence"""
+        if run is not self.monte_carlo_run:
+            return
+        try:
+            running = run.poll()
+        except Exception as e:
+            run.stop("failed")
+            messagebox.showerror("Monte Carlo Error", f"Error: {str(e)}")
+            return
+        
+        if run.history:
+            if progress.winfo_exists():
+                progress.config(text=run.summary())
+            self.draw_monte_carlo(run)
+        if running:
+            self.root.after(100, lambda: self.poll_monte_carlo(run, progress))
+        else:
+            self.display_stats_result(f"{run.summary()} [{run.reason}]")
+            self.update_status(f"Monte Carlo finished: {run.reason}")
+    
+    def draw_monte_carlo(self, run):
+        """Running mean with its confidence band on the statistics chart"""
+        samples, means, widths = (np.array(column) for column in zip(*run.history))
+        widths = np.where(np.isfinite(widths), widths, 0.0)
+        ax = self.stats_ax
+        ax.clear()
+        ax.fill_between(samples, means - widths, means + widths, color='#4a90e2', alpha=0.3)
+        ax.plot(samples, means, color='#00ff88')
+        ax.set_xscale('log')
+        ax.set_facecolor('#1e1e1e')
+        ax.grid(True, alpha=0.3, color='#7f8c8d')
+        ax.tick_params(colors='#ffffff')
+        ax.set_title(f"Running mean (n={samples[-1]:,})", color='#ffffff')
+        self.stats_canvas.draw_idle()
+    
+    def stop_monte_carlo(self):
+        """Cancel the current Monte Carlo run, keeping the estimate so far"""
+        run = self.monte_carlo_run
+        if run is not None and not run.finished:
+            run.stop()
+            self.display_stats_result(f"{run.summary()} [stopped]")
+        self.monte_carlo_run = None
+    
+    def open_sweep(self):
+        """Evaluate one expression over ranges, a Cartesian grid or CSV rows of bindings"""
+        window = tk.Toplevel(self.root)
+        window.title("Parameter Sweep")
+        window.geometry("640x560")
+        window.configure(bg='#0a0a0a')
+        state = {'table': None, 'sweep': None, 'export': None}
+        
+        tk.Label(window, text="Expression:", bg='#0a0a0a', fg='#ffffff',
+                font=('JetBrains Mono', 11)).pack(anchor='w', padx=10, pady=(10, 0))
+        expression_entry = tk.Entry(window, font=('JetBrains Mono', 11), bg='#1e1e1e', fg='#ffffff',
+                                    insertbackground='#ffffff')
+        expression_entry.insert(0, "S*exp(-r*T) - K")
+        expression_entry.pack(fill=tk.X, padx=10, pady=5)
+        
+        tk.Label(window, text="Bindings (name = start:stop:count or a, b, c):", bg='#0a0a0a', fg='#ffffff',
+                font=('JetBrains Mono', 11)).pack(anchor='w', padx=10)
+        bindings_text = tk.Text(window, height=4, font=('JetBrains Mono', 11),
+                                bg='#1e1e1e', fg='#ffffff', insertbackground='#ffffff')
+        bindings_text.insert("1.0", "S = 80:120:41\nK = 90, 100, 110\nr = 0.01:0.05:5\nT = 1")
+        bindings_text.pack(fill=tk.X, padx=10, pady=5)
+        
+        options = tk.Frame(window, bg='#0a0a0a')
+        options.pack(fill=tk.X, padx=10)
+        mode = tk.StringVar(value='grid')
+        tk.Radiobutton(options, text="Grid (all combinations)", variable=mode, value='grid',
+                      bg='#0a0a0a', fg='#ffffff', selectcolor='#1e1e1e').pack(side=tk.LEFT)
+        tk.Radiobutton(options, text="Zip (row by row)", variable=mode, value='zip',
+                      bg='#0a0a0a', fg='#ffffff', selectcolor='#1e1e1e').pack(side=tk.LEFT)
+        table_label = tk.Label(options, text="No CSV", bg='#0a0a0a', fg='#7f8c8d')
+        table_label.pack(side=tk.RIGHT)
+        
+        def import_table():
+            file_path = filedialog.askopenfilename(
+                parent=window, filetypes=[("CSV files", "*.csv"), ("NumPy arrays", "*.npy"), ("All files", "*.*")])
+            if file_path:
+                try:
+                    state['table'] = sweeps.load_binding_table(file_path)
+                    names, array = state['table']
+                    table_label.config(text=f"{os.path.basename(file_path)}: {', '.join(names)} ({array.shape[0]:,} rows)")
+                except Exception as e:
+                    messagebox.showerror("Import Error", f"Error: {str(e)}", parent=window)
+        
+        ttk.Button(options, text="Import CSV", style='Function.TButton',
+                  command=import_table).pack(side=tk.RIGHT, padx=5)
+        
+        info = tk.Label(window, text="", bg='#0a0a0a', fg='#7f8c8d', anchor='w')
+        info.pack(fill=tk.X, padx=10)
+        grid = VirtualGrid(window)
+        grid.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        
+        def build():
+            groups = sweeps.parse_bindings(bindings_text.get("1.0", tk.END))
+            if state['table'] is not None:
+                groups.append(state['table'])
+            state['sweep'] = sweeps.Sweep(expression_entry.get().strip(), groups, mode.get())
+            return state['sweep']
+        
+        def preview():
+            try:
+                sweep = build()
+                grid.set_data(sweeps.SweepTable(sweep), sweep.names + ['result'])
+                info.config(text=f"{sweep.rows:,} rows (evaluated as you scroll)")
+            except Exception as e:
+                messagebox.showerror("Sweep Error", f"Error: {str(e)}", parent=window)
+        
+        def export():
+            try:
+                sweep = build()
+            except Exception as e:
+                messagebox.showerror("Sweep Error", f"Error: {str(e)}", parent=window)
+                return
+            file_path = filedialog.asksaveasfilename(
+                parent=window, defaultextension=".csv", filetypes=[("CSV files", "*.csv")])
+            if file_path:
+                state['export'] = self.export_sweep(sweep, file_path, info)
+        
+        def to_statistics():
+            try:
+                sweep = build()
+                if sweep.rows > self.SWEEP_DATASET_ROWS:
+                    raise ValueError(f"{sweep.rows:,} rows; export to CSV and import it instead")
+                results = np.concatenate([chunk for _, _, chunk in sweep.iter_chunks()])
+                self.stats_array = results
+                self.stats_source_path = None
+                self.data_entry.delete("1.0", tk.END)
+                self.data_entry.insert("1.0", f"[{results.size:,} sweep results of {sweep.source}]")
+                self.notebook.select(self.stats_frame)
+            except Exception as e:
+                messagebox.showerror("Sweep Error", f"Error: {str(e)}", parent=window)
+        
+        def cancel():
+            if state['export'] is not None:
+                state['export'].set()
+        
+        buttons = tk.Frame(window, bg='#0a0a0a')
+        buttons.pack(pady=5)
+        for text, command in [("Preview", preview), ("Export CSV...", export),
+                              ("To Statistics", to_statistics), ("Cancel Export", cancel)]:
+            ttk.Button(buttons, text=text, style='Function.TButton',
+                      command=command).pack(side=tk.LEFT, padx=5)
+        window.protocol("WM_DELETE_WINDOW", lambda: (cancel(), window.destroy()))
+    
+    # User-defined functions
+    def load_function_library(self):
+        """Compile the saved f(x, y) = ... definitions (from the disk cache when unchanged), once per process"""
+        if self.shared.library_loaded:
+            return
+        try:
+            self.function_library.load().install()
+            self.shared.library_loaded = True
+        except (OSError, ValueError) as e:
+            self.update_status(f"Function library not loaded: {str(e)}")
+    
+    def open_function_library(self):
+        """Editor for user functions usable in calculations, plots, sweeps and Monte Carlo"""
+        window = tk.Toplevel(self.root)
+        window.title("Function Library")
+        window.geometry("600x460")
+        window.configure(bg='#0a0a0a')
+        
+        tk.Label(window, text="One definition per line, e.g. f(x, y) = x^2 + y   (# comments)",
+                bg='#0a0a0a', fg='#ffffff', font=('JetBrains Mono', 11)).pack(anchor='w', padx=10, pady=(10, 0))
+        definitions_text = tk.Text(window, height=16, font=('JetBrains Mono', 11),
+                                   bg='#1e1e1e', fg='#ffffff', insertbackground='#ffffff')
+        definitions_text.insert("1.0", self.function_library.source or
+                                "hyp(a, b) = sqrt(a^2 + b^2)\nclamp(x, lo, hi) = min(max(x, lo), hi)\n")
+        definitions_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        
+        info = tk.Label(window, text=", ".join(self.function_library.describe()), bg='#0a0a0a',
+                       fg='#7f8c8d', anchor='w', justify=tk.LEFT, wraplength=560)
+        info.pack(fill=tk.X, padx=10)
+        
+        def apply():
+            try:
+                report = self.function_library.update(definitions_text.get("1.0", tk.END))
+                self.function_library.install()
+                self.function_library.save()
+            except (OSError, ValueError) as e:
+                info.config(text=str(e), fg='#e74c3c')
+                return
+            rebuilt = ", ".join(report['rebuilt']) or "nothing"
+            info.config(text=f"{report['definitions']} functions; parsed {report['parsed']}, "
+                             f"rebuilt {rebuilt}", fg='#7f8c8d')
+            self.update_status("Function library updated")
+        
+        buttons = tk.Frame(window, bg='#0a0a0a')
+        buttons.pack(fill=tk.X, padx=10, pady=10)
+        ttk.Button(buttons, text="Apply", command=apply).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Close", command=window.destroy).pack(side=tk.RIGHT, padx=5)
+    
+    # Scripts
+    def open_script(self):
+        """Script panel: loops, conditionals and functions over the expression language"""
+        window = tk.Toplevel(self.root)
+        window.title("Script")
+        window.geometry("640x620")
+        window.configure(bg='#0a0a0a')
+        
+        tk.Label(window, text="Python-style statements: x = ..., if/elif/else, while, for i in range(...), def, print",
+                bg='#0a0a0a', fg='#ffffff', font=('JetBrains Mono', 10)).pack(anchor='w', padx=10, pady=(10, 0))
+        script_text = tk.Text(window, height=16, font=('JetBrains Mono', 11), undo=True,
+                              bg='#1e1e1e', fg='#ffffff', insertbackground='#ffffff')
+        script_text.insert("1.0", getattr(self, 'script_source', None) or
+                           "balance = 200000\nrate = 0.05 / 12\n"
+                           "payment = balance * rate / (1 - (1 + rate)^-360)\n"
+                           "for month in range(1, 361):\n"
+                           "    interest = balance * rate\n"
+                           "    balance = balance - (payment - interest)\n"
+                           "    if month % 60 == 0:\n"
+                           "        print(month, interest, balance)\n")
+        script_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        
+        output_text = tk.Text(window, height=10, font=('JetBrains Mono', 10), state=tk.DISABLED,
+                              bg='#1e1e1e', fg='#2ecc71')
+        output_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        info = tk.Label(window, text="Ready", bg='#0a0a0a', fg='#7f8c8d', anchor='w')
+        info.pack(fill=tk.X, padx=10)
+        state = {'cancel': None}
+        
+        def show_output(lines, clear=False):
+            output_text.config(state=tk.NORMAL)
+            if clear:
+                output_text.delete("1.0", tk.END)
+            output_text.insert(tk.END, "".join(line + "\n" for line in lines))
+            output_text.see(tk.END)
+            output_text.config(state=tk.DISABLED)
+        
+        def run():
+            if state['cancel'] is not None:
+                return
+            source = script_text.get("1.0", tk.END)
+            self.script_source = source
+            seeds = {name: value for name, value in self.variables.items()
+                     if isinstance(value, (int, float, complex))}
+            seeds['ans'] = self.last_answer
+            try:
+                program = scripting.Program(source, seeds)
+            except scripting.ScriptError as e:
+                info.config(text=str(e), fg='#e74c3c')
+                return
+            
+            cancel = threading.Event()
+            lines = []  # print() output, drained by poll()
+            outcome = {}
+            state['cancel'] = cancel
+            
+            def execute():
+                start = time.perf_counter()
+                try:
+                    outcome['variables'] = program.run(cancel=cancel, output=lines.append, variables=seeds)
+                except scripting.ScriptError as e:
+                    outcome['error'] = e
+                outcome['seconds'] = time.perf_counter() - start
+            
+            def poll():
+                if not window.winfo_exists():
+                    cancel.set()
+                    return
+                if lines:
+                    batch = lines[:]
+                    del lines[:len(batch)]
+                    show_output(batch)
+                if 'seconds' not in outcome:
+                    info.config(text=f"Running... {program.steps:,} steps", fg='#7f8c8d')
+                    self.root.after(100, poll)
+                    return
+                state['cancel'] = None
+                summary = f"{program.steps:,} steps in {outcome['seconds']:.3f} s"
+                if 'error' in outcome:
+                    info.config(text=f"{outcome['error']}  ({summary})", fg='#e74c3c')
+                    return
+                results = {name: value for name, value in outcome['variables'].items()
+                           if name != 'ans' and isinstance(value, (int, float, complex))
+                           and not isinstance(value, bool)}
+                self.variables.update(results)
+                self.update_displays()
+                info.config(text=f"Done: {summary}; {len(results)} variables kept", fg='#7f8c8d')
+                self.update_status("Script finished")
+            
+            show_output([], clear=True)
+            threading.Thread(target=execute, daemon=True).start()
+            poll()
+        
+        def cancel():
+            if state['cancel'] is not None:
+                state['cancel'].set()
+        
+        buttons = tk.Frame(window, bg='#0a0a0a')
+        buttons.pack(fill=tk.X, padx=10, pady=10)
+        ttk.Button(buttons, text="Run", command=run).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Cancel", command=cancel).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Close", command=window.destroy).pack(side=tk.RIGHT, padx=5)
+        window.bind('<Control-Return>', lambda event: run())
+        window.protocol("WM_DELETE_WINDOW", lambda: (cancel(), window.destroy()))
+    
+    def export_sweep(self, sweep, file_path, info):
+        """Export a sweep on a helper thread (chunks formatted on the process pool)
+
+        Returns an Event that cancels the export when set.
+        """
+        cancelled = threading.Event()
+        progress = {'rows': 0}
+        executor = self.get_stats_executor()
+        
+        def run():
+            try:
+                sweeps.export_sweep(sweep, file_path, executor=executor, workers=self.stats_workers,
+                                    progress=lambda rows: progress.update(rows=rows),
+                                    cancelled=cancelled.is_set)
+            except Exception as e:
+                progress['error'] = e
+            progress['done'] = True
+        
+        def poll():
+            if not info.winfo_exists():
+                cancelled.set()
+                return
+            if 'error' in progress:
+                messagebox.showerror("Export Error", f"Error: {str(progress['error'])}")
+            elif progress.get('done'):
+                outcome = "cancelled" if cancelled.is_set() else "exported"
+                info.config(text=f"{progress['rows']:,} of {sweep.rows:,} rows {outcome} to {os.path.basename(file_path)}")
+                self.update_status(f"Sweep {outcome}")
+            else:
+                info.config(text=f"Exporting... {progress['rows']:,} of {sweep.rows:,} rows")
+                self.root.after(200, poll)
+        
+        threading.Thread(target=run, daemon=True).start()
+        poll()
+        return cancelled
+    
     def open_settings(self):
         """Open settings dialog"""
         settings_window = tk.Toplevel(self.root)
@@ -1206,6 +3747,7 @@ Advanced:
 • Tab: Switch calculator tabs
 • Ctrl+S: Save session
 • Ctrl+O: Load session
+• Ctrl+N: New session (own display, history, memory and variables)
         """
         messagebox.showinfo("Keyboard Shortcuts", shortcuts_text)
     
@@ -1223,6 +3765,7 @@ FEATURES:
 • Memory operations
 • Variable storage
 • Calculation history
+• Exact large integers (e.g. 200000!) shown instantly; 'ans' reuses the exact result and Copy gives every digit
 • Session save/load
 • Multiple themes
 
@@ -1230,8 +3773,19 @@ TABS:
 • Basic: Standard calculator
 • Scientific: Advanced math functions  
 • Programming: Number base conversions
-• Statistics: Data analysis
+• Statistics: Data analysis, distributions (normcdf, tinv, binopdf, ...)
+• Tools > Monte Carlo: simulate models such as Z = normrnd(0, 1); exp(Z)
+• Tools > Parameter Sweep: evaluate a formula over ranges, grids or CSV rows
+• Tools > Function Library: define f(x, y) = ... once and use it in any expression or plot
+• Tools > Script: loops, conditionals and functions, e.g. for i in range(10): s += i^2
+• Scientific > Solve: polynomial roots, dense/sparse linear systems and batches of small systems
+• Statistics > Time Series: moving averages, EWMA, rolling std, detrend, resample, autocorrelation, spectra
+• Live preview: the value of the expression appears under it as you type
+• File > Batch Plot Export: render a CSV/JSON list of plots to PNG, SVG or PDF (also python batch_plot.py)
+• File > New Session (Ctrl+N): another calculator window in the same process
+• View > History (F9): millions of past results; plot them over time or use them as the Statistics dataset
 • Graphing: Function plotting
+• Matrix: Linear algebra (solve, inverse, eigen, SVD)
 
 For more help, visit the GitHub repository.
         """
@@ -1272,8 +3826,10 @@ Designed for professionals, students & developers
         self.root.bind('<F1>', lambda e: self.show_shortcuts())
         self.root.bind('<F2>', lambda e: self.toggle_theme())
         self.root.bind('<F9>', lambda e: self.show_history())
+        self.root.bind('<Control-n>', lambda e: self.shared.open_session())
         self.root.focus_set()
     
+    @profiled
     def on_key_press(self, event):
         """Enhanced keyboard input handling"""
         key = event.char
@@ -1283,6 +3839,8 @@ Designed for professionals, students & developers
         elif key in '+-*/':
             op_map = {'/': '÷', '*': '×'}
             self.add_operator(op_map.get(key, key))
+        elif key == 'i' and self.complex_mode.get():
+            self.add_number('i')
         elif key == '\r' or key == '=':  # Enter key
             self.calculate()
         elif event.keysym == 'BackSpace':
@@ -1305,14 +3863,8 @@ def main():
     except:
         pass
     
-    calculator = AdvancedCalculator(root)
-    
-    # Handle window closing
-    def on_closing():
-        calculator.save_settings()
-        root.destroy()
-    
-    root.protocol("WM_DELETE_WINDOW", on_closing)
+    # The first session uses the root window; File > New Session (Ctrl+N) adds more
+    SessionManager(root).open_session(root)
     root.mainloop()
 
 if __name__ == "__main__":
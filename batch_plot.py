@@ -0,0 +1,237 @@
+"""Headless batch plot export: many function plots to PNG, SVG or PDF.
+
+Jobs come from a CSV file with a header row, or a JSON list of objects,
+with the fields
+
+    function   expression; 'x(t); y(t)' for parametric, 'lhs = rhs' for implicit
+    x_min, x_max, y_min, y_max   ranges (expressions such as 2*pi allowed);
+                                 y is optional except for implicit and domain plots
+    mode       explicit (default), parametric, polar, implicit or domain
+    name       output file name without extension (default plot_0001, ...)
+    title      plot title (default from the function)
+
+    python batch_plot.py jobs.csv --out plots --format svg --dpi 300 --workers 8
+
+Plots are drawn with the Agg backend (no Tk and no display), spread over a
+process pool. Each worker builds and styles one figure when it starts and
+reuses it for all of its plots.
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+
+import expression_engine
+import function_library
+import plotting
+
+MODES = ('explicit', 'parametric', 'polar', 'implicit', 'domain')
+FORMATS = ('png', 'svg', 'pdf')
+THEMES = {
+    # figure, axes, grid, text, curve
+    'dark': ('#0a0a0a', '#1e1e1e', '#7f8c8d', '#ffffff', '#00ff88'),
+    'light': ('#ffffff', '#ffffff', '#b0b0b0', '#000000', '#1f77b4'),
+}
+SAMPLES = {'explicit': 1000, 'parametric': 2000, 'polar': 2000}
+DOMAIN_PIXELS = 512
+_UNSAFE = re.compile(r'[^\w.-]+')
+
+_template = None  # This worker's (figure, axes, theme), built by _init_worker
+
+
+def load_jobs(path):
+    """Job dicts from a CSV (header row) or JSON file, validated and with defaults filled in"""
+    with open(path, newline='') as file:
+        if path.lower().endswith('.json'):
+            rows = json.load(file)
+            if not isinstance(rows, list):
+                raise ValueError("A JSON job file holds a list of objects")
+        else:
+            rows = [row for row in csv.DictReader(line for line in file if not line.lstrip().startswith('#'))]
+    jobs = []
+    for index, row in enumerate(rows, 1):
+        row = {key.strip().lower(): value for key, value in row.items()
+               if key and value is not None and str(value).strip() != ''}
+        if 'function' not in row:
+            raise ValueError(f"Job {index}: no function")
+        mode = str(row.get('mode', 'explicit')).strip().lower()
+        if mode not in MODES:
+            raise ValueError(f"Job {index}: unknown mode '{mode}' (expected one of {', '.join(MODES)})")
+        job = {'function': str(row['function']).strip(), 'mode': mode,
+               'name': _UNSAFE.sub('_', str(row.get('name', f"plot_{index:04d}"))).strip('_'),
+               'title': row.get('title')}
+        for key, default in (('x_min', -10), ('x_max', 10), ('y_min', None), ('y_max', None)):
+            value = row.get(key, default)
+            job[key] = None if value is None else float(expression_engine.evaluate(str(value)))
+        if mode in ('implicit', 'domain') and (job['y_min'] is None or job['y_max'] is None):
+            raise ValueError(f"Job {index}: {mode} plots need y_min and y_max")
+        jobs.append(job)
+    return jobs
+
+
+def _init_worker(size, dpi, theme, functions):
+    """Build this worker's styled figure once; plots only swap its artists"""
+    global _template
+    function_library.install_source(functions)
+    figure_color, axes_color, grid_color, text_color, _ = THEMES[theme]
+    figure = Figure(figsize=size, dpi=dpi, facecolor=figure_color)
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot(111)
+    axes.set_facecolor(axes_color)
+    axes.tick_params(colors=text_color)
+    for spine in axes.spines.values():
+        spine.set_color(grid_color)
+    axes.set_xlabel('X', color=text_color)
+    axes.set_ylabel('Y', color=text_color)
+    _template = (figure, axes, theme)
+
+
+def _reset(axes):
+    """Remove the previous plot's data artists, keeping the styling"""
+    for artist in list(axes.lines) + list(axes.collections) + list(axes.images):
+        artist.remove()
+    axes.set_aspect('auto')
+    axes.grid(True, alpha=0.3, color=THEMES[_template[2]][2])
+    axes.set_autoscale_on(True)
+
+
+def draw(axes, job, color):
+    """Draw one job on cleared axes; returns the default title"""
+    function, mode = job['function'], job['mode']
+    x_min, x_max, y_min, y_max = job['x_min'], job['x_max'], job['y_min'], job['y_max']
+    if mode == 'explicit':
+        x = np.linspace(x_min, x_max, SAMPLES[mode])
+        y = expression_engine.compile_expression(function).vectorized(shape=x.shape, x=x)
+        axes.plot(x, y, color=color, linewidth=2)
+        title = f'f(x) = {function}'
+    elif mode == 'parametric':
+        x_source, y_source = plotting.parametric_sources(function)
+        t = np.linspace(x_min, x_max, SAMPLES[mode])
+        x = expression_engine.compile_expression(x_source).vectorized(shape=t.shape, t=t)
+        y = expression_engine.compile_expression(y_source).vectorized(shape=t.shape, t=t)
+        axes.plot(x, y, color=color, linewidth=2)
+        title = f'(x, y) = ({x_source}, {y_source})'
+    elif mode == 'polar':
+        theta = np.linspace(x_min, x_max, SAMPLES[mode])
+        r = expression_engine.compile_expression(function).vectorized(
+            shape=theta.shape, theta=theta, θ=theta, t=theta)
+        axes.plot(r * np.cos(theta), r * np.sin(theta), color=color, linewidth=2)
+        axes.set_aspect('equal', adjustable='datalim')
+        title = f'r(θ) = {function}'
+    elif mode == 'implicit':
+        expression = expression_engine.compile_expression(plotting.implicit_source(function))
+        extent = (x_min, x_max, y_min, y_max)
+        axes.add_collection(LineCollection(plotting.implicit_segments(expression, extent),
+                                           colors=color, linewidths=2))
+        title = function if '=' in function else f'{function} = 0'
+    else:
+        extent = (x_min, x_max, y_min, y_max)
+        image = plotting.render_domain_coloring(expression_engine.compile_expression(function),
+                                                extent, DOMAIN_PIXELS, DOMAIN_PIXELS)
+        axes.imshow(image, extent=extent, origin='upper', aspect='auto', interpolation='bilinear')
+        axes.grid(False)
+        title = f'f(z) = {function}'
+
+    if mode in ('implicit', 'domain'):
+        axes.set_xlim(x_min, x_max)
+        axes.set_ylim(y_min, y_max)
+    else:
+        axes.relim()
+        axes.autoscale_view()
+        if y_min is not None and y_max is not None:
+            axes.set_ylim(y_min, y_max)
+    return title
+
+
+def render(job, out_dir, file_format, dpi):
+    """Worker: draw one job on the template figure and save it; returns (name, path or None, error)"""
+    figure, axes, theme = _template
+    text_color, color = THEMES[theme][3], THEMES[theme][4]
+    path = os.path.join(out_dir, f"{job['name']}.{file_format}")
+    try:
+        _reset(axes)
+        with np.errstate(all='ignore'):
+            title = draw(axes, job, color)
+        axes.set_title(job['title'] or title, color=text_color)
+        figure.savefig(path, format=file_format, dpi=dpi, facecolor=figure.get_facecolor())
+        return job['name'], path, None
+    except Exception as e:
+        return job['name'], None, str(e)
+
+
+def render_chunk(jobs, out_dir, file_format, dpi):
+    return [render(job, out_dir, file_format, dpi) for job in jobs]
+
+
+def export(jobs, out_dir, file_format='png', dpi=150, size=(8, 6), theme='dark', workers=None,
+           chunk_size=8, progress=None, cancelled=None):
+    """Render every job into out_dir across a process pool
+
+    Jobs go to the workers in chunks of chunk_size to amortize the
+    round trips. progress(done, total) is called as chunks finish, and
+    cancelled() returning True stops before the next chunk is collected.
+    Returns [(name, path or None, error or None)] in job order.
+    """
+    if file_format not in FORMATS:
+        raise ValueError(f"Unknown format '{file_format}' (expected one of {', '.join(FORMATS)})")
+    os.makedirs(out_dir, exist_ok=True)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs) or 1))
+    chunks = [jobs[start:start + chunk_size] for start in range(0, len(jobs), chunk_size)]
+    results = [None] * len(chunks)
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_worker,
+                             initargs=(size, dpi, theme, expression_engine.user_source())) as executor:
+        futures = {executor.submit(render_chunk, chunk, out_dir, file_format, dpi): index
+                   for index, chunk in enumerate(chunks)}
+        for future in as_completed(futures):
+            if cancelled is not None and cancelled():
+                for pending in futures:
+                    pending.cancel()
+                break
+            results[futures[future]] = future.result()
+            done += len(results[futures[future]])
+            if progress is not None:
+                progress(done, len(jobs))
+    return [result for chunk in results if chunk is not None for result in chunk]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('jobs', help="CSV (with header) or JSON job file")
+    parser.add_argument('--out', default='plots', help="output directory")
+    parser.add_argument('--format', choices=FORMATS, default='png')
+    parser.add_argument('--dpi', type=int, default=150)
+    parser.add_argument('--size', default='8x6', help="figure size in inches, WxH")
+    parser.add_argument('--theme', choices=sorted(THEMES), default='dark')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--functions', help="user function library (f(x, y) = ... per line)")
+    args = parser.parse_args()
+
+    if args.functions:
+        function_library.FunctionLibrary(args.functions).load().install()
+    width, _, height = args.size.lower().partition('x')
+    jobs = load_jobs(args.jobs)
+    started = time.perf_counter()
+    results = export(jobs, args.out, args.format, args.dpi, (float(width), float(height)), args.theme,
+                     args.workers, progress=lambda done, total: print(f"\r{done}/{total}", end='', flush=True))
+    failures = [(name, error) for name, path, error in results if error]
+    print(f"\n{len(results) - len(failures)} plots written to {args.out} "
+          f"in {time.perf_counter() - started:.1f} s")
+    for name, error in failures:
+        print(f"{name}: {error}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,442 @@
+"""Input-to-idle latency benchmark for the Tk GUI under a virtual X server.
+
+Starts advanced_calculator.main() under Xvfb (or an existing --display),
+replays key and button sequences with event_generate and measures, per
+scenario, the time from each input until the event loop goes idle, the
+duration of every event-loop iteration that did work ("frames") and the
+process RSS. Each scenario runs in a fresh process and a scratch working
+directory, so saved settings and libraries are left alone. Run from the
+repository root:
+
+    python benchmarks/bench_gui.py --json gui.json
+    python benchmarks/bench_gui.py --baseline gui.json    # exit status 1 on regressions
+
+Scenarios are JSON lists of steps, so sequences recorded with --record (or
+written by hand) replay the same way as the built-in ones:
+
+    {"key": "F9"}                         press and release a key in the focused widget
+    {"type": "12*(3+4)="}                 one key per character, each measured on its own
+    {"click": "text:Plot"}                click a widget by Tk path, @calculator attribute or text:label
+    {"tab": "Graphing"}                   click a notebook tab
+    {"close": "dialogs"}                  close every Toplevel opened by the previous steps
+    {"history": 20000}                    fill the history (setup, not measured)
+    {"wait": 500}                         keep the event loop running for 500 ms
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FRAME_BUDGET_MS = 1000 / 60
+
+# Characters whose keysym differs from the character itself
+KEYSYMS = {
+    '+': 'plus', '-': 'minus', '*': 'asterisk', '/': 'slash', '.': 'period', ',': 'comma',
+    '(': 'parenleft', ')': 'parenright', '^': 'asciicircum', '=': 'equal', ' ': 'space',
+    '\n': 'Return', '!': 'exclam', '%': 'percent',
+}
+
+LONG_EXPRESSION = "123456789+987654321*3.14159-2718.2818/7+" * 5 + "1="
+
+SCENARIOS = {
+    'startup': [],
+    'typing': [{'type': LONG_EXPRESSION}, {'key': 'Escape'}],
+    'tabs': [{'tab': name} for name in ("Scientific", "Programming", "Statistics", "Graphing",
+                                        "Matrix", "Basic")] * 2,
+    'plotting': [
+        {'tab': "Graphing"},
+        {'click': '@function_entry'},
+        {'type': "sin(x)*exp(-x/10)"},
+        {'click': 'text:Plot'},
+        *[{'key': 'BackSpace'}] * 7, {'type': "cos(3*x)"},
+        {'click': 'text:Plot'},
+    ],
+    'history': [{'history': 20000}] + [{'key': 'F9'}, {'close': 'dialogs'}] * 3,
+    'theme': [{'key': 'F2'}] * 10,
+}
+
+
+# Child process: drive the GUI
+def rss_mb():
+    """Current resident set size (Linux /proc; peak RSS elsewhere)"""
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except OSError:
+        return peak_rss_mb()
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if platform.system() == 'Darwin' else peak / 2 ** 10
+
+
+class Driver:
+    """Replays steps against a running calculator and times the event loop"""
+
+    def __init__(self, root, calculator, quiet_ms, timeout_ms):
+        import _tkinter
+        self.root = root
+        self.calculator = calculator
+        self.quiet = quiet_ms / 1000
+        self.timeout = timeout_ms / 1000
+        self.flags = _tkinter.ALL_EVENTS | _tkinter.DONT_WAIT
+        self.latencies = []  # (label, ms)
+        self.frames = []     # ms per event-loop iteration that did work
+        self.dialogs = []
+
+    def settle(self, start):
+        """Run the event loop until nothing happens for quiet seconds
+
+        Returns milliseconds from start to the last iteration that did work,
+        plus an X round trip so drawing requests have reached the server.
+        """
+        last_work = time.perf_counter()
+        deadline = start + self.timeout
+        while True:
+            before = time.perf_counter()
+            if self.root.tk.dooneevent(self.flags):
+                last_work = time.perf_counter()
+                self.frames.append((last_work - before) * 1000)
+            elif before - last_work >= self.quiet or before > deadline:
+                break
+            else:
+                time.sleep(0.0005)
+        round_trip = time.perf_counter()
+        self.root.winfo_pointerxy()
+        return (last_work - start + time.perf_counter() - round_trip) * 1000
+
+    def pump(self, seconds):
+        """Keep the event loop running for a while without measuring an input"""
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            if not self.root.tk.dooneevent(self.flags):
+                time.sleep(0.001)
+
+    def measure(self, label, action):
+        start = time.perf_counter()
+        action()
+        self.latencies.append((label, self.settle(start)))
+
+    # Locating widgets
+    def widget(self, locator):
+        if locator.startswith('@'):
+            return getattr(self.calculator, locator[1:])
+        if locator.startswith('text:'):
+            return self.find_text(self.root, locator[5:])
+        return self.root.nametowidget(locator)
+
+    def find_text(self, parent, text):
+        for child in parent.winfo_children():
+            try:
+                if child.cget('text') == text and child.winfo_viewable():
+                    return child
+            except Exception:
+                pass  # Widgets without a text option
+            found = self.find_text(child, text)
+            if found is not None:
+                return found
+        if parent is self.root:
+            raise LookupError(f"No visible widget labelled '{text}'")
+        return None
+
+    def tab_point(self, name):
+        """Coordinates inside the notebook tab with this label"""
+        notebook = self.calculator.notebook
+        target = [notebook.tab(tab, 'text') for tab in notebook.tabs()].index(name)
+        for y in (10, 15, 5, 20):
+            for x in range(2, notebook.winfo_width(), 4):
+                try:
+                    if notebook.index(f'@{x},{y}') == target:
+                        return notebook, x + 4, y
+                except Exception:
+                    continue
+        raise LookupError(f"Tab '{name}' is not visible")
+
+    # Input
+    def key(self, keysym):
+        target = self.root.focus_get() or self.root
+        target.event_generate('<KeyPress>', keysym=keysym, when='tail')
+        target.event_generate('<KeyRelease>', keysym=keysym, when='tail')
+
+    def click(self, widget, x=None, y=None, button=1):
+        if x is None:
+            widget.update_idletasks()
+            x, y = widget.winfo_width() // 2, widget.winfo_height() // 2
+        widget.event_generate('<Enter>', x=x, y=y, when='tail')
+        widget.event_generate(f'<ButtonPress-{button}>', x=x, y=y, when='tail')
+        widget.event_generate(f'<ButtonRelease-{button}>', x=x, y=y, when='tail')
+
+    def toplevels(self):
+        return [child for child in self.root.winfo_children() if child.winfo_class() == 'Toplevel']
+
+    def run_step(self, step):
+        if 'history' in step:
+            self.calculator.history.clear()
+            self.calculator.history.extend((f"{i}*{i}+1", i * i + 1) for i in range(step['history']))
+            return
+        if 'close' in step:
+            for window in self.toplevels():
+                if window not in self.dialogs:
+                    self.measure('close', window.destroy)
+            return
+        if 'type' in step:
+            for char in step['type']:
+                keysym = KEYSYMS.get(char, char)
+                self.measure(f'type {keysym}', lambda keysym=keysym: self.key(keysym))
+            return
+        if 'key' in step:
+            self.measure(f"key {step['key']}", lambda: self.key(step['key']))
+        elif 'click' in step:
+            widget = self.widget(step['click'])
+            self.measure(f"click {step['click']}",
+                         lambda: self.click(widget, step.get('x'), step.get('y'), step.get('button', 1)))
+        elif 'tab' in step:
+            notebook, x, y = self.tab_point(step['tab'])
+            self.measure(f"tab {step['tab']}", lambda: self.click(notebook, x, y))
+        elif 'wait' in step:
+            self.pump(step['wait'] / 1000)
+        else:
+            raise ValueError(f"Unknown step: {step}")
+
+
+def percentiles(values):
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def at(q):
+        return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+    return {'p50': at(50), 'p95': at(95), 'p99': at(99), 'max': ordered[-1]}
+
+
+def run_child(args):
+    """Start the real GUI through main() and replay one scenario from stdin"""
+    steps = json.load(sys.stdin)
+    sys.path.insert(0, ROOT)
+    os.chdir(tempfile.mkdtemp(prefix='calc_gui_bench_'))
+    import tkinter as tk
+    from tkinter import messagebox
+    import advanced_calculator
+
+    errors = []
+    for name in ('showerror', 'showwarning', 'showinfo'):  # A modal dialog would stall the replay
+        setattr(messagebox, name, lambda title, message, *a, **k: errors.append(f"{title}: {message}"))
+    for name in ('askyesno', 'askokcancel'):
+        setattr(messagebox, name, lambda *a, **k: False)
+
+    created = {}
+    original_init = advanced_calculator.AdvancedCalculator.__init__
+
+    def capture(self, root, *args):
+        original_init(self, root, *args)
+        created['calculator'] = self
+    advanced_calculator.AdvancedCalculator.__init__ = capture
+
+    report = {}
+    started = time.perf_counter()
+
+    def drive(root, n=0):
+        # main() ends in mainloop(); the harness runs the loop itself instead
+        driver = Driver(root, created['calculator'], args.quiet_ms, args.timeout_ms)
+        root.update()
+        report['startup_ms'] = driver.settle(started)
+        report['startup_rss_mb'] = rss_mb()
+        driver.dialogs = driver.toplevels()
+        driver.frames.clear()
+        for step in steps:
+            driver.run_step(step)
+        report['latency_ms'] = percentiles([ms for _, ms in driver.latencies])
+        report['frame_ms'] = percentiles(driver.frames)
+        report['inputs'] = len(driver.latencies)
+        report['frames'] = len(driver.frames)
+        report['long_frames'] = sum(ms > FRAME_BUDGET_MS for ms in driver.frames)
+        report['slowest'] = sorted(driver.latencies, key=lambda item: -item[1])[:5]
+        report['rss_mb'] = rss_mb()
+        report['peak_rss_mb'] = peak_rss_mb()
+        report['errors'] = errors
+        closing = root.tk.call('wm', 'protocol', root._w, 'WM_DELETE_WINDOW')
+        if closing:
+            root.tk.call(closing)  # The calculator's own shutdown (executors, settings)
+        else:
+            root.destroy()
+    tk.Tk.mainloop = drive
+    advanced_calculator.main()
+    print(json.dumps(report))
+
+
+# Parent process: Xvfb, scenarios and comparison
+def start_xvfb(args):
+    """Start Xvfb on a free display and return (process, display)"""
+    if shutil.which('Xvfb') is None:
+        raise SystemExit("Xvfb not found; install it (e.g. apt install xvfb) or pass --display")
+    read_fd, write_fd = os.pipe()
+    process = subprocess.Popen(['Xvfb', '-displayfd', str(write_fd), '-screen', '0', args.screen,
+                                '-nolisten', 'tcp'], pass_fds=(write_fd,), stderr=subprocess.DEVNULL)
+    os.close(write_fd)
+    with os.fdopen(read_fd) as pipe:
+        number = pipe.readline().strip()
+    if not number:
+        process.kill()
+        raise SystemExit("Xvfb failed to start")
+    return process, f':{number}'
+
+
+def run_scenario(name, steps, args, display):
+    environment = dict(os.environ, DISPLAY=display, MPLBACKEND='TkAgg')
+    command = [sys.executable, os.path.abspath(__file__), '--child',
+               '--quiet-ms', str(args.quiet_ms), '--timeout-ms', str(args.timeout_ms)]
+    completed = subprocess.run(command, input=json.dumps(steps), capture_output=True, text=True,
+                               env=environment, cwd=ROOT, timeout=args.scenario_timeout)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Scenario '{name}' failed:\n{completed.stderr[-2000:]}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def median_report(runs):
+    """Per-metric median over repeated runs of one scenario"""
+    def median(values):
+        ordered = sorted(values)
+        return ordered[len(ordered) // 2]
+
+    report = dict(runs[len(runs) // 2])
+    for key in ('startup_ms', 'startup_rss_mb', 'rss_mb', 'peak_rss_mb', 'long_frames'):
+        report[key] = median([run[key] for run in runs])
+    for key in ('latency_ms', 'frame_ms'):
+        report[key] = {name: median([run[key].get(name, 0.0) for run in runs]) for name in runs[0][key]}
+    report['repeats'] = len(runs)
+    return report
+
+
+# (metric path, noise floor): smaller differences are never regressions
+COMPARED = [(('startup_ms',), 20.0), (('latency_ms', 'p50'), 1.0), (('latency_ms', 'p95'), 2.0),
+            (('frame_ms', 'p95'), 2.0), (('peak_rss_mb',), 5.0)]
+
+
+def compare(current, baseline, tolerance):
+    """Regressions: metrics worse than baseline by more than tolerance and the noise floor"""
+    regressions = []
+    for name, report in current.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        for path, floor in COMPARED:
+            new, old = report, before
+            for key in path:
+                new, old = new.get(key, {}), old.get(key, {})
+            if not isinstance(new, (int, float)) or not isinstance(old, (int, float)):
+                continue
+            if new > old * (1 + tolerance) and new - old > floor:
+                regressions.append({'scenario': name, 'metric': '.'.join(path),
+                                    'baseline': old, 'current': new, 'ratio': new / old if old else None})
+    return regressions
+
+
+def load_scenarios(paths, names):
+    scenarios = dict(SCENARIOS)
+    for path in paths or []:
+        with open(path) as file:
+            loaded = json.load(file)
+        if isinstance(loaded, list):
+            loaded = {os.path.splitext(os.path.basename(path))[0]: loaded}
+        scenarios.update(loaded)
+    if names:
+        unknown = set(names) - set(scenarios)
+        if unknown:
+            raise SystemExit(f"Unknown scenario(s): {', '.join(sorted(unknown))}; "
+                             f"choose from {', '.join(scenarios)}")
+        return {name: scenarios[name] for name in names}
+    return scenarios
+
+
+def record(path):
+    """Run the GUI normally and save keys and clicks as a replayable scenario"""
+    sys.path.insert(0, ROOT)
+    import tkinter as tk
+    import advanced_calculator
+
+    steps = []
+    original_init = advanced_calculator.AdvancedCalculator.__init__
+
+    def capture(self, root, *args):
+        original_init(self, root, *args)
+        root.bind_all('<KeyPress>', lambda event: steps.append({'key': event.keysym}), add='+')
+        root.bind_all('<ButtonRelease-1>', lambda event: steps.append(
+            {'click': str(event.widget), 'x': event.x, 'y': event.y}), add='+')
+    advanced_calculator.AdvancedCalculator.__init__ = capture
+    try:
+        advanced_calculator.main()
+    finally:
+        with open(path, 'w') as file:
+            json.dump(steps, file, indent=1)
+        print(f"Recorded {len(steps)} steps to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scenario', action='append', help="run only these (repeatable)")
+    parser.add_argument('--scenarios', action='append', help="JSON file of extra scenarios")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per scenario; the median is reported")
+    parser.add_argument('--display', help="use this X display instead of starting Xvfb")
+    parser.add_argument('--screen', default='1600x1000x24', help="Xvfb screen geometry")
+    parser.add_argument('--quiet-ms', type=float, default=50, help="idle time that ends an input")
+    parser.add_argument('--timeout-ms', type=float, default=30000, help="longest wait for one input")
+    parser.add_argument('--scenario-timeout', type=float, default=600)
+    parser.add_argument('--json', help="write the report to this JSON file")
+    parser.add_argument('--baseline', help="report from an earlier run to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed slowdown before a regression")
+    parser.add_argument('--record', help="run the GUI and record a scenario to this file")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return run_child(args)
+    if args.record:
+        return record(args.record)
+
+    scenarios = load_scenarios(args.scenarios, args.scenario)
+    xvfb, display = (None, args.display) if args.display else start_xvfb(args)
+    results = {}
+    try:
+        for name, steps in scenarios.items():
+            runs = [run_scenario(name, steps, args, display) for _ in range(max(1, args.repeat))]
+            report = results[name] = median_report(runs)
+            latency, frames = report['latency_ms'], report['frame_ms']
+            print(f"{name:>10}: startup {report['startup_ms']:7.1f} ms  "
+                  f"input p50 {latency.get('p50', 0):6.1f} p95 {latency.get('p95', 0):6.1f} "
+                  f"max {latency.get('max', 0):7.1f} ms  frames p95 {frames.get('p95', 0):6.1f} ms "
+                  f"({report['long_frames']} > {FRAME_BUDGET_MS:.1f})  RSS {report['rss_mb']:.0f} MB")
+            for error in report['errors'][:3]:
+                print(f"{'':>12}dialog: {error}")
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+            xvfb.wait()
+
+    output = {'python': platform.python_version(), 'platform': platform.platform(), 'scenarios': results}
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file)['scenarios'], args.tolerance)
+        output['baseline'] = args.baseline
+        output['regressions'] = regressions
+        for regression in regressions:
+            print(f"REGRESSION {regression['scenario']} {regression['metric']}: "
+                  f"{regression['baseline']:.1f} -> {regression['current']:.1f}")
+        if not regressions:
+            print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(output, file, indent=2)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""Scaling benchmark for the parallel statistics map-reduce.
+
+Writes a synthetic CSV (index,value) of the requested size, then reduces it
+with 1, 2, 4, ... worker processes up to the CPU count and prints throughput
+and speedup for each. Run from the repository root:
+
+    python benchmarks/bench_parallel_stats.py --size-mb 1024
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import stats_engine  # noqa: E402
+
+
+def write_dataset(path, size_mb):
+    """Append random rows until the file reaches size_mb"""
+    rng = np.random.default_rng(0)
+    target = size_mb << 20
+    row = 0
+    with open(path, 'w') as file:
+        file.write("index,value\n")
+        while file.tell() < target:
+            values = rng.normal(50.0, 12.0, 1_000_000)
+            index = np.arange(row, row + values.size)
+            np.savetxt(file, np.column_stack((index, values)), delimiter=',', fmt=('%d', '%.6f'))
+            row += values.size
+
+
+def worker_counts(limit):
+    counts = [1]
+    while counts[-1] * 2 <= limit:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != limit:
+        counts.append(limit)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size-mb', type=int, default=512, help="synthetic file size")
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--file', help="reduce an existing file instead of generating one")
+    parser.add_argument('--json', help="also write results to this JSON file")
+    args = parser.parse_args()
+
+    path = args.file
+    if path is None:
+        path = os.path.join(tempfile.gettempdir(), f"calc_bench_{args.size_mb}mb.csv")
+        if not os.path.exists(path) or os.path.getsize(path) < args.size_mb << 20:
+            print(f"Writing {args.size_mb} MB dataset to {path} ...")
+            write_dataset(path, args.size_mb)
+    size_mb = os.path.getsize(path) / (1 << 20)
+
+    results = []
+    baseline = None
+    print(f"{'workers':>8} {'seconds':>9} {'MB/s':>9} {'speedup':>8} {'efficiency':>10}")
+    for workers in worker_counts(args.max_workers):
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            # Warm the pool so process start-up is not measured
+            list(executor.map(abs, range(workers)))
+            start = time.perf_counter()
+            state = stats_engine.parallel_file_stats(path, executor, workers)
+            elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        speedup = baseline / elapsed
+        results.append({'workers': workers, 'seconds': elapsed, 'mb_per_s': size_mb / elapsed,
+                        'speedup': speedup, 'count': state.count, 'mean': state.mean})
+        print(f"{workers:>8} {elapsed:>9.2f} {size_mb / elapsed:>9.1f} {speedup:>8.2f} "
+              f"{speedup / workers:>10.0%}")
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump({'file': path, 'size_mb': size_mb, 'results': results}, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
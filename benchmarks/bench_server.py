@@ -0,0 +1,165 @@
+"""Load generator for the local evaluation server.
+
+Opens many concurrent connections, keeps a fixed number of pipelined
+requests in flight on each, and reports throughput and latency percentiles.
+Without --tcp/--unix it starts its own server on a free port. Run from the
+repository root:
+
+    python benchmarks/bench_server.py --clients 32 --depth 16 --requests 100000
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (method, params factory): a mix of cache-friendly and fresh work
+WORKLOADS = {
+    'constant': lambda rng: ('evaluate', {'expression': 'sqrt(2)*sin(pi/7)+3^4'}),
+    'variables': lambda rng: ('evaluate', {'expression': 'a*x^2 + b*x + exp(-x/10)',
+                                           'variables': {'a': rng.random(), 'b': rng.random(),
+                                                         'x': rng.uniform(-10, 10)}}),
+    'distinct': lambda rng: ('evaluate', {'expression': f'{rng.randint(0, 10 ** 6)} * ln({rng.randint(1, 100)})'}),
+    'sample': lambda rng: ('sample', {'expression': 'sin(x)*exp(-x/5)', 'x_min': 0, 'x_max': 20,
+                                      'points': 1000}),
+    'statistics': lambda rng: ('statistics', {'data': [rng.gauss(50, 12) for _ in range(1000)]}),
+}
+DEFAULT_MIX = 'constant=1,variables=6,distinct=2,sample=1'
+
+
+def parse_mix(text):
+    """'name=weight,...' -> (names, weights)"""
+    names, weights = [], []
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip() not in WORKLOADS:
+            raise SystemExit(f"Unknown workload '{name}'; choose from {', '.join(WORKLOADS)}")
+        names.append(name.strip())
+        weights.append(float(weight or 1))
+    return names, weights
+
+
+async def open_connection(args):
+    if args.unix:
+        return await asyncio.open_unix_connection(args.unix, limit=64 << 20)
+    host, _, port = args.tcp.rpartition(':')
+    return await asyncio.open_connection(host, int(port), limit=64 << 20)
+
+
+async def client(args, client_id, quota, names, weights, latencies, errors):
+    """Keep args.depth requests in flight until this client's quota is sent"""
+    reader, writer = await open_connection(args)
+    rng = random.Random(client_id)
+    sent_at = {}
+    ids = itertools.count()
+
+    def send():
+        method, params = WORKLOADS[rng.choices(names, weights)[0]](rng)
+        request_id = next(ids)
+        sent_at[request_id] = time.perf_counter()
+        writer.write((json.dumps({'jsonrpc': '2.0', 'id': request_id, 'method': method,
+                                  'params': params}) + '\n').encode())
+
+    sent = 0
+    while sent < min(args.depth, quota):
+        send()
+        sent += 1
+    await writer.drain()
+    while sent_at:
+        response = json.loads(await reader.readline())
+        latencies.append(time.perf_counter() - sent_at.pop(response['id']))
+        if 'error' in response:
+            errors.append(response['error']['message'])
+        if sent < quota:
+            send()
+            sent += 1
+            await writer.drain()
+    writer.close()
+
+
+async def run(args):
+    names, weights = parse_mix(args.mix)
+    latencies, errors = [], []
+    quotas = [args.requests // args.clients + (i < args.requests % args.clients) for i in range(args.clients)]
+    start = time.perf_counter()
+    await asyncio.gather(*(client(args, i, quota, names, weights, latencies, errors)
+                           for i, quota in enumerate(quotas) if quota))
+    elapsed = time.perf_counter() - start
+    milliseconds = np.array(latencies) * 1000
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'first_error': errors[0] if errors else None,
+        'clients': args.clients,
+        'depth': args.depth,
+        'mix': args.mix,
+        'seconds': elapsed,
+        'throughput_rps': len(latencies) / elapsed,
+        'latency_ms': {f'p{q:g}': float(np.percentile(milliseconds, q)) for q in (50, 90, 99, 99.9)}
+                      | {'max': float(milliseconds.max())},
+    }
+
+
+def start_server(args):
+    """Spawn eval_server.py on a free localhost port and wait until it listens"""
+    command = [sys.executable, os.path.join(ROOT, 'eval_server.py'), '--tcp', '127.0.0.1:0',
+               '--workers', str(args.workers)]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True, cwd=ROOT)
+    line = process.stdout.readline()
+    if not line.startswith('Listening on '):
+        process.kill()
+        raise SystemExit("Server failed to start")
+    args.tcp = line.split()[-1]
+    return process
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--tcp', help="host:port of a running server")
+    target.add_argument('--unix', help="Unix socket of a running server")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="worker processes for a self-started server")
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--depth', type=int, default=16, help="pipelined requests in flight per client")
+    parser.add_argument('--requests', type=int, default=50000)
+    parser.add_argument('--warmup', type=int, default=2000, help="requests sent before measuring")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f"workload weights ({', '.join(WORKLOADS)})")
+    parser.add_argument('--json', help="also write results to this JSON file")
+    args = parser.parse_args()
+
+    process = start_server(args) if not (args.tcp or args.unix) else None
+    try:
+        if args.warmup:
+            measured = args.requests
+            args.requests = args.warmup
+            asyncio.run(run(args))  # Spawns workers and fills their caches
+            args.requests = measured
+        report = asyncio.run(run(args))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    latency = report['latency_ms']
+    print(f"{report['requests']:,} requests from {args.clients} clients × {args.depth} in flight "
+          f"in {report['seconds']:.2f} s")
+    print(f"Throughput: {report['throughput_rps']:,.0f} req/s")
+    print("Latency (ms): " + "  ".join(f"{name}={value:.2f}" for name, value in latency.items()))
+    if report['errors']:
+        print(f"Errors: {report['errors']:,} (first: {report['first_error']})")
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
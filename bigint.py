@@ -0,0 +1,121 @@
+import decimal
+import math
+
+LOG10_2 = math.log10(2)
+INLINE_DIGITS = 1000  # Integers up to this many digits are converted with plain str()
+_BASE_BITS = 128
+
+
+def log10_abs(n):
+    """log10 |n| of an arbitrarily large integer from its top 64 bits"""
+    n = abs(n)
+    shift = max(0, n.bit_length() - 64)
+    return math.log10(n >> shift) + shift * LOG10_2
+
+
+def digit_count(n):
+    """Number of decimal digits of |n|, from the logarithm
+
+    Only when log10 lands within rounding error of an integer is the
+    answer confirmed with one exact power-of-ten comparison.
+    """
+    n = abs(n)
+    if n < 10:
+        return 1
+    log = log10_abs(n)
+    count = int(log) + 1
+    fraction = log - int(log)
+    if fraction < 1e-9 or fraction > 1 - 1e-9:
+        count = int(round(log))
+        count += n >= 10 ** count
+    return count
+
+
+def _decimal_context(precision):
+    return decimal.Context(prec=precision, Emax=decimal.MAX_EMAX, Emin=decimal.MIN_EMIN)
+
+
+def format_scientific(n, precision):
+    """n as d.ddd…e+X with `precision` significant digits, without converting all of n"""
+    if abs(n) < 10 ** 15:
+        return f"{n:.{precision}g}"
+    shift = max(0, n.bit_length() - _BASE_BITS)
+    context = _decimal_context(precision + 25)
+    value = context.multiply(decimal.Decimal(abs(n) >> shift), context.power(decimal.Decimal(2), shift))
+    mantissa, _, exponent = format(value, f".{max(precision - 1, 0)}e").partition('e')
+    if '.' in mantissa:
+        mantissa = mantissa.rstrip('0').rstrip('.')  # As 'g' does in the branch above
+    return ('-' if n < 0 else '') + mantissa + 'e' + exponent
+
+
+def trailing_digits(n, count):
+    """Last `count` decimal digits of |n| by modular arithmetic (linear time)"""
+    return str(abs(n) % 10 ** count).zfill(count)
+
+
+def to_decimal_string(n):
+    """Full decimal expansion in subquadratic time
+
+    Divide and conquer on binary halves: each half is converted recursively
+    and recombined with decimal arithmetic, whose large multiplications use
+    libmpdec's number-theoretic transform. Sidesteps both CPython's
+    quadratic int-to-str and the 4300-digit limit of Python 3.11+.
+    """
+    if n.bit_length() <= INLINE_DIGITS * 3:
+        return str(n)
+    powers = {}
+
+    def power_of_two(bits):
+        result = powers.get(bits)
+        if result is None:
+            if bits <= _BASE_BITS:
+                result = decimal.Decimal(2) ** bits
+            elif bits - 1 in powers:
+                result = powers[bits - 1] * 2
+            else:
+                half = bits >> 1
+                result = power_of_two(half) * power_of_two(bits - half)
+            powers[bits] = result
+        return result
+
+    def convert(value, bits):
+        if bits <= _BASE_BITS:
+            return decimal.Decimal(value)
+        half = bits >> 1
+        high = value >> half
+        low = value - (high << half)
+        return convert(low, half) + convert(high, bits - half) * power_of_two(half)
+
+    context = _decimal_context(decimal.MAX_PREC)
+    context.traps[decimal.Inexact] = True
+    with decimal.localcontext(context):
+        result = convert(abs(n), n.bit_length())
+    return ('-' if n < 0 else '') + str(result)
+
+
+def from_decimal_string(text):
+    """Inverse of to_decimal_string, also free of the str-to-int digit limit"""
+    text = text.strip()
+    sign = -1 if text.startswith('-') else 1
+    digits = text.lstrip('+-')
+    if not digits.isdigit():
+        raise ValueError(f"Not an integer: {text[:20]}")
+    powers = {}
+
+    def power_of_ten(count):
+        if count not in powers:
+            powers[count] = 10 ** count
+        return powers[count]
+
+    def convert(start, stop):
+        if stop - start <= INLINE_DIGITS:
+            return int(digits[start:stop])
+        middle = (start + stop + 1) // 2
+        return convert(start, middle) * power_of_ten(stop - middle) + convert(middle, stop)
+
+    return sign * convert(0, len(digits))
+
+
+def describe(n, trailing=10):
+    """Status line for a large integer: digit count and last digits"""
+    return f"{digit_count(n):,} digits, ending …{trailing_digits(n, trailing)}"
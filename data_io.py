@@ -0,0 +1,130 @@
+import os
+import re
+
+import numpy as np
+
+_NUMERIC_LINE = re.compile(r'^\s*[-+0-9.eE,;\s\t]*$')
+_SEPARATORS = str.maketrans(',;', '  ')
+_BYTE_SEPARATORS = bytes.maketrans(b',;', b'  ')
+_BLANK_BYTES = np.zeros(256, dtype=bool)
+_BLANK_BYTES[list(b' \t\r\n')] = True
+
+
+def read_numeric_table(file_path):
+    """Read a delimited numeric file into a 2D float array; returns (header, array)
+
+    The whole file is parsed in C by np.fromstring rather than line by line,
+    which keeps tens of millions of values to a few seconds.
+    """
+    with open(file_path, 'r') as file:
+        first = file.readline()
+        header = None
+        if first.strip() and not _NUMERIC_LINE.match(first):
+            header = [name.strip() for name in re.split(r'[,;\t]', first.strip())]
+            first = file.readline()
+        columns = len([value for value in re.split(r'[,;\s]+', first.strip()) if value])
+        text = first + file.read()
+
+    values = np.fromstring(text.translate(_SEPARATORS), sep=' ')
+    if columns == 0:
+        return header, values.reshape(0, 0)
+    if values.size % columns:
+        raise ValueError("Rows have differing numbers of values")
+    return header, values.reshape(-1, columns)
+
+
+def load_array(file_path):
+    """Load .npy (memory-mapped) or delimited text as a 2D array"""
+    if file_path.lower().endswith('.npy'):
+        array = np.load(file_path, mmap_mode='r')
+    else:
+        _, array = read_numeric_table(file_path)
+    if array.ndim == 1:
+        array = array.reshape(-1, 1)
+    return array
+
+
+def split_points(array):
+    """Contiguous (x, y) arrays from a one- or two-column table"""
+    if array.shape[1] == 1:
+        y = np.ascontiguousarray(array[:, 0], dtype=float)
+        return np.arange(y.size, dtype=float), y
+    return (np.ascontiguousarray(array[:, 0], dtype=float),
+            np.ascontiguousarray(array[:, 1], dtype=float))
+
+
+def read_header(file_path):
+    """Column names (or None) and the column count of a delimited file"""
+    with open(file_path, 'r') as file:
+        first = file.readline()
+        header = None
+        if first.strip() and not _NUMERIC_LINE.match(first):
+            header = [name.strip() for name in re.split(r'[,;\t]', first.strip())]
+            first = file.readline()
+    columns = len([value for value in re.split(r'[,;\s]+', first.strip()) if value])
+    return header, columns
+
+
+def iter_table_chunks(file_path, chunk_bytes=32 << 20):
+    """Yield (rows, columns) float arrays of about chunk_bytes of text each"""
+    header, columns = read_header(file_path)
+    with open(file_path, 'r') as file:
+        if header is not None:
+            file.readline()
+        while True:
+            lines = file.readlines(chunk_bytes)
+            if not lines:
+                break
+            values = np.fromstring(''.join(lines).translate(_SEPARATORS), sep=' ')
+            if values.size % columns:
+                raise ValueError("Rows have differing numbers of values")
+            yield values.reshape(-1, columns)
+
+
+def parse_numbers(text):
+    """All numbers in a block of delimited text (str or bytes), parsed in C"""
+    table = _BYTE_SEPARATORS if isinstance(text, bytes) else _SEPARATORS
+    return np.fromstring(text.translate(table), sep=' ')
+
+
+def parse_rows(block, columns):
+    """(rows, columns) array of a block of whole lines (bytes), checking every line's field count"""
+    data = np.frombuffer(block.translate(_BYTE_SEPARATORS), dtype=np.uint8)
+    blank = _BLANK_BYTES[data]
+    starts = ~blank
+    starts[1:] &= blank[:-1]
+    # Line number of each field: newlines before its first byte
+    lines = np.searchsorted(np.flatnonzero(data == ord('\n')), np.flatnonzero(starts))
+    counts = np.bincount(lines)
+    if np.any((counts != 0) & (counts != columns)):
+        raise ValueError("Rows have differing numbers of values")
+    values = parse_numbers(block)
+    if values.size != lines.size:
+        raise ValueError("Non-numeric value in the data")
+    return values.reshape(-1, columns)
+
+
+def file_ranges(file_path, parts):
+    """Split a file into about `parts` equal byte ranges [start, end)"""
+    size = os.path.getsize(file_path)
+    parts = max(1, min(parts, size // (1 << 20) or 1))
+    bounds = [size * i // parts for i in range(parts + 1)]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def iter_range_blocks(file_path, start, end, block_bytes=64 << 20):
+    """Yield byte blocks covering whole lines whose first byte lies in [start, end)"""
+    with open(file_path, 'rb') as file:
+        if start > 0:
+            # A line that begins exactly at start belongs to this range
+            file.seek(start - 1)
+            file.readline()
+        position = file.tell()
+        while position < end:
+            block = file.read(min(block_bytes, end - position))
+            if not block:
+                break
+            if not block.endswith(b'\n'):
+                block += file.readline()
+            position = file.tell()
+            yield block
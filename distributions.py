@@ -0,0 +1,590 @@
+import functools
+
+import numpy as np
+
+_EPS = 1e-15
+_TINY = 1e-300
+_MAX_ITER = 10000
+_STEP_TOLERANCE = 1e-14  # Relative Newton/Halley step at which an inverse has converged
+
+# Lanczos coefficients (g = 7, n = 9)
+_LANCZOS = (0.99999999999980993, 676.5203681218851, -1259.1392167224028,
+            771.32342877765313, -176.61502916214059, 12.507343278686905,
+            -0.13857109526572012, 9.9843695780195716e-6, 1.5056327351493116e-7)
+
+_rng = np.random.default_rng()
+
+
+def _broadcast(*args):
+    """Broadcast arguments to float arrays; returns (flat arrays, shape)"""
+    arrays = np.broadcast_arrays(*[np.asarray(arg, dtype=float) for arg in args])
+    shape = arrays[0].shape
+    return [array.ravel() for array in arrays], shape
+
+
+def _finish(result, shape):
+    """Plain float for scalar input so results format like any other calculator value"""
+    result = np.asarray(result, dtype=float).reshape(shape)
+    return float(result) if result.ndim == 0 else result
+
+
+def _nonzero(values):
+    return np.where(np.abs(values) < _TINY, _TINY, values)
+
+
+def gammaln(x):
+    """log |Gamma(x)| by the Lanczos approximation"""
+    x = np.asarray(x, dtype=float)
+    small = x < 0.5
+    z = np.where(small, 1 - x, x) - 1
+    series = _LANCZOS[0] + sum(c / (z + i) for i, c in enumerate(_LANCZOS[1:], 1))
+    t = z + 7.5
+    with np.errstate(all='ignore'):
+        result = 0.5 * np.log(2 * np.pi) + (z + 0.5) * np.log(t) - t + np.log(series)
+        reflected = np.log(np.pi / np.abs(np.sin(np.pi * x))) - result
+    return np.where(small, reflected, result)
+
+
+def betaln(a, b):
+    """log B(a, b)"""
+    return gammaln(a) + gammaln(b) - gammaln(a + b)
+
+
+def _iterate(state, step):
+    """Run step(i, state) -> (done mask, value) until every element converges
+
+    Converged elements are written out and dropped from the working set once
+    enough of them accumulate, so slow arguments never make the whole array
+    pay for extra iterations. Steps must leave converged values unchanged.
+    """
+    out = np.empty(state[0].size)
+    index = np.arange(state[0].size)
+    for i in range(1, _MAX_ITER + 1):
+        done, value = step(i, state)
+        finished = np.count_nonzero(done)
+        if finished == index.size or i == _MAX_ITER:
+            out[index] = value
+            break
+        if finished * 4 >= index.size or (finished and i % 16 == 0):
+            out[index[done]] = value[done]
+            keep = ~done
+            index = index[keep]
+            state = [array[keep] for array in state]
+    return out
+
+
+def _gamma_series(a, x):
+    """P(a, x) by its power series (x < a + 1)"""
+    def step(i, state):
+        a, x, term, total = state
+        term *= x / (a + i)
+        total += term
+        return np.abs(term) < np.abs(total) * _EPS, total
+
+    total = _iterate([a, x, 1 / a, 1 / a], step)
+    return total * np.exp(-x + a * np.log(x) - gammaln(a))
+
+
+def _gamma_continued_fraction(a, x):
+    """Q(a, x) by the modified Lentz continued fraction (x >= a + 1)"""
+    def step(i, state):
+        a, b, c, d, h = state
+        an = -i * (i - a)
+        b += 2
+        d[:] = 1 / _nonzero(an * d + b)
+        c[:] = _nonzero(b + an / c)
+        delta = d * c
+        h *= delta
+        return np.abs(delta - 1) < _EPS, h
+
+    b = x + 1 - a
+    d = 1 / _nonzero(b)
+    h = _iterate([a, b, np.full(a.size, 1 / _TINY), d, d.copy()], step)
+    return h * np.exp(-x + a * np.log(x) - gammaln(a))
+
+
+def _gamma_pq(a, x):
+    """Regularized lower and upper incomplete gamma, each accurate in its own tail"""
+    (a, x), shape = _broadcast(a, x)
+    p = np.full(a.size, np.nan)
+    p[(a > 0) & (x <= 0)] = 0.0
+    p[(a > 0) & (x == np.inf)] = 1.0
+    q = 1 - p
+    valid = (a > 0) & (x > 0) & np.isfinite(x)
+    series = valid & (x < a + 1)
+    fraction = valid & ~series
+    with np.errstate(all='ignore'):
+        p[series] = _gamma_series(a[series], x[series])
+        q[series] = 1 - p[series]
+        q[fraction] = _gamma_continued_fraction(a[fraction], x[fraction])
+        p[fraction] = 1 - q[fraction]
+    return p.reshape(shape), q.reshape(shape)
+
+
+def gammainc(a, x):
+    """Regularized lower incomplete gamma P(a, x)"""
+    return _gamma_pq(a, x)[0]
+
+
+def gammaincc(a, x):
+    """Regularized upper incomplete gamma Q(a, x) = 1 - P(a, x)"""
+    return _gamma_pq(a, x)[1]
+
+
+def _beta_continued_fraction(a, b, x):
+    """Continued fraction for I_x(a, b), converging for x < (a + 1) / (a + b + 2)"""
+    def step(m, state):
+        a, b, x, c, d, h = state
+        aa = m * (b - m) * x / ((a - 1 + 2 * m) * (a + 2 * m))
+        d[:] = 1 / _nonzero(1 + aa * d)
+        c[:] = _nonzero(1 + aa / c)
+        h *= d * c
+        aa = -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 1 + 2 * m))
+        d[:] = 1 / _nonzero(1 + aa * d)
+        c[:] = _nonzero(1 + aa / c)
+        delta = d * c
+        h *= delta
+        return np.abs(delta - 1) < _EPS, h
+
+    d = 1 / _nonzero(1 - (a + b) * x / (a + 1))
+    return _iterate([a, b, x, np.ones(a.size), d, d.copy()], step)
+
+
+def _beta_pq(a, b, x):
+    """Regularized incomplete beta I_x(a, b) and its complement"""
+    (a, b, x), shape = _broadcast(a, b, x)
+    p = np.full(a.size, np.nan)
+    valid = (a > 0) & (b > 0)
+    p[valid & (x <= 0)] = 0.0
+    p[valid & (x >= 1)] = 1.0
+    q = 1 - p
+    inside = valid & (x > 0) & (x < 1)
+    with np.errstate(all='ignore'):
+        front = np.exp(a * np.log(x) + b * np.log1p(-x) - betaln(a, b))
+        direct = inside & (x < (a + 1) / (a + b + 2))
+        swapped = inside & ~direct
+        p[direct] = front[direct] * _beta_continued_fraction(
+            a[direct], b[direct], x[direct]) / a[direct]
+        q[direct] = 1 - p[direct]
+        q[swapped] = front[swapped] * _beta_continued_fraction(
+            b[swapped], a[swapped], 1 - x[swapped]) / b[swapped]
+        p[swapped] = 1 - q[swapped]
+    return p.reshape(shape), q.reshape(shape)
+
+
+def betainc(a, b, x):
+    """Regularized incomplete beta I_x(a, b)"""
+    return _beta_pq(a, b, x)[0]
+
+
+def _initial_normal(p):
+    """Rough standard normal quantile (Abramowitz & Stegun 26.2.22) used as a Newton start"""
+    pp = np.where(p < 0.5, p, 1 - p)
+    t = np.sqrt(-2 * np.log(pp))
+    x = (2.30753 + t * 0.27061) / (1 + t * (0.99229 + t * 0.04481)) - t
+    return np.where(p < 0.5, x, -x)
+
+
+def gammaincinv(a, p):
+    """x with P(a, x) = p, by Halley iterations from a Wilson-Hilferty start"""
+    (a, p), shape = _broadcast(a, p)
+    with np.errstate(all='ignore'):
+        gln = gammaln(a)
+        a1 = a - 1
+        big = a > 1
+        wilson = np.maximum(1e-3, a * (1 - 1 / (9 * a) + _initial_normal(p) / (3 * np.sqrt(a))) ** 3)
+        t = 1 - a * (0.253 + a * 0.12)
+        # Lower tail: P(a, x) ~ x^a / gamma(a + 1) for x << a + 1, so x ~ (p gamma(a + 1))^(1/a),
+        # taken through logs; for tiny shapes it may go subnormal or underflow to 0, where it is
+        # already exact (relative error about x / (a + 1)) and Halley steps would overflow
+        lower = np.exp((np.log(p) + gammaln(a + 1)) / a)
+        small = np.where(p < t, lower, 1 - np.log1p(-(p - t) / (1 - t)))
+        x = np.where(big, np.where(lower < 0.2 * (a + 1), lower, np.maximum(lower, wilson)), small)
+        active = np.flatnonzero((a > 0) & (p > 0) & (p < 1) & (x >= np.finfo(float).tiny))
+        for _ in range(12):
+            if active.size == 0:
+                break
+            xa, aa, a1a = x[active], a[active], a1[active]
+            error = gammainc(aa, xa) - p[active]
+            density = np.exp(-xa + a1a * np.log(xa) - gln[active])
+            u = error / density
+            step = u / (1 - 0.5 * np.minimum(1, u * (a1a / xa - 1)))
+            xa = xa - step
+            xa = np.where(xa <= 0, 0.5 * (xa + step), xa)
+            x[active] = xa
+            active = active[np.abs(step) > _STEP_TOLERANCE * xa]
+        x = np.where(p <= 0, 0.0, np.where(p >= 1, np.inf, x))
+        x[(a <= 0) | np.isnan(p) | (p < 0) | (p > 1)] = np.nan
+    return _finish(x, shape)
+
+
+def betaincinv(a, b, p):
+    """x with I_x(a, b) = p, by Halley iterations"""
+    (a, b, p), shape = _broadcast(a, b, p)
+    with np.errstate(all='ignore'):
+        # Starting point as in Numerical Recipes' invbetai
+        y = -_initial_normal(p)
+        al = (y * y - 3) / 6
+        h = 2 / (1 / (2 * a - 1) + 1 / (2 * b - 1))
+        w = y * np.sqrt(al + h) / h - (1 / (2 * b - 1) - 1 / (2 * a - 1)) * (al + 5 / 6 - 2 / (3 * h))
+        large = a / (a + b * np.exp(2 * w))
+        tail_a = np.exp(a * np.log(a / (a + b))) / a
+        tail_b = np.exp(b * np.log(b / (a + b))) / b
+        total = tail_a + tail_b
+        small = np.where(p < tail_a / total, (a * total * p) ** (1 / a),
+                         1 - (b * total * (1 - p)) ** (1 / b))
+        x = np.where((a >= 1) & (b >= 1), large, small)
+
+        log_norm = -betaln(a, b)
+        active = np.flatnonzero((a > 0) & (b > 0) & (p > 0) & (p < 1))
+        for _ in range(10):
+            if active.size == 0:
+                break
+            xa, aa, ba = x[active], a[active], b[active]
+            error = betainc(aa, ba, xa) - p[active]
+            density = np.exp((aa - 1) * np.log(xa) + (ba - 1) * np.log1p(-xa) + log_norm[active])
+            u = error / density
+            step = u / (1 - 0.5 * np.minimum(1, u * ((aa - 1) / xa - (ba - 1) / (1 - xa))))
+            step = np.where(np.isfinite(step), step, 0.0)  # Converged onto 0 or 1
+            xa = xa - step
+            xa = np.where(xa <= 0, 0.5 * (xa + step), xa)
+            xa = np.where(xa >= 1, 0.5 * (xa + step + 1), xa)
+            x[active] = xa
+            active = active[np.abs(step) > _STEP_TOLERANCE * xa]
+        x = np.where(p <= 0, 0.0, np.where(p >= 1, 1.0, x))
+        x[(a <= 0) | (b <= 0) | np.isnan(p) | (p < 0) | (p > 1)] = np.nan
+    return _finish(x, shape)
+
+
+def _integer_search(cdf, q, guess, upper):
+    """Smallest integer k in [0, upper] with cdf(k) >= q, by vectorized bisection
+
+    The search starts from a narrow bracket around guess; only elements the
+    bracket misses fall back to the full range [0, upper].
+    """
+    guess = np.clip(np.nan_to_num(np.floor(guess)), 0, upper)
+    lo = np.maximum(guess - 2, -1)
+    hi = np.minimum(guess + 2, upper)
+    miss = ((lo >= 0) & (cdf(lo) >= q)) | (cdf(hi) < q)
+    lo = np.where(miss, -1.0, lo)
+    hi = np.where(miss, upper, hi)
+    while np.any(hi - lo > 1):
+        mid = np.floor((lo + hi) / 2)
+        below = cdf(mid) < q
+        active = hi - lo > 1
+        lo = np.where(active & below, mid, lo)
+        hi = np.where(active & ~below, mid, hi)
+    return hi
+
+
+# Normal(mu, sigma)
+
+def norm_pdf(x, mu=0.0, sigma=1.0):
+    (x, mu, sigma), shape = _broadcast(x, mu, sigma)
+    with np.errstate(all='ignore'):
+        z = (x - mu) / sigma
+        result = np.exp(-0.5 * z * z) / (sigma * np.sqrt(2 * np.pi))
+    return _finish(np.where(sigma > 0, result, np.nan), shape)
+
+
+def _standard_normal_cdf(z):
+    # Phi(z) = erfc(-z / sqrt 2) / 2, with erfc from the upper incomplete gamma
+    tail = 0.5 * gammaincc(0.5, 0.5 * z * z)
+    return np.where(z < 0, tail, 1 - tail)
+
+
+def norm_cdf(x, mu=0.0, sigma=1.0):
+    (x, mu, sigma), shape = _broadcast(x, mu, sigma)
+    with np.errstate(all='ignore'):
+        result = _standard_normal_cdf((x - mu) / sigma)
+    return _finish(np.where(sigma > 0, result, np.nan), shape)
+
+
+# Acklam's rational approximation, refined below with one Halley step
+_ACKLAM_A = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+             1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00)
+_ACKLAM_B = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+             6.680131188771972e+01, -1.328068155288572e+01)
+_ACKLAM_C = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+             -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00)
+_ACKLAM_D = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00,
+             3.754408661907416e+00)
+
+
+def _polynomial(coefficients, x):
+    result = np.zeros_like(x)
+    for c in coefficients:
+        result = result * x + c
+    return result
+
+
+def norm_inv(p, mu=0.0, sigma=1.0):
+    (p, mu, sigma), shape = _broadcast(p, mu, sigma)
+    with np.errstate(all='ignore'):
+        tail = np.minimum(p, 1 - p)
+        q = np.sqrt(-2 * np.log(tail))
+        outer = _polynomial(_ACKLAM_C, q) / (_polynomial(_ACKLAM_D, q) * q + 1)
+        outer = np.where(p < 0.5, outer, -outer)
+        r = (p - 0.5) ** 2
+        central = (p - 0.5) * _polynomial(_ACKLAM_A, r) / (_polynomial(_ACKLAM_B, r) * r + 1)
+        z = np.where(tail < 0.02425, outer, central)
+
+        error = _standard_normal_cdf(z) - p
+        u = error * np.sqrt(2 * np.pi) * np.exp(0.5 * z * z)
+        z = z - u / (1 + 0.5 * z * u)
+        z = np.where(p <= 0, -np.inf, np.where(p >= 1, np.inf, z))
+        result = mu + sigma * z
+    return _finish(np.where((p >= 0) & (p <= 1) & (sigma > 0), result, np.nan), shape)
+
+
+def norm_rnd(mu=0.0, sigma=1.0, size=None, rng=None):
+    return (rng or _rng).normal(mu, sigma, size)
+
+
+# Student t(df)
+
+def t_pdf(x, df):
+    (x, df), shape = _broadcast(x, df)
+    with np.errstate(all='ignore'):
+        log_norm = gammaln((df + 1) / 2) - gammaln(df / 2) - 0.5 * np.log(df * np.pi)
+        result = np.exp(log_norm - (df + 1) / 2 * np.log1p(x * x / df))
+    return _finish(np.where(df > 0, result, np.nan), shape)
+
+
+def t_cdf(x, df):
+    (x, df), shape = _broadcast(x, df)
+    with np.errstate(all='ignore'):
+        tail = 0.5 * betainc(df / 2, 0.5, df / (df + x * x))
+    return _finish(np.where(x < 0, tail, 1 - tail), shape)
+
+
+def t_inv(p, df):
+    (p, df), shape = _broadcast(p, df)
+    with np.errstate(all='ignore'):
+        tail = np.minimum(p, 1 - p)
+        x = betaincinv(df / 2, 0.5, 2 * tail)
+        t = np.sqrt(df * (1 - x) / x)
+        result = np.where(p < 0.5, -t, t)
+    return _finish(result, shape)
+
+
+def t_rnd(df, size=None, rng=None):
+    return (rng or _rng).standard_t(df, size)
+
+
+# Chi-square(k) and gamma(shape, scale)
+
+def gamma_pdf(x, shape_k, scale=1.0):
+    (x, k, scale), shape = _broadcast(x, shape_k, scale)
+    with np.errstate(all='ignore'):
+        z = x / scale
+        result = np.exp((k - 1) * np.log(z) - z - gammaln(k)) / scale
+        result = np.where(x < 0, 0.0, np.where((x == 0) & (k == 1), 1 / scale, result))
+    return _finish(np.where((k > 0) & (scale > 0), result, np.nan), shape)
+
+
+def gamma_cdf(x, shape_k, scale=1.0):
+    (x, k, scale), shape = _broadcast(x, shape_k, scale)
+    with np.errstate(all='ignore'):
+        result = gammainc(k, np.maximum(x, 0) / scale)
+    return _finish(np.where(scale > 0, result, np.nan), shape)
+
+
+def gamma_inv(p, shape_k, scale=1.0):
+    (p, k, scale), shape = _broadcast(p, shape_k, scale)
+    return _finish(np.asarray(gammaincinv(k, p)) * np.where(scale > 0, scale, np.nan), shape)
+
+
+def gamma_rnd(shape_k, scale=1.0, size=None, rng=None):
+    return (rng or _rng).gamma(shape_k, scale, size)
+
+
+def chi2_pdf(x, k):
+    return gamma_pdf(x, np.asarray(k, dtype=float) / 2, 2.0)
+
+
+def chi2_cdf(x, k):
+    return gamma_cdf(x, np.asarray(k, dtype=float) / 2, 2.0)
+
+
+def chi2_inv(p, k):
+    return gamma_inv(p, np.asarray(k, dtype=float) / 2, 2.0)
+
+
+def chi2_rnd(k, size=None, rng=None):
+    return (rng or _rng).chisquare(k, size)
+
+
+# F(d1, d2)
+
+def f_pdf(x, d1, d2):
+    (x, d1, d2), shape = _broadcast(x, d1, d2)
+    with np.errstate(all='ignore'):
+        log_pdf = (0.5 * d1 * np.log(d1 / d2) + (0.5 * d1 - 1) * np.log(x)
+                   - 0.5 * (d1 + d2) * np.log1p(d1 * x / d2) - betaln(d1 / 2, d2 / 2))
+        result = np.where(x < 0, 0.0, np.exp(log_pdf))
+    return _finish(np.where((d1 > 0) & (d2 > 0), result, np.nan), shape)
+
+
+def f_cdf(x, d1, d2):
+    (x, d1, d2), shape = _broadcast(x, d1, d2)
+    with np.errstate(all='ignore'):
+        # Written as 1 / (1 + d2 / (d1 x)) so x = inf maps to 1
+        result = betainc(d1 / 2, d2 / 2, 1 / (1 + d2 / (d1 * np.maximum(x, 0))))
+    return _finish(result, shape)
+
+
+def f_inv(p, d1, d2):
+    (p, d1, d2), shape = _broadcast(p, d1, d2)
+    with np.errstate(all='ignore'):
+        x = np.asarray(betaincinv(d1 / 2, d2 / 2, p))
+        result = d2 * x / (d1 * (1 - x))
+    return _finish(result, shape)
+
+
+def f_rnd(d1, d2, size=None, rng=None):
+    return (rng or _rng).f(d1, d2, size)
+
+
+# Exponential(mu), parametrized by its mean as MATLAB's expcdf etc. are
+
+def exp_pdf(x, mu=1.0):
+    (x, mu), shape = _broadcast(x, mu)
+    with np.errstate(all='ignore'):
+        result = np.where(x < 0, 0.0, np.exp(-x / mu) / mu)
+    return _finish(np.where(mu > 0, result, np.nan), shape)
+
+
+def exp_cdf(x, mu=1.0):
+    (x, mu), shape = _broadcast(x, mu)
+    with np.errstate(all='ignore'):
+        result = -np.expm1(-np.maximum(x, 0) / mu)
+    return _finish(np.where(mu > 0, result, np.nan), shape)
+
+
+def exp_inv(p, mu=1.0):
+    (p, mu), shape = _broadcast(p, mu)
+    with np.errstate(all='ignore'):
+        result = -np.log1p(-p) * mu
+    return _finish(np.where((p >= 0) & (p <= 1) & (mu > 0), result, np.nan), shape)
+
+
+def exp_rnd(mu=1.0, size=None, rng=None):
+    return (rng or _rng).exponential(mu, size)
+
+
+# Binomial(n, p)
+
+def binom_pdf(k, n, p):
+    (k, n, p), shape = _broadcast(k, n, p)
+    with np.errstate(all='ignore'):
+        log_choose = gammaln(n + 1) - gammaln(k + 1) - gammaln(n - k + 1)
+        # xlogy-style products so p = 0 or p = 1 give exact 0/1 probabilities
+        log_success = np.where(k == 0, 0.0, k * np.log(p))
+        log_failure = np.where(n - k == 0, 0.0, (n - k) * np.log1p(-p))
+        result = np.exp(log_choose + log_success + log_failure)
+        result = np.where((k == np.floor(k)) & (k >= 0) & (k <= n), result, 0.0)
+    return _finish(np.where((p >= 0) & (p <= 1) & (n >= 0), result, np.nan), shape)
+
+
+def _binom_cdf(k, n, p):
+    k = np.floor(k)
+    with np.errstate(all='ignore'):
+        result = betainc(np.maximum(n - k, 1e-300), k + 1, 1 - p)
+    return np.where(k < 0, 0.0, np.where(k >= n, 1.0, result))
+
+
+def binom_cdf(k, n, p):
+    (k, n, p), shape = _broadcast(k, n, p)
+    return _finish(_binom_cdf(k, n, p), shape)
+
+
+def binom_inv(q, n, p):
+    (q, n, p), shape = _broadcast(q, n, p)
+    with np.errstate(all='ignore'):
+        # Cornish-Fisher normal approximation as the starting guess
+        z = _initial_normal(q)
+        guess = n * p + np.sqrt(n * p * (1 - p)) * z + (z * z - 1) * (1 - 2 * p) / 6 + 0.5
+    result = _integer_search(lambda k: _binom_cdf(k, n, p), q, guess, n)
+    return _finish(np.where((q >= 0) & (q <= 1), result, np.nan), shape)
+
+
+def binom_rnd(n, p, size=None, rng=None):
+    return (rng or _rng).binomial(n, p, size)
+
+
+# Poisson(lambda)
+
+def poisson_pdf(k, lam):
+    (k, lam), shape = _broadcast(k, lam)
+    with np.errstate(all='ignore'):
+        log_power = np.where(k == 0, 0.0, k * np.log(lam))
+        result = np.exp(log_power - lam - gammaln(k + 1))
+        result = np.where((k == np.floor(k)) & (k >= 0), result, 0.0)
+    return _finish(np.where(lam >= 0, result, np.nan), shape)
+
+
+def _poisson_cdf(k, lam):
+    k = np.floor(k)
+    return np.where(k < 0, 0.0, gammaincc(np.maximum(k + 1, 1), lam))
+
+
+def poisson_cdf(k, lam):
+    (k, lam), shape = _broadcast(k, lam)
+    return _finish(_poisson_cdf(k, lam), shape)
+
+
+def poisson_inv(q, lam):
+    (q, lam), shape = _broadcast(q, lam)
+    # The upper tail beyond ten standard deviations (plus ten) is below double precision
+    hi = np.ceil(lam + 10 * np.sqrt(lam) + 10)
+    with np.errstate(all='ignore'):
+        z = _initial_normal(q)
+        guess = lam + np.sqrt(lam) * z + (z * z - 1) / 6 + 0.5
+    result = _integer_search(lambda k: _poisson_cdf(k, lam), q, guess, hi)
+    result = np.where(q >= 1, np.inf, result)
+    return _finish(np.where((q >= 0) & (q <= 1) & (lam >= 0), result, np.nan), shape)
+
+
+def poisson_rnd(lam, size=None, rng=None):
+    return (rng or _rng).poisson(lam, size)
+
+
+def unif_rnd(a=0.0, b=1.0, size=None, rng=None):
+    return (rng or _rng).uniform(a, b, size)
+
+
+def _calculator(function):
+    """A special function as the calculator calls it: plain float for scalar input"""
+    @functools.wraps(function)
+    def wrapper(*args):
+        result = np.asarray(function(*args))
+        return _finish(result, result.shape)
+    return wrapper
+
+
+# Calculator function names (MATLAB-style); the same callables serve scalars and arrays
+FUNCTIONS = {
+    'normpdf': norm_pdf, 'normcdf': norm_cdf, 'norminv': norm_inv, 'normrnd': norm_rnd,
+    'tpdf': t_pdf, 'tcdf': t_cdf, 'tinv': t_inv, 'trnd': t_rnd,
+    'chi2pdf': chi2_pdf, 'chi2cdf': chi2_cdf, 'chi2inv': chi2_inv, 'chi2rnd': chi2_rnd,
+    'fpdf': f_pdf, 'fcdf': f_cdf, 'finv': f_inv, 'frnd': f_rnd,
+    'binopdf': binom_pdf, 'binocdf': binom_cdf, 'binoinv': binom_inv, 'binornd': binom_rnd,
+    'poisspdf': poisson_pdf, 'poisscdf': poisson_cdf, 'poissinv': poisson_inv, 'poissrnd': poisson_rnd,
+    'exppdf': exp_pdf, 'expcdf': exp_cdf, 'expinv': exp_inv, 'exprnd': exp_rnd,
+    'gampdf': gamma_pdf, 'gamcdf': gamma_cdf, 'gaminv': gamma_inv, 'gamrnd': gamma_rnd,
+    'unifrnd': unif_rnd,
+    'gammaln': _calculator(gammaln), 'gammainc': _calculator(gammainc), 'betainc': _calculator(betainc),
+}
+
+# Statistics tab: label -> (calculator prefix, parameter names, default parameters, discrete)
+DISTRIBUTIONS = {
+    'Normal': ('norm', ('mu', 'sigma'), (0.0, 1.0), False),
+    'Student t': ('t', ('df',), (10.0,), False),
+    'Chi-square': ('chi2', ('k',), (3.0,), False),
+    'F': ('f', ('d1', 'd2'), (5.0, 10.0), False),
+    'Binomial': ('bino', ('n', 'p'), (20.0, 0.5), True),
+    'Poisson': ('poiss', ('lambda',), (4.0,), True),
+    'Exponential': ('exp', ('mu',), (1.0,), False),
+    'Gamma': ('gam', ('shape', 'scale'), (2.0, 1.0), False),
+}
@@ -0,0 +1,437 @@
+"""Local evaluation server: the calculator's engines over JSON-RPC 2.0.
+
+Requests and responses are JSON-lines over a Unix socket or localhost TCP:
+
+    python eval_server.py --tcp 127.0.0.1:8765
+    python eval_server.py --unix /tmp/calculator.sock
+
+    {"jsonrpc": "2.0", "id": 1, "method": "evaluate", "params": {"expression": "x^2", "variables": {"x": 3}}}
+
+Methods: evaluate, evaluate_many, sample, statistics, ping, server_stats.
+A client may pipeline any number of requests without waiting; responses carry
+the request id and arrive as they complete, not necessarily in order. A JSON
+array is a JSON-RPC batch and is answered with one array. Every request takes
+an optional "timeout" (seconds) in its params.
+"""
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import bigint
+import expression_engine
+import function_library
+import stats_engine
+from monte_carlo import SAMPLERS
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+EVALUATION_ERROR = -32000
+TIMEOUT_ERROR = -32001
+
+MAX_LINE_BYTES = 64 << 20
+MAX_SAMPLE_POINTS = 1_000_000
+RESULT_CACHE_SIZE = 4096
+
+
+def _jsonable(value):
+    """JSON form of a result: complex as {re, im}, arrays as lists, NaN/inf as null"""
+    if isinstance(value, np.ndarray):
+        if np.iscomplexobj(value):
+            return {'re': _jsonable(value.real), 'im': _jsonable(value.imag)}
+        array = np.asarray(value, dtype=float)
+        finite = np.isfinite(array)
+        if finite.all():
+            return array.tolist()
+        return np.where(finite, array, None).tolist()
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int):
+        if value.bit_length() > bigint.INLINE_DIGITS * 3:
+            return bigint.to_decimal_string(value)  # json's int repr stops at 4300 digits
+        return value
+    if isinstance(value, complex):
+        return {'re': _jsonable(value.real), 'im': _jsonable(value.imag)}
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+def _variables(params, arrays=False):
+    """Variable bindings checked before they reach eval: numbers (or numeric lists), no built-in names"""
+    variables = params.get('variables', {})
+    if not isinstance(variables, dict):
+        raise ValueError("variables must be an object")
+    checked = {}
+    for name, value in variables.items():
+        if name in expression_engine.KNOWN_NAMES or name in expression_engine.USER_NAMESPACES['real']:
+            raise ValueError(f"variable '{name}' would shadow a function or constant")
+        if arrays:
+            if isinstance(value, (str, bytes, dict)):
+                raise ValueError(f"variable '{name}' must be a number or a list of numbers")
+            try:
+                value = np.asarray(value, dtype=float)
+            except (TypeError, ValueError):
+                raise ValueError(f"variable '{name}' must be a number or a list of numbers")
+        elif isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"variable '{name}' must be a number")
+        checked[name] = value
+    return checked
+
+
+def _evaluate(params):
+    expression = expression_engine.compile_expression(params['expression'])
+    return _jsonable(expression.evaluate(params.get('mode', 'real'), **_variables(params)))
+
+
+def _evaluate_many(params):
+    """One broadcasted evaluation over arrays of variable values"""
+    expression = expression_engine.compile_expression(params['expression'])
+    arrays = _variables(params, arrays=True)
+    shape = np.broadcast_shapes(*(array.shape for array in arrays.values())) if arrays else None
+    return _jsonable(np.asarray(expression.vectorized(shape=shape, **arrays)))
+
+
+def _sample(params):
+    """Plot sampling: y = f(x) on an evenly spaced grid"""
+    points = int(params.get('points', 1000))
+    if not 2 <= points <= MAX_SAMPLE_POINTS:
+        raise ValueError(f"points must be between 2 and {MAX_SAMPLE_POINTS:,}")
+    x = np.linspace(float(params['x_min']), float(params['x_max']), points)
+    y = expression_engine.compile_expression(params['expression']).vectorized(shape=x.shape, x=x)
+    return {'x': _jsonable(x), 'y': _jsonable(np.asarray(y))}
+
+
+def _statistics(params):
+    """Summary statistics of a list of numbers (NaN and inf ignored)"""
+    data = np.asarray(params['data'], dtype=float)
+    state = stats_engine.MomentState.from_array(data)
+    if state.count == 0:
+        raise ValueError("No finite data points")
+    ordered = np.sort(data[np.isfinite(data)])
+    summary = {
+        'count': state.count, 'mean': state.mean, 'std_dev': state.std_dev(),
+        'variance': state.variance(), 'min': state.minimum, 'max': state.maximum,
+        'q1': stats_engine.quantile_sorted(ordered, 0.25),
+        'median': stats_engine.quantile_sorted(ordered, 0.5),
+        'q3': stats_engine.quantile_sorted(ordered, 0.75),
+    }
+    return {name: _jsonable(value) for name, value in summary.items()}
+
+
+WORKER_METHODS = {
+    'evaluate': _evaluate,
+    'evaluate_many': _evaluate_many,
+    'sample': _sample,
+    'statistics': _statistics,
+}
+
+
+def run_batch(calls, functions=''):
+    """Worker: run [(method, params)] and return [(ok, JSON text or error message)]
+
+    Results are encoded here rather than in the server process, which keeps
+    the event loop free of JSON work for large arrays.
+    """
+    function_library.install_source(functions)
+    results = []
+    for method, params in calls:
+        try:
+            results.append((True, json.dumps(WORKER_METHODS[method](params))))
+        except Exception as e:
+            results.append((False, str(e) or type(e).__name__))
+    return results
+
+
+class RequestError(Exception):
+    """A JSON-RPC error response"""
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+class EvaluationServer:
+    """asyncio front end that batches CPU-bound requests onto a process pool
+
+    Requests arriving within batch_delay of each other are grouped, split
+    into at most one batch per worker and sent as a single task each, so one
+    pickling round trip serves many small evaluations. Expressions are
+    compiled in the front end first: the shared LRU cache rejects bad input
+    without a round trip, and results of constant deterministic expressions
+    are answered from a result cache.
+    """
+
+    def __init__(self, workers=None, batch_size=256, batch_delay=0.001, timeout=10.0, grace=0.5):
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.timeout = timeout
+        self.grace = grace  # A batch still running this far past any item's deadline holds a stuck worker
+        self.executor = self._new_executor()
+        self.queue = []  # (method, params, deadline, asyncio future)
+        self.flush_handle = None
+        self.running = {}  # concurrent future -> its batch
+        self.results = OrderedDict()  # constant expression source -> JSON text
+        self.counters = {'requests': 0, 'errors': 0, 'timeouts': 0, 'batches': 0,
+                         'result_cache_hits': 0, 'pool_restarts': 0}
+        self.started = time.monotonic()
+
+    def _new_executor(self):
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+
+    # Batching
+    def submit(self, method, params, timeout):
+        """Queue a worker call; returns an asyncio future of its JSON text"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.queue.append((method, params, time.monotonic() + timeout, future))
+        if len(self.queue) >= self.batch_size * self.workers:
+            self.flush()
+        elif self.flush_handle is None:
+            self.flush_handle = loop.call_later(self.batch_delay, self.flush)
+        return future
+
+    def flush(self):
+        """Send queued calls to the pool as up to one batch per worker"""
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        queue = [item for item in self.queue if not item[3].done()]  # Drop requests that already timed out
+        self.queue = []
+        if not queue:
+            return
+        size = max(1, min(self.batch_size, math.ceil(len(queue) / self.workers)))
+        for start in range(0, len(queue), size):
+            self._dispatch(queue[start:start + size])
+
+    def _dispatch(self, batch):
+        task = self.executor.submit(run_batch, [(method, params) for method, params, _, _ in batch],
+                                    expression_engine.user_source())
+        self.running[task] = batch
+        self.counters['batches'] += 1
+        loop = asyncio.get_running_loop()
+        task.add_done_callback(lambda task: loop.call_soon_threadsafe(self._finish, task))
+
+    def _finish(self, task):
+        batch = self.running.pop(task, None)
+        if batch is None:
+            return  # Abandoned by a pool restart
+        try:
+            outcomes = task.result()
+        except Exception as e:  # Cancelled or the pool broke (e.g. after a restart)
+            outcomes = [(False, f"Worker failed: {str(e) or type(e).__name__}")] * len(batch)
+        for (_, _, _, future), (ok, value) in zip(batch, outcomes):
+            if future.done():
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(RequestError(EVALUATION_ERROR, value))
+
+    async def watchdog(self):
+        """Replace the pool when any request overruns its own deadline, e.g. 9^9^9
+
+        A batch runs its items in turn, so one runaway item would hold every
+        item queued behind it. As soon as a batch is still running past the
+        deadline of any of its items (plus grace), the workers are killed and
+        the items still waiting for an answer are resent to a new pool: the
+        ones from overdue batches one per task, so a second runaway among
+        them can only hold itself. Timed-out clients have their answers
+        already and are dropped.
+        """
+        while True:
+            await asyncio.sleep(min(1.0, self.grace / 2))
+            now = time.monotonic()
+            overdue = {task for task, batch in self.running.items()
+                       if not task.done() and now > min(item[2] for item in batch) + self.grace}
+            if not overdue:
+                continue
+            running, self.running = self.running, {}
+            stuck, self.executor = self.executor, self._new_executor()
+            self.counters['pool_restarts'] += 1
+            for process in list(getattr(stuck, '_processes', {}).values()):
+                process.terminate()
+            stuck.shutdown(wait=False, cancel_futures=True)
+            for task, batch in running.items():
+                live = [item for item in batch if not item[3].done()]
+                if task in overdue:
+                    for item in live:
+                        self._dispatch([item])
+                elif live:
+                    self._dispatch(live)
+
+    # Requests
+    async def call(self, method, params):
+        """Result of one request as JSON text"""
+        if not isinstance(params, dict):
+            raise RequestError(INVALID_PARAMS, "params must be an object")
+        timeout = float(params.get('timeout', self.timeout))
+        if method == 'ping':
+            return '"pong"'
+        if method == 'server_stats':
+            return json.dumps(self.stats())
+        if method not in WORKER_METHODS:
+            raise RequestError(METHOD_NOT_FOUND, f"Unknown method: {method}")
+
+        if method in ('evaluate', 'evaluate_many'):
+            _variables(params, arrays=method == 'evaluate_many')  # Bad bindings never reach a worker
+        cache_key = None
+        if 'expression' in params:
+            try:
+                compiled = expression_engine.compile_expression(str(params['expression']))
+            except ValueError as e:
+                raise RequestError(EVALUATION_ERROR, str(e))
+            if (method == 'evaluate' and not compiled.variables and not params.get('variables')
+                    and not SAMPLERS.keys() & set(compiled.code.co_names)):
+                cache_key = (compiled.source, params.get('mode', 'real'))
+                cached = self.results.get(cache_key)
+                if cached is not None:
+                    self.results.move_to_end(cache_key)
+                    self.counters['result_cache_hits'] += 1
+                    return cached
+
+        try:
+            result = await asyncio.wait_for(self.submit(method, params, timeout), timeout)
+        except asyncio.TimeoutError:
+            self.counters['timeouts'] += 1
+            raise RequestError(TIMEOUT_ERROR, f"Timed out after {timeout:g} s")
+        if cache_key is not None:
+            self.results[cache_key] = result
+            if len(self.results) > RESULT_CACHE_SIZE:
+                self.results.popitem(last=False)
+        return result
+
+    async def respond(self, message):
+        """Response text for one JSON-RPC request object (None for notifications)"""
+        self.counters['requests'] += 1
+        request_id = message.get('id') if isinstance(message, dict) else None
+        try:
+            if not isinstance(message, dict) or not isinstance(message.get('method'), str):
+                raise RequestError(INVALID_REQUEST, "Expected a JSON-RPC request object")
+            result = await self.call(message['method'], message.get('params', {}))
+            response = f'{{"jsonrpc": "2.0", "id": {json.dumps(request_id)}, "result": {result}}}'
+        except RequestError as e:
+            response = self.error(request_id, e.code, str(e))
+        except (KeyError, TypeError, ValueError) as e:
+            response = self.error(request_id, INVALID_PARAMS, f"Invalid params: {str(e)}")
+        if isinstance(message, dict) and 'id' not in message:
+            return None
+        return response
+
+    def error(self, request_id, code, message):
+        self.counters['errors'] += 1
+        return json.dumps({'jsonrpc': '2.0', 'id': request_id, 'error': {'code': code, 'message': message}})
+
+    async def handle_line(self, line, writer):
+        try:
+            message = json.loads(line)
+        except ValueError:
+            writer.write((self.error(None, PARSE_ERROR, "Parse error") + '\n').encode())
+            return
+        if isinstance(message, list):
+            if not message:
+                text = self.error(None, INVALID_REQUEST, "Empty batch")
+            else:
+                responses = await asyncio.gather(*(self.respond(item) for item in message))
+                responses = [response for response in responses if response is not None]
+                text = f"[{', '.join(responses)}]" if responses else None
+        else:
+            text = await self.respond(message)
+        if text is not None and not writer.is_closing():
+            writer.write((text + '\n').encode())
+
+    async def handle_client(self, reader, writer):
+        """Read requests as fast as they arrive; each is answered when it completes"""
+        tasks = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    writer.write((self.error(None, INVALID_REQUEST, "Request too large") + '\n').encode())
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                task = asyncio.create_task(self.handle_line(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                if writer.transport.get_write_buffer_size() > MAX_LINE_BYTES:
+                    await writer.drain()  # Back-pressure on clients that do not read
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def stats(self):
+        return dict(self.counters, workers=self.workers, queued=len(self.queue),
+                    running_batches=len(self.running), uptime=time.monotonic() - self.started,
+                    compiled_cache_size=len(expression_engine._cache))
+
+    async def serve(self, host=None, port=None, path=None, ready=None):
+        """Serve until cancelled; ready(address) is called once listening"""
+        if path is not None:
+            if os.path.exists(path):
+                os.unlink(path)
+            server = await asyncio.start_unix_server(self.handle_client, path, limit=MAX_LINE_BYTES)
+            address = path
+        else:
+            server = await asyncio.start_server(self.handle_client, host, port, limit=MAX_LINE_BYTES)
+            address = '%s:%d' % server.sockets[0].getsockname()[:2]
+        watchdog = asyncio.create_task(self.watchdog())
+        if ready is not None:
+            ready(address)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            watchdog.cancel()
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            if path is not None and os.path.exists(path):
+                os.unlink(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--tcp', default='127.0.0.1:8765', help="host:port (port 0 picks a free one)")
+    target.add_argument('--unix', help="Unix socket path")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--batch-size', type=int, default=256, help="largest batch sent to one worker")
+    parser.add_argument('--batch-delay-ms', type=float, default=1.0, help="time to gather a batch")
+    parser.add_argument('--timeout', type=float, default=10.0, help="default per-request timeout (s)")
+    parser.add_argument('--functions', help="user function library to serve (f(x, y) = ... per line)")
+    args = parser.parse_args()
+
+    if args.functions:
+        function_library.FunctionLibrary(args.functions).load().install()
+
+    server = EvaluationServer(args.workers, args.batch_size, args.batch_delay_ms / 1000, args.timeout)
+    host, _, port = args.tcp.rpartition(':')
+    ready = lambda address: print(f"Listening on {address}", flush=True)  # noqa: E731
+    try:
+        if args.unix:
+            asyncio.run(server.serve(path=args.unix, ready=ready))
+        else:
+            asyncio.run(server.serve(host or '127.0.0.1', int(port), ready=ready))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
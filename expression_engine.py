@@ -0,0 +1,242 @@
+import ast
+import cmath
+import math
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import distributions
+
+# Real scalar functions (radians), complex principal-branch functions and
+# NumPy ufuncs share the same names so one expression evaluates in any mode.
+REAL_NAMESPACE = {
+    'sin': math.sin, 'cos': math.cos, 'tan': math.tan,
+    'asin': math.asin, 'acos': math.acos, 'atan': math.atan, 'atan2': math.atan2,
+    'sinh': math.sinh, 'cosh': math.cosh, 'tanh': math.tanh,
+    'log': math.log10, 'ln': math.log, 'log2': math.log2, 'exp': math.exp,
+    'sqrt': math.sqrt, 'cbrt': lambda x: math.copysign(abs(x) ** (1 / 3), x),
+    'abs': abs, 'floor': math.floor, 'ceil': math.ceil, 'round': round,
+    'factorial': math.factorial, 'min': min, 'max': max,
+    'pi': math.pi, 'e': math.e, 'tau': math.tau, 'inf': math.inf,
+}
+
+COMPLEX_NAMESPACE = {
+    'sin': cmath.sin, 'cos': cmath.cos, 'tan': cmath.tan,
+    'asin': cmath.asin, 'acos': cmath.acos, 'atan': cmath.atan,
+    'sinh': cmath.sinh, 'cosh': cmath.cosh, 'tanh': cmath.tanh,
+    'log': cmath.log10, 'ln': cmath.log, 'exp': cmath.exp,
+    'sqrt': cmath.sqrt, 'cbrt': lambda z: z ** (1 / 3) if z != 0 else 0j,
+    'abs': abs, 'arg': cmath.phase, 're': lambda z: complex(z).real,
+    'im': lambda z: complex(z).imag, 'conj': lambda z: complex(z).conjugate(),
+    'pi': math.pi, 'e': math.e, 'tau': math.tau, 'i': 1j,
+}
+
+VECTOR_NAMESPACE = {
+    'sin': np.sin, 'cos': np.cos, 'tan': np.tan,
+    'asin': np.arcsin, 'acos': np.arccos, 'atan': np.arctan, 'atan2': np.arctan2,
+    'sinh': np.sinh, 'cosh': np.cosh, 'tanh': np.tanh,
+    'log': np.log10, 'ln': np.log, 'log2': np.log2, 'exp': np.exp,
+    'sqrt': np.sqrt, 'cbrt': np.cbrt, 'abs': np.abs, 'floor': np.floor,
+    'ceil': np.ceil, 'round': np.round, 'min': np.minimum, 'max': np.maximum,
+    'arg': np.angle, 're': np.real, 'im': np.imag, 'conj': np.conj,
+    'pi': np.pi, 'e': np.e, 'tau': 2 * np.pi, 'inf': np.inf, 'i': 1j,
+}
+
+# Probability distributions are NumPy-vectorized, so one set serves scalars and arrays
+REAL_NAMESPACE.update(distributions.FUNCTIONS)
+VECTOR_NAMESPACE.update(distributions.FUNCTIONS)
+
+
+def _where(condition, if_true, if_false):
+    return np.where(condition, if_true, if_false)
+
+
+def _all(*values):
+    return np.logical_and.reduce(values)
+
+
+def _any(*values):
+    return np.logical_or.reduce(values)
+
+
+class _Vectorize(ast.NodeTransformer):
+    """Rewrite branches into array form: x if c else y -> where(c, x, y), and/or/not -> logical"""
+
+    def visit_IfExp(self, node):
+        self.generic_visit(node)
+        return ast.Call(ast.Name('_where', ast.Load()), [node.test, node.body, node.orelse], [])
+
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        name = '_all' if isinstance(node.op, ast.And) else '_any'
+        return ast.Call(ast.Name(name, ast.Load()), node.values, [])
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return ast.Call(ast.Name('_not', ast.Load()), [node.operand], [])
+        return node
+
+    def visit_Compare(self, node):
+        """a < b < c is (a < b) and (b < c), which arrays need as logical_and"""
+        self.generic_visit(node)
+        if len(node.ops) == 1:
+            return node
+        operands = [node.left] + node.comparators
+        return ast.Call(ast.Name('_all', ast.Load()),
+                        [ast.Compare(left, [op], [right])
+                         for left, op, right in zip(operands, node.ops, operands[1:])], [])
+
+
+# Helpers of the rewritten vector code; parse() rejects '_' names, so expressions cannot reach them
+VECTOR_NAMESPACE.update(_where=_where, _all=_all, _any=_any, _not=np.logical_not)
+
+NAMESPACES = {'real': REAL_NAMESPACE, 'complex': COMPLEX_NAMESPACE, 'vector': VECTOR_NAMESPACE}
+KNOWN_NAMES = set(REAL_NAMESPACE) | set(COMPLEX_NAMESPACE) | set(VECTOR_NAMESPACE)
+
+# User-defined functions (see function_library), per mode, and the definitions they came from
+USER_NAMESPACES = {'real': {}, 'complex': {}, 'vector': {}}
+_user_source = ''
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant, ast.Name, ast.Load,
+    ast.Call, ast.Compare, ast.IfExp, ast.BoolOp,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+    ast.USub, ast.UAdd, ast.Not, ast.And, ast.Or,
+    ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+    ast.BitAnd, ast.BitOr, ast.BitXor, ast.LShift, ast.RShift, ast.Invert,
+)
+
+_IMAGINARY_LITERAL = re.compile(r'(\d+(?:\.\d*)?(?:[eE][+-]?\d+)?)i\b')
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()  # The UI, live preview and script threads all compile
+CACHE_SIZE = 256
+_counter = None
+
+
+def set_counter(callback):
+    """Report 'cache_hits'/'cache_misses'/'evaluations' to callback(name)"""
+    global _counter
+    _counter = callback
+
+
+def _count(name):
+    if _counter is not None:
+        _counter(name)
+
+
+def set_user_functions(namespaces, source=''):
+    """Install user-defined functions for every mode and drop stale compilations"""
+    global _user_source
+    for mode in USER_NAMESPACES:
+        # Replace rather than mutate, so a reader never sees a half-installed library
+        USER_NAMESPACES[mode] = dict(namespaces.get(mode, {}))
+    _user_source = source
+    with _cache_lock:
+        _cache.clear()
+
+
+def user_source():
+    """Definitions text of the installed user functions, for rebuilding them in workers"""
+    return _user_source
+
+
+def translate(source):
+    """Map calculator notation onto Python expression syntax"""
+    expr = source.strip()
+    expr = expr.replace('÷', '/').replace('×', '*').replace('−', '-')
+    expr = expr.replace('^', '**').replace('π', 'pi').replace('√', 'sqrt')
+    expr = _IMAGINARY_LITERAL.sub(r'\1j', expr)
+    return expr
+
+
+class CompiledExpression:
+    """A validated expression compiled once and evaluable in any mode
+
+    vector_code is the same expression with conditionals and logic
+    rewritten for arrays (see _Vectorize); it is code itself when there
+    is nothing to rewrite.
+    """
+
+    __slots__ = ('source', 'code', 'variables', 'vector_code')
+
+    def __init__(self, source, code, variables, vector_code=None):
+        self.source = source
+        self.code = code
+        self.variables = variables
+        self.vector_code = code if vector_code is None else vector_code
+
+    def evaluate(self, mode='real', **variables):
+        """Evaluate with 'real' (math), 'complex' (cmath) or 'vector' (NumPy) functions"""
+        namespace = dict(NAMESPACES[mode])
+        namespace.update(USER_NAMESPACES[mode])
+        namespace.update(variables)
+        namespace['__builtins__'] = {}
+        _count('evaluations')
+        return eval(self.vector_code if mode == 'vector' else self.code, namespace)
+
+    def vectorized(self, shape=None, **arrays):
+        """Evaluate over NumPy arrays, broadcasting constant results to shape"""
+        with np.errstate(all='ignore'):
+            result = self.evaluate('vector', **arrays)
+        if shape is not None and np.shape(result) != shape:
+            result = np.broadcast_to(np.asarray(result), shape)
+        return result
+
+
+def parse(source):
+    """Translate, parse and validate an expression into an ast.Expression"""
+    expr = translate(source)
+    if not expr:
+        raise ValueError("Empty expression")
+    try:
+        tree = ast.parse(expr, mode='eval')
+    except SyntaxError:
+        raise ValueError(f"Invalid expression: {source}")
+
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"Unsupported syntax: {type(node).__name__}")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float, complex)):
+            raise ValueError("Only numeric constants are allowed")
+        if isinstance(node, ast.Call) and not isinstance(node.func, ast.Name):
+            raise ValueError("Only named functions can be called")
+        if isinstance(node, ast.Name) and node.id.startswith('_'):
+            raise ValueError(f"Invalid name: {node.id}")
+    return tree
+
+
+def compile_expression(source):
+    """Parse, validate and compile an expression, reusing cached results"""
+    with _cache_lock:
+        cached = _cache.get(source)
+        if cached is not None:
+            _cache.move_to_end(source)
+    if cached is not None:
+        _count('cache_hits')
+        return cached
+    _count('cache_misses')
+
+    tree = parse(source)
+    variables = {node.id for node in ast.walk(tree) if isinstance(node, ast.Name)
+                 and node.id not in KNOWN_NAMES and node.id not in USER_NAMESPACES['real']}
+    code = compile(tree, '<expression>', 'eval')
+    vector_code = None
+    if any(isinstance(node, (ast.IfExp, ast.BoolOp, ast.Not)) or
+           (isinstance(node, ast.Compare) and len(node.ops) > 1) for node in ast.walk(tree)):
+        vector_code = compile(ast.fix_missing_locations(_Vectorize().visit(tree)), '<expression>', 'eval')
+
+    compiled = CompiledExpression(source, code, frozenset(variables), vector_code)
+    with _cache_lock:
+        _cache[source] = compiled
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return compiled
+
+
+def evaluate(source, mode='real', **variables):
+    """Compile (cached) and evaluate an expression"""
+    return compile_expression(source).evaluate(mode, **variables)
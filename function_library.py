@@ -0,0 +1,386 @@
+import ast
+import hashlib
+import hmac
+import importlib.util
+import inspect
+import marshal
+import os
+import re
+
+import numpy as np
+
+import expression_engine
+
+LIBRARY_FILE = "calculator_functions.txt"
+CACHE_FILE = "calculator_functions.cache"
+# Per-user secret that authenticates the cache: code objects are only loaded
+# from a cache this user's calculator wrote, never from any file in the CWD
+CACHE_KEY_FILE = os.path.join(os.path.expanduser('~'), '.calculator_cache_key')
+# Compiled code is only valid for the interpreter (and engine) that produced it
+_CACHE_TAG = importlib.util.MAGIC_NUMBER + b'function-library-3'
+_DIGEST_SIZE = hashlib.sha256().digest_size
+
+_DEFINITION = re.compile(r'^\s*([A-Za-z]\w*)\s*\(([^()]*)\)\s*=(?!=)(.*)$')
+_PARAMETER = re.compile(r'^[A-Za-z]\w*$')
+
+
+def _cache_key():
+    """The user's cache secret, created (mode 0600) on first use; None if it cannot be kept"""
+    try:
+        with open(CACHE_KEY_FILE, 'rb') as file:
+            secret = file.read()
+        if len(secret) >= 32:
+            return secret
+    except OSError:
+        pass
+    try:
+        descriptor = os.open(CACHE_KEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        secret = os.urandom(32)
+        with os.fdopen(descriptor, 'wb') as file:
+            file.write(secret)
+        return secret
+    except OSError:
+        return None
+
+
+def _arity(function):
+    """(fewest, most) positional arguments (most None if unbounded), or None if not introspectable"""
+    if isinstance(function, np.ufunc):
+        return function.nin, function.nin
+    try:
+        parameters = inspect.signature(function).parameters.values()
+    except (TypeError, ValueError):
+        return None  # C functions without a text signature, such as min, max and math.log
+    fewest, most = 0, 0
+    for parameter in parameters:
+        if parameter.kind == parameter.VAR_POSITIONAL:
+            most = None
+        elif parameter.kind in (parameter.POSITIONAL_ONLY, parameter.POSITIONAL_OR_KEYWORD):
+            if most is not None:
+                most += 1
+            if parameter.default is parameter.empty:
+                fewest += 1
+    return fewest, most
+
+
+def _lambda_code(name, params, body):
+    arguments = ast.arguments(posonlyargs=[], args=[ast.arg(param) for param in params],
+                              kwonlyargs=[], kw_defaults=[], defaults=[])
+    tree = ast.fix_missing_locations(ast.Expression(ast.Lambda(arguments, body)))
+    return compile(tree, f'<function {name}>', 'eval')
+
+
+class Definition:
+    """One parsed 'name(params) = body' with its compiled scalar and vector code"""
+
+    __slots__ = ('name', 'params', 'source', 'key', 'calls', 'names', 'scalar_code', 'vector_code')
+
+    def __init__(self, name, params, source, key, calls, names, scalar_code, vector_code):
+        self.name = name
+        self.params = params
+        self.source = source
+        self.key = key
+        self.calls = calls    # {called name: argument counts used}
+        self.names = names    # Names read as values
+        self.scalar_code = scalar_code
+        self.vector_code = vector_code
+
+    @classmethod
+    def parse(cls, line, key):
+        match = _DEFINITION.match(line)
+        if not match:
+            raise ValueError("Expected 'name(x, y) = expression'")
+        name, params_text, body_text = match.groups()
+        params = tuple(param.strip() for param in params_text.split(',') if param.strip())
+        for param in params:
+            if not _PARAMETER.match(param) or param.startswith('_'):
+                raise ValueError(f"Invalid parameter name: {param}")
+            if callable(expression_engine.REAL_NAMESPACE.get(param)):
+                raise ValueError(f"Parameter '{param}' shadows the built-in function")
+        if len(set(params)) != len(params):
+            raise ValueError("Duplicate parameter names")
+
+        tree = expression_engine.parse(body_text)
+        calls, callees = {}, set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Call):
+                if node.keywords:
+                    raise ValueError("Keyword arguments are not supported")
+                calls.setdefault(node.func.id, set()).add(len(node.args))
+                callees.add(id(node.func))
+        names = {node.id for node in ast.walk(tree) if isinstance(node, ast.Name) and id(node) not in callees}
+        calls = {called: tuple(sorted(counts)) for called, counts in calls.items()}
+
+        scalar_code = _lambda_code(name, params, tree.body)
+        vector_code = _lambda_code(name, params, expression_engine._Vectorize().visit(tree).body)
+        return cls(name, params, line.strip(), key, calls, frozenset(names), scalar_code, vector_code)
+
+    def dependencies(self, library):
+        return {called for called in self.calls if called in library}
+
+    def to_cache(self):
+        return (self.name, self.params, self.source, self.calls, tuple(self.names),
+                self.scalar_code, self.vector_code)
+
+    @classmethod
+    def from_cache(cls, key, entry):
+        name, params, source, calls, names, scalar_code, vector_code = entry
+        return cls(name, params, source, key, calls, frozenset(names), scalar_code, vector_code)
+
+
+def definition_key(line):
+    """Cache key of a definition: hash of its whitespace-normalized source"""
+    return hashlib.sha256(' '.join(line.split()).encode()).hexdigest()
+
+
+class FunctionLibrary:
+    """User-defined functions compiled once to scalar and NumPy-vectorized forms
+
+    Each definition compiles to a lambda evaluated against one globals dict
+    per mode, shared by the whole library, so functions call each other by
+    name. Parsed and compiled definitions are kept in an authenticated
+    marshal cache keyed by source hash; after an edit only changed
+    definitions and those that call them are re-checked, and the new
+    functions replace the old ones in one step at install().
+    """
+
+    def __init__(self, path=LIBRARY_FILE, cache_path=CACHE_FILE):
+        self.path = path
+        self.cache_path = cache_path
+        self.definitions = {}  # name -> Definition, in file order
+        self.source = ''
+        self.globals = self._new_scopes()
+        self.functions = {mode: {} for mode in self.globals}
+        self._pending = None  # (globals, functions) built by update(), swapped in by install()
+        self._compiled = self._read_cache()  # key -> Definition
+        self.last_report = {}
+
+    @staticmethod
+    def _new_scopes():
+        """Fresh globals per mode for one generation of compiled functions"""
+        scopes = {}
+        for mode, namespace in expression_engine.NAMESPACES.items():
+            scope = dict(namespace)  # The vector namespace carries _Vectorize's helpers
+            scope['__builtins__'] = {}
+            scopes[mode] = scope
+        return scopes
+
+    # Disk cache: tag, HMAC-SHA256 of the payload under the user's secret, marshal payload
+    def _read_cache(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        secret = _cache_key()
+        if secret is None:
+            return {}
+        try:
+            with open(self.cache_path, 'rb') as file:
+                if file.read(len(_CACHE_TAG)) != _CACHE_TAG:
+                    return {}
+                digest = file.read(_DIGEST_SIZE)
+                payload = file.read()
+            # Nothing is unmarshalled, let alone evaluated, unless this user's calculator wrote it
+            if not hmac.compare_digest(digest, hmac.new(secret, _CACHE_TAG + payload, 'sha256').digest()):
+                return {}
+            entries = marshal.loads(payload)
+            # Each entry must still be the one its source hashes to
+            return {key: Definition.from_cache(key, entry) for key, entry in entries.items()
+                    if key == definition_key(entry[2])}
+        except (OSError, EOFError, ValueError, TypeError, IndexError):
+            return {}  # A corrupt, foreign or tampered cache is just rebuilt
+
+    def _write_cache(self):
+        secret = _cache_key() if self.cache_path else None
+        if secret is None:
+            return
+        entries = {definition.key: definition.to_cache() for definition in self.definitions.values()}
+        payload = marshal.dumps(entries)
+        temporary = self.cache_path + '.tmp'
+        with open(temporary, 'wb') as file:
+            file.write(_CACHE_TAG)
+            file.write(hmac.new(secret, _CACHE_TAG + payload, 'sha256').digest())
+            file.write(payload)
+        os.replace(temporary, self.cache_path)
+
+    # Definitions
+    def load(self):
+        """Read the library file (a missing file is an empty library)"""
+        if self.path and os.path.exists(self.path):
+            with open(self.path, 'r') as file:
+                self.update(file.read())
+        return self
+
+    def save(self):
+        with open(self.path, 'w') as file:
+            file.write(self.source)
+
+    def _parse_all(self, source):
+        definitions, parsed = {}, 0
+        for number, line in enumerate(source.splitlines(), 1):
+            if not line.strip() or line.lstrip().startswith('#'):
+                continue
+            key = definition_key(line)
+            definition = self._compiled.get(key)
+            if definition is None:
+                try:
+                    definition = Definition.parse(line, key)
+                except ValueError as e:
+                    raise ValueError(f"Line {number}: {str(e)}")
+                parsed += 1
+            if definition.name in definitions:
+                raise ValueError(f"Line {number}: {definition.name} is defined twice")
+            definitions[definition.name] = definition
+        return definitions, parsed
+
+    def check(self, definition, definitions):
+        """Names, arities and built-in clashes of one definition against the library"""
+        name = definition.name
+        if name in expression_engine.KNOWN_NAMES:
+            raise ValueError(f"{name}: cannot redefine the built-in '{name}'")
+        for called, counts in definition.calls.items():
+            if called in definitions:
+                expected = len(definitions[called].params)
+                for count in counts:
+                    if count != expected:
+                        raise ValueError(f"{name}: {called} takes {expected} argument(s), got {count}")
+            else:
+                function = expression_engine.REAL_NAMESPACE.get(
+                    called, expression_engine.COMPLEX_NAMESPACE.get(called))
+                if called in definition.params or not callable(function):
+                    raise ValueError(f"{name}: unknown function '{called}'")
+                arity = _arity(function)
+                for count in counts:
+                    if arity is not None and not (arity[0] <= count and (arity[1] is None or count <= arity[1])):
+                        expected = arity[0] if arity[0] == arity[1] else \
+                            f"{arity[0]} or more" if arity[1] is None else f"{arity[0]} to {arity[1]}"
+                        raise ValueError(f"{name}: {called} takes {expected} argument(s), got {count}")
+        for used in definition.names:
+            if used in definitions:
+                raise ValueError(f"{name}: function '{used}' used without arguments")
+            if used not in definition.params and used not in expression_engine.KNOWN_NAMES:
+                raise ValueError(f"{name}: unknown name '{used}'")
+
+    def _dependents(self, changed, definitions):
+        """changed plus everything that calls into it, directly or not
+
+        Matched on every name a definition calls or reads, not just those
+        still in the library, so the callers of a removed function are
+        re-checked too.
+        """
+        affected = set(changed)
+        grew = True
+        while grew:
+            grew = False
+            for definition in definitions.values():
+                if definition.name not in affected and (definition.calls.keys() | definition.names) & affected:
+                    affected.add(definition.name)
+                    grew = True
+        return affected
+
+    def _recursive_names(self, definitions):
+        """Names on a call cycle (strongly connected components, Tarjan, iteratively)"""
+        graph = {name: sorted(definition.dependencies(definitions)) for name, definition in definitions.items()}
+        index, low, on_stack, stack, recursive = {}, {}, set(), [], set()
+        for root in graph:
+            if root in index:
+                continue
+            work = [(root, 0)]
+            while work:
+                name, position = work.pop()
+                if position == 0:
+                    index[name] = low[name] = len(index)
+                    stack.append(name)
+                    on_stack.add(name)
+                for i in range(position, len(graph[name])):
+                    called = graph[name][i]
+                    if called not in index:
+                        work.append((name, i + 1))
+                        work.append((called, 0))
+                        break
+                    if called in on_stack:
+                        low[name] = min(low[name], index[called])
+                else:
+                    if low[name] == index[name]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == name:
+                                break
+                        if len(component) > 1 or name in graph[name]:
+                            recursive.update(component)
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[name])
+        return recursive
+
+    def update(self, source):
+        """Replace the library with new definitions text
+
+        Raises ValueError (leaving the library unchanged) if any definition
+        fails to parse or check. Returns a report of what was parsed, taken
+        from the cache and rebuilt. Functions are bound into new scopes;
+        the installed ones keep working unchanged until install().
+        """
+        definitions, parsed = self._parse_all(source)
+        changed = {name for name, definition in definitions.items()
+                   if self.definitions.get(name) is None or self.definitions[name].key != definition.key}
+        removed = set(self.definitions) - set(definitions)
+        affected = self._dependents(changed | removed, definitions) & set(definitions)
+        for name in affected:
+            self.check(definitions[name], definitions)
+
+        # Only the affected definitions were re-checked (and, if new, compiled); binding
+        # every code object into the new scopes is just function creation
+        scopes = self._new_scopes()
+        functions = {mode: {} for mode in scopes}
+        recursive = self._recursive_names(definitions)
+        for name, definition in definitions.items():
+            self._build(definition, name in recursive, scopes, functions)
+
+        self._pending = (scopes, functions)
+        self.definitions = definitions
+        self.source = source
+        self._compiled = {definition.key: definition for definition in definitions.values()}
+        if parsed or removed:
+            self._write_cache()
+        self.last_report = {'definitions': len(definitions), 'parsed': parsed,
+                            'rebuilt': sorted(affected), 'removed': sorted(removed)}
+        return self.last_report
+
+    @staticmethod
+    def _build(definition, recursive, scopes, functions):
+        name = definition.name
+        for mode, scope in scopes.items():
+            if mode == 'vector':
+                if recursive:
+                    # where() evaluates both branches, so recursion cannot bottom out on arrays
+                    scalar = eval(definition.scalar_code, scopes['real'])
+                    function = np.vectorize(scalar, otypes=[float])
+                else:
+                    function = eval(definition.vector_code, scope)
+            else:
+                function = eval(definition.scalar_code, scope)
+            scope[name] = function
+            functions[mode][name] = function
+
+    def install(self):
+        """Swap in the functions built by the last update and make them callable from every expression"""
+        if self._pending is not None:
+            self.globals, self.functions = self._pending
+            self._pending = None
+        expression_engine.set_user_functions(self.functions, self.source)
+
+    def describe(self):
+        """One 'f(x, y)' signature per definition"""
+        return [f"{name}({', '.join(definition.params)})" for name, definition in self.definitions.items()]
+
+
+def install_source(source):
+    """Worker processes: build and install a library from its text unless already installed"""
+    if source == expression_engine.user_source():
+        return
+    library = FunctionLibrary(path=None, cache_path=CACHE_FILE if os.path.exists(CACHE_FILE) else None)
+    library.cache_path = None  # Read the cache but leave writing it to the GUI process
+    library.update(source)
+    library.install()
@@ -0,0 +1,299 @@
+import time
+from array import array
+from datetime import datetime
+
+import numpy as np
+
+import bigint
+
+MAX_ENTRIES = 1 << 24   # Beyond this the oldest tenth is dropped in one step
+_FLOAT, _INT, _EXACT = 0, 1, 2  # Result kinds: plain float, integer exact as float, kept in the side table
+
+
+def _as_float(value):
+    """Float column value of any result: itself, its nearest float, ±inf when too large, else NaN"""
+    try:
+        return float(value)
+    except OverflowError:
+        return float('inf') if value > 0 else float('-inf')
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+def _encode_exact(value):
+    """JSON form of a side-table result (long integers as digit strings, complex as [re, im])"""
+    if isinstance(value, complex):
+        return [value.real, value.imag]
+    if isinstance(value, int) and value.bit_length() > bigint.INLINE_DIGITS * 3:
+        return bigint.to_decimal_string(value)
+    if isinstance(value, (int, float)):
+        return value
+    return str(value)
+
+
+def _decode_exact(value):
+    if isinstance(value, list) and len(value) == 2:
+        return complex(value[0], value[1])
+    if isinstance(value, str):
+        try:
+            return bigint.from_decimal_string(value)
+        except ValueError:
+            pass
+    return value
+
+
+def _parse_timestamp(value):
+    """Epoch milliseconds from a saved timestamp: a number, ISO text, or the old "%H:%M:%S" (today)"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    try:
+        moment = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        try:
+            moment = datetime.combine(datetime.now().date(),
+                                      datetime.strptime(value, "%H:%M:%S").time())
+        except (TypeError, ValueError):
+            return int(time.time() * 1000)
+    return int(moment.timestamp() * 1000)
+
+
+class History:
+    """Calculation history stored as column buffers
+
+    Results live in an array('d'), timestamps in an array('q') of epoch
+    milliseconds and expressions as ids into a deduplicated pool: one
+    UTF-8 bytearray plus an array of offsets, found again through an
+    open-addressing table of ids. An entry costs about 21 bytes plus its
+    expression text the first time that text is seen. Results a float
+    cannot hold exactly (long integers, complex numbers) keep the float
+    column approximation (NaN for complex) and the value itself in a small
+    side table. Entries still read back as the old dicts.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.clear()
+
+    def clear(self):
+        self.results = array('d')
+        self.timestamps = array('q')
+        self.expression_ids = array('i')
+        self.kinds = array('b')
+        self.exact = {}      # absolute row -> result, for kind _EXACT
+        self.dropped = 0     # Rows trimmed from the front; absolute row = index + dropped
+        self._text = bytearray()
+        self._offsets = array('q', [0])
+        self._slots = array('i', bytes(4 * 1024))  # Expression id + 1, 0 = empty
+
+    def __len__(self):
+        return len(self.results)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __getitem__(self, index):
+        """Entry as {'expression', 'result', 'timestamp' ("%H:%M:%S")} like the old list of dicts"""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("history index out of range")
+        moment = datetime.fromtimestamp(self.timestamps[index] / 1000)
+        return {'expression': self.expression(index), 'result': self.result(index),
+                'timestamp': moment.strftime("%H:%M:%S")}
+
+    def result(self, index):
+        kind = self.kinds[index]
+        if kind == _EXACT:
+            return self.exact[index + self.dropped]
+        value = self.results[index]
+        return int(value) if kind == _INT else value
+
+    def expression(self, index):
+        return self.pooled(self.expression_ids[index])
+
+    def pooled(self, expression_id):
+        return self._text[self._offsets[expression_id]:self._offsets[expression_id + 1]].decode('utf-8')
+
+    @property
+    def unique_expressions(self):
+        return len(self._offsets) - 1
+
+    # Appending
+
+    def intern(self, expression):
+        """Pool id of an expression, adding its text on first sight"""
+        data = expression.encode('utf-8')
+        mask = len(self._slots) - 1
+        slot = hash(data) & mask
+        while True:
+            stored = self._slots[slot]
+            if not stored:
+                break
+            start, stop = self._offsets[stored - 1], self._offsets[stored]
+            if stop - start == len(data) and self._text[start:stop] == data:
+                return stored - 1
+            slot = (slot + 1) & mask
+        expression_id = len(self._offsets) - 1
+        self._text += data
+        self._offsets.append(len(self._text))
+        self._slots[slot] = expression_id + 1
+        if 2 * len(self._offsets) > len(self._slots):
+            self._rehash(2 * len(self._slots))
+        return expression_id
+
+    def _rehash(self, size):
+        slots = array('i', bytes(4 * size))
+        mask = size - 1
+        text, offsets = self._text, self._offsets
+        for expression_id in range(len(offsets) - 1):
+            slot = hash(bytes(text[offsets[expression_id]:offsets[expression_id + 1]])) & mask
+            while slots[slot]:
+                slot = (slot + 1) & mask
+            slots[slot] = expression_id + 1
+        self._slots = slots
+
+    def _push(self, name, value):
+        """Append to a column; a column still exported to a NumPy view is copied first"""
+        column = getattr(self, name)
+        try:
+            column.append(value)
+        except BufferError:
+            column = array(column.typecode, column)
+            column.append(value)
+            setattr(self, name, column)
+
+    def append(self, expression, result, timestamp=None):
+        """Record one calculation; timestamp in epoch seconds, default now"""
+        if len(self) >= self.max_entries:
+            self.drop_oldest(max(1, self.max_entries // 10))
+        value = _as_float(result)
+        if isinstance(result, float):
+            kind = _FLOAT
+        elif isinstance(result, int) and not isinstance(result, bool) and value == result:
+            kind = _INT
+        else:
+            kind = _EXACT
+            self.exact[len(self) + self.dropped] = result
+        milliseconds = int((time.time() if timestamp is None else timestamp) * 1000)
+        self._push('expression_ids', self.intern(expression))
+        self._push('timestamps', milliseconds)
+        self._push('kinds', kind)
+        self._push('results', value)
+
+    def extend(self, entries):
+        """Append (expression, result[, timestamp]) tuples"""
+        for entry in entries:
+            self.append(*entry)
+
+    def drop_oldest(self, count):
+        """Remove the first `count` entries and compact the expression pool to what remains"""
+        count = min(count, len(self))
+        kept_ids = np.frombuffer(self.expression_ids, dtype=np.int32)[count:]
+        used, remapped = np.unique(kept_ids, return_inverse=True)
+        old_text, old_offsets = self._text, self._offsets
+        columns = {name: array(getattr(self, name).typecode, getattr(self, name)[count:])
+                   for name in ('results', 'timestamps', 'kinds')}
+        del kept_ids
+        dropped = self.dropped + count
+        exact = {row: value for row, value in self.exact.items() if row >= dropped}
+
+        self.clear()
+        for expression_id in used.tolist():
+            self.intern(old_text[old_offsets[expression_id]:old_offsets[expression_id + 1]].decode('utf-8'))
+        self.expression_ids = array('i', remapped.astype(np.int32).tobytes())
+        for name, column in columns.items():
+            setattr(self, name, column)
+        self.exact = exact
+        self.dropped = dropped
+
+    # Zero-copy views
+
+    def results_view(self):
+        """float64 view of the result column (NaN for complex results); no copy"""
+        return np.frombuffer(self.results, dtype=np.float64) if len(self) else np.empty(0)
+
+    def timestamps_view(self):
+        """int64 epoch-millisecond view of the timestamp column; no copy"""
+        return np.frombuffer(self.timestamps, dtype=np.int64) if len(self) else np.empty(0, np.int64)
+
+    def expression_ids_view(self):
+        return np.frombuffer(self.expression_ids, dtype=np.int32) if len(self) else np.empty(0, np.int32)
+
+    def summary(self):
+        """Count, finite count, mean, std, min and max of the past results in one pass over the column"""
+        results = self.results_view()
+        finite = results[np.isfinite(results)]
+        if not finite.size:
+            return {'count': len(results), 'finite': 0}
+        return {'count': len(results), 'finite': finite.size, 'mean': float(finite.mean()),
+                'std': float(finite.std()), 'min': float(finite.min()), 'max': float(finite.max())}
+
+    def nbytes(self):
+        """Bytes held by the columns, pool and side table index"""
+        columns = (self.results, self.timestamps, self.expression_ids, self.kinds,
+                   self._offsets, self._slots)
+        return (sum(column.itemsize * len(column) for column in columns)
+                + len(self._text) + 100 * len(self.exact))
+
+    # Serialization
+
+    def to_json(self):
+        """Columnar JSON form: each expression's text once, then the numeric columns"""
+        return {
+            'format': 'columns',
+            'expressions': [self.pooled(expression_id) for expression_id in range(self.unique_expressions)],
+            'expression_ids': self.expression_ids.tolist(),
+            'results': self.results.tolist(),
+            'kinds': self.kinds.tolist(),
+            'timestamps': self.timestamps.tolist(),
+            'exact': {str(row - self.dropped): _encode_exact(value) for row, value in self.exact.items()},
+        }
+
+    def entries(self):
+        """List of dicts with long integers as digit strings, for human-readable export"""
+        return [dict(entry, result=_encode_exact(entry['result'])) if not isinstance(entry['result'], float)
+                else entry for entry in self]
+
+    @classmethod
+    def from_json(cls, data, max_entries=MAX_ENTRIES):
+        """Read to_json output, or the older list of {'expression', 'result', 'timestamp'} dicts"""
+        history = cls(max_entries)
+        if isinstance(data, dict) and data.get('format') == 'columns':
+            pool = [history.intern(expression) for expression in data['expressions']]
+            exact = {int(row): _decode_exact(value) for row, value in data.get('exact', {}).items()}
+            history.expression_ids = array('i', (pool[i] for i in data['expression_ids']))
+            history.results = array('d', data['results'])
+            history.kinds = array('b', data['kinds'])
+            history.timestamps = array('q', data['timestamps'])
+            history.exact = exact
+        else:
+            for entry in data or []:
+                if isinstance(entry, dict):
+                    history.append(str(entry.get('expression', '')), _decode_exact(entry.get('result', 0)),
+                                   _parse_timestamp(entry.get('timestamp')) / 1000)
+        return history
+
+
+class HistoryTable:
+    """Newest-first (time, expression, result) text cells of a History, sliced like a 2D array for VirtualGrid"""
+
+    def __init__(self, history, format_result):
+        self.history = history
+        self.format_result = format_result
+
+    @property
+    def shape(self):
+        return (len(self.history), 3)
+
+    def __getitem__(self, key):
+        rows, columns = key
+        last = len(self.history) - 1
+        cells = []
+        for row in range(*rows.indices(len(self.history))):
+            entry = self.history[last - row]
+            cells.append([entry['timestamp'], entry['expression'], self.format_result(entry['result'])])
+        table = np.empty((len(cells), 3), dtype=object)
+        if cells:
+            table[:] = cells
+        return table[:, columns]
@@ -0,0 +1,177 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Any
+
+
+class Instrumentation:
+    """Opt-in timing of command callbacks and Tk event-loop lag"""
+
+    def __init__(self, enabled=False, max_events=200000):
+        self.enabled = enabled
+        self.events = deque(maxlen=max_events)
+        self.counters = {}
+        self.stats = {}  # name -> [calls, total_us, max_us, last_us]
+        self.lag_ms = 0.0
+        self.max_lag_ms = 0.0
+        self.heartbeat_ms = 50
+        self._epoch = time.perf_counter_ns()
+        self._pid = os.getpid()
+        self._root = None
+        self._heartbeat_id = None
+        self._expected = 0
+
+    # Recording
+    def record(self, name, start_ns, end_ns):
+        """Record one completed span"""
+        ts = (start_ns - self._epoch) / 1000.0
+        dur = (end_ns - start_ns) / 1000.0
+        self.events.append({
+            'name': name, 'ph': 'X', 'ts': ts, 'dur': dur,
+            'pid': self._pid, 'tid': threading.get_ident()
+        })
+        entry = self.stats.get(name)
+        if entry is None:
+            self.stats[name] = [1, dur, dur, dur]
+        else:
+            entry[0] += 1
+            entry[1] += dur
+            entry[3] = dur
+            if dur > entry[2]:
+                entry[2] = dur
+
+    def count(self, name, amount=1):
+        """Increment a named counter (cache hits, evaluations, ...)"""
+        if not self.enabled:
+            return
+        value = self.counters.get(name, 0) + amount
+        self.counters[name] = value
+        self.events.append({
+            'name': name, 'ph': 'C',
+            'ts': (time.perf_counter_ns() - self._epoch) / 1000.0,
+            'pid': self._pid, 'tid': threading.get_ident(),
+            'args': {name: value}
+        })
+
+    def span(self, name):
+        """Context manager timing an arbitrary block"""
+        return _Span(self, name)
+
+    def reset(self):
+        """Drop all recorded data"""
+        self.events.clear()
+        self.counters.clear()
+        self.stats.clear()
+        self.lag_ms = 0.0
+        self.max_lag_ms = 0.0
+
+    # Event-loop heartbeat
+    def start_heartbeat(self, root):
+        """Measure event-loop lag by scheduling a periodic root.after callback"""
+        self._root = root
+        if self._heartbeat_id is None and self.enabled:
+            self._expected = time.perf_counter_ns() + self.heartbeat_ms * 1_000_000
+            self._heartbeat_id = root.after(self.heartbeat_ms, self._beat)
+
+    def stop_heartbeat(self):
+        """Cancel the heartbeat"""
+        if self._heartbeat_id is not None and self._root is not None:
+            try:
+                self._root.after_cancel(self._heartbeat_id)
+            except Exception:
+                pass
+        self._heartbeat_id = None
+
+    def _beat(self):
+        now = time.perf_counter_ns()
+        lag = max(0.0, (now - self._expected) / 1_000_000)
+        self.lag_ms = lag
+        if lag > self.max_lag_ms:
+            self.max_lag_ms = lag
+        self.events.append({
+            'name': 'event_loop_lag_ms', 'ph': 'C',
+            'ts': (now - self._epoch) / 1000.0,
+            'pid': self._pid, 'tid': threading.get_ident(),
+            'args': {'lag_ms': round(lag, 3)}
+        })
+        self._heartbeat_id = None
+        if self.enabled:
+            self._expected = now + self.heartbeat_ms * 1_000_000
+            self._heartbeat_id = self._root.after(self.heartbeat_ms, self._beat)
+
+    def set_enabled(self, enabled, root=None):
+        """Turn instrumentation on or off"""
+        self.enabled = enabled
+        if enabled:
+            self.start_heartbeat(root or self._root)
+        else:
+            self.stop_heartbeat()
+
+    # Reporting
+    def summary(self) -> Dict[str, Any]:
+        """Per-callback call count, mean/max duration in milliseconds"""
+        return {
+            name: {
+                'calls': calls,
+                'mean_ms': total / calls / 1000.0,
+                'max_ms': peak / 1000.0,
+                'last_ms': last / 1000.0
+            }
+            for name, (calls, total, peak, last) in self.stats.items()
+        }
+
+    def overlay_text(self):
+        """Short text for the status bar overlay"""
+        slowest = ""
+        if self.stats:
+            name, entry = max(self.stats.items(), key=lambda item: item[1][3])
+            slowest = f"{name} {entry[3] / 1000.0:.1f}ms | "
+        counters = " ".join(f"{k}={v}" for k, v in sorted(self.counters.items()))
+        return f"{slowest}lag {self.lag_ms:.1f}ms (max {self.max_lag_ms:.1f}) {counters}".strip()
+
+    def export_chrome_trace(self, file_path):
+        """Write recorded events in Chrome trace-event JSON format"""
+        trace = {
+            'traceEvents': list(self.events),
+            'displayTimeUnit': 'ms',
+            'otherData': {'summary': self.summary(), 'counters': dict(self.counters)}
+        }
+        with open(file_path, 'w') as file:
+            json.dump(trace, file)
+
+
+class _Span:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        if self.profiler.enabled:
+            self.profiler.record(self.name, self.start, time.perf_counter_ns())
+        return False
+
+
+def profiled(func):
+    """Time a calculator method when its instance's profiler is enabled"""
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        profiler = self.profiler
+        if not profiler.enabled:
+            return func(self, *args, **kwargs)
+        start = time.perf_counter_ns()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            profiler.record(name, start, time.perf_counter_ns())
+    return wrapper
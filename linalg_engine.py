@@ -0,0 +1,178 @@
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any
+
+import numpy as np
+
+import data_io
+
+# Matrices with more elements than this are computed in a worker process
+BACKGROUND_THRESHOLD = 250_000
+
+OPERATIONS = {
+    'multiply': ('A × B', 2),
+    'inverse': ('A⁻¹', 1),
+    'determinant': ('det(A)', 1),
+    'solve': ('Solve Ax = B', 2),
+    'eigen': ('Eigen(A)', 1),
+    'svd': ('SVD(A)', 1),
+    'lstsq': ('Least Squares', 2),
+}
+
+
+def parse_matrix(text):
+    """Parse rows separated by newlines or ';' and columns by commas or spaces"""
+    rows = [row.strip() for row in re.split(r'[;\n]', text) if row.strip()]
+    if not rows:
+        raise ValueError("Matrix is empty")
+    data = [[float(value) for value in re.split(r'[,\s]+', row) if value] for row in rows]
+    width = len(data[0])
+    if any(len(row) != width for row in data):
+        raise ValueError("All matrix rows must have the same number of columns")
+    return np.array(data, dtype=float)
+
+
+def load_matrix(file_path):
+    """Load a matrix from .npy (memory-mapped) or CSV"""
+    matrix = data_io.load_array(file_path)
+    if matrix.ndim != 2:
+        raise ValueError(f"Expected a 2D matrix, got shape {matrix.shape}")
+    return matrix
+
+
+def run_operation(operation, a, b=None) -> Dict[str, Any]:
+    """Run a linear algebra operation; returns named results (arrays or scalars)"""
+    a = np.asarray(a)
+    if operation in ('multiply', 'solve', 'lstsq') and b is None:
+        raise ValueError(f"{OPERATIONS[operation][0]} needs matrix B")
+
+    if operation == 'multiply':
+        if a.shape[1] != b.shape[0]:
+            raise ValueError(f"Cannot multiply {a.shape} by {b.shape}")
+        return {'A × B': np.matmul(a, b)}
+    if operation == 'inverse':
+        _require_square(a)
+        return {'A⁻¹': np.linalg.inv(a)}
+    if operation == 'determinant':
+        _require_square(a)
+        sign, logdet = np.linalg.slogdet(a)
+        det = sign * np.exp(logdet) if logdet < 709 else sign * np.inf
+        return {'det(A)': float(det), 'log|det(A)|': float(logdet)}
+    if operation == 'solve':
+        _require_square(a)
+        return {'x': np.linalg.solve(a, np.asarray(b))}
+    if operation == 'eigen':
+        _require_square(a)
+        if np.allclose(a, a.T):
+            values, vectors = np.linalg.eigh(a)
+        else:
+            values, vectors = np.linalg.eig(a)
+        return {'eigenvalues': values.reshape(-1, 1), 'eigenvectors': vectors}
+    if operation == 'svd':
+        u, s, vt = np.linalg.svd(a, full_matrices=False)
+        return {'singular values': s.reshape(-1, 1), 'U': u, 'Vᵀ': vt}
+    if operation == 'lstsq':
+        x, residuals, rank, s = np.linalg.lstsq(a, np.asarray(b), rcond=None)
+        return {'x': x, 'residuals': np.atleast_1d(residuals).reshape(-1, 1), 'rank': int(rank)}
+    raise ValueError(f"Unknown operation: {operation}")
+
+
+def _require_square(a):
+    if a.shape[0] != a.shape[1]:
+        raise ValueError(f"Matrix must be square, got {a.shape}")
+
+
+def needs_background(a, b=None):
+    """Whether operands are large enough to compute off the UI thread"""
+    size = np.size(a) + (np.size(b) if b is not None else 0)
+    return size > BACKGROUND_THRESHOLD
+
+
+def _compute_from_files(operation, a_path, b_path, out_dir):
+    """Worker entry point: operands and array results travel as .npy files"""
+    a = np.load(a_path, mmap_mode='r')
+    b = np.load(b_path, mmap_mode='r') if b_path else None
+    results = run_operation(operation, a, b)
+    paths = {}
+    for i, (name, value) in enumerate(results.items()):
+        if isinstance(value, np.ndarray):
+            path = os.path.join(out_dir, f"result_{i}.npy")
+            np.save(path, value)
+            paths[name] = path
+        else:
+            paths[name] = value
+    return paths
+
+
+class MatrixWorker:
+    """Computes large linear algebra jobs in a separate process
+
+    Each job gets its own directory under work_dir for the spilled
+    operands and the results. Operands are deleted when the job ends and
+    results once load_results has mapped them, so large jobs do not pile
+    up on disk over a session.
+    """
+
+    def __init__(self):
+        self._executor = None
+        self.work_dir = tempfile.mkdtemp(prefix='calc_matrix_')
+
+    def submit(self, operation, a, b=None):
+        """Spill operands to .npy (if not already memory-mapped) and submit"""
+        if self._executor is None:
+            # Spawn rather than fork so the worker never inherits the Tk interpreter
+            self._executor = ProcessPoolExecutor(max_workers=1,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+        out_dir = tempfile.mkdtemp(dir=self.work_dir)
+        a_path = self._operand_path(a, out_dir, 'a')
+        b_path = self._operand_path(b, out_dir, 'b') if b is not None else None
+        future = self._executor.submit(_compute_from_files, operation, a_path, b_path, out_dir)
+        future.add_done_callback(lambda future: self._job_done(future, out_dir))
+        return future
+
+    @staticmethod
+    def _job_done(future, job_dir):
+        """Drop the spilled operands; a failed job has nothing to load either"""
+        if future.cancelled() or future.exception() is not None:
+            shutil.rmtree(job_dir, ignore_errors=True)
+            return
+        for name in ('a', 'b'):
+            try:
+                os.remove(os.path.join(job_dir, f"operand_{name}.npy"))
+            except OSError:
+                pass
+
+    @staticmethod
+    def _operand_path(matrix, job_dir, name):
+        if (isinstance(matrix, np.memmap) and matrix.filename and matrix.filename.endswith('.npy')
+                and os.path.exists(matrix.filename)):
+            return matrix.filename
+        path = os.path.join(job_dir, f"operand_{name}.npy")
+        np.save(path, np.asarray(matrix))
+        return path
+
+    @staticmethod
+    def load_results(paths):
+        """Open array results memory-mapped so they are never copied into Tk
+
+        The job directory is removed once they are mapped: the open maps
+        keep the data readable and the space is freed when they are
+        released. Where mapped files cannot be deleted (Windows) it stays
+        until shutdown.
+        """
+        results = {name: np.load(value, mmap_mode='r') if isinstance(value, str) else value
+                   for name, value in paths.items()}
+        for job_dir in {os.path.dirname(value) for value in paths.values() if isinstance(value, str)}:
+            shutil.rmtree(job_dir, ignore_errors=True)
+        return results
+
+    def shutdown(self):
+        """Stop the worker process and delete every job's files"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        shutil.rmtree(self.work_dir, ignore_errors=True)
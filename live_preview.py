@@ -0,0 +1,397 @@
+import bisect
+import math
+import numbers
+import operator
+import re
+import threading
+import time
+
+import expression_engine
+
+PREVIEW_BITS = 1 << 20      # Integer results estimated larger than this are deferred to '='
+DIVISION_WORK = 1 << 34     # Quotient bits x divisor bits above this (~50 ms) defer // and % too
+FACTORIAL_LIMIT = 50000     # factorial(n) above this is deferred too
+DELAY = 0.08                # Seconds of quiet typing before a preview is computed
+_LOOKAHEAD = 2              # Characters past a token's end the lexer may have looked at
+
+# One token at a time, in the engine's notation (see expression_engine.translate).
+# Incomplete exponents ("1e", "1e+") are single number tokens so typing never
+# splits them; the imaginary suffix matches the engine's "\d i\b" rule.
+_TOKEN = re.compile(r"""\s*(?:
+    (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d*)?)(?P<imaginary>[ij](?!\w))?
+  | (?P<name>[^\W\d]\w*|π|√)
+  | (?P<operator>\*\*|//|[-+*/%^÷×−])
+  | (?P<punctuation>[(),])
+  | (?P<other>\S)
+)""", re.VERBOSE)
+_COMPLETE_NUMBER = re.compile(r'(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?')
+_KEYWORDS = frozenset({'and', 'or', 'not', 'if', 'else', 'in', 'is', 'lambda', 'for'})
+
+_BINARY = {'+': operator.add, '-': operator.sub, '*': operator.mul, '/': operator.truediv,
+           '//': operator.floordiv, '%': operator.mod, '**': operator.pow}
+_PRECEDENCE = {'+': 1, '-': 1, '*': 2, '/': 2, '//': 2, '%': 2, 'unary': 3, '**': 4}
+_SPELLINGS = {'^': '**', '÷': '/', '×': '*', '−': '-', 'π': 'pi', '√': 'sqrt'}
+
+
+class _Deferred:
+    """A sub-result too expensive to compute while typing; '=' computes it"""
+
+    def __repr__(self):
+        return '…'
+
+
+DEFERRED = _Deferred()
+
+
+class _Failure:
+    """An exception raised by a sub-result, carried along like a value"""
+
+    __slots__ = ('error',)
+
+    def __init__(self, error):
+        self.error = error
+
+
+class _Name:
+    """A name not yet looked up: it may turn out to be a function being called"""
+
+    __slots__ = ('id',)
+
+    def __init__(self, name):
+        self.id = name
+
+
+class _Incomplete(Exception):
+    pass
+
+
+def _common_prefix(a, b):
+    """Length of the common prefix, by C-level comparisons (binary search on startswith)"""
+    n = min(len(a), len(b))
+    if a.startswith(b[:n]):
+        return n
+    low, high = 0, n
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a.startswith(b[:middle]):
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def lex(text, position=0):
+    """(kind, value, end) tokens of text[position:]"""
+    tokens = []
+    while True:
+        match = _TOKEN.match(text, position)
+        if match is None:
+            return tokens  # End of text (or trailing whitespace)
+        position = match.end()
+        kind = match.lastgroup
+        if kind == 'imaginary':
+            kind = 'number'
+        value = match.group(kind)
+        if kind == 'number':
+            value = _number(value, match.group('imaginary'))
+        elif kind in ('name', 'operator'):
+            value = _SPELLINGS.get(value, value)
+            if kind == 'name' and value in _KEYWORDS:
+                kind = 'other'
+        tokens.append((kind, value, position))
+
+
+def _number(text, imaginary):
+    """Literal value as Python would read it, or None when Python would reject it"""
+    if not _COMPLETE_NUMBER.fullmatch(text):
+        return None
+    if imaginary:
+        return complex(0, float(text))
+    if text.isdigit():
+        if len(text) > 1 and text[0] == '0' and text.strip('0'):
+            return None
+        try:
+            return int(text)
+        except ValueError:  # Beyond int()'s digit limit, as for the engine's compile
+            return None
+    return float(text)
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _apply(symbol, left, right):
+    """left <symbol> right, unless either failed or it would be too costly to compute now"""
+    for value in (left, right):
+        if isinstance(value, _Failure) or value is DEFERRED:
+            return value
+    if _is_int(left) and _is_int(right):
+        if symbol == '**' and right > 0 and abs(left) > 1 and right * left.bit_length() > PREVIEW_BITS:
+            return DEFERRED
+        if symbol == '*' and left.bit_length() + right.bit_length() > PREVIEW_BITS:
+            return DEFERRED
+        if symbol in ('//', '%'):
+            # Long division is quadratic: quotient length times divisor length
+            divisor_bits = right.bit_length()
+            if max(left.bit_length() - divisor_bits + 1, 0) * divisor_bits > DIVISION_WORK:
+                return DEFERRED
+    try:
+        return _BINARY[symbol](left, right)
+    except Exception as e:
+        return _Failure(e)
+
+
+def _negate(symbol, value):
+    if isinstance(value, _Failure) or value is DEFERRED:
+        return value
+    try:
+        return -value if symbol == '-' else +value
+    except Exception as e:
+        return _Failure(e)
+
+
+def _call(function, arguments):
+    for value in arguments:
+        if isinstance(value, _Failure) or value is DEFERRED:
+            return value
+    if isinstance(function, _Failure):
+        return function
+    if function is math.factorial and arguments and _is_int(arguments[0]) \
+            and arguments[0] > FACTORIAL_LIMIT:
+        return DEFERRED
+    try:
+        return function(*arguments)
+    except Exception as e:
+        return _Failure(e)
+
+
+class IncrementalParser:
+    """Operator-precedence parser that keeps its state after every token
+
+    Value and operator stacks are linked (head, tail) pairs, so the state
+    after token k is shared, never copied, by every later state. Feeding a
+    new version of the text re-lexes only from the first changed token and
+    resumes from the state saved just before it: appending or deleting a
+    character costs the same for a 10-character expression as for a
+    10,000-character one. Sub-results are computed as their operators
+    reduce, with the calculator's namespace, exactly as eval would.
+    """
+
+    def __init__(self, namespace):
+        self.namespace = namespace
+        self.text = ''
+        self.tokens = []    # (kind, value, end)
+        self.ends = []      # Token end offsets, for bisect
+        # State after tokens[:k]: (values, operators, expecting an operand) or an error message
+        self.states = [(None, None, True)]
+
+    def feed(self, text, cancelled=None):
+        """Bring the parse up to date with text; False if cancelled part-way"""
+        common = _common_prefix(self.text, text)
+        kept = bisect.bisect_right(self.ends, common - _LOOKAHEAD)
+        del self.tokens[kept:], self.ends[kept:], self.states[kept + 1:]
+        new = lex(text, self.ends[-1] if kept else 0)
+        self.tokens.extend(new)
+        self.ends.extend(token[2] for token in new)
+        self.text = text
+        return self.catch_up(cancelled)
+
+    def catch_up(self, cancelled=None):
+        """Parse the tokens not yet covered by a saved state"""
+        state = self.states[-1]
+        for index in range(len(self.states) - 1, len(self.tokens)):
+            if cancelled is not None and cancelled():
+                return False
+            state = self.step(state, self.tokens[index])
+            self.states.append(state)
+        return True
+
+    def lookup(self, value):
+        if not isinstance(value, _Name):
+            return value
+        try:
+            return self.namespace[value.id]
+        except KeyError:
+            return _Failure(NameError(f"name '{value.id}' is not defined"))
+
+    def step(self, state, token):
+        if isinstance(state, str):
+            return state
+        values, operators, expecting_operand = state
+        kind, value, _ = token
+        if expecting_operand:
+            if kind == 'number':
+                return ((value, values), operators, False) if value is not None else "Invalid number"
+            if kind == 'name':
+                return ((_Name(value), values), operators, False)
+            if kind == 'operator' and value in ('-', '+'):
+                return (values, (('unary', value), operators), True)
+            if kind == 'punctuation' and value == '(':
+                return (values, (('paren',), operators), True)
+            return f"Unexpected {kind}"
+
+        if kind == 'punctuation' and value == '(':
+            if not isinstance(values[0], _Name):
+                return "Unexpected '('"
+            return (values[1], (('call', self.lookup(values[0]), 0), operators), True)
+        values = (self.lookup(values[0]), values[1])
+        if kind == 'operator':
+            precedence = _PRECEDENCE[value]
+            right_associative = value == '**'
+            while operators is not None:
+                top = operators[0]
+                if top[0] == 'unary':
+                    top_precedence = _PRECEDENCE['unary']
+                elif top[0] == 'binary':
+                    top_precedence = _PRECEDENCE[top[1]]
+                else:
+                    break
+                if top_precedence < precedence or (top_precedence == precedence and right_associative):
+                    break
+                values, operators = self.reduce(values, operators)
+            return (values, (('binary', value), operators), True)
+        if kind == 'punctuation':
+            while operators is not None and operators[0][0] in ('unary', 'binary'):
+                values, operators = self.reduce(values, operators)
+            if operators is None:
+                return f"Unmatched '{value}'"
+            top = operators[0]
+            if value == ',':
+                if top[0] != 'call':
+                    return "Unexpected ','"
+                return (values, (('call', top[1], top[2] + 1), operators[1]), True)
+            if top[0] == 'paren':
+                return (values, operators[1], False)
+            values, operators = self.reduce(values, operators)
+            return (values, operators, False)
+        return f"Unexpected {kind}"
+
+    def reduce(self, values, operators):
+        """Apply the operator on top of the stack"""
+        top, operators = operators
+        if top[0] == 'binary':
+            right, (left, values) = values[0], values[1]
+            return (_apply(top[1], left, right), values), operators
+        if top[0] == 'unary':
+            return (_negate(top[1], values[0]), values[1]), operators
+        if top[0] == 'paren':
+            return values, operators
+        arguments = []
+        for _ in range(top[2] + 1):
+            arguments.append(values[0])
+            values = values[1]
+        return (_call(top[1], arguments[::-1]), values), operators
+
+    def result(self):
+        """Value of the text so far, closing open brackets and ignoring a trailing operator
+
+        Raises _Incomplete when there is nothing to show yet, and the
+        sub-result's own exception when evaluating it failed.
+        """
+        state = self.states[-1]
+        if isinstance(state, str) or len(self.states) <= len(self.tokens):
+            raise _Incomplete(state if isinstance(state, str) else "Not parsed yet")
+        values, operators, expecting_operand = state
+        while expecting_operand and operators is not None:
+            top, operators = operators
+            if top[0] == 'binary':
+                expecting_operand = False
+            elif top[0] == 'call':
+                if top[2] == 0:
+                    raise _Incomplete("Function without arguments")
+                operators = (('call', top[1], top[2] - 1), operators)
+                expecting_operand = False
+        if values is None or expecting_operand:
+            raise _Incomplete("Empty expression")
+        values = (self.lookup(values[0]), values[1])
+        while operators is not None:
+            values, operators = self.reduce(values, operators)
+        value = values[0]
+        if isinstance(value, _Failure):
+            raise value.error
+        return value
+
+
+class LivePreview:
+    """Debounced, cancellable evaluate-as-you-type on a background thread
+
+    request() only records the latest text; the worker waits for DELAY
+    seconds without a newer request, then brings its IncrementalParser up
+    to date. A newer request cancels the one in progress between tokens,
+    and sub-results that would take long (huge powers, products, long
+    divisions and factorials) are deferred rather than computed, so typing
+    never waits.
+    """
+
+    def __init__(self, delay=DELAY):
+        self.delay = delay
+        self.generation = 0
+        self.result = (0, None)   # (generation, value or None)
+        self._condition = threading.Condition()
+        self._request = None
+        self._parser = None
+        self._namespace_key = None
+        self._thread = None
+        self._closed = False
+
+    def request(self, text, mode='real', variables=None):
+        """Queue text for preview; returns its generation number"""
+        with self._condition:
+            self.generation += 1
+            self._request = (self.generation, text, mode, dict(variables or {}), time.monotonic())
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._condition.notify()
+            return self.generation
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._request is None and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                generation, text, mode, variables, requested = self._request
+                remaining = requested + self.delay - time.monotonic()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+                self._request = None
+            value = self.evaluate(text, mode, variables,
+                                  cancelled=lambda: self.generation != generation)
+            if self.generation == generation:
+                self.result = (generation, value)
+
+    def parser(self, mode, variables):
+        """The parser for this namespace; a changed variable or function definition starts afresh"""
+        key = (mode, expression_engine.user_source(),
+               tuple((name, id(value)) for name, value in variables.items()))
+        if key != self._namespace_key:
+            namespace = dict(expression_engine.NAMESPACES[mode])
+            namespace.update(expression_engine.USER_NAMESPACES[mode])
+            namespace.update(variables)
+            self._parser = IncrementalParser(namespace)
+            self._namespace_key = key
+        return self._parser
+
+    def evaluate(self, text, mode='real', variables=None, cancelled=None):
+        """Preview value of text: a number, DEFERRED, or None (nothing worth showing)"""
+        parser = self.parser(mode, variables or {})
+        if not parser.feed(text, cancelled):
+            return None
+        if len(parser.tokens) == 1 and parser.tokens[0][0] == 'number':
+            return None  # A bare number previews as itself
+        try:
+            value = parser.result()
+        except Exception:
+            return None
+        if value is DEFERRED or isinstance(value, numbers.Number):
+            return value
+        return None
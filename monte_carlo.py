@@ -0,0 +1,146 @@
+import functools
+import math
+import re
+
+import numpy as np
+
+import distributions
+import expression_engine
+import function_library
+from stats_engine import MomentState
+
+_DEFINITION = re.compile(r'^\s*([A-Za-z]\w*)\s*=(?!=)(.*)$', re.S)
+SAMPLERS = {name: function for name, function in distributions.FUNCTIONS.items() if name.endswith('rnd')}
+
+
+def parse_model(source):
+    """Compile 'X = expr; Y = expr; result expr' into [(name or None, CompiledExpression)]
+
+    Each definition is drawn once per sample, so later expressions that reuse
+    a random variable see the same draw.
+    """
+    parts = [part.strip() for part in source.split(';') if part.strip()]
+    if not parts:
+        raise ValueError("Enter a model expression")
+    steps = []
+    for part in parts[:-1]:
+        match = _DEFINITION.match(part)
+        if not match:
+            raise ValueError(f"Expected 'name = expression': {part}")
+        steps.append((match.group(1), expression_engine.compile_expression(match.group(2).strip())))
+    steps.append((None, expression_engine.compile_expression(parts[-1])))
+    return steps
+
+
+def sample_model(steps, rng, size):
+    """One vectorized chunk of `size` samples of the model"""
+    values = {name: functools.partial(sampler, size=size, rng=rng) for name, sampler in SAMPLERS.items()}
+    result = None
+    for name, expression in steps:
+        result = expression.vectorized(shape=(size,), **values)
+        if name is not None:
+            values[name] = result
+    return np.asarray(result, dtype=float)
+
+
+def simulate(source, seed_sequence, chunk_size, chunks, functions=''):
+    """Worker: reduce `chunks` chunks of samples to a MomentState
+
+    Only one chunk of samples exists at a time, so memory is bounded by
+    chunk_size whatever the total sample count.
+    """
+    function_library.install_source(functions)
+    steps = parse_model(source)
+    rng = np.random.default_rng(seed_sequence)
+    state = MomentState()
+    for _ in range(chunks):
+        state.update(sample_model(steps, rng, chunk_size))
+    return state
+
+
+def half_width(state, confidence=0.95):
+    """Normal-approximation confidence half-width of the mean"""
+    if state.count < 2:
+        return math.inf
+    z = distributions.norm_inv(0.5 + confidence / 2)
+    return z * math.sqrt(state.variance() / state.count)
+
+
+class MonteCarloRun:
+    """A simulation spread over a process pool, merged in task order as results arrive
+
+    Task i always draws from child i of the root SeedSequence, so a given seed
+    reproduces the same estimate regardless of worker scheduling. poll() is
+    meant to be called repeatedly (e.g. from Tk's after loop).
+    """
+
+    def __init__(self, source, executor, workers, seed=None, chunk_size=1 << 20, chunks_per_task=1,
+                 target=None, relative=False, confidence=0.95, max_samples=10 ** 8):
+        sample_model(parse_model(source), np.random.default_rng(0), 8)  # Fail fast on bad models
+        self.source = source
+        self.functions = expression_engine.user_source()
+        self.executor = executor
+        self.in_flight = max(1, workers) * 2
+        self.root_seed = np.random.SeedSequence(seed)
+        self.chunk_size = chunk_size
+        self.chunks_per_task = chunks_per_task
+        self.target = target
+        self.relative = relative
+        self.confidence = confidence
+        self.max_samples = max_samples
+        self.state = MomentState()
+        self.history = []  # (samples, mean, half width) after each merge
+        self.pending = []
+        self.submitted = 0
+        self.finished = False
+        self.reason = None
+        self._submit()
+
+    def _task_samples(self):
+        return self.chunk_size * self.chunks_per_task
+
+    def _submit(self):
+        while (len(self.pending) < self.in_flight
+               and self.submitted * self._task_samples() < self.max_samples):
+            seed_sequence = self.root_seed.spawn(1)[0]
+            self.pending.append(self.executor.submit(
+                simulate, self.source, seed_sequence, self.chunk_size, self.chunks_per_task, self.functions))
+            self.submitted += 1
+
+    def precision_reached(self):
+        if self.target is None or self.state.count < 2:
+            return False
+        goal = self.target * abs(self.state.mean) if self.relative else self.target
+        return half_width(self.state, self.confidence) <= goal
+
+    def poll(self):
+        """Merge finished tasks; returns True while the run is still going"""
+        if self.finished:
+            return False
+        while self.pending and self.pending[0].done():
+            self.state.merge(self.pending.pop(0).result())  # Worker errors propagate here
+            self.history.append((self.state.count, self.state.mean,
+                                 half_width(self.state, self.confidence)))
+            # Checked after every task, so the stopping point depends only on the seed
+            if self.precision_reached():
+                self.stop("target precision reached")
+                return False
+        if not self.pending and self.submitted * self._task_samples() >= self.max_samples:
+            self.stop("sample limit reached")
+        else:
+            self._submit()
+        return not self.finished
+
+    def stop(self, reason="stopped"):
+        """Cancel outstanding work"""
+        for future in self.pending:
+            future.cancel()
+        self.pending = []
+        self.finished = True
+        self.reason = reason
+
+    def summary(self):
+        """Current estimate as a one-line report"""
+        width = half_width(self.state, self.confidence)
+        return (f"n={self.state.count:,}  mean={self.state.mean:.8g}  "
+                f"±{width:.3g} ({self.confidence:.0%} CI)  std={self.state.std_dev():.6g}")
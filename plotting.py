@@ -0,0 +1,205 @@
+import re
+
+import numpy as np
+from matplotlib.colors import hsv_to_rgb
+
+_EQUALS = re.compile(r'(?<![<>=!])=(?!=)')
+
+
+def complex_grid(x_min, x_max, y_min, y_max, width, height):
+    """Complex plane sampled as one (height, width) array, top row = y_max"""
+    real_axis = np.linspace(x_min, x_max, width)
+    imag_axis = np.linspace(y_max, y_min, height)
+    return real_axis[np.newaxis, :] + 1j * imag_axis[:, np.newaxis]
+
+
+def domain_coloring(w):
+    """Map complex values to RGB: hue = argument, brightness = log-modulus contours"""
+    w = np.asarray(w, dtype=complex)
+    with np.errstate(all='ignore'):
+        hue = (np.angle(w) / (2 * np.pi)) % 1.0
+        log_mod = np.log2(np.abs(w))
+        contours = log_mod - np.floor(log_mod)
+        value = 0.6 + 0.4 * contours
+        saturation = np.full(w.shape, 0.9)
+
+    hsv = np.stack((hue, saturation, value), axis=-1)
+    bad = ~np.isfinite(w)
+    hsv[bad] = (0.0, 0.0, 1.0)  # Poles and undefined points render white
+    hsv[np.isnan(hsv)] = 0.0
+    return hsv_to_rgb(hsv)
+
+
+def render_domain_coloring(expression, extent, width, height):
+    """Evaluate f(z) over the whole grid in one vectorized call and color it"""
+    z = complex_grid(*extent, width, height)
+    w = expression.vectorized(shape=z.shape, z=z)
+    return domain_coloring(w)
+
+
+# Marching squares. Corners: v0 (x0, y0), v1 (x1, y0), v2 (x1, y1), v3 (x0, y1);
+# edges: 0 = v0-v1, 1 = v1-v2, 2 = v3-v2, 3 = v0-v3. Cases 16/17 are the
+# saddle cases 5/10 when the cell center is positive.
+_SEGMENT_TABLE = {
+    1: [(3, 0)], 2: [(0, 1)], 3: [(3, 1)], 4: [(1, 2)],
+    5: [(3, 0), (1, 2)], 6: [(0, 2)], 7: [(3, 2)], 8: [(2, 3)],
+    9: [(0, 2)], 10: [(0, 1), (2, 3)], 11: [(1, 2)], 12: [(3, 1)],
+    13: [(0, 1)], 14: [(3, 0)], 16: [(0, 1), (2, 3)], 17: [(3, 0), (1, 2)],
+}
+_EDGE_A = np.full((18, 2), -1)
+_EDGE_B = np.full((18, 2), -1)
+for _case, _pairs in _SEGMENT_TABLE.items():
+    for _slot, (_a, _b) in enumerate(_pairs):
+        _EDGE_A[_case, _slot] = _a
+        _EDGE_B[_case, _slot] = _b
+
+
+def _interpolate(fa, fb, pa, pb):
+    with np.errstate(all='ignore'):
+        t = np.clip(fa / (fa - fb), 0.0, 1.0)
+    return pa + np.nan_to_num(t) * (pb - pa)
+
+
+def marching_squares(f, x, y):
+    """Zero-contour segments (M, 2, 2) of sampled grids; leading batch axes allowed"""
+    f0, f1, f2, f3 = f[..., :-1, :-1], f[..., :-1, 1:], f[..., 1:, 1:], f[..., 1:, :-1]
+    x0, x1 = x[..., :-1, :-1], x[..., :-1, 1:]
+    y0, y1 = y[..., :-1, :-1], y[..., 1:, :-1]
+
+    case = ((f0 > 0).astype(np.int8) | (f1 > 0) << 1 | (f2 > 0) << 2 | (f3 > 0) << 3)
+    center_positive = (f0 + f1 + f2 + f3) > 0
+    case = np.where((case == 5) & center_positive, 16, case)
+    case = np.where((case == 10) & center_positive, 17, case)
+    valid = np.isfinite(f0) & np.isfinite(f1) & np.isfinite(f2) & np.isfinite(f3)
+
+    edge_x = np.stack((_interpolate(f0, f1, x0, x1), np.broadcast_to(x1, f0.shape),
+                       _interpolate(f3, f2, x0, x1), np.broadcast_to(x0, f0.shape)))
+    edge_y = np.stack((np.broadcast_to(y0, f0.shape), _interpolate(f1, f2, y0, y1),
+                       np.broadcast_to(y1, f0.shape), _interpolate(f0, f3, y0, y1)))
+
+    segments = []
+    for slot in (0, 1):
+        edge_a = _EDGE_A[case, slot]
+        mask = (edge_a >= 0) & valid
+        if not mask.any():
+            continue
+        cells = np.nonzero(mask)
+        a = edge_a[mask]
+        b = _EDGE_B[case, slot][mask]
+        start = np.stack((edge_x[(a,) + cells], edge_y[(a,) + cells]), axis=-1)
+        end = np.stack((edge_x[(b,) + cells], edge_y[(b,) + cells]), axis=-1)
+        segments.append(np.stack((start, end), axis=1))
+    if not segments:
+        return np.empty((0, 2, 2))
+    return np.concatenate(segments)
+
+
+def _crossing_cells(f):
+    positive = f > 0
+    corners = (positive[:-1, :-1].astype(np.int8) + positive[:-1, 1:]
+               + positive[1:, 1:] + positive[1:, :-1])
+    finite = np.isfinite(f)
+    valid = finite[:-1, :-1] & finite[:-1, 1:] & finite[1:, 1:] & finite[1:, :-1]
+    crossing = (corners > 0) & (corners < 4) & valid
+    # Include neighbours so curves that barely touch a coarse cell are refined too
+    dilated = crossing.copy()
+    dilated[1:, :] |= crossing[:-1, :]
+    dilated[:-1, :] |= crossing[1:, :]
+    dilated[:, 1:] |= crossing[:, :-1]
+    dilated[:, :-1] |= crossing[:, 1:]
+    return dilated
+
+
+def implicit_segments(expression, extent, coarse=256, refine=8):
+    """Segments of F(x, y) = 0: coarse grid pass, then refinement of crossing cells only"""
+    x_min, x_max, y_min, y_max = extent
+    xs = np.linspace(x_min, x_max, coarse + 1)
+    ys = np.linspace(y_min, y_max, coarse + 1)
+    grid_x, grid_y = np.meshgrid(xs, ys)
+    f = np.asarray(expression.vectorized(shape=grid_x.shape, x=grid_x, y=grid_y), dtype=float)
+    if refine <= 1:
+        return marching_squares(f, grid_x, grid_y)
+
+    rows, cols = np.nonzero(_crossing_cells(f))
+    if rows.size == 0:
+        return np.empty((0, 2, 2))
+    u = np.linspace(0.0, 1.0, refine + 1)
+    sub_x = xs[cols][:, None, None] + u[None, None, :] * (xs[1] - xs[0])
+    sub_y = ys[rows][:, None, None] + u[None, :, None] * (ys[1] - ys[0])
+    sub_x, sub_y = np.broadcast_arrays(sub_x, sub_y)
+    sub_f = np.asarray(expression.vectorized(shape=sub_x.shape, x=sub_x, y=sub_y), dtype=float)
+    return marching_squares(sub_f, sub_x, sub_y)
+
+
+def implicit_source(source):
+    """Rewrite 'lhs = rhs' as '(lhs) - (rhs)'"""
+    parts = _EQUALS.split(source)
+    if len(parts) == 2:
+        return f"({parts[0]}) - ({parts[1]})"
+    if len(parts) > 2:
+        raise ValueError("Implicit equation may contain only one '='")
+    return source
+
+
+def parametric_sources(source):
+    """Split 'x(t); y(t)' into its two component expressions"""
+    parts = [part.strip() for part in source.split(';')]
+    if len(parts) != 2 or not all(parts):
+        raise ValueError("Enter parametric curves as x(t); y(t)")
+    return parts
+
+
+def surface_grid(expression, extent, resolution):
+    """Evaluate z = f(x, y) over a meshgrid in one broadcasted call"""
+    x_min, x_max, y_min, y_max = extent
+    x = np.linspace(x_min, x_max, resolution)[np.newaxis, :]
+    y = np.linspace(y_min, y_max, resolution)[:, np.newaxis]
+    z = np.asarray(expression.vectorized(shape=(resolution, resolution), x=x, y=y), dtype=float)
+    grid_x, grid_y = np.broadcast_arrays(x, y)
+    return grid_x, grid_y, np.where(np.isfinite(z), z, np.nan)
+
+
+def decimate_grid(x, y, z, max_count):
+    """Stride a surface down to at most max_count samples per axis, keeping the edges"""
+    rows, cols = z.shape
+    row_index = np.unique(np.linspace(0, rows - 1, min(rows, max_count)).astype(int))
+    col_index = np.unique(np.linspace(0, cols - 1, min(cols, max_count)).astype(int))
+    mesh = np.ix_(row_index, col_index)
+    return x[mesh], y[mesh], z[mesh]
+
+
+def density_grid(x, y, extent, width, height, chunk_size=4_000_000):
+    """Point counts per pixel over extent: datashader-style rasterization
+
+    Bin indices are computed arithmetically and counted with np.bincount in
+    fixed-size chunks, so memory stays bounded however many points there are.
+    """
+    x_min, x_max, y_min, y_max = extent
+    x_scale = width / (x_max - x_min)
+    y_scale = height / (y_max - y_min)
+    counts = np.zeros(width * height, dtype=np.int64)
+    for start in range(0, x.size, chunk_size):
+        cx = (x[start:start + chunk_size] - x_min) * x_scale
+        cy = (y[start:start + chunk_size] - y_min) * y_scale
+        inside = (cx >= 0) & (cx < width) & (cy >= 0) & (cy < height)
+        flat = cy[inside].astype(np.intp) * width + cx[inside].astype(np.intp)
+        counts += np.bincount(flat, minlength=width * height)
+    return counts.reshape(height, width)
+
+
+def data_extent(x, y):
+    """Bounding box of finite points, padded so a single point still has area"""
+    if x.size == 0:
+        return (-1.0, 1.0, -1.0, 1.0)
+    bounds = (float(x.min()), float(x.max()), float(y.min()), float(y.max()))
+    if not np.all(np.isfinite(bounds)):
+        # Slow path only when the data holds NaN or inf
+        finite = np.isfinite(x) & np.isfinite(y)
+        if not finite.any():
+            return (-1.0, 1.0, -1.0, 1.0)
+        bounds = (float(x[finite].min()), float(x[finite].max()),
+                  float(y[finite].min()), float(y[finite].max()))
+    x_min, x_max, y_min, y_max = bounds
+    x_pad = (x_max - x_min) * 0.02 or 1.0
+    y_pad = (y_max - y_min) * 0.02 or 1.0
+    return (x_min - x_pad, x_max + x_pad, y_min - y_pad, y_max + y_pad)
@@ -0,0 +1,753 @@
+import ast
+import math
+import operator
+
+import numpy as np
+
+import expression_engine
+
+DEFAULT_BUDGET = 100_000_000  # Loop iterations plus function calls per run
+CHECK_INTERVAL = 4096         # Steps between cancellation checks
+VECTOR_CHUNK = 1 << 20        # Loop iterations per vectorized pass
+MAX_DEPTH = 200               # Script function call depth
+_EXACT = 2.0 ** 53            # Integers below this survive a round trip through float64
+
+_BREAK = object()
+_CONTINUE = object()
+_RETURN = object()
+
+_BINARY = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+    ast.Div: operator.truediv, ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod,
+    ast.Pow: operator.pow, ast.BitAnd: operator.and_, ast.BitOr: operator.or_,
+    ast.BitXor: operator.xor, ast.LShift: operator.lshift, ast.RShift: operator.rshift,
+}
+_UNARY = {ast.USub: operator.neg, ast.UAdd: operator.pos, ast.Not: operator.not_, ast.Invert: operator.invert}
+# Real functions that return a float for any real argument
+_FLOAT_FUNCTIONS = frozenset({'sin', 'cos', 'tan', 'asin', 'acos', 'atan', 'atan2', 'sinh', 'cosh', 'tanh',
+                              'log', 'ln', 'log2', 'exp', 'sqrt', 'cbrt'})
+_COMPARE = {
+    ast.Eq: operator.eq, ast.NotEq: operator.ne, ast.Lt: operator.lt,
+    ast.LtE: operator.le, ast.Gt: operator.gt, ast.GtE: operator.ge,
+}
+
+
+class _Unset:
+    """Initial value of a variable slot: any use reports the variable by name"""
+
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return f"<unset {self.name}>"
+
+    def _fail(self, *args):
+        raise NameError(f"'{self.name}' used before assignment")
+
+
+for _method in ('add', 'sub', 'mul', 'truediv', 'floordiv', 'mod', 'pow', 'and', 'or', 'xor',
+                'lshift', 'rshift'):
+    setattr(_Unset, f'__{_method}__', _Unset._fail)
+    setattr(_Unset, f'__r{_method}__', _Unset._fail)
+for _method in ('neg', 'pos', 'invert', 'abs', 'bool', 'float', 'int', 'complex', 'index',
+                'lt', 'le', 'gt', 'ge', 'eq', 'ne', 'str', 'format', 'round', 'floor', 'ceil', 'trunc'):
+    setattr(_Unset, f'__{_method}__', _Unset._fail)
+
+
+def _unset_frame(names):
+    return [_Unset(name.strip('\0')) for name in names]
+
+
+class ScriptError(ValueError):
+    """A compile or run-time error, located by script line"""
+
+    def __init__(self, message, line=None):
+        super().__init__(f"Line {line}: {message}" if line else message)
+        self.line = line
+
+
+class _Runtime:
+    """Per-run step budget, cancellation and output"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self, budget=DEFAULT_BUDGET, cancel=None, output=None):
+        self.budget = budget
+        self.used = 0
+        self.cancel = cancel
+        self.output = output or (lambda text: None)
+        self.depth = 0
+
+    def spend(self, steps, line):
+        self.used += steps
+        if self.used > self.budget:
+            raise ScriptError(f"Step budget of {self.budget:,} exceeded", line)
+        if self.cancel is not None and self.cancel.is_set():
+            raise ScriptError("Cancelled", line)
+
+
+class _Function:
+    """A compiled script function: parameters occupy the first frame slots"""
+
+    def __init__(self, name, params):
+        self.name = name
+        self.params = params
+        self.locals = []  # Unset values for the non-parameter slots
+        self.body = None
+
+    def invoke(self, runtime, args, line):
+        if len(args) != len(self.params):
+            raise ScriptError(f"{self.name}() takes {len(self.params)} argument(s), got {len(args)}", line)
+        runtime.depth += 1
+        try:
+            if runtime.depth > MAX_DEPTH:
+                raise ScriptError(f"Recursion deeper than {MAX_DEPTH} calls", line)
+            runtime.spend(1, line)
+            frame = args + self.locals
+            if self.body(frame) is _RETURN:
+                return frame[-1]
+            return None
+        finally:
+            runtime.depth -= 1
+
+
+def _assigned_names(statements):
+    """Names bound by assignments and for loops anywhere in these statements"""
+    names = set()
+    for statement in statements:
+        for node in ast.walk(statement):
+            if isinstance(node, (ast.Assign, ast.AugAssign, ast.For)):
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                names.update(target.id for target in targets if isinstance(target, ast.Name))
+    return names
+
+
+class _Scope:
+    """Slot numbering for one frame (the module or a function call)"""
+
+    def __init__(self, names, module=None):
+        self.slots = {name: index for index, name in enumerate(names)}
+        self.module = module  # Module scope, for globals read inside functions
+
+    def add(self, name):
+        return self.slots.setdefault(name, len(self.slots))
+
+
+class Program:
+    """A script compiled to a tree of Python closures
+
+    Scripts use Python statement syntax (assignments, if/elif/else, while,
+    for over range(), def/return, break/continue, print) with the
+    calculator's expression language. Nothing is passed to eval or exec:
+    every node becomes a closure over frame slots. A for loop whose body
+    only accumulates (s += f(i)) is run as chunked NumPy passes when the
+    result is provably the same as the scalar loop's: integer sums are
+    exact and float sums are accumulated in the loop's own order.
+    """
+
+    def __init__(self, source, inputs=()):
+        """inputs names variables the caller will seed through run()"""
+        self.source = source
+        try:
+            tree = ast.parse(expression_engine.translate(source), mode='exec')
+        except SyntaxError as e:
+            raise ScriptError(e.msg, e.lineno)
+        self.runtime = _Runtime()
+        self.functions = {}
+        self._loop_depth = 0
+        body = []
+        for statement in tree.body:
+            if isinstance(statement, ast.FunctionDef):
+                self._declare(statement)
+            else:
+                body.append(statement)
+        self.scope = _Scope(sorted(_assigned_names(body) | set(inputs)))
+        for name in self.functions:
+            if name in self.scope.slots:
+                raise ScriptError(f"'{name}' is both a function and a variable")
+        for statement in tree.body:
+            if isinstance(statement, ast.FunctionDef):
+                self._define(statement)
+        self.body = self._block(body, self.scope)
+        self.frame = []
+        self.vectorized_loops = 0
+
+    # Functions
+    def _declare(self, node):
+        args = node.args
+        if args.vararg or args.kwarg or args.kwonlyargs or args.defaults or args.posonlyargs:
+            raise ScriptError("Functions take plain positional parameters only", node.lineno)
+        if node.decorator_list:
+            raise ScriptError("Decorators are not supported", node.lineno)
+        if node.name in self.functions or node.name in expression_engine.KNOWN_NAMES:
+            raise ScriptError(f"'{node.name}' is already defined", node.lineno)
+        self.functions[node.name] = _Function(node.name, [arg.arg for arg in args.args])
+
+    def _define(self, node):
+        function = self.functions[node.name]
+        scope = _Scope(function.params, module=self.scope)
+        for name in sorted(_assigned_names(node.body) - set(function.params)):
+            scope.add(name)
+        function.body = self._block(node.body, scope)
+        scope.add('\0return')  # Last slot holds the return value
+        function.locals = _unset_frame(list(scope.slots)[len(function.params):])
+
+    # Statements: closures taking the frame and returning None or a control signal
+    def _block(self, statements, scope):
+        compiled = [self._statement(statement, scope) for statement in statements]
+        if len(compiled) == 1:
+            return compiled[0]
+
+        def block(frame):
+            for statement in compiled:
+                signal = statement(frame)
+                if signal is not None:
+                    return signal
+        return block
+
+    def _statement(self, node, scope):
+        method = getattr(self, '_' + type(node).__name__, None)
+        if method is None:
+            raise ScriptError(f"Unsupported statement: {type(node).__name__}", node.lineno)
+        return method(node, scope)
+
+    def _Assign(self, node, scope):
+        if len(node.targets) != 1 or not isinstance(node.targets[0], ast.Name):
+            raise ScriptError("Assign to a single name", node.lineno)
+        slot = scope.slots[node.targets[0].id]
+        value = self._expression(node.value, scope)
+        line = node.lineno
+
+        def assign(frame):
+            try:
+                frame[slot] = value(frame)
+            except Exception as e:
+                _fail(e, line)
+        return assign
+
+    def _AugAssign(self, node, scope):
+        if not isinstance(node.target, ast.Name):
+            raise ScriptError("Assign to a single name", node.lineno)
+        slot = scope.slots[node.target.id]
+        op = _BINARY.get(type(node.op))
+        if op is None:
+            raise ScriptError(f"Unsupported operator: {type(node.op).__name__}", node.lineno)
+        value = self._binary(op, ('slot', slot), self._operand(node.value, scope))
+        line = node.lineno
+
+        def augment(frame):
+            try:
+                frame[slot] = value(frame)
+            except Exception as e:
+                _fail(e, line)
+        return augment
+
+    def _Expr(self, node, scope):
+        value = self._expression(node.value, scope)
+        line = node.lineno
+
+        def discard(frame):
+            try:
+                value(frame)
+            except Exception as e:
+                _fail(e, line)
+        return discard
+
+    def _Pass(self, node, scope):
+        return lambda frame: None
+
+    def _Break(self, node, scope):
+        if not self._loop_depth:
+            raise ScriptError("break outside a loop", node.lineno)
+        return lambda frame: _BREAK
+
+    def _Continue(self, node, scope):
+        if not self._loop_depth:
+            raise ScriptError("continue outside a loop", node.lineno)
+        return lambda frame: _CONTINUE
+
+    def _Return(self, node, scope):
+        if scope.module is None:
+            raise ScriptError("return outside a function", node.lineno)
+        value = self._expression(node.value, scope) if node.value is not None else (lambda frame: None)
+        slot = len(scope.slots)  # The return slot is added after the body is compiled
+        line = node.lineno
+
+        def give(frame):
+            try:
+                frame[slot] = value(frame)
+            except Exception as e:
+                _fail(e, line)
+            return _RETURN
+        return give
+
+    def _If(self, node, scope):
+        test = self._expression(node.test, scope)
+        body = self._block(node.body, scope)
+        orelse = self._block(node.orelse, scope) if node.orelse else (lambda frame: None)
+        line = node.lineno
+
+        def branch(frame):
+            try:
+                condition = test(frame)
+            except Exception as e:
+                _fail(e, line)
+            return body(frame) if condition else orelse(frame)
+        return branch
+
+    def _While(self, node, scope):
+        if node.orelse:
+            raise ScriptError("while/else is not supported", node.lineno)
+        test = self._expression(node.test, scope)
+        body = self._loop_body(node.body, scope)
+        runtime, line = self.runtime, node.lineno
+
+        def loop(frame):
+            pending = 0
+            try:
+                while test(frame):
+                    pending += 1
+                    if pending == CHECK_INTERVAL:
+                        runtime.spend(pending, line)
+                        pending = 0
+                    signal = body(frame)
+                    if signal is not None:
+                        if signal is _BREAK:
+                            break
+                        if signal is not _CONTINUE:
+                            return signal
+            except Exception as e:
+                _fail(e, line)
+            finally:
+                runtime.used += pending
+        return loop
+
+    def _For(self, node, scope):
+        if node.orelse:
+            raise ScriptError("for/else is not supported", node.lineno)
+        call = node.iter
+        if not (isinstance(node.target, ast.Name) and isinstance(call, ast.Call)
+                and isinstance(call.func, ast.Name) and call.func.id == 'range'
+                and 1 <= len(call.args) <= 3 and not call.keywords):
+            raise ScriptError("Loops are 'for name in range(...)'", node.lineno)
+        slot = scope.slots[node.target.id]
+        bounds = [self._expression(arg, scope) for arg in call.args]
+        body = self._loop_body(node.body, scope)
+        runtime, line = self.runtime, node.lineno
+
+        def make_range(frame):
+            values = []
+            for bound in bounds:
+                value = bound(frame)
+                if isinstance(value, float) and value.is_integer():
+                    value = int(value)
+                if not isinstance(value, int):
+                    raise ScriptError("range() needs integer bounds", line)
+                values.append(value)
+            return range(*values)
+
+        def scalar(frame, steps):
+            pending = 0
+            try:
+                for i in steps:
+                    frame[slot] = i
+                    pending += 1
+                    if pending == CHECK_INTERVAL:
+                        runtime.spend(pending, line)
+                        pending = 0
+                    signal = body(frame)
+                    if signal is not None:
+                        if signal is _BREAK:
+                            break
+                        if signal is not _CONTINUE:
+                            return signal
+            finally:
+                runtime.used += pending
+
+        vector = self._vectorize(node, scope)
+
+        def loop(frame):
+            steps = make_range(frame)
+            if vector is not None:
+                steps = vector(frame, steps)
+            return scalar(frame, steps) if steps else None
+        return loop
+
+    def _loop_body(self, statements, scope):
+        self._loop_depth += 1
+        try:
+            return self._block(statements, scope)
+        finally:
+            self._loop_depth -= 1
+
+    # Auto-vectorization
+    def _vectorize(self, node, scope):
+        """Chunked NumPy runner for loops of independent accumulations, else None
+
+        Eligible bodies are only 's += f(i)', 's -= f(i)', 's *= f(i)' (or
+        s = s + f(i) ...) where f reads the loop variable and names the loop
+        never assigns. The runner returns the part of the range it could
+        not take exactly, including any chunk with a NaN or infinite term
+        (to finish in the scalar loop).
+        """
+        assigned = _assigned_names(node.body) | {node.target.id}
+        updates = []
+        for statement in node.body:
+            if isinstance(statement, ast.AugAssign) and isinstance(statement.target, ast.Name):
+                name, op, term = statement.target.id, type(statement.op), statement.value
+            elif (isinstance(statement, ast.Assign) and len(statement.targets) == 1
+                  and isinstance(statement.targets[0], ast.Name) and isinstance(statement.value, ast.BinOp)
+                  and isinstance(statement.value.left, ast.Name)
+                  and statement.value.left.id == statement.targets[0].id):
+                name, op, term = statement.targets[0].id, type(statement.value.op), statement.value.right
+            else:
+                return None
+            if op not in (ast.Add, ast.Sub, ast.Mult) or name == node.target.id:
+                return None
+            if any(isinstance(sub, (ast.IfExp, ast.BoolOp, ast.Compare))
+                   or (isinstance(sub, ast.Name) and sub.id in assigned and sub.id != node.target.id)
+                   or (isinstance(sub, ast.Call) and sub.func.id not in expression_engine.VECTOR_NAMESPACE
+                       and sub.func.id not in expression_engine.USER_NAMESPACES['vector'])
+                   for sub in ast.walk(term)):
+                return None
+            updates.append((name, op, term))
+        if not updates or len({name for name, _, _ in updates}) != len(updates):
+            return None
+
+        loop_slot = scope.slots[node.target.id]
+        compiled = [(scope.slots[name], op, self._expression(term, scope, vector=True),
+                     self._expression(term, scope, magnitude=True), term)
+                    for name, op, term in updates]
+        runtime, line = self.runtime, node.lineno
+        read_names = {sub.id for _, _, term in updates for sub in ast.walk(term) if isinstance(sub, ast.Name)}
+
+        def run(frame, steps):
+            if len(steps) < 2 * CHECK_INTERVAL:
+                return steps
+            accumulators = [frame[slot] for slot, _, _, _, _ in compiled]
+            if any(not isinstance(value, (int, float, complex)) or isinstance(value, bool)
+                   for value in accumulators):
+                return steps
+            integer_names = {node.target.id} | {
+                name for name in read_names if name in scope.slots
+                and isinstance(frame[scope.slots[name]], int) and not isinstance(frame[scope.slots[name]], bool)}
+            float_names = {name for name in read_names if name in scope.slots
+                           and isinstance(frame[scope.slots[name]], (float, complex))}
+            integral = [isinstance(value, int) and _integer_valued(term, integer_names)
+                        for value, (_, _, _, _, term) in zip(accumulators, compiled)]
+            if any(isinstance(value, int) and not exact and not _float_valued(term, float_names)
+                   for value, exact, (_, _, _, _, term) in zip(accumulators, integral, compiled)):
+                return steps  # An int accumulator the scalar loop might keep an int (s += i % 2)
+            original, last = frame[loop_slot], steps[-1]
+            for start in range(0, len(steps), VECTOR_CHUNK):
+                chunk = steps[start:start + VECTOR_CHUNK]
+                if any(integral) and not self._exact(frame, loop_slot, chunk, compiled, accumulators, integral):
+                    # Hand the rest to the scalar loop, which keeps big integers exact
+                    frame[loop_slot] = steps[start - 1] if start else original
+                    self._store(frame, compiled, accumulators)
+                    return steps[start:]
+                frame[loop_slot] = np.arange(chunk.start, chunk.stop, chunk.step, dtype=float)
+                with np.errstate(all='ignore'):
+                    terms = [np.broadcast_to(vectorized(frame), (len(chunk),))
+                             for _, _, vectorized, _, _ in compiled]
+                if not all(np.isfinite(values).all() for values in terms):
+                    # NaN or inf where the scalar loop raises (sqrt(-1), 1/0) or overflows:
+                    # let it run from here so it fails or rounds exactly as it would have
+                    frame[loop_slot] = steps[start - 1] if start else original
+                    self._store(frame, compiled, accumulators)
+                    return steps[start:]
+                runtime.spend(len(chunk), line)
+                for k, ((_, op, _, _, _), values) in enumerate(zip(compiled, terms)):
+                    if integral[k]:
+                        # Every partial result is an integer below 2^53, so any order is exact
+                        reduced = int(values.prod() if op is ast.Mult else values.sum())
+                        if op is ast.Add:
+                            accumulators[k] = accumulators[k] + reduced
+                        elif op is ast.Sub:
+                            accumulators[k] = accumulators[k] - reduced
+                        else:
+                            accumulators[k] = accumulators[k] * reduced
+                        continue
+                    # Floats: cumsum/cumprod add in loop order, rounding exactly as s += t does
+                    start_value = float(accumulators[k]) if isinstance(accumulators[k], int) else accumulators[k]
+                    sequence = np.concatenate(([start_value], -values if op is ast.Sub else values))
+                    accumulated = np.cumprod(sequence) if op is ast.Mult else np.cumsum(sequence)
+                    accumulators[k] = accumulated[-1].item()
+                self.vectorized_loops += 1
+            frame[loop_slot] = last
+            self._store(frame, compiled, accumulators)
+            return range(0)
+        return run
+
+    @staticmethod
+    def _exact(frame, loop_slot, chunk, compiled, accumulators, integral):
+        """Whether float64 reproduces the integer results exactly (all magnitudes below 2^53)"""
+        frame[loop_slot] = float(max(abs(chunk[0]), abs(chunk[-1])))
+        for k, (_, op, _, magnitude, _) in enumerate(compiled):
+            if not integral[k]:
+                continue
+            bound = abs(magnitude(frame))  # Bounds every intermediate: |a - b| <= |a| + |b|
+            if op is ast.Mult:
+                total = abs(accumulators[k]) * bound if bound <= 1 else math.inf
+            else:
+                total = abs(accumulators[k]) + bound * len(chunk)
+            if not total < _EXACT:
+                return False
+        return True
+
+    @staticmethod
+    def _store(frame, compiled, accumulators):
+        for (slot, _, _, _, _), value in zip(compiled, accumulators):
+            frame[slot] = value
+
+    # Expressions: closures taking the frame and returning a value
+    def _operand(self, node, scope, vector=False, magnitude=False):
+        """('slot', index) for local names, ('const', value) or ('code', closure)
+
+        Operators specialize on their operand kinds, so r * x reads both
+        slots in one closure instead of three nested calls.
+        """
+        line = getattr(node, 'lineno', None)
+        if isinstance(node, ast.Constant):
+            if not isinstance(node.value, (int, float, complex)):
+                raise ScriptError("Only numeric constants are allowed", line)
+            return 'const', abs(node.value) if magnitude else node.value
+        if isinstance(node, ast.Name):
+            name = node.id
+            if name in scope.slots:
+                slot = scope.slots[name]
+                if magnitude:
+                    return 'code', lambda frame: abs(frame[slot])
+                return 'slot', slot
+            if scope.module is not None and name in scope.module.slots:
+                slot, program = scope.module.slots[name], self  # Globals live in self.frame
+                if magnitude:
+                    return 'code', lambda frame: abs(program.frame[slot])
+                return 'code', lambda frame: program.frame[slot]
+            namespace = expression_engine.VECTOR_NAMESPACE if vector else expression_engine.REAL_NAMESPACE
+            if name in namespace and not callable(namespace[name]):
+                return 'const', abs(namespace[name]) if magnitude else namespace[name]
+            raise ScriptError(f"Unknown name '{name}'", line)
+        return 'code', self._expression(node, scope, vector, magnitude)
+
+    @staticmethod
+    def _closure(operand):
+        kind, value = operand
+        if kind == 'slot':
+            return lambda frame: frame[value]
+        if kind == 'const':
+            return lambda frame: value
+        return value
+
+    @staticmethod
+    def _binary(op, left, right):
+        """Closure applying a binary operator to two operands"""
+        (left_kind, a), (right_kind, b) = left, right
+        if left_kind == 'const' and right_kind == 'const':
+            return lambda frame: op(a, b)  # Errors such as 1/0 still surface at run time
+        if left_kind == 'slot' and right_kind == 'slot':
+            return lambda frame: op(frame[a], frame[b])
+        if left_kind == 'slot' and right_kind == 'const':
+            return lambda frame: op(frame[a], b)
+        if left_kind == 'const' and right_kind == 'slot':
+            return lambda frame: op(a, frame[b])
+        if left_kind == 'slot':
+            return lambda frame: op(frame[a], b(frame))
+        if right_kind == 'slot':
+            return lambda frame: op(a(frame), frame[b])
+        if right_kind == 'const':
+            return lambda frame: op(a(frame), b)
+        if left_kind == 'const':
+            return lambda frame: op(a, b(frame))
+        return lambda frame: op(a(frame), b(frame))
+
+    def _expression(self, node, scope, vector=False, magnitude=False):
+        """Compile an expression node; vector uses NumPy functions, magnitude bounds |value|"""
+        line = getattr(node, 'lineno', None)
+        compile_ = lambda child: self._expression(child, scope, vector, magnitude)  # noqa: E731
+        operand = lambda child: self._operand(child, scope, vector, magnitude)  # noqa: E731
+
+        if isinstance(node, ast.Name):
+            read = self._closure(operand(node))
+
+            def name(frame):
+                value = read(frame)
+                if type(value) is _Unset:  # Copied or passed on, it would fail far from here
+                    value._fail()
+                return value
+            return name
+        if isinstance(node, ast.Constant):
+            return self._closure(operand(node))
+
+        if isinstance(node, ast.BinOp):
+            op_type = type(node.op)
+            if magnitude and op_type is ast.Sub:
+                op_type = ast.Add  # |a - b| <= |a| + |b|
+            if magnitude and op_type is ast.Mod:
+                return compile_(node.right)  # |a % b| < |b|
+            if magnitude and op_type is ast.FloorDiv:
+                return compile_(node.left)  # |a // b| <= |a| for integers b != 0
+            op = _BINARY.get(op_type)
+            if op is None:
+                raise ScriptError(f"Unsupported operator: {op_type.__name__}", line)
+            return self._binary(op, operand(node.left), operand(node.right))
+
+        if isinstance(node, ast.UnaryOp):
+            inner = compile_(node.operand)
+            if magnitude and isinstance(node.op, (ast.USub, ast.UAdd)):
+                return inner
+            op = _UNARY[type(node.op)]
+            return lambda frame: op(inner(frame))
+
+        if isinstance(node, ast.Compare):
+            if len(node.ops) == 1:
+                return self._binary(_COMPARE[type(node.ops[0])], operand(node.left), operand(node.comparators[0]))
+            left = compile_(node.left)
+            pairs = [(_COMPARE[type(op)], compile_(right)) for op, right in zip(node.ops, node.comparators)]
+
+            def compare(frame):
+                current = left(frame)
+                for op, right in pairs:
+                    following = right(frame)
+                    if not op(current, following):
+                        return False
+                    current = following
+                return True
+            return compare
+
+        if isinstance(node, ast.BoolOp):
+            values = [compile_(value) for value in node.values]
+            if isinstance(node.op, ast.And):
+                def all_of(frame):
+                    result = True
+                    for value in values:
+                        result = value(frame)
+                        if not result:
+                            return result
+                    return result
+                return all_of
+
+            def any_of(frame):
+                result = False
+                for value in values:
+                    result = value(frame)
+                    if result:
+                        return result
+                return result
+            return any_of
+
+        if isinstance(node, ast.IfExp):
+            test, body, orelse = compile_(node.test), compile_(node.body), compile_(node.orelse)
+            return lambda frame: body(frame) if test(frame) else orelse(frame)
+
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.keywords:
+                raise ScriptError("Only named functions with positional arguments can be called", line)
+            return self._call(node.func.id, [compile_(arg) for arg in node.args], line, vector)
+
+        raise ScriptError(f"Unsupported syntax: {type(node).__name__}", line)
+
+    def _call(self, name, args, line, vector):
+        runtime = self.runtime
+        if name == 'print':
+            def show(frame):
+                runtime.output(' '.join(_format(arg(frame)) for arg in args))
+            return show
+        if name in self.functions:
+            function = self.functions[name]
+            if len(args) != len(function.params):
+                raise ScriptError(f"{name}() takes {len(function.params)} argument(s), got {len(args)}", line)
+            return lambda frame: function.invoke(runtime, [arg(frame) for arg in args], line)
+        mode = 'vector' if vector else 'real'
+        function = expression_engine.USER_NAMESPACES[mode].get(name, expression_engine.NAMESPACES[mode].get(name))
+        if not callable(function):
+            raise ScriptError(f"Unknown function '{name}'", line)
+        if len(args) == 1:
+            (arg,) = args
+            return lambda frame: function(arg(frame))
+        return lambda frame: function(*[arg(frame) for arg in args])
+
+    # Running
+    def run(self, budget=DEFAULT_BUDGET, cancel=None, output=None, variables=None):
+        """Execute the script; returns its top-level variables
+
+        budget caps loop iterations plus function calls; cancel is a
+        threading.Event checked every CHECK_INTERVAL steps; output(text)
+        receives print() lines; variables seed top-level names.
+        """
+        self.runtime.reset(budget, cancel, output)
+        self.frame = _unset_frame(self.scope.slots)
+        for name, value in (variables or {}).items():
+            if name in self.scope.slots:
+                self.frame[self.scope.slots[name]] = value
+        self.vectorized_loops = 0
+        self.body(self.frame)
+        return {name: self.frame[slot] for name, slot in self.scope.slots.items()
+                if not isinstance(self.frame[slot], _Unset)}
+
+    @property
+    def steps(self):
+        return self.runtime.used
+
+
+def _integer_valued(node, integer_names):
+    """Whether an expression yields Python ints when these names hold ints"""
+    if isinstance(node, ast.Constant):
+        return isinstance(node.value, int) and not isinstance(node.value, bool)
+    if isinstance(node, ast.Name):
+        return node.id in integer_names
+    if isinstance(node, ast.UnaryOp):
+        return isinstance(node.op, (ast.USub, ast.UAdd)) and _integer_valued(node.operand, integer_names)
+    if isinstance(node, ast.BinOp):
+        if isinstance(node.op, ast.Pow):
+            return (_integer_valued(node.left, integer_names) and isinstance(node.right, ast.Constant)
+                    and isinstance(node.right.value, int) and node.right.value >= 0)
+        return (isinstance(node.op, (ast.Add, ast.Sub, ast.Mult, ast.Mod, ast.FloorDiv))
+                and _integer_valued(node.left, integer_names) and _integer_valued(node.right, integer_names))
+    if isinstance(node, ast.Call):
+        return node.func.id == 'abs' and all(_integer_valued(arg, integer_names) for arg in node.args)
+    return False
+
+
+def _float_valued(node, float_names):
+    """Whether an expression yields a float (or complex) in the scalar loop whatever ints it reads"""
+    if isinstance(node, ast.Constant):
+        return isinstance(node.value, (float, complex))
+    if isinstance(node, ast.Name):
+        return node.id in float_names
+    if isinstance(node, ast.UnaryOp):
+        return isinstance(node.op, (ast.USub, ast.UAdd)) and _float_valued(node.operand, float_names)
+    if isinstance(node, ast.BinOp):
+        if isinstance(node.op, ast.Div):
+            return True
+        return (isinstance(node.op, (ast.Add, ast.Sub, ast.Mult, ast.Mod, ast.FloorDiv, ast.Pow))
+                and (_float_valued(node.left, float_names) or _float_valued(node.right, float_names)))
+    if isinstance(node, ast.Call):
+        return node.func.id in _FLOAT_FUNCTIONS
+    return False
+
+
+def _fail(error, line):
+    """Re-raise an error from a statement as a ScriptError carrying its line"""
+    if isinstance(error, ScriptError):
+        raise error
+    if isinstance(error, RecursionError):
+        raise ScriptError("Recursion too deep", line)
+    raise ScriptError(str(error) or type(error).__name__, line) from error
+
+
+def _format(value):
+    if isinstance(value, float):
+        return f"{value:.12g}"
+    if isinstance(value, np.ndarray):
+        return np.array2string(value, precision=6, threshold=20)
+    return str(value)
+
+
+def run_script(source, **options):
+    """Compile and run a script; returns (variables, program)"""
+    program = Program(source, options.get('variables') or ())
+    return program.run(**options), program
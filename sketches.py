@@ -0,0 +1,308 @@
+import json
+import math
+
+import numpy as np
+
+import data_io
+from stats_engine import MomentState, iter_range_values
+
+
+class KLLSketch:
+    """KLL quantile sketch: levels of compactors, level h items weigh 2**h
+
+    Compactions sort a whole level and promote every other item with a
+    random offset, so updates from NumPy chunks stay vectorized.
+    """
+
+    def __init__(self, k=200, seed=None):
+        self.k = k
+        self.count = 0
+        self.levels = [np.empty(0)]
+        self.rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(8, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def update(self, values):
+        """Add an array of finite values"""
+        values = np.asarray(values, dtype=float)
+        self.levels[0] = np.concatenate((self.levels[0], values))
+        self.count += values.size
+        self._compress()
+        return self
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if items.size > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                leftover, items = items[items.size - items.size % 2:], items[:items.size - items.size % 2]
+                promoted = items[self.rng.integers(2)::2]
+                self.levels[level] = leftover
+                self.levels[level + 1] = np.concatenate((self.levels[level + 1], promoted))
+            level += 1
+
+    def merge(self, other):
+        """Combine another sketch (same k) into this one"""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate((self.levels[level], items))
+        self.count += other.count
+        self._compress()
+        return self
+
+    def quantiles(self, qs):
+        """Approximate quantiles for an array of fractions in [0, 1]"""
+        values = np.concatenate(self.levels)
+        if values.size == 0:
+            return np.full(np.shape(qs), np.nan)
+        weights = np.concatenate([np.full(items.size, 2.0 ** level)
+                                  for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        values, cumulative = values[order], np.cumsum(weights[order])
+        ranks = np.asarray(qs) * cumulative[-1]
+        index = np.minimum(np.searchsorted(cumulative, ranks, side='left'), values.size - 1)
+        return values[index]
+
+    def rank_error(self):
+        """Normalized rank error at 99% confidence (DataSketches approximation)"""
+        return 2.296 / self.k ** 0.9723
+
+    def to_dict(self):
+        return {'k': self.k, 'count': self.count, 'levels': [items.tolist() for items in self.levels]}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['k'])
+        sketch.count = data['count']
+        sketch.levels = [np.asarray(items, dtype=float) for items in data['levels']]
+        return sketch
+
+
+class MisraGries:
+    """Deterministic heavy-hitter summary with k counters
+
+    Each counter underestimates its true frequency by at most `error`.
+    """
+
+    def __init__(self, k=256):
+        self.k = k
+        self.count = 0
+        self.error = 0
+        self.counters = {}
+
+    def update(self, values, is_sorted=False):
+        """Add an array of values, collapsed to (value, count) pairs and pruned in NumPy"""
+        values = np.asarray(values, dtype=float)
+        if not is_sorted:
+            values = np.sort(values)
+        if values.size == 0:
+            return self
+        starts = np.flatnonzero(np.concatenate(([True], values[1:] != values[:-1])))
+        keys = values[starts]
+        counts = np.diff(np.append(starts, values.size))
+        other = MisraGries(self.k)
+        other.count = int(values.size)
+        if keys.size > self.k:
+            threshold = np.partition(counts, -(self.k + 1))[-(self.k + 1)]
+            keep = counts > threshold
+            keys, counts = keys[keep], counts[keep] - threshold
+            other.error = int(threshold)
+        other.counters = dict(zip(keys.tolist(), counts.tolist()))
+        return self.merge(other)
+
+    def merge(self, other):
+        """Mergeable summary: add counters, then cut back to k"""
+        for key, value in other.counters.items():
+            self.counters[key] = self.counters.get(key, 0) + value
+        self.count += other.count
+        self.error += other.error
+        self._prune()
+        return self
+
+    def _prune(self):
+        if len(self.counters) <= self.k:
+            return
+        threshold = sorted(self.counters.values(), reverse=True)[self.k]
+        self.counters = {key: value - threshold for key, value in self.counters.items()
+                         if value > threshold}
+        self.error += threshold
+
+    def top(self, n=1):
+        """Most frequent values as (value, lower bound count) pairs"""
+        return sorted(self.counters.items(), key=lambda item: -item[1])[:n]
+
+    def to_dict(self):
+        return {'k': self.k, 'count': self.count, 'error': self.error,
+                'counters': [[key, value] for key, value in self.counters.items()]}
+
+    @classmethod
+    def from_dict(cls, data):
+        summary = cls(data['k'])
+        summary.count, summary.error = data['count'], data['error']
+        summary.counters = {float(key): int(value) for key, value in data['counters']}
+        return summary
+
+
+_MASK64 = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+def _hash64(values):
+    """splitmix64 finalizer over the IEEE bits of each float (with -0.0 == 0.0)"""
+    bits = (np.asarray(values, dtype=float) + 0.0).view(np.uint64)
+    with np.errstate(over='ignore'):
+        z = bits + np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return (z ^ (z >> np.uint64(31))) & _MASK64
+
+
+def _leading_zeros(words):
+    """Leading zeros of uint64 values, exact up to 53 (all an HLL rank needs)"""
+    # The top 53 bits convert to float64 exactly, and frexp's exponent is their bit length
+    _, exponent = np.frexp((words >> np.uint64(11)).astype(float))
+    return 53 - exponent
+
+
+class HyperLogLog:
+    """Distinct-count estimator with 2**p registers (about 1.04 / sqrt(2**p) error)"""
+
+    def __init__(self, p=14):
+        self.p = p
+        self.registers = np.zeros(1 << p, dtype=np.uint8)
+
+    def update(self, values):
+        """Add an array of values"""
+        hashes = _hash64(values)
+        index = (hashes >> np.uint64(64 - self.p)).astype(np.intp)
+        rest = (hashes << np.uint64(self.p)) & _MASK64
+        rank = np.minimum(_leading_zeros(rest) + 1, 64 - self.p + 1).astype(np.uint8)
+        # One bincount over (register, rank) pairs, then the highest rank seen per register
+        seen = np.bincount(index * 64 + rank, minlength=self.registers.size * 64)
+        seen = seen.reshape(-1, 64) > 0
+        highest = 63 - np.argmax(seen[:, ::-1], axis=1)
+        highest[~seen.any(axis=1)] = 0
+        np.maximum(self.registers, highest.astype(np.uint8), out=self.registers)
+        return self
+
+    def merge(self, other):
+        """Register-wise maximum"""
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self):
+        """Estimated number of distinct values"""
+        m = self.registers.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(2.0 ** -self.registers.astype(float))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)  # Linear counting for small cardinalities
+        return raw
+
+    def relative_error(self):
+        """Standard error of the estimate"""
+        return 1.04 / math.sqrt(self.registers.size)
+
+    def to_dict(self):
+        return {'p': self.p, 'registers': self.registers.tolist()}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['p'])
+        sketch.registers = np.asarray(data['registers'], dtype=np.uint8)
+        return sketch
+
+
+class DatasetSketch:
+    """Exact moments plus quantile, heavy-hitter and distinct-count sketches"""
+
+    def __init__(self):
+        self.moments = MomentState()
+        self.quantiles = KLLSketch()
+        self.heavy_hitters = MisraGries()
+        self.distinct = HyperLogLog()
+
+    @classmethod
+    def from_array(cls, values):
+        return cls().update(values)
+
+    def update(self, values):
+        """Fold in an array of values (NaN and inf ignored)"""
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        if values.size:
+            values = np.sort(values)  # Shared by the quantile and heavy-hitter sketches
+            self.moments.update(values)
+            self.quantiles.update(values)
+            self.heavy_hitters.update(values, is_sorted=True)
+            self.distinct.update(values)
+        return self
+
+    def merge(self, other):
+        """Merge another dataset's sketch without rescanning either dataset"""
+        self.moments.merge(other.moments)
+        self.quantiles.merge(other.quantiles)
+        self.heavy_hitters.merge(other.heavy_hitters)
+        self.distinct.merge(other.distinct)
+        return self
+
+    def to_json(self):
+        moments = self.moments
+        return json.dumps({
+            'version': 1,
+            'moments': {'count': moments.count, 'mean': moments.mean, 'm2': moments.m2,
+                        'min': moments.minimum, 'max': moments.maximum},
+            'quantiles': self.quantiles.to_dict(),
+            'heavy_hitters': self.heavy_hitters.to_dict(),
+            'distinct': self.distinct.to_dict(),
+        })
+
+    @classmethod
+    def from_json(cls, text):
+        data = json.loads(text)
+        sketch = cls()
+        moments = data['moments']
+        sketch.moments.count, sketch.moments.mean = moments['count'], moments['mean']
+        sketch.moments.m2 = moments['m2']
+        sketch.moments.minimum, sketch.moments.maximum = moments['min'], moments['max']
+        sketch.quantiles = KLLSketch.from_dict(data['quantiles'])
+        sketch.heavy_hitters = MisraGries.from_dict(data['heavy_hitters'])
+        sketch.distinct = HyperLogLog.from_dict(data['distinct'])
+        return sketch
+
+
+def sketch_file_range(file_path, start, end, columns=1, column=-1):
+    """Worker: sketch one byte range of a delimited file"""
+    sketch = DatasetSketch()
+    for values in iter_range_values(file_path, start, end, columns, column):
+        sketch.update(values)
+    return sketch
+
+
+def parallel_file_sketch(file_path, executor, workers, column=-1):
+    """Sketch byte ranges of a file over a process pool and merge the results"""
+    _, columns = data_io.read_header(file_path)
+    futures = [executor.submit(sketch_file_range, file_path, start, end, columns, column)
+               for start, end in data_io.file_ranges(file_path, workers * 4)]
+    sketch = DatasetSketch()
+    for future in futures:
+        sketch.merge(future.result())
+    return sketch
+
+
+def load_sketch(path):
+    """Read a sketch saved with save_sketch"""
+    with open(path, 'r') as file:
+        return DatasetSketch.from_json(file.read())
+
+
+def save_sketch(sketch, path):
+    """Write a sketch as JSON so it can be merged later without the data"""
+    with open(path, 'w') as file:
+        file.write(sketch.to_json())
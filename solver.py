@@ -0,0 +1,411 @@
+import ast
+import os
+import re
+
+import numpy as np
+
+import data_io
+import expression_engine
+import linalg_engine
+
+POLISH_STEPS = 8                # Newton iterations applied to each companion-matrix root
+SPARSE_TOLERANCE = 1e-10        # Relative residual |b - Ax| / |b| that ends an iterative solve
+SPARSE_MAX_ITERATIONS = 20_000
+MAX_DEGREE = 10_000
+
+MODES = {
+    'roots': "Polynomial roots",
+    'dense': "Dense system Ax = b",
+    'sparse': "Sparse system (iterative)",
+    'batch': "Batch of small systems",
+}
+
+
+# Polynomials
+def polynomial_coefficients(text, variable='x'):
+    """Coefficients, highest power first, from '1, -6, 11, -6' or an expression in x"""
+    tokens = [token for token in re.split(r'[,;\s]+', text.strip()) if token]
+    try:
+        coefficients = np.array([float(token) for token in tokens])
+    except ValueError:
+        coefficients = _polynomial(expression_engine.parse(text).body, variable)
+    coefficients = np.trim_zeros(np.atleast_1d(coefficients), 'f')
+    if not coefficients.size:
+        raise ValueError("The zero polynomial has every number as a root")
+    return coefficients
+
+
+def _polynomial(node, variable):
+    """Coefficient array of an expression built from x with + - * / and integer powers"""
+    names = {child.id for child in ast.walk(node) if isinstance(child, ast.Name)}
+    if variable not in names:
+        value = expression_engine.evaluate(ast.unparse(node), 'complex')
+        value = value.real if value.imag == 0 else value
+        return np.array([value])
+    if isinstance(node, ast.Name):
+        return np.array([1.0, 0.0])
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        inner = _polynomial(node.operand, variable)
+        return -inner if isinstance(node.op, ast.USub) else inner
+    if isinstance(node, ast.BinOp):
+        left = _polynomial(node.left, variable)
+        if isinstance(node.op, ast.Pow):
+            power = _polynomial(node.right, variable)
+            if power.size != 1 or power[0] != int(power[0].real) or power[0].real < 0:
+                raise ValueError("Powers of x must be non-negative integers")
+            power = int(power[0].real)
+            if power * (left.size - 1) > MAX_DEGREE:
+                raise ValueError(f"Degree above {MAX_DEGREE:,}")
+            return np.polynomial.polynomial.polypow(left[::-1], power)[::-1]
+        right = _polynomial(node.right, variable)
+        if isinstance(node.op, ast.Add):
+            return np.polyadd(left, right)
+        if isinstance(node.op, ast.Sub):
+            return np.polysub(left, right)
+        if isinstance(node.op, ast.Mult):
+            return np.polymul(left, right)
+        if isinstance(node.op, ast.Div) and right.size == 1:
+            return left / right[0]
+    raise ValueError(f"Not a polynomial in {variable}: {ast.unparse(node)}")
+
+
+def polynomial_roots(coefficients, polish_steps=POLISH_STEPS):
+    """Roots as eigenvalues of the companion matrix, polished by Newton's method
+
+    Returns (roots, |p(root)|). Zero roots from trailing zero coefficients
+    are exact; every other root only accepts a Newton step that reduces
+    its residual, so polishing never makes a root worse.
+    """
+    coefficients = np.trim_zeros(np.asarray(coefficients), 'f')
+    if not coefficients.size:
+        raise ValueError("The zero polynomial has every number as a root")
+    nonzero = np.trim_zeros(coefficients, 'b')
+    zero_roots = coefficients.size - nonzero.size
+    degree = nonzero.size - 1
+    roots = np.zeros(0, dtype=complex)
+    if degree:
+        companion = np.diag(np.ones(degree - 1, dtype=nonzero.dtype), -1)
+        companion[0, :] = -nonzero[1:] / nonzero[0]
+        roots = np.linalg.eigvals(companion).astype(complex)
+        roots = _polish(nonzero, roots, polish_steps)
+    roots = np.concatenate([roots, np.zeros(zero_roots, dtype=complex)])
+    roots = roots[np.lexsort((roots.imag, roots.real))]
+    with np.errstate(all='ignore'):
+        residuals = np.abs(np.polyval(coefficients, roots))
+    return roots, residuals
+
+
+def _polish(coefficients, roots, steps):
+    derivative = np.polyder(coefficients)
+    with np.errstate(all='ignore'):
+        values = np.polyval(coefficients, roots)
+        for _ in range(steps):
+            slopes = np.polyval(derivative, roots)
+            candidates = roots - values / np.where(slopes == 0, np.inf, slopes)
+            candidate_values = np.polyval(coefficients, candidates)
+            better = np.abs(candidate_values) < np.abs(values)
+            if not better.any():
+                break
+            roots = np.where(better, candidates, roots)
+            values = np.where(better, candidate_values, values)
+        if not np.iscomplexobj(coefficients):
+            # Real roots that picked up rounding noise in their imaginary part
+            real = roots.real
+            real_values = np.polyval(coefficients, real)
+            snap = (np.abs(roots.imag) <= 1e-8 * np.maximum(1, np.abs(real))) & \
+                   (np.abs(real_values) <= np.abs(values))
+            roots = np.where(snap, real + 0j, roots)
+    return roots
+
+
+# Dense systems
+def solve_dense(a, b):
+    """Solve Ax = b (b may hold several right-hand sides); returns (x, relative residuals)"""
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    x = linalg_engine.run_operation('solve', a, b)['x']
+    residual = np.linalg.norm((a @ x - b).reshape(b.shape[0], -1), axis=0)
+    scale = np.linalg.norm(b.reshape(b.shape[0], -1), axis=0)
+    return x, residual / np.where(scale == 0, 1, scale)
+
+
+def split_augmented(matrix):
+    """[A | b] -> (A, b): the last column is the right-hand side"""
+    if matrix.shape[1] != matrix.shape[0] + 1:
+        raise ValueError(f"Expected an n×(n+1) augmented matrix [A | b], got {matrix.shape[0]}×{matrix.shape[1]}")
+    return matrix[:, :-1], matrix[:, -1]
+
+
+# Sparse systems
+class SparseMatrix:
+    """Square matrix in coordinate form with the products iterative solvers need
+
+    Entries are kept sorted by row, and duplicate (row, column) pairs add up
+    as Matrix Market and triplet files expect.
+    """
+
+    __slots__ = ('rows', 'cols', 'values', 'size')
+
+    def __init__(self, rows, cols, values, size):
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        if rows.size and (rows.min() < 0 or cols.min() < 0 or rows.max() >= size or cols.max() >= size):
+            raise ValueError(f"Entry index outside a {size}×{size} matrix")
+        order = np.lexsort((cols, rows))
+        self.rows = rows[order]
+        self.cols = cols[order]
+        self.values = np.asarray(values, dtype=float)[order]
+        self.size = size
+
+    @property
+    def nnz(self):
+        return self.values.size
+
+    def matvec(self, x):
+        return np.bincount(self.rows, weights=self.values * x[self.cols], minlength=self.size)
+
+    def diagonal(self):
+        on_diagonal = self.rows == self.cols
+        return np.bincount(self.rows[on_diagonal], weights=self.values[on_diagonal], minlength=self.size)
+
+    def is_symmetric(self, tolerance=1e-12):
+        keys = self.rows * self.size + self.cols
+        transposed = self.cols * self.size + self.rows
+        unique, summed = _sum_duplicates(keys, self.values)
+        unique_t, summed_t = _sum_duplicates(transposed, self.values)
+        if not np.array_equal(unique, unique_t):
+            return False
+        return bool(np.all(np.abs(summed - summed_t) <= tolerance * np.maximum(1, np.abs(summed))))
+
+
+def _sum_duplicates(keys, values):
+    unique, inverse = np.unique(keys, return_inverse=True)
+    return unique, np.bincount(inverse, weights=values, minlength=unique.size)
+
+
+def load_matrix_market(file_path):
+    """Read a real, integer or pattern Matrix Market file (coordinate or array)"""
+    with open(file_path, 'r') as file:
+        banner = file.readline().lower().split()
+        if len(banner) < 5 or banner[0] != '%%matrixmarket' or banner[1] != 'matrix':
+            raise ValueError("Not a Matrix Market file (missing %%MatrixMarket matrix banner)")
+        layout, field, symmetry = banner[2:5]
+        if field not in ('real', 'integer', 'pattern', 'double'):
+            raise ValueError(f"Unsupported Matrix Market field: {field}")
+        line = file.readline()
+        while line.startswith('%') or not line.strip():
+            line = file.readline()
+        sizes = [int(value) for value in line.split()]
+        values = data_io.parse_numbers(file.read())
+
+    n_rows, n_cols = sizes[:2]
+    if n_rows != n_cols:
+        raise ValueError(f"Matrix must be square, got {n_rows}×{n_cols}")
+    if layout == 'array':
+        dense = values.reshape(n_cols, n_rows).T  # Column-major
+        rows, cols = np.nonzero(dense)
+        entries = dense[rows, cols]
+        lower = rows > cols
+    else:
+        width = 2 if field == 'pattern' else 3
+        if values.size != sizes[2] * width:
+            raise ValueError(f"Expected {sizes[2]:,} entries, found {values.size // width:,}")
+        table = values.reshape(-1, width)
+        rows = table[:, 0].astype(np.int64) - 1  # Matrix Market indices start at 1
+        cols = table[:, 1].astype(np.int64) - 1
+        entries = np.ones(len(table)) if field == 'pattern' else table[:, 2]
+        lower = rows != cols
+    if symmetry in ('symmetric', 'skew-symmetric', 'hermitian'):
+        sign = -1.0 if symmetry == 'skew-symmetric' else 1.0
+        rows, cols, entries = (np.concatenate([rows, cols[lower]]), np.concatenate([cols, rows[lower]]),
+                               np.concatenate([entries, sign * entries[lower]]))
+    return SparseMatrix(rows, cols, entries, n_rows)
+
+
+def load_triplets(file_path):
+    """Read row,col,value lines (0-based indices, optional header) as a sparse matrix"""
+    _, table = data_io.read_numeric_table(file_path)
+    if table.ndim != 2 or table.shape[1] != 3:
+        raise ValueError("Expected three columns: row, col, value")
+    rows = table[:, 0].astype(np.int64)
+    cols = table[:, 1].astype(np.int64)
+    size = int(max(rows.max(), cols.max())) + 1 if len(table) else 0
+    return SparseMatrix(rows, cols, table[:, 2], size)
+
+
+def load_sparse(file_path):
+    if file_path.lower().endswith('.mtx'):
+        return load_matrix_market(file_path)
+    return load_triplets(file_path)
+
+
+def solve_sparse(matrix, b=None, method='auto', tolerance=SPARSE_TOLERANCE,
+                 max_iterations=SPARSE_MAX_ITERATIONS, progress=None, cancelled=None):
+    """Iteratively solve Ax = b with Jacobi-preconditioned CG or BiCGSTAB
+
+    method 'auto' uses conjugate gradients for symmetric matrices with a
+    positive diagonal and BiCGSTAB otherwise (or if CG breaks down). b
+    defaults to all ones. progress(iteration, relative residual) is called
+    every few iterations; cancelled() stops the solve early.
+    """
+    b = np.ones(matrix.size) if b is None else np.asarray(b, dtype=float).ravel()
+    if b.size != matrix.size:
+        raise ValueError(f"b has {b.size:,} values but A is {matrix.size:,}×{matrix.size:,}")
+    diagonal = matrix.diagonal()
+    inverse_diagonal = np.where(diagonal != 0, 1.0 / np.where(diagonal != 0, diagonal, 1), 1.0)
+    if method == 'auto':
+        method = 'cg' if np.all(diagonal > 0) and matrix.is_symmetric() else 'bicgstab'
+    solve = {'cg': _conjugate_gradient, 'bicgstab': _bicgstab}[method]
+    x, iterations, converged = solve(matrix, b, inverse_diagonal, tolerance, max_iterations,
+                                     progress or (lambda iteration, residual: None),
+                                     cancelled or (lambda: False))
+    if x is None:  # CG found the matrix is not positive definite
+        method = 'bicgstab'
+        x, iterations, converged = _bicgstab(matrix, b, inverse_diagonal, tolerance, max_iterations,
+                                             progress or (lambda iteration, residual: None),
+                                             cancelled or (lambda: False))
+    norm_b = np.linalg.norm(b) or 1.0
+    residual = b - matrix.matvec(x)
+    return {'x': x, 'residual': residual, 'relative_residual': float(np.linalg.norm(residual) / norm_b),
+            'iterations': iterations, 'converged': converged, 'method': method}
+
+
+def _conjugate_gradient(matrix, b, inverse_diagonal, tolerance, max_iterations, progress, cancelled):
+    x = np.zeros_like(b)
+    r = b.copy()
+    z = inverse_diagonal * r
+    p = z.copy()
+    rz = r @ z
+    norm_b = np.linalg.norm(b) or 1.0
+    for iteration in range(1, max_iterations + 1):
+        ap = matrix.matvec(p)
+        curvature = p @ ap
+        if curvature <= 0:
+            return None, iteration, False
+        alpha = rz / curvature
+        x += alpha * p
+        r -= alpha * ap
+        relative = np.linalg.norm(r) / norm_b
+        if iteration % 16 == 0:
+            progress(iteration, relative)
+            if cancelled():
+                return x, iteration, False
+        if relative <= tolerance:
+            return x, iteration, True
+        z = inverse_diagonal * r
+        rz_next = r @ z
+        p = z + (rz_next / rz) * p
+        rz = rz_next
+    return x, max_iterations, False
+
+
+def _bicgstab(matrix, b, inverse_diagonal, tolerance, max_iterations, progress, cancelled):
+    x = np.zeros_like(b)
+    r = b.copy()
+    shadow = r.copy()
+    rho = alpha = omega = 1.0
+    v = np.zeros_like(b)
+    p = np.zeros_like(b)
+    norm_b = np.linalg.norm(b) or 1.0
+    for iteration in range(1, max_iterations + 1):
+        rho_next = shadow @ r
+        if rho_next == 0:
+            return x, iteration, False  # Breakdown
+        p = r + (rho_next / rho) * (alpha / omega) * (p - omega * v) if iteration > 1 else r.copy()
+        rho = rho_next
+        p_hat = inverse_diagonal * p
+        v = matrix.matvec(p_hat)
+        alpha = rho / (shadow @ v)
+        s = r - alpha * v
+        if np.linalg.norm(s) / norm_b <= tolerance:
+            x += alpha * p_hat
+            return x, iteration, True
+        s_hat = inverse_diagonal * s
+        t = matrix.matvec(s_hat)
+        omega = (t @ s) / (t @ t) if t @ t else 0.0
+        x += alpha * p_hat + omega * s_hat
+        r = s - omega * t
+        relative = np.linalg.norm(r) / norm_b
+        if iteration % 16 == 0:
+            progress(iteration, relative)
+            if cancelled():
+                return x, iteration, False
+        if relative <= tolerance:
+            return x, iteration, True
+        if omega == 0:
+            return x, iteration, False
+    return x, max_iterations, False
+
+
+# Batches of small systems
+def load_batch(file_path):
+    """Stacked systems: rows of n² + n values (A row-major, then b), or .npy of shape (k, n, n+1)"""
+    if file_path.lower().endswith('.npy'):
+        array = np.load(file_path)
+        if array.ndim == 3:
+            if array.shape[2] != array.shape[1] + 1:
+                raise ValueError(f"Expected shape (k, n, n+1), got {array.shape}")
+            return array[:, :, :-1], array[:, :, -1]
+    else:
+        _, array = data_io.read_numeric_table(file_path)
+    return split_batch_rows(np.asarray(array, dtype=float))
+
+
+def split_batch_rows(array):
+    width = array.shape[1]
+    n = int((np.sqrt(1 + 4 * width) - 1) / 2)
+    if n * n + n != width:
+        raise ValueError(f"Rows of {width} values are not n² + n for any n")
+    return array[:, :n * n].reshape(-1, n, n), array[:, n * n:]
+
+
+def solve_batch(a, b):
+    """Solve k systems A[i] x[i] = b[i] in one stacked LAPACK call
+
+    Returns (x, residual norms). Singular systems get NaN solutions
+    instead of failing the whole batch.
+    """
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    if a.ndim != 3 or a.shape[1] != a.shape[2] or b.shape != a.shape[:2]:
+        raise ValueError(f"Expected A of shape (k, n, n) and b of shape (k, n), got {a.shape} and {b.shape}")
+    try:
+        x = np.linalg.solve(a, b[..., None])[..., 0]
+    except np.linalg.LinAlgError:
+        sign, _ = np.linalg.slogdet(a)
+        regular = sign != 0
+        x = np.full(b.shape, np.nan)
+        if regular.any():
+            x[regular] = np.linalg.solve(a[regular], b[regular][..., None])[..., 0]
+    residual = np.linalg.norm(np.matmul(a, np.nan_to_num(x)[..., None])[..., 0] - b, axis=1)
+    residual[np.isnan(x).any(axis=1)] = np.nan
+    return x, residual
+
+
+# Result tables
+def result_table(mode, result):
+    """(column names, 2D array) for showing or exporting a solver result"""
+    if mode == 'roots':
+        roots, residuals = result
+        return (['real', 'imag', '|root|', '|p(root)|'],
+                np.column_stack([roots.real, roots.imag, np.abs(roots), residuals]))
+    if mode == 'dense':
+        x, residuals = result
+        x = x.reshape(x.shape[0], -1)
+        names = ['x'] if x.shape[1] == 1 else [f'x{j + 1}' for j in range(x.shape[1])]
+        return names, x
+    if mode == 'sparse':
+        return ['x', 'b - Ax'], np.column_stack([result['x'], result['residual']])
+    if mode == 'batch':
+        x, residuals = result
+        return [f'x{j + 1}' for j in range(x.shape[1])] + ['|Ax - b|'], np.column_stack([x, residuals])
+    raise ValueError(f"Unknown solver mode: {mode}")
+
+
+def export_table(file_path, names, table):
+    """Write a result table to CSV (with a header) or .npy"""
+    if file_path.lower().endswith('.npy'):
+        np.save(file_path, table)
+    else:
+        np.savetxt(file_path, table, delimiter=',', header=','.join(names), comments='', fmt='%.17g')
+    return os.path.getsize(file_path)
@@ -0,0 +1,275 @@
+import numpy as np
+
+import data_io
+
+
+def histogram(data, bins, value_range=None):
+    """Counts and edges in one vectorized pass (np.bincount on bin indices)"""
+    lo, hi = value_range if value_range is not None else (float(data.min()), float(data.max()))
+    if hi <= lo:
+        hi = lo + 1.0
+    index = ((data - lo) * (bins / (hi - lo))).astype(np.intp)
+    np.clip(index, 0, bins - 1, out=index)
+    counts = np.bincount(index, minlength=bins)
+    return counts, np.linspace(lo, hi, bins + 1)
+
+
+def auto_bins(sorted_data):
+    """Freedman-Diaconis bin count from an already sorted array"""
+    n = sorted_data.size
+    if n < 2:
+        return 1
+    q1, q3 = sorted_data[int(0.25 * (n - 1))], sorted_data[int(0.75 * (n - 1))]
+    spread = sorted_data[-1] - sorted_data[0]
+    if q3 <= q1 or spread <= 0:
+        return int(min(max(np.sqrt(n), 1), 200))
+    width = 2 * (q3 - q1) / n ** (1 / 3)
+    return int(min(max(spread / width, 1), 1000))
+
+
+def quantile_sorted(sorted_data, q):
+    """Linear-interpolated quantile(s) of a sorted array without re-sorting"""
+    position = np.asarray(q) * (sorted_data.size - 1)
+    lower = np.floor(position).astype(np.intp)
+    upper = np.minimum(lower + 1, sorted_data.size - 1)
+    fraction = position - lower
+    return sorted_data[lower] * (1 - fraction) + sorted_data[upper] * fraction
+
+
+def ecdf(sorted_data, max_points=4000):
+    """Empirical CDF reusing the sorted array, thinned to max_points for drawing"""
+    n = sorted_data.size
+    if n <= max_points:
+        positions = np.arange(n)
+    else:
+        positions = np.unique(np.linspace(0, n - 1, max_points).astype(np.intp))
+    return sorted_data[positions], (positions + 1) / n
+
+
+def box_stats(sorted_data, max_fliers=2000):
+    """Statistics for Axes.bxp computed from a sorted array"""
+    q1, median, q3 = quantile_sorted(sorted_data, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    low_fence, high_fence = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+    first = np.searchsorted(sorted_data, low_fence, side='left')
+    last = np.searchsorted(sorted_data, high_fence, side='right') - 1
+    fliers = np.concatenate((sorted_data[:first], sorted_data[last + 1:]))
+    if fliers.size > max_fliers:
+        fliers = fliers[np.linspace(0, fliers.size - 1, max_fliers).astype(np.intp)]
+    return {
+        'med': median, 'q1': q1, 'q3': q3,
+        'whislo': sorted_data[first], 'whishi': sorted_data[last],
+        'fliers': fliers, 'mean': float(sorted_data.mean()), 'label': ''
+    }
+
+
+def kde_fft(sorted_data, grid_size=1024, bandwidth=None):
+    """Gaussian KDE by binning onto a grid and convolving with the kernel via FFT
+
+    Costs O(n + m log m) instead of the O(n * m) direct sum.
+    """
+    n = sorted_data.size
+    std = sorted_data.std(ddof=1) if n > 1 else 1.0
+    if bandwidth is None:
+        q1, q3 = quantile_sorted(sorted_data, [0.25, 0.75])
+        scale = min(std, (q3 - q1) / 1.349) or std or 1.0
+        bandwidth = 0.9 * scale * n ** (-1 / 5)
+
+    lo = sorted_data[0] - 3 * bandwidth
+    hi = sorted_data[-1] + 3 * bandwidth
+    counts, edges = histogram(sorted_data, grid_size, (lo, hi))
+    step = edges[1] - edges[0]
+
+    # Kernel sampled at grid offsets, zero-padded to avoid circular wrap-around
+    half = min(grid_size, int(np.ceil(4 * bandwidth / step)))
+    offsets = np.arange(-half, half + 1) * step
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2)
+    kernel /= kernel.sum()
+    size = grid_size + kernel.size - 1
+    density = np.fft.irfft(np.fft.rfft(counts, size) * np.fft.rfft(kernel, size), size)
+    density = density[half:half + grid_size] / (n * step)
+
+    centers = (edges[:-1] + edges[1:]) / 2
+    return centers, np.maximum(density, 0.0)
+
+
+class CrossProductAccumulator:
+    """Single-pass, mergeable count/mean/co-moment/min/max over table columns
+
+    Chunks are reduced with one centered matrix product each and combined
+    with Chan's pairwise update, so tables larger than memory can be
+    processed chunk by chunk (or in parallel and merged).
+    """
+
+    def __init__(self, columns):
+        self.count = 0
+        self.mean = np.zeros(columns)
+        self.comoment = np.zeros((columns, columns))
+        self.minimum = np.full(columns, np.inf)
+        self.maximum = np.full(columns, -np.inf)
+
+    def update(self, chunk):
+        """Fold in a (rows, columns) chunk; rows containing NaN are skipped"""
+        chunk = np.asarray(chunk, dtype=float)
+        chunk = chunk[np.isfinite(chunk).all(axis=1)]
+        if chunk.shape[0] == 0:
+            return self
+        other = CrossProductAccumulator(chunk.shape[1])
+        other.count = chunk.shape[0]
+        other.mean = chunk.mean(axis=0)
+        centered = chunk - other.mean
+        other.comoment = centered.T @ centered
+        other.minimum = chunk.min(axis=0)
+        other.maximum = chunk.max(axis=0)
+        return self.merge(other)
+
+    def merge(self, other):
+        """Combine another accumulator into this one"""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean = other.count, other.mean.copy()
+            self.comoment = other.comoment.copy()
+            self.minimum, self.maximum = other.minimum.copy(), other.maximum.copy()
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.comoment = self.comoment + other.comoment + np.outer(delta, delta) * (self.count * other.count / total)
+        self.mean = self.mean + delta * (other.count / total)
+        self.count = total
+        self.minimum = np.minimum(self.minimum, other.minimum)
+        self.maximum = np.maximum(self.maximum, other.maximum)
+        return self
+
+    def covariance(self):
+        """Sample covariance matrix"""
+        return self.comoment / max(self.count - 1, 1)
+
+    def correlation(self):
+        """Pearson correlation matrix"""
+        std = np.sqrt(np.diag(self.comoment))
+        with np.errstate(all='ignore'):
+            return self.comoment / np.outer(std, std)
+
+    def summary(self):
+        """Per-column count, mean, standard deviation, min and max"""
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'std_dev': np.sqrt(np.diag(self.covariance())),
+            'min': self.minimum,
+            'max': self.maximum,
+        }
+
+
+def polynomial_features(x, y, degree):
+    """Columns [x, x^2, ..., x^degree, y] for a regression accumulator"""
+    return np.column_stack([x ** power for power in range(1, degree + 1)] + [y])
+
+
+def regression_from_accumulator(accumulator):
+    """Least-squares fit of the last column on the others from centered co-moments
+
+    Returns (coefficients lowest power first including intercept, r_squared).
+    """
+    sxx = accumulator.comoment[:-1, :-1]
+    sxy = accumulator.comoment[:-1, -1]
+    syy = accumulator.comoment[-1, -1]
+    beta = np.linalg.lstsq(sxx, sxy, rcond=None)[0]
+    intercept = accumulator.mean[-1] - accumulator.mean[:-1] @ beta
+    r_squared = float(sxy @ beta / syy) if syy > 0 else 1.0
+    return np.concatenate(([intercept], beta)), r_squared
+
+
+class MomentState:
+    """Mergeable count, mean, M2, min, max and optional fixed-range histogram"""
+
+    __slots__ = ('count', 'mean', 'm2', 'minimum', 'maximum', 'histogram', 'value_range')
+
+    def __init__(self, bins=None, value_range=None):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+        self.value_range = value_range
+        self.histogram = np.zeros(bins, dtype=np.int64) if bins else None
+
+    @classmethod
+    def from_array(cls, values, bins=None, value_range=None):
+        """State of an array of values (NaN and inf ignored)"""
+        state = cls(bins, value_range)
+        return state.update(values)
+
+    def update(self, values):
+        """Fold in an array of values with a vectorized reduction and a Chan merge"""
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            return self
+        other = MomentState(None, self.value_range)
+        other.count = values.size
+        other.mean = float(values.mean())
+        other.m2 = float(np.square(values - other.mean).sum())
+        other.minimum = float(values.min())
+        other.maximum = float(values.max())
+        if self.histogram is not None:
+            lo, hi = self.value_range
+            inside = values[(values >= lo) & (values <= hi)]
+            other.histogram = histogram(inside, self.histogram.size, self.value_range)[0]
+        return self.merge(other)
+
+    def merge(self, other):
+        """Parallel Welford/Chan combination of two partial states"""
+        if other.count == 0:
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.mean += delta * other.count / total
+        self.count = total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        if self.histogram is not None and other.histogram is not None:
+            self.histogram += other.histogram
+        return self
+
+    def variance(self):
+        """Sample variance"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def std_dev(self):
+        """Sample standard deviation"""
+        return float(np.sqrt(self.variance()))
+
+
+def iter_range_values(file_path, start, end, columns=1, column=-1):
+    """Values of one column for the lines of a byte range, block by block"""
+    skip_header = start == 0 and data_io.read_header(file_path)[0] is not None
+    for block in data_io.iter_range_blocks(file_path, start, end):
+        if skip_header:
+            block = block.split(b'\n', 1)[1] if b'\n' in block else b''
+            skip_header = False
+        if columns > 1:
+            yield data_io.parse_rows(block, columns)[:, column]
+        else:
+            yield data_io.parse_numbers(block)
+
+
+def reduce_file_range(file_path, start, end, columns=1, column=-1, bins=None, value_range=None):
+    """Worker: parse one byte range block by block and reduce it to a MomentState"""
+    state = MomentState(bins, value_range)
+    for values in iter_range_values(file_path, start, end, columns, column):
+        state.update(values)
+    return state
+
+
+def parallel_file_stats(file_path, executor, workers, bins=None, value_range=None, column=-1):
+    """Map byte ranges of a file over a process pool and merge the partial states in order"""
+    _, columns = data_io.read_header(file_path)
+    futures = [executor.submit(reduce_file_range, file_path, start, end, columns, column, bins, value_range)
+               for start, end in data_io.file_ranges(file_path, workers * 4)]
+    state = MomentState(bins, value_range)
+    for future in futures:
+        state.merge(future.result())
+    return state
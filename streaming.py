@@ -0,0 +1,99 @@
+import os
+import re
+import stat
+import threading
+import time
+
+import numpy as np
+
+_NUMBER = re.compile(rb'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+
+
+class RingBuffer:
+    """Fixed-size float buffer; memory never grows however many samples arrive"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.data = np.full(capacity, np.nan)
+        self.total = 0  # Samples ever written
+        self.lock = threading.Lock()
+
+    def extend(self, values):
+        """Append samples, overwriting the oldest"""
+        values = np.asarray(values, dtype=float)[-self.capacity:]
+        with self.lock:
+            start = self.total % self.capacity
+            first = min(values.size, self.capacity - start)
+            self.data[start:start + first] = values[:first]
+            self.data[:values.size - first] = values[first:]
+            self.total += values.size
+
+    def view(self):
+        """Samples oldest to newest (a copy, safe to use outside the lock)"""
+        with self.lock:
+            if self.total < self.capacity:
+                return self.data[:self.total].copy()
+            start = self.total % self.capacity
+            return np.concatenate((self.data[start:], self.data[:start]))
+
+    def rolling_stats(self):
+        """Statistics over the samples currently in the window"""
+        window = self.view()
+        window = window[np.isfinite(window)]
+        if window.size == 0:
+            return None
+        return {
+            'count': int(window.size),
+            'latest': float(window[-1]),
+            'mean': float(window.mean()),
+            'std_dev': float(window.std(ddof=1)) if window.size > 1 else 0.0,
+            'min': float(window.min()),
+            'max': float(window.max()),
+        }
+
+
+class StreamReader(threading.Thread):
+    """Background reader following a growing file or a named pipe
+
+    Each line contributes its last number, so 'timestamp,value' logs work
+    as well as bare values. Regular files are followed like `tail -f`;
+    pipes are reopened when the writer closes them.
+    """
+
+    def __init__(self, path, buffer, poll_interval=0.05):
+        super().__init__(daemon=True)
+        self.path = path
+        self.buffer = buffer
+        self.poll_interval = poll_interval
+        self.error = None
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        """Ask the reader to finish"""
+        self._stop_event.set()
+
+    def run(self):
+        try:
+            is_pipe = stat.S_ISFIFO(os.stat(self.path).st_mode)
+            while not self._stop_event.is_set():
+                with open(self.path, 'rb') as source:
+                    self._follow(source, is_pipe)
+                if not is_pipe:
+                    break
+        except Exception as e:
+            self.error = e
+
+    def _follow(self, source, is_pipe):
+        pending = b''
+        while not self._stop_event.is_set():
+            chunk = source.read1(65536) if is_pipe else source.read(65536)
+            if not chunk:
+                if is_pipe:
+                    return  # Writer closed; reopen and wait for the next one
+                time.sleep(self.poll_interval)
+                continue
+            lines = (pending + chunk).split(b'\n')
+            pending = lines.pop()
+            values = [float(numbers[-1]) for numbers in map(_NUMBER.findall, lines) if numbers]
+            if values:
+                self.buffer.extend(values)
@@ -0,0 +1,191 @@
+import re
+from collections import deque
+
+import numpy as np
+
+import data_io
+import expression_engine
+import function_library
+
+_BINDING = re.compile(r'^\s*([A-Za-z]\w*)\s*=(.*)$')
+
+
+def parse_values(text):
+    """'start:stop:count' (inclusive linspace) or a comma-separated list of numbers"""
+    text = text.strip()
+    if ':' in text:
+        parts = [part.strip() for part in text.split(':')]
+        if len(parts) != 3:
+            raise ValueError(f"Ranges are start:stop:count, got '{text}'")
+        start, stop = float(expression_engine.evaluate(parts[0])), float(expression_engine.evaluate(parts[1]))
+        count = int(parts[2])
+        if count < 1:
+            raise ValueError("A range needs at least one point")
+        return np.linspace(start, stop, count)
+    values = [float(expression_engine.evaluate(value)) for value in text.split(',') if value.strip()]
+    if not values:
+        raise ValueError("Empty binding")
+    return np.array(values)
+
+
+def parse_bindings(text):
+    """One 'name = values' per line -> list of binding groups ((name,), (n, 1) array)"""
+    groups = []
+    for line in text.splitlines():
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+        match = _BINDING.match(line)
+        if not match:
+            raise ValueError(f"Expected 'name = values': {line.strip()}")
+        groups.append(((match.group(1),), parse_values(match.group(2)).reshape(-1, 1)))
+    return groups
+
+
+def load_binding_table(path):
+    """A CSV (header row names the variables) or .npy table as one binding group"""
+    header = None if path.lower().endswith('.npy') else data_io.read_header(path)[0]
+    array = data_io.load_array(path)
+    if header is None or len(header) != array.shape[1]:
+        header = [f"c{i}" for i in range(array.shape[1])]
+    return tuple(header), array
+
+
+class Sweep:
+    """An expression evaluated over every row of a table of variable bindings
+
+    In 'grid' mode the rows are the Cartesian product of the binding groups
+    (a CSV table is one group, its rows kept together); in 'zip' mode groups
+    are aligned row by row and must have equal lengths (or length 1). Rows
+    are generated on demand from flat indices, so a sweep never has to fit
+    in memory as a whole.
+    """
+
+    def __init__(self, source, groups, mode='grid'):
+        self.source = source
+        self.expression = expression_engine.compile_expression(source)
+        self.groups = groups
+        self.mode = mode
+        self.functions = expression_engine.user_source()  # Rebuilt in worker processes
+        self.names = [name for names, _ in groups for name in names]
+        if len(set(self.names)) != len(self.names):
+            raise ValueError("A variable is bound more than once")
+        missing = self.expression.variables - set(self.names)
+        if missing:
+            raise ValueError(f"Unbound variables: {', '.join(sorted(missing))}")
+        sizes = [array.shape[0] for _, array in groups]
+        if mode == 'grid':
+            self.shape = tuple(sizes)
+            self.rows = int(np.prod(sizes, dtype=object)) if sizes else 1
+        else:
+            lengths = {size for size in sizes if size != 1}
+            if len(lengths) > 1:
+                raise ValueError("Zipped bindings must have equal lengths")
+            self.rows = lengths.pop() if lengths else 1
+
+    def columns(self, start, stop):
+        """Bound variable columns for rows [start, stop)"""
+        flat = np.arange(start, stop)
+        if self.mode == 'grid' and self.groups:
+            indices = np.unravel_index(flat, self.shape)
+        else:
+            indices = [np.minimum(flat, array.shape[0] - 1) for _, array in self.groups]
+        columns = {}
+        for (names, array), index in zip(self.groups, indices):
+            rows = array[index]
+            for i, name in enumerate(names):
+                columns[name] = np.asarray(rows[:, i], dtype=float)
+        return columns
+
+    def evaluate(self, start, stop):
+        """(columns, results) for rows [start, stop) in one broadcasted evaluation"""
+        columns = self.columns(start, stop)
+        variables = {name: columns[name] for name in self.expression.variables}
+        result = self.expression.vectorized(shape=(stop - start,), **variables)
+        return columns, np.asarray(result, dtype=float)
+
+    def iter_chunks(self, chunk_rows=1 << 20):
+        """Yield (start, columns, results) chunk by chunk"""
+        for start in range(0, self.rows, chunk_rows):
+            stop = min(start + chunk_rows, self.rows)
+            columns, results = self.evaluate(start, stop)
+            yield start, columns, results
+
+    def format_rows(self, start, stop):
+        """CSV text for rows [start, stop): binding columns then the result"""
+        columns, results = self.evaluate(start, stop)
+        table = np.column_stack([columns[name] for name in self.names] + [results])
+        # One %-format over the whole chunk is several times faster than np.savetxt
+        row = ','.join(['%.17g'] * table.shape[1]) + '\n'
+        return (row * table.shape[0]) % tuple(table.ravel().tolist())
+
+
+def format_chunk(source, groups, mode, start, stop, functions=''):
+    """Worker: rebuild the sweep (code objects do not pickle) and format one chunk"""
+    function_library.install_source(functions)
+    return Sweep(source, groups, mode).format_rows(start, stop)
+
+
+def _parallel_chunks(sweep, bounds, executor, in_flight):
+    """Yield (stop row, CSV text) in order while keeping at most in_flight chunks queued"""
+    pending = deque()
+    try:
+        for start, stop in bounds:
+            pending.append((stop, executor.submit(format_chunk, sweep.source, sweep.groups,
+                                                  sweep.mode, start, stop, sweep.functions)))
+            if len(pending) >= in_flight:
+                stop_row, future = pending.popleft()
+                yield stop_row, future.result()
+        while pending:
+            stop_row, future = pending.popleft()
+            yield stop_row, future.result()
+    finally:
+        for _, future in pending:
+            future.cancel()
+
+
+def export_sweep(sweep, path, chunk_rows=1 << 18, executor=None, workers=1, progress=None, cancelled=None):
+    """Write the binding columns and the result column to CSV, one chunk at a time
+
+    With an executor, chunks are evaluated and formatted in parallel and
+    written in order, with memory bounded by 2 * workers chunks.
+    progress(rows_done) is called after every chunk; cancelled() returning
+    True stops the export early. Returns the number of rows written.
+    """
+    bounds = ((start, min(start + chunk_rows, sweep.rows)) for start in range(0, sweep.rows, chunk_rows))
+    if executor is None:
+        chunks = ((stop, sweep.format_rows(start, stop)) for start, stop in bounds)
+    else:
+        chunks = _parallel_chunks(sweep, bounds, executor, 2 * workers)
+    written = 0
+    with open(path, 'w') as file:
+        file.write(','.join(sweep.names + ['result']) + '\n')
+        for stop, text in chunks:
+            if cancelled is not None and cancelled():
+                break
+            file.write(text)
+            written = stop
+            if progress is not None:
+                progress(written)
+    chunks.close()
+    return written
+
+
+class SweepTable:
+    """Read-only 2D view of a sweep (bindings then result) evaluated on demand
+
+    Lets a VirtualGrid page through sweeps of any size: only the rows on
+    screen are ever computed.
+    """
+
+    ndim = 2
+
+    def __init__(self, sweep):
+        self.sweep = sweep
+        self.shape = (sweep.rows, len(sweep.names) + 1)
+
+    def __getitem__(self, key):
+        rows, cols = key
+        start, stop, _ = rows.indices(self.shape[0])
+        columns, results = self.sweep.evaluate(start, max(start, stop))
+        table = np.column_stack([columns[name] for name in self.sweep.names] + [results])
+        return table.reshape(-1, self.shape[1])[:, cols]
@@ -0,0 +1,23 @@
+import math
+
+import pytest
+
+import distributions
+
+
+@pytest.mark.parametrize('name, args', [
+    ('gammaln', (5,)), ('gammainc', (2, 1)), ('betainc', (2, 3, 0.5)),
+    ('normcdf', (0.5,)), ('expcdf', (1, 2)), ('gaminv', (0.5, 2, 1)),
+])
+def test_scalar_input_gives_plain_float(name, args):
+    assert type(distributions.FUNCTIONS[name](*args)) is float
+
+
+def test_expcdf_takes_the_mean():
+    assert distributions.FUNCTIONS['expcdf'](1, 2) == pytest.approx(1 - math.exp(-0.5))
+
+
+def test_gaminv_tiny_shape():
+    assert distributions.gamma_inv(1e-8, 0.01, 1) == 0.0
+    x = distributions.gamma_inv(1e-4, 0.1, 1)
+    assert distributions.gamma_cdf(x, 0.1, 1) == pytest.approx(1e-4, rel=1e-10)
@@ -0,0 +1,44 @@
+import threading
+
+import numpy as np
+import pytest
+
+import expression_engine
+
+
+@pytest.mark.parametrize('source', [
+    'x if x > 0 else 0',
+    '1 if x > 0 or x < -1 else -1',
+    '0 < x < 1.5',
+    'not x',
+    'x == 1 or not (x > 0)',
+])
+def test_vectorized_matches_scalar(source):
+    x = np.linspace(-2, 2, 9)
+    vector = expression_engine.compile_expression(source).vectorized(shape=x.shape, x=x)
+    scalar = [expression_engine.evaluate(source, x=float(value)) for value in x]
+    assert np.array_equal(vector, np.array(scalar, dtype=float))
+
+
+def test_rewrite_helpers_not_reachable():
+    with pytest.raises(ValueError):
+        expression_engine.compile_expression('_where(1, 2, 3)')
+
+
+def test_cache_shared_between_threads():
+    errors = []
+
+    def compile_many(offset):
+        try:
+            for i in range(2000):
+                expression_engine.compile_expression(f'x + {(i * 7 + offset) % 600}')
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=compile_many, args=(k,)) for k in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert len(expression_engine._cache) <= expression_engine.CACHE_SIZE
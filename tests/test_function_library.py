@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+import expression_engine
+import function_library
+from function_library import Definition, FunctionLibrary, definition_key
+
+
+@pytest.fixture
+def library(tmp_path, monkeypatch):
+    monkeypatch.setattr(function_library, 'CACHE_KEY_FILE', str(tmp_path / 'key'))
+    yield FunctionLibrary(path=None, cache_path=str(tmp_path / 'functions.cache'))
+    expression_engine.set_user_functions({})
+
+
+def test_parse():
+    line = 'f(x, y) = x*y + sin(x) + g(y)'
+    definition = Definition.parse(line, definition_key(line))
+    assert definition.name == 'f'
+    assert definition.params == ('x', 'y')
+    assert set(definition.calls) == {'sin', 'g'}
+
+
+@pytest.mark.parametrize('line', ['f(x) = ', 'f(x, x) = x', 'f(1) = 2', 'f(x) = __import__("os")'])
+def test_parse_rejects(line):
+    with pytest.raises(ValueError):
+        Definition.parse(line, definition_key(line))
+
+
+@pytest.mark.parametrize('source, message', [
+    ('f(x) = sin(1, 2) + x', r'sin takes 1 argument\(s\), got 2'),
+    ('g(x, y) = x + y\nf(x) = g(x)', r'g takes 2 argument\(s\), got 1'),
+    ('f(x) = x + y', "unknown name 'y'"),
+    ('f(x) = h(x)', "unknown function 'h'"),
+    ('sin(x) = x', "cannot redefine the built-in 'sin'"),
+])
+def test_check(library, source, message):
+    with pytest.raises(ValueError, match=message):
+        library.update(source)
+    assert library.definitions == {}
+
+
+def test_evaluate_after_install(library):
+    library.update('sq(x) = x^2\nf(x) = sq(x) + 1 if x > 0 else 0')
+    library.install()
+    assert expression_engine.evaluate('f(3)') == 10
+    assert list(expression_engine.compile_expression('f(x)').vectorized(x=np.array([-1.0, 2.0]))) == [0.0, 5.0]
+
+
+def test_edit_rebuilds_only_dependents(library):
+    library.update('a(x) = x + 1\nb(x) = a(x) * 2\nc(x) = x - 1')
+    report = library.update('a(x) = x + 2\nb(x) = a(x) * 2\nc(x) = x - 1')
+    assert report['parsed'] == 1
+    assert report['rebuilt'] == ['a', 'b']
+
+
+def test_cache_reused(library):
+    source = 'a(x) = x + 1\nb(x) = a(x) * 2'
+    library.update(source)
+    reloaded = FunctionLibrary(path=None, cache_path=library.cache_path)
+    assert reloaded.update(source)['parsed'] == 0
+
+
+def test_tampered_cache_ignored(library):
+    source = 'a(x) = x + 1'
+    library.update(source)
+    with open(library.cache_path, 'r+b') as file:
+        file.seek(-1, 2)
+        last = file.read(1)
+        file.seek(-1, 2)
+        file.write(bytes([last[0] ^ 1]))
+    assert FunctionLibrary(path=None, cache_path=library.cache_path).update(source)['parsed'] == 1
+
+
+def test_cache_from_another_key_ignored(library, tmp_path, monkeypatch):
+    source = 'a(x) = x + 1'
+    library.update(source)
+    monkeypatch.setattr(function_library, 'CACHE_KEY_FILE', str(tmp_path / 'other-key'))
+    assert FunctionLibrary(path=None, cache_path=library.cache_path).update(source)['parsed'] == 1
+
+
+def test_update_leaves_installed_functions_alone(library):
+    library.update('a(x) = x + 1\nb(x) = a(x) * 2')
+    library.install()
+    library.update('b(x) = x * 3')
+    assert expression_engine.evaluate('b(1)') == 4
+    library.install()
+    assert expression_engine.evaluate('b(1)') == 3
+    with pytest.raises(Exception):
+        expression_engine.evaluate('a(1)')
+
+
+def test_removing_a_function_rechecks_its_callers(library):
+    library.update('a(x) = x + 1\nb(x) = a(x) * 2')
+    library.install()
+    with pytest.raises(ValueError, match="unknown function 'a'"):
+        library.update('b(x) = a(x) * 2')
+    assert expression_engine.evaluate('b(1)') == 4
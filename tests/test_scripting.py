@@ -0,0 +1,59 @@
+import math
+
+import pytest
+
+import scripting
+
+SHORT = 2 * scripting.CHECK_INTERVAL - 1   # Always the scalar loop
+LONG = 100_000                             # Vectorized
+
+
+def _run(body, n, start='0'):
+    variables, program = scripting.run_script(f"s = {start}\nfor i in range({n}):\n    {body}\n")
+    return variables['s'], program.vectorized_loops
+
+
+def _reference(term, n, start=0):
+    s = start
+    for i in range(n):
+        s += term(i)
+    return s
+
+
+@pytest.mark.parametrize('body, term', [
+    ('s += i % 2', lambda i: i % 2),
+    ('s += i // 3', lambda i: i // 3),
+    ('s += i * i', lambda i: i * i),
+    ('s += 1/(i + 1)', lambda i: 1 / (i + 1)),
+    ('s += sqrt(i)', math.sqrt),
+    ('s += 0.1 * i', lambda i: 0.1 * i),
+])
+@pytest.mark.parametrize('n', [SHORT, LONG])
+def test_vectorized_matches_scalar(body, term, n):
+    value, _ = _run(body, n)
+    expected = _reference(term, n)
+    assert value == expected
+    assert type(value) is type(expected)
+
+
+def test_long_loops_are_vectorized():
+    assert _run('s += 1/(i + 1)', LONG)[1] > 0
+    assert _run('s += i % 2', LONG)[1] > 0
+
+
+def test_int_accumulator_with_possible_int_term_stays_scalar():
+    value, vectorized = _run('s += floor(i / 2)', LONG)
+    assert value == _reference(lambda i: math.floor(i / 2), LONG)
+    assert isinstance(value, int)
+
+
+def test_integer_result_usable_as_integer():
+    variables, _ = scripting.run_script("s = 0\nfor i in range(100000):\n    s += i % 2\nf = factorial(s % 10)\n")
+    assert variables['f'] == math.factorial(50000 % 10)
+
+
+@pytest.mark.parametrize('body', ['s += sqrt(i - 5)', 's += 1/(i - 5)'])
+@pytest.mark.parametrize('n', [SHORT, LONG])
+def test_errors_do_not_depend_on_length(body, n):
+    with pytest.raises(scripting.ScriptError):
+        _run(body, n)
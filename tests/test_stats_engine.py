@@ -0,0 +1,32 @@
+import os
+
+import numpy as np
+import pytest
+
+import data_io
+import sketches
+import stats_engine
+
+RAGGED = "a,b\n1,10\n2,20\n3\n4,40\n5,50\n"
+
+
+def _write(tmp_path, text):
+    path = tmp_path / 'data.csv'
+    path.write_text(text)
+    return str(path)
+
+
+def test_range_values_picks_the_column(tmp_path):
+    path = _write(tmp_path, "a,b\n1,10\n2,20\n3,30\n")
+    values = np.concatenate(list(stats_engine.iter_range_values(path, 0, os.path.getsize(path), 2, 1)))
+    assert values.tolist() == [10, 20, 30]
+
+
+def test_ragged_file_rejected_like_iter_table_chunks(tmp_path):
+    path = _write(tmp_path, RAGGED)
+    with pytest.raises(ValueError, match="differing numbers of values"):
+        list(data_io.iter_table_chunks(path))
+    with pytest.raises(ValueError, match="differing numbers of values"):
+        stats_engine.reduce_file_range(path, 0, os.path.getsize(path), 2, 1)
+    with pytest.raises(ValueError, match="differing numbers of values"):
+        sketches.sketch_file_range(path, 0, os.path.getsize(path), 2, 1)
@@ -0,0 +1,343 @@
+import hashlib
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+import data_io
+
+CHUNK = 1 << 20                  # Samples per pass step; memory stays O(CHUNK) for any series length
+IN_MEMORY_SAMPLES = 1 << 24      # Longer results go to a temporary memory-mapped .npy
+_EWMA_EXPONENT = 300.0           # Largest e^x a scaled EWMA block may reach before rescaling
+
+OPERATIONS = {
+    'moving_average': ("Moving average", "Window"),
+    'ewma': ("EWMA", "Alpha (0-1]"),
+    'rolling_std': ("Rolling std dev", "Window"),
+    'detrend_linear': ("Detrend (linear)", None),
+    'detrend_mean': ("Detrend (mean)", None),
+    'resample': ("Resample", "Length"),
+    'autocorrelation': ("Autocorrelation", "Max lag"),
+    'spectrum': ("Power spectrum", "Segment"),
+    'spectrogram': ("Spectrogram", "Segment"),
+}
+SERIES_OPERATIONS = ('moving_average', 'ewma', 'rolling_std', 'detrend_linear', 'detrend_mean', 'resample')
+
+
+class Cancelled(Exception):
+    pass
+
+
+def _steps(total, size, progress=None, cancelled=None):
+    """(start, stop) pairs covering range(total), reporting progress and honouring cancel"""
+    for start in range(0, total, size):
+        if cancelled is not None and cancelled():
+            raise Cancelled()
+        if progress is not None:
+            progress(start / total)
+        yield start, min(start + size, total)
+
+
+def _block(series, start, stop):
+    return np.asarray(series[start:stop], dtype=float)
+
+
+def _output(length):
+    """Result array: in memory, or a temporary memory-mapped .npy for long series"""
+    if length <= IN_MEMORY_SAMPLES:
+        return np.empty(length)
+    handle, path = tempfile.mkstemp(prefix='calc_series_', suffix='.npy')
+    os.close(handle)
+    out = np.lib.format.open_memmap(path, mode='w+', dtype=float, shape=(length,))
+    if os.name == 'posix':
+        os.remove(path)  # The mapping keeps the data; the disk space is freed with the array
+    return out
+
+
+# Sources
+def as_series(data):
+    """A 1D float series from an array or memory map, without copying memory maps"""
+    if isinstance(data, np.ndarray) and data.ndim == 2:
+        data = data[:, -1]
+    if not isinstance(data, np.memmap):
+        data = np.asarray(data, dtype=float)
+    if data.ndim != 1:
+        raise ValueError(f"Expected a one-dimensional series, got shape {data.shape}")
+    return data
+
+
+def spill_text(file_path, column=-1, cancelled=None):
+    """Parse one column of a delimited file into a memory-mapped .npy, once per file version
+
+    Lets text files larger than memory be analysed with random access;
+    the copy lives in the temp directory keyed by path, size and mtime.
+    """
+    stat = os.stat(file_path)
+    key = hashlib.sha256(f"{os.path.abspath(file_path)}|{stat.st_size}|{stat.st_mtime_ns}|{column}".encode())
+    path = os.path.join(tempfile.gettempdir(), f"calc_series_{key.hexdigest()[:16]}.npy")
+    if os.path.exists(path):
+        return np.load(path, mmap_mode='r')
+
+    raw_path = path + '.raw'
+    count = 0
+    try:
+        with open(raw_path, 'wb') as raw:
+            for chunk in data_io.iter_table_chunks(file_path):
+                if cancelled is not None and cancelled():
+                    raise Cancelled()
+                np.ascontiguousarray(chunk[:, column], dtype=float).tofile(raw)
+                count += chunk.shape[0]
+        with open(path + '.part', 'wb') as out, open(raw_path, 'rb') as raw:
+            np.lib.format.write_array_header_1_0(out, {'descr': np.dtype(float).str, 'fortran_order': False,
+                                                       'shape': (count,)})
+            shutil.copyfileobj(raw, out, 16 << 20)
+        os.replace(path + '.part', path)
+    finally:
+        os.remove(raw_path)
+    return np.load(path, mmap_mode='r')
+
+
+# Rolling statistics: O(1) per sample from chunk-local cumulative sums
+def moving_average(series, window, progress=None, cancelled=None):
+    """Mean of the last `window` samples; the first window - 1 results are NaN"""
+    return _rolling(series, window, False, progress, cancelled)
+
+
+def rolling_std(series, window, progress=None, cancelled=None):
+    """Sample standard deviation of the last `window` samples"""
+    if window < 2:
+        raise ValueError("Rolling standard deviation needs a window of at least 2")
+    return _rolling(series, window, True, progress, cancelled)
+
+
+def _rolling(series, window, spread, progress, cancelled):
+    window = int(window)
+    n = len(series)
+    if window < 1 or window > n:
+        raise ValueError(f"Window must be between 1 and {n:,}")
+    out = _output(n)
+    carry = np.empty(0)  # The window - 1 samples before the current chunk
+    for start, stop in _steps(n, CHUNK, progress, cancelled):
+        extended = np.concatenate([carry, _block(series, start, stop)])
+        # Sums restart every chunk, so rounding never builds up over the whole series;
+        # squares are taken about the chunk mean to avoid cancellation
+        shift = extended.mean() if spread else 0.0
+        centred = extended - shift
+        sums = np.concatenate([[0.0], np.cumsum(centred)])
+        totals = sums[window:] - sums[:-window]
+        if spread:
+            squares = np.concatenate([[0.0], np.cumsum(centred * centred)])
+            square_totals = squares[window:] - squares[:-window]
+            values = np.sqrt(np.maximum(square_totals - totals * totals / window, 0) / (window - 1))
+        else:
+            values = totals / window
+        leading = window - 1 - carry.size  # Positions of this chunk without a full window
+        if leading > 0:
+            out[start:start + leading] = np.nan
+            out[start + leading:stop] = values
+        else:
+            out[start:stop] = values
+        carry = extended[-(window - 1):] if window > 1 else np.empty(0)
+    return out
+
+
+def ewma(series, alpha, progress=None, cancelled=None):
+    """Exponentially weighted moving average y[t] = alpha x[t] + (1 - alpha) y[t-1], y[-1] = x[0]
+
+    The recurrence is solved in vectorized blocks: within a block,
+    y[k] = d^k (y0 + alpha sum x[j] d^-j) with d = 1 - alpha, where blocks
+    are short enough that d^-k stays far from overflow.
+    """
+    alpha = float(alpha)
+    if not 0 < alpha <= 1:
+        raise ValueError("Alpha must be in (0, 1]")
+    n = len(series)
+    out = _output(n)
+    if n == 0:
+        return out
+    decay = 1.0 - alpha
+    if decay == 0:
+        for start, stop in _steps(n, CHUNK, progress, cancelled):
+            out[start:stop] = _block(series, start, stop)
+        return out
+
+    block = int(min(CHUNK, max(1, _EWMA_EXPONENT / -np.log(decay))))
+    exponents = np.arange(block)
+    growth = decay ** -exponents.astype(float)          # d^-k
+    shrink = decay ** exponents.astype(float)           # d^k
+    carry_weights = decay ** (exponents + 1.0)          # d^(k+1), weight of the previous value
+    previous = float(series[0])
+    step = max(block, CHUNK // block * block)
+    for start, stop in _steps(n, step, progress, cancelled):
+        values = _block(series, start, stop)
+        blocks = -(-values.size // block)
+        padded = np.zeros(blocks * block)
+        padded[:values.size] = values
+        padded = padded.reshape(blocks, block)
+        local = alpha * shrink * np.cumsum(padded * growth, axis=1)  # Blocks started from zero
+        # A block's carry-in is the previous block's last value; d^block is below
+        # e^-300, so only the first block's carry needs the exact chained value
+        ends = local[:, -1].copy()
+        ends[0] += decay ** block * previous
+        carries = np.concatenate([[previous], ends[:-1]])
+        result = local + carry_weights * carries[:, None]
+        flat = result.ravel()[:values.size]
+        out[start:stop] = flat
+        previous = float(flat[-1])
+    return out
+
+
+# Detrending and resampling
+def trend(series, progress=None, cancelled=None):
+    """Least-squares line through the series: (mean, slope per sample about the centre)"""
+    n = len(series)
+    if n < 2:
+        raise ValueError("Need at least two samples")
+    centre = (n - 1) / 2
+    total = weighted = 0.0
+    for start, stop in _steps(n, CHUNK, progress, cancelled):
+        values = _block(series, start, stop)
+        total += values.sum()
+        weighted += values @ (np.arange(start, stop) - centre)
+    mean = total / n
+    return mean, weighted / (n * (n * n - 1) / 12.0)  # sum of squared centred positions
+
+
+def detrend(series, kind='linear', progress=None, cancelled=None):
+    """Series minus its least-squares line ('linear') or its mean ('constant')"""
+    mean, slope = trend(series, progress, cancelled)
+    if kind == 'constant':
+        slope = 0.0
+    n = len(series)
+    centre = (n - 1) / 2
+    out = _output(n)
+    for start, stop in _steps(n, CHUNK, progress, cancelled):
+        out[start:stop] = _block(series, start, stop) - (mean + slope * (np.arange(start, stop) - centre))
+    return out
+
+
+def resample(series, length, progress=None, cancelled=None):
+    """Resample to `length` samples: bin means when shrinking (anti-aliased), linear interpolation when growing"""
+    n = len(series)
+    length = int(length)
+    if length < 2 or n < 2:
+        raise ValueError("Resampling needs at least two samples in and out")
+    out = _output(length)
+    step = max(1, CHUNK * length // n) if length < n else CHUNK
+    for start, stop in _steps(length, step, progress, cancelled):
+        if length < n:
+            edges = np.arange(start, stop + 1) * n // length  # Bin k covers [edges[k], edges[k+1])
+            values = _block(series, edges[0], edges[-1])
+            sums = np.concatenate([[0.0], np.cumsum(values)])
+            local = edges - edges[0]
+            out[start:stop] = (sums[local[1:]] - sums[local[:-1]]) / np.diff(edges)
+        else:
+            positions = np.arange(start, stop) * ((n - 1) / (length - 1))
+            first = int(positions[0])
+            last = min(n, int(positions[-1]) + 2)
+            out[start:stop] = np.interp(positions, np.arange(first, last), _block(series, first, last))
+    return out
+
+
+# Correlation and spectra
+def autocorrelation(series, max_lag, progress=None, cancelled=None):
+    """Autocorrelation at lags 0..max_lag by chunked FFT cross-correlation
+
+    Each chunk is correlated with itself plus the next max_lag samples, so
+    the sums are exact for any series length. Returns (lags, acf).
+    """
+    n = len(series)
+    max_lag = int(min(max_lag, n - 1))
+    if max_lag < 1:
+        raise ValueError("Need a maximum lag of at least 1 and at least two samples")
+    mean, _ = trend(series)
+    size = 1 << int(np.ceil(np.log2(CHUNK + max_lag)))
+    sums = np.zeros(max_lag + 1)
+    for start, stop in _steps(n, CHUNK, progress, cancelled):
+        head = _block(series, start, stop) - mean
+        extended = _block(series, start, min(n, stop + max_lag)) - mean
+        spectrum = np.conj(np.fft.rfft(head, size)) * np.fft.rfft(extended, size)
+        sums += np.fft.irfft(spectrum, size)[:max_lag + 1]
+    if sums[0] == 0:
+        raise ValueError("Constant series: autocorrelation is undefined")
+    return np.arange(max_lag + 1), sums / sums[0]
+
+
+def _frames(series, segment, hop, progress, cancelled):
+    """Yield (first frame index, windowed detrended frames) in batches of about CHUNK samples"""
+    n = len(series)
+    count = 1 + (n - segment) // hop
+    batch = max(1, CHUNK // hop)
+    for first, last in _steps(count, batch, progress, cancelled):
+        values = _block(series, first * hop, (last - 1) * hop + segment)
+        frames = np.lib.stride_tricks.sliding_window_view(values, segment)[::hop]
+        yield first, frames - frames.mean(axis=1, keepdims=True)
+
+
+def _check_segment(series, segment):
+    segment = int(segment)
+    if segment < 4:
+        raise ValueError("Segment length must be at least 4")
+    if segment > len(series):
+        raise ValueError(f"Segment length exceeds the {len(series):,} samples")
+    return segment
+
+
+def power_spectrum(series, segment=4096, rate=1.0, progress=None, cancelled=None):
+    """Welch power spectral density: Hann-windowed, 50% overlapping, mean-removed segments
+
+    Returns (frequencies, one-sided PSD in units² per frequency unit).
+    """
+    segment = _check_segment(series, segment)
+    window = np.hanning(segment)
+    total = np.zeros(segment // 2 + 1)
+    count = 0
+    for _, frames in _frames(series, segment, segment // 2, progress, cancelled):
+        total += (np.abs(np.fft.rfft(frames * window, axis=1)) ** 2).sum(axis=0)
+        count += frames.shape[0]
+    psd = total / count / (rate * (window ** 2).sum())
+    psd[1:-1 if segment % 2 == 0 else None] *= 2
+    return np.fft.rfftfreq(segment, 1 / rate), psd
+
+
+def spectrogram(series, segment=1024, rate=1.0, columns=1200, progress=None, cancelled=None):
+    """Short-time power spectra averaged into at most `columns` time bins
+
+    Returns (bin centre times, frequencies, power array of shape
+    (frequencies, time bins)), so a 100M-sample series still yields an
+    image the size of the canvas. Power is one-sided PSD, in the same
+    units as power_spectrum.
+    """
+    segment = _check_segment(series, segment)
+    hop = segment // 2
+    count = 1 + (len(series) - segment) // hop
+    columns = max(1, min(int(columns), count))
+    window = np.hanning(segment)
+    power = np.zeros((columns, segment // 2 + 1))
+    frames_per_column = np.bincount(np.arange(count) * columns // count, minlength=columns)
+    for first, frames in _frames(series, segment, hop, progress, cancelled):
+        spectra = np.abs(np.fft.rfft(frames * window, axis=1)) ** 2
+        column = (np.arange(first, first + frames.shape[0]) * columns) // count
+        starts = np.flatnonzero(np.diff(column, prepend=-1))
+        power[column[starts]] += np.add.reduceat(spectra, starts, axis=0)
+    power /= frames_per_column[:, None] * rate * (window ** 2).sum()
+    power[:, 1:-1 if segment % 2 == 0 else None] *= 2
+    centres = (np.arange(columns) + 0.5) * count / columns * hop + segment / 2
+    return centres / rate, np.fft.rfftfreq(segment, 1 / rate), power.T
+
+
+def envelope(series, columns=2000, progress=None, cancelled=None):
+    """Per-bucket (positions, min, max, mean) for drawing a long series at screen resolution"""
+    n = len(series)
+    columns = max(1, min(int(columns), n))
+    edges = np.arange(columns + 1) * n // columns
+    lows, highs, means = np.empty(columns), np.empty(columns), np.empty(columns)
+    per_step = max(1, columns * CHUNK // max(n, 1))
+    for first, last in _steps(columns, per_step, progress, cancelled):
+        values = _block(series, edges[first], edges[last])
+        starts = edges[first:last] - edges[first]
+        lows[first:last] = np.minimum.reduceat(values, starts)
+        highs[first:last] = np.maximum.reduceat(values, starts)
+        means[first:last] = np.add.reduceat(values, starts) / np.diff(edges[first:last + 1])
+    return (edges[:-1] + edges[1:] - 1) / 2, lows, highs, means